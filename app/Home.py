@@ -2,8 +2,15 @@ import streamlit as st
 import sqlite3
 import bcrypt
 from data.users import get_user_by_username
+from data import metrics
+from data import maintenance
+from data.db import DB_PATH
 from services.user_service import register_user
 
+# Process-wide background services start here, not per connection (no-ops after the first run)
+metrics.start_exporter()
+maintenance.start_scheduler(DB_PATH)
+
 from pathlib import Path
 
 def connect_database():
@@ -54,7 +61,11 @@ with tab_login:
             stored_hash = user[2].encode("utf-8")
             password_bytes = login_password.encode("utf-8")
 
-            if bcrypt.checkpw(password_bytes, stored_hash):
+            with metrics.BCRYPT_SECONDS.labels("check").time():
+                valid = bcrypt.checkpw(password_bytes, stored_hash)
+            metrics.LOGINS.labels("success" if valid else "wrong_password").inc()
+
+            if valid:
                 st.session_state.logged_in = True
                 st.session_state.username = login_username
                 st.success(f"Welcome back, {login_username}!")
@@ -62,6 +73,7 @@ with tab_login:
             else:
                 st.error("Invalid username or password.")
         else:
+            metrics.LOGINS.labels("unknown_user").inc()
             st.error("Invalid username or password.")
 
 # ----- REGISTER TAB -----
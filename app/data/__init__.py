@@ -0,0 +1,7 @@
+import sys
+from pathlib import Path
+
+# Code shared by app/ and multi_domain_platform/ lives in <repository root>/platform_core
+_REPO_ROOT = str(Path(__file__).resolve().parents[2])
+if _REPO_ROOT not in sys.path:
+    sys.path.append(_REPO_ROOT)
@@ -0,0 +1,137 @@
+"""
+Streaming incident-rate alerts: flags days on which an incident_type or
+severity runs well above its usual daily count.
+
+Each key keeps an EWMA level and variance of its (day-of-week adjusted) daily
+count plus seven day-of-week factors, so memory stays constant per key. The
+first run replays every incident in date order; after that only incidents
+with an id above the last one seen are read. Alerts go to incident_alerts.
+
+Update and list open alerts (from the project root):
+    PYTHONPATH=app python -m data.anomaly [--backfill]
+"""
+import os
+import pandas as pd
+from data.db import connect_database
+# the detector is shared with multi_domain_platform/services/incident_anomaly.py
+from platform_core.anomaly import RateAnomalyDetector
+
+# Same settings (and environment variables) as multi_domain_platform/config.py
+ANOMALY_ALPHA = float(os.environ.get("PLATFORM_ANOMALY_ALPHA", "0.1"))
+ANOMALY_SEASON_GAMMA = float(os.environ.get("PLATFORM_ANOMALY_SEASON_GAMMA", "0.05"))
+ANOMALY_Z = float(os.environ.get("PLATFORM_ANOMALY_Z", "3.0"))
+ANOMALY_MIN_COUNT = int(os.environ.get("PLATFORM_ANOMALY_MIN_COUNT", "3"))
+ANOMALY_WARMUP_DAYS = int(os.environ.get("PLATFORM_ANOMALY_WARMUP_DAYS", "7"))
+
+CHUNK_ROWS = 50_000
+DETECTOR = RateAnomalyDetector(ANOMALY_ALPHA, ANOMALY_SEASON_GAMMA, ANOMALY_Z, ANOMALY_MIN_COUNT, ANOMALY_WARMUP_DAYS)
+PARAMS = DETECTOR.params
+
+def ensure_tables(conn):
+    """Create the baseline, alert and state tables; forget the baselines when the settings changed."""
+    conn.executescript("""
+    BEGIN;
+    CREATE TABLE IF NOT EXISTS anomaly_baselines (
+        kind TEXT NOT NULL,
+        value TEXT NOT NULL,
+        day INTEGER NOT NULL,
+        count INTEGER NOT NULL,
+        level REAL NOT NULL,
+        var REAL NOT NULL,
+        days INTEGER NOT NULL,
+        season TEXT NOT NULL,
+        PRIMARY KEY (kind, value)
+    );
+    CREATE TABLE IF NOT EXISTS incident_alerts (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        kind TEXT NOT NULL,
+        value TEXT NOT NULL,
+        day TEXT NOT NULL,
+        count INTEGER NOT NULL,
+        expected REAL NOT NULL,
+        score REAL NOT NULL,
+        raised_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        acknowledged INTEGER NOT NULL DEFAULT 0,
+        UNIQUE (kind, value, day)
+    );
+    CREATE INDEX IF NOT EXISTS idx_incident_alerts_open ON incident_alerts(acknowledged, day);
+    CREATE TABLE IF NOT EXISTS anomaly_state (
+        id INTEGER PRIMARY KEY CHECK (id = 1),
+        params TEXT NOT NULL,
+        last_id INTEGER NOT NULL
+    );
+    COMMIT;
+    """)
+    row = conn.execute("SELECT params FROM anomaly_state WHERE id = 1").fetchone()
+    if row is None or row[0] != PARAMS:
+        with conn:
+            conn.execute("DELETE FROM anomaly_baselines")
+            conn.execute("INSERT OR REPLACE INTO anomaly_state (id, params, last_id) VALUES (1, ?, -1)", (PARAMS,))
+
+def _save(conn, detector, last_id):
+    with conn:
+        conn.execute("DELETE FROM anomaly_baselines")
+        conn.executemany(
+            "INSERT INTO anomaly_baselines (kind, value, day, count, level, var, days, season) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            detector.dump())
+        #an alerting day keeps growing after it first fires: keep the row's peak count
+        conn.executemany(
+            "INSERT INTO incident_alerts (kind, value, day, count, expected, score) VALUES (?, ?, ?, ?, ?, ?) "
+            "ON CONFLICT(kind, value, day) DO UPDATE SET count = MAX(count, excluded.count), "
+            "score = MAX(score, excluded.score)", detector.alerts + detector.open_alerts())
+        conn.execute("UPDATE anomaly_state SET last_id = ? WHERE id = 1", (last_id,))
+    detector.alerts.clear()
+
+def sync(conn, backfill=False):
+    """Consume incidents added since the last run (all of them, date-ordered, on the first run). Returns events."""
+    ensure_tables(conn)
+    last_id = conn.execute("SELECT last_id FROM anomaly_state WHERE id = 1").fetchone()[0]
+    detector, processed = DETECTOR.fresh(), 0
+    if backfill or last_id < 0:
+        last_id = conn.execute("SELECT COALESCE(MAX(id), 0) FROM cyber_incidents").fetchone()[0]
+        cursor = conn.execute("SELECT date, incident_type, severity FROM cyber_incidents WHERE id <= ? "
+                              "ORDER BY COALESCE(date, ''), id", (last_id,))
+        while True:
+            rows = cursor.fetchmany(CHUNK_ROWS)
+            if not rows:
+                break
+            processed += detector.process(rows)
+        _save(conn, detector, last_id)
+        return processed
+
+    detector.load(conn.execute("SELECT kind, value, day, count, level, var, days, season FROM anomaly_baselines"))
+    while True:
+        rows = conn.execute("SELECT id, date, incident_type, severity FROM cyber_incidents WHERE id > ? "
+                            "ORDER BY id LIMIT ?", (last_id, CHUNK_ROWS)).fetchall()
+        if not rows:
+            return processed
+        processed += detector.process(row[1:] for row in rows)
+        last_id = rows[-1][0]
+        _save(conn, detector, last_id)
+
+def get_open_alerts(conn, limit=50):
+    """Unacknowledged alerts, newest day first."""
+    return pd.read_sql_query(
+        "SELECT id, day, kind, value, count, expected, score, raised_at FROM incident_alerts "
+        "WHERE acknowledged = 0 ORDER BY day DESC, score DESC LIMIT ?", conn, params=(int(limit),))
+
+def acknowledge_alerts(conn, alert_ids):
+    """Mark alerts as seen. Returns alerts updated."""
+    with conn:
+        return conn.executemany("UPDATE incident_alerts SET acknowledged = 1 WHERE id = ?",
+                                [(int(aid),) for aid in alert_ids]).rowcount
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Update the incident-rate baselines and list open alerts.")
+    parser.add_argument("--backfill", action="store_true", help="rebuild the baselines from every incident")
+    args = parser.parse_args()
+
+    conn = connect_database()
+    processed = sync(conn, backfill=args.backfill)
+    alerts = get_open_alerts(conn)
+    print(f"✅ {processed} incident(s) processed; {len(alerts)} open alert(s)")
+    if not alerts.empty:
+        print(alerts[["day", "kind", "value", "count", "expected", "score"]].to_string(index=False))
+    conn.close()
@@ -0,0 +1,120 @@
+"""
+Hot/cold archiving for cyber_incidents and it_tickets.
+
+Closed/Resolved rows older than the policy age move into <table>_archive in
+the same database, one chunk per transaction, so dashboards and CRUD queries
+only scan open work. <table>_all views union both tables for historical
+analytics, and the rollup tables keep counting archived rows.
+
+Archive from the command line (run from the project root):
+    PYTHONPATH=app python -m data.archive [--days 90] [--dry-run]
+"""
+import os
+from data.db import connect_database
+from data.rollups import recount_sql
+
+# Same settings (and environment variables) as multi_domain_platform/config.py
+ARCHIVE_AFTER_DAYS = int(os.environ.get("PLATFORM_ARCHIVE_AFTER_DAYS", "90"))
+ARCHIVE_CHUNK_ROWS = int(os.environ.get("PLATFORM_ARCHIVE_CHUNK_ROWS", "1000"))
+ARCHIVE_STATUSES = tuple(s.strip() for s in os.environ.get("PLATFORM_ARCHIVE_STATUSES", "Closed,Resolved").split(","))
+
+# hot table -> SQL expression for the age of a row (tickets age from when they were resolved)
+ARCHIVE_TABLES = {
+    "cyber_incidents": "date(trim(date))",
+    "it_tickets": "date(trim(COALESCE(NULLIF(trim(resolved_date), ''), created_date)))",
+}
+
+def _columns(conn, table):
+    return [(row[1], row[2]) for row in conn.execute(f"PRAGMA table_info({table})")]
+
+def create_archive_tables(conn):
+    """Create the <table>_archive tables and <table>_all views; add columns the hot tables gained since."""
+    views = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'view'")}
+    script = []
+    for table in ARCHIVE_TABLES:
+        hot = _columns(conn, table)
+        archive = {name for name, _ in _columns(conn, f"{table}_archive")}
+        if not archive:
+            definitions = ", ".join("id INTEGER PRIMARY KEY" if name == "id" else f"{name} {kind}".strip()
+                                    for name, kind in hot)
+            script.append(f"CREATE TABLE {table}_archive ({definitions}, archived_at TIMESTAMP);")
+        missing = [(name, kind) for name, kind in hot if archive and name not in archive]
+        script.extend(f"ALTER TABLE {table}_archive ADD COLUMN {name} {kind};" for name, kind in missing)
+        if missing or f"{table}_all" not in views:
+            column_list = ", ".join(name for name, _ in hot)
+            script.append(f"DROP VIEW IF EXISTS {table}_all;")
+            script.append(f"CREATE VIEW {table}_all AS SELECT {column_list} FROM {table} "
+                          f"UNION ALL SELECT {column_list} FROM {table}_archive;")
+    if script:
+        conn.executescript("BEGIN;\n" + "\n".join(script) + "\nCOMMIT;")
+
+def history_source(conn, table):
+    """`table`'s *_all view if it exists, else the table itself."""
+    row = conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'view' AND name = ?", (f"{table}_all",)).fetchone()
+    return f"{table}_all" if row else table
+
+def _candidate_filter(table, older_than_days, statuses):
+    placeholders = ", ".join("?" * len(statuses))
+    return (f"status IN ({placeholders}) AND {ARCHIVE_TABLES[table]} < date('now', ?)",
+            [*statuses, f"-{int(older_than_days)} days"])
+
+def archive_ids(conn, table, ids, statuses=ARCHIVE_STATUSES):
+    """Move the given rows into the archive in one transaction; reopened rows stay hot. Returns rows archived."""
+    ids = list(ids)
+    if not ids:
+        return 0
+    columns = ", ".join(name for name, _ in _columns(conn, table))
+    id_list = ", ".join("?" * len(ids))
+    status_list = ", ".join("?" * len(statuses))
+    existing = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    with conn:
+        conn.execute(f"INSERT INTO {table}_archive ({columns}, archived_at) "
+                     f"SELECT {columns}, CURRENT_TIMESTAMP FROM {table} "
+                     f"WHERE id IN ({id_list}) AND status IN ({status_list})", [*ids, *statuses])
+        archived = conn.execute(f"DELETE FROM {table} WHERE id IN "
+                                f"(SELECT id FROM {table}_archive WHERE id IN ({id_list}))", ids).rowcount
+        # the delete triggers just took these rows out of the rollups; count them back in
+        for rollup, sql in recount_sql(table, f"{table}_archive", f"id IN ({id_list})"):
+            if rollup in existing:
+                conn.execute(sql, ids)
+    return archived
+
+def archive_closed(conn, table, older_than_days=ARCHIVE_AFTER_DAYS, statuses=ARCHIVE_STATUSES,
+                   chunk_rows=ARCHIVE_CHUNK_ROWS):
+    """Archive every row the policy selects, chunk_rows per transaction. Returns rows archived."""
+    create_archive_tables(conn)
+    where, params = _candidate_filter(table, older_than_days, statuses)
+    ids = [row[0] for row in conn.execute(f"SELECT id FROM {table} WHERE {where} ORDER BY id", params)]
+    return sum(archive_ids(conn, table, ids[start:start + chunk_rows], statuses)
+               for start in range(0, len(ids), chunk_rows))
+
+def archive_stats(conn, older_than_days=ARCHIVE_AFTER_DAYS, statuses=ARCHIVE_STATUSES):
+    """Per table: hot rows, archived rows and rows the policy would archive now."""
+    create_archive_tables(conn)
+    stats = {}
+    for table in ARCHIVE_TABLES:
+        where, params = _candidate_filter(table, older_than_days, statuses)
+        stats[table] = {
+            "hot": conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0],
+            "archived": conn.execute(f"SELECT COUNT(*) FROM {table}_archive").fetchone()[0],
+            "due": conn.execute(f"SELECT COUNT(*) FROM {table} WHERE {where}", params).fetchone()[0],
+        }
+    return stats
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Move closed incidents and tickets into the archive tables.")
+    parser.add_argument("--days", type=int, default=ARCHIVE_AFTER_DAYS)
+    parser.add_argument("--chunk-rows", type=int, default=ARCHIVE_CHUNK_ROWS)
+    parser.add_argument("--dry-run", action="store_true", help="only report what would be archived")
+    args = parser.parse_args()
+
+    conn = connect_database()
+    if args.dry_run:
+        for name, counts in archive_stats(conn, args.days).items():
+            print(f"  {name}: {counts['hot']} hot, {counts['archived']} archived, {counts['due']} due")
+    else:
+        for name in ARCHIVE_TABLES:
+            print(f"✅ {name}: {archive_closed(conn, name, args.days, chunk_rows=args.chunk_rows)} rows archived")
+    conn.close()
@@ -0,0 +1,34 @@
+import threading
+import numpy as np
+import pandas as pd
+
+# Same strategies, edges and labels as multi_domain_platform/services/binning.py (platform_core/binning.py):
+# "log" (equal width on a log scale), "quantile" (equal counts), "linear" (equal width)
+from platform_core.binning import DEFAULT_BINS, STRATEGIES, bin_labels, compute_edges
+
+# column fingerprint -> bin edges, shared across reruns
+_EDGES = {}
+_EDGES_LOCK = threading.Lock()
+_MAX_CACHED = 64
+
+def histogram(series: pd.Series, strategy="log", bins=DEFAULT_BINS):
+    """
+    Bin a numeric column into tens of bars instead of one per distinct value.
+    Edges are cached on a fingerprint of the column (size, sum, min, max), so reruns over
+    unchanged data skip the quantile sort. Returns bin, bin_start, bin_end, label, count.
+    """
+    values = pd.to_numeric(series, errors="coerce").dropna().to_numpy(dtype="float64")
+    fingerprint = (series.name, strategy, bins, values.size, float(values.sum()),
+                   float(values.min()) if values.size else None, float(values.max()) if values.size else None)
+    with _EDGES_LOCK:
+        edges = _EDGES.get(fingerprint)
+    if edges is None:
+        edges = compute_edges(values, strategy, bins)
+        with _EDGES_LOCK:
+            if len(_EDGES) >= _MAX_CACHED:
+                _EDGES.clear()
+            _EDGES[fingerprint] = edges
+    # the last bin includes its upper edge, as in numpy.histogram
+    counts = np.histogram(values, edges)[0]
+    return pd.DataFrame({"bin": np.arange(len(counts)), "bin_start": edges[:-1], "bin_end": edges[1:],
+                         "label": bin_labels(edges), "count": counts})
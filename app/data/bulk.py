@@ -0,0 +1,42 @@
+import sqlite3
+
+
+def execute_batch(conn: sqlite3.Connection, sql: str, rows):
+    """
+    Run one write statement for every parameter tuple with executemany, in a single transaction.
+    A row that violates a constraint is skipped instead of aborting the batch.
+
+    Returns: (rows affected, [(row index, error message)])
+    """
+    rows = [tuple(row) for row in rows]
+    cursor = conn.cursor()
+    cursor.execute("SAVEPOINT batch")
+    try:
+        cursor.executemany(sql, rows)
+        affected, errors = cursor.rowcount, []
+    except sqlite3.IntegrityError:
+        # redo row by row to find the offending rows; still one transaction
+        cursor.execute("ROLLBACK TO batch")
+        affected, errors = 0, []
+        for index, row in enumerate(rows):
+            try:
+                cursor.execute(sql, row)
+                affected += cursor.rowcount
+            except sqlite3.IntegrityError as e:
+                errors.append((index, str(e)))
+    cursor.execute("RELEASE batch")
+    conn.commit()
+    return affected, errors
+
+
+def missing_keys(conn: sqlite3.Connection, table: str, column: str, keys):
+    """Report the keys not present in table.column as [(index, error)], looked up in chunks of 500."""
+    keys = list(keys)
+    found = set()
+    for start in range(0, len(keys), 500):
+        chunk = keys[start:start + 500]
+        placeholders = ", ".join("?" * len(chunk))
+        found.update(row[0] for row in conn.execute(
+            f"SELECT {column} FROM {table} WHERE {column} IN ({placeholders})", chunk
+        ))
+    return [(i, f"{key} not found") for i, key in enumerate(keys) if key not in found]
@@ -1,9 +1,11 @@
 import sqlite3
 import pandas as pd
+from data.db import connect_database
+from data.bulk import execute_batch, missing_keys
 
 def insert_dataset(dataset_name, category, source, last_updated, record_count, file_size_mb):
     """CREATE: Insert a new dataset metadata record into the database."""
-    conn = sqlite3.connect("DATA/intelligence_platform.db")
+    conn = connect_database()
     cursor = conn.cursor()
     
     cursor.execute("""
@@ -18,14 +20,14 @@ def insert_dataset(dataset_name, category, source, last_updated, record_count, f
 
 def get_all_datasets():
     """READ: Retrieve all dataset metadata records as a pandas DataFrame."""
-    conn = sqlite3.connect("DATA/intelligence_platform.db")
+    conn = connect_database()
     df = pd.read_sql_query("SELECT * FROM datasets_metadata ORDER BY last_updated DESC", conn)
     conn.close()
     return df
 
 def update_dataset(dataset_id, dataset_name=None, category=None, source=None, last_updated=None, record_count=None, file_size_mb=None):
     """UPDATE: Modify dataset metadata details."""
-    conn = sqlite3.connect("DATA/intelligence_platform.db")
+    conn = connect_database()
     cursor = conn.cursor()
     
     updates = []
@@ -69,10 +71,33 @@ def update_dataset(dataset_id, dataset_name=None, category=None, source=None, la
     
 def delete_dataset(dataset_name):
     """DELETE: Remove a dataset metadata record from the database by dataset_name."""
-    conn = sqlite3.connect("DATA/intelligence_platform.db")
+    conn = connect_database()
     cursor = conn.cursor()
     cursor.execute("DELETE FROM datasets_metadata WHERE id = ?", (dataset_name,))
     conn.commit()
     rows_deleted = cursor.rowcount
     conn.close()
-    return rows_deleted
\ No newline at end of file
+    return rows_deleted
+
+def insert_datasets_bulk(rows):
+    """CREATE (batch): Insert many records, each (dataset_name, category, source, last_updated, record_count, file_size_mb), in one transaction."""
+    conn = connect_database()
+    try:
+        return execute_batch(conn, """
+            INSERT INTO datasets_metadata
+            (dataset_name, category, source, last_updated, record_count, file_size_mb)
+            VALUES (?, ?, ?, ?, ?, ?)
+        """, rows)
+    finally:
+        conn.close()
+
+def delete_datasets_bulk(dataset_ids):
+    """DELETE (batch): Remove many dataset metadata records by id in one transaction. Returns (rows deleted, [(index, error)])."""
+    dataset_ids = [int(did) for did in dataset_ids]
+    conn = connect_database()
+    try:
+        missing = missing_keys(conn, "datasets_metadata", "id", dataset_ids)
+        deleted, errors = execute_batch(conn, "DELETE FROM datasets_metadata WHERE id = ?", [(did,) for did in dataset_ids])
+        return deleted, sorted(errors + missing)
+    finally:
+        conn.close()
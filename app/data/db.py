@@ -1,8 +1,9 @@
-import sqlite3
 from pathlib import Path
+from data import tracing
 
 # Define paths
 DB_PATH = Path("DATA") / "intelligence_platform.db"
 
 def connect_database(db_path=DB_PATH):
-    return sqlite3.connect(db_path)
\ No newline at end of file
+    # every statement is timed; slow ones go to the SQL trace log (see data/tracing.py)
+    return tracing.connect(db_path)
\ No newline at end of file
@@ -0,0 +1,160 @@
+"""
+Near-duplicate cyber incidents (one campaign reported many times).
+
+Each description gets a MinHash signature over its character shingles, stored
+in incident_signatures, and is filed under one LSH bucket per band in
+incident_lsh, so near-duplicates are found from a few index entries instead of
+comparing every pair. SQLite triggers queue every inserted, edited or deleted
+incident in dedup_queue; sync() re-signs just the queued ones.
+
+Index and list the groups (from the project root):
+    PYTHONPATH=app python -m data.dedup [--threshold 0.8]
+"""
+import os
+import threading
+import numpy as np
+from data.db import connect_database
+# MinHash, LSH buckets, clustering and collapsing are shared with multi_domain_platform/services/incident_dedup.py
+from platform_core.dedup import MinHasher, cluster_frame, collapse_frame
+
+# Same settings (and environment variables) as multi_domain_platform/config.py
+DEDUP_SHINGLE = int(os.environ.get("PLATFORM_DEDUP_SHINGLE", "5"))
+DEDUP_NUM_PERM = int(os.environ.get("PLATFORM_DEDUP_NUM_PERM", "128"))
+DEDUP_BANDS = int(os.environ.get("PLATFORM_DEDUP_BANDS", "16"))
+DEDUP_THRESHOLD = float(os.environ.get("PLATFORM_DEDUP_THRESHOLD", "0.7"))
+
+CHUNK_ROWS = 5_000
+SEVERITY_LEVELS = {"low": 1, "medium": 2, "high": 3, "critical": 4}
+
+HASHER = MinHasher(DEDUP_NUM_PERM, DEDUP_BANDS, DEDUP_SHINGLE)
+PARAMS = HASHER.params
+signature = HASHER.signature
+buckets = HASHER.buckets
+
+# (db path, index generation, threshold) -> clusters, shared across reruns
+_CLUSTERS = {}
+_CLUSTERS_LOCK = threading.Lock()
+
+def ensure_tables(conn):
+    """Create the index tables and queue triggers; queue every incident when the MinHash settings changed."""
+    conn.executescript("""
+    BEGIN;
+    CREATE TABLE IF NOT EXISTS incident_signatures (
+        incident_id INTEGER PRIMARY KEY,
+        signature BLOB NOT NULL
+    );
+    CREATE TABLE IF NOT EXISTS incident_lsh (
+        band INTEGER NOT NULL,
+        bucket INTEGER NOT NULL,
+        incident_id INTEGER NOT NULL,
+        PRIMARY KEY (band, bucket, incident_id)
+    ) WITHOUT ROWID;
+    CREATE INDEX IF NOT EXISTS idx_incident_lsh_incident ON incident_lsh(incident_id);
+    CREATE TABLE IF NOT EXISTS dedup_queue (incident_id INTEGER PRIMARY KEY);
+    CREATE TABLE IF NOT EXISTS dedup_state (
+        id INTEGER PRIMARY KEY CHECK (id = 1),
+        params TEXT NOT NULL,
+        generation INTEGER NOT NULL DEFAULT 0
+    );
+    CREATE TRIGGER IF NOT EXISTS trg_dedup_insert AFTER INSERT ON cyber_incidents
+    BEGIN INSERT OR IGNORE INTO dedup_queue VALUES (NEW.id); END;
+    CREATE TRIGGER IF NOT EXISTS trg_dedup_update AFTER UPDATE OF description ON cyber_incidents
+    BEGIN INSERT OR IGNORE INTO dedup_queue VALUES (NEW.id); END;
+    CREATE TRIGGER IF NOT EXISTS trg_dedup_delete AFTER DELETE ON cyber_incidents
+    BEGIN INSERT OR IGNORE INTO dedup_queue VALUES (OLD.id); END;
+    COMMIT;
+    """)
+    row = conn.execute("SELECT params FROM dedup_state WHERE id = 1").fetchone()
+    if row is None or row[0] != PARAMS:
+        with conn:
+            conn.execute("DELETE FROM incident_lsh")
+            conn.execute("DELETE FROM incident_signatures")
+            conn.execute("INSERT OR IGNORE INTO dedup_queue SELECT id FROM cyber_incidents")
+            conn.execute("INSERT INTO dedup_state (id, params) VALUES (1, ?) "
+                         "ON CONFLICT(id) DO UPDATE SET params = excluded.params, generation = generation + 1",
+                         (PARAMS,))
+
+def sync(conn):
+    """Re-sign the queued incidents (drop deleted ones). Returns incidents processed."""
+    ensure_tables(conn)
+    processed = 0
+    while True:
+        #the queue is read and cleared in one write transaction, so an edit made meanwhile re-queues its row
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            ids = [row[0] for row in conn.execute("SELECT incident_id FROM dedup_queue LIMIT ?", (CHUNK_ROWS,))]
+            if not ids:
+                conn.commit()
+                return processed
+            marks = ", ".join("?" * len(ids))
+            descriptions = dict(conn.execute(f"SELECT id, description FROM cyber_incidents WHERE id IN ({marks})", ids))
+            signed, cache = [], {}
+            for incident_id, description in descriptions.items():
+                if description not in cache:
+                    cache[description] = signature(description)
+                if cache[description] is not None:
+                    signed.append((incident_id, cache[description]))
+            conn.execute(f"DELETE FROM incident_lsh WHERE incident_id IN ({marks})", ids)
+            conn.execute(f"DELETE FROM incident_signatures WHERE incident_id IN ({marks})", ids)
+            conn.executemany("INSERT INTO incident_signatures (incident_id, signature) VALUES (?, ?)",
+                             [(incident_id, sig.tobytes()) for incident_id, sig in signed])
+            conn.executemany("INSERT OR IGNORE INTO incident_lsh (band, bucket, incident_id) VALUES (?, ?, ?)",
+                             [(band, bucket, incident_id) for incident_id, sig in signed
+                              for band, bucket in enumerate(buckets(sig))])
+            conn.execute(f"DELETE FROM dedup_queue WHERE incident_id IN ({marks})", ids)
+            conn.execute("UPDATE dedup_state SET generation = generation + 1 WHERE id = 1")
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        processed += len(ids)
+
+def _signatures(conn, incident_ids):
+    found = {}
+    for start in range(0, len(incident_ids), 500):
+        chunk = incident_ids[start:start + 500]
+        found.update((row[0], np.frombuffer(row[1], dtype=np.uint32)) for row in conn.execute(
+            f"SELECT incident_id, signature FROM incident_signatures WHERE incident_id IN ({', '.join('?' * len(chunk))})",
+            chunk))
+    return found
+
+def clusters(conn, threshold=DEDUP_THRESHOLD):
+    """incident_id, cluster_id (lowest id in the group), similarity for every incident with a near-duplicate."""
+    generation = conn.execute("SELECT generation FROM dedup_state WHERE id = 1").fetchone()[0]
+    path = conn.execute("PRAGMA database_list").fetchone()[2]
+    key = (path, generation, threshold)
+    with _CLUSTERS_LOCK:
+        if key in _CLUSTERS:
+            return _CLUSTERS[key]
+
+    groups = [[int(i) for i in row[0].split(",")] for row in conn.execute(
+        "SELECT group_concat(incident_id) FROM incident_lsh GROUP BY band, bucket HAVING COUNT(*) > 1")]
+    frame = cluster_frame(groups, _signatures(conn, sorted({i for group in groups for i in group})), threshold)
+    with _CLUSTERS_LOCK:
+        for stale in [k for k in _CLUSTERS if k[0] == path and k[1] != generation]:
+            del _CLUSTERS[stale]
+        _CLUSTERS[key] = frame
+    return frame
+
+def collapse(conn, incidents, threshold=DEDUP_THRESHOLD):
+    """
+    One row per group of near-duplicate incidents (and per incident without any):
+    the group's first incident, count, ids, date range, highest severity, open count.
+    """
+    return collapse_frame(incidents, clusters(conn, threshold), SEVERITY_LEVELS)
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Index incidents for near-duplicate detection and list the groups.")
+    parser.add_argument("--threshold", type=float, default=DEDUP_THRESHOLD)
+    args = parser.parse_args()
+
+    conn = connect_database()
+    processed = sync(conn)
+    found = clusters(conn, args.threshold)
+    sizes = found.groupby("cluster_id").size().sort_values(ascending=False)
+    print(f"✅ {processed} incident(s) indexed; {len(found)} in {len(sizes)} group(s) of near-duplicates")
+    for cluster_id, size in sizes.head(10).items():
+        print(f"  #{cluster_id}: {size} incidents")
+    conn.close()
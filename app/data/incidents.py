@@ -1,6 +1,8 @@
 import pandas as pd
 from pathlib import Path
 from data.db import connect_database
+from data.bulk import execute_batch, missing_keys
+from data.transitions import build_filter, transition, transition_keys
 
 def load_csv_to_table(conn, csv_path, table_name: str):
     """Load a CSV file into a database table using pandas."""
@@ -64,12 +66,9 @@ def get_all_incidents(conn):
     return df
 
 def update_incident_status(conn, incident_id, new_status):
-    """UPDATE: Modify the status of an incident."""
-    cursor = conn.cursor()
-    query = "UPDATE cyber_incidents SET status = ? WHERE id = ?"
-    cursor.execute(query, (new_status, incident_id))
-    conn.commit()
-    return cursor.rowcount
+    """UPDATE: Move one incident to new_status through the status workflow. Returns 1 if it is now in new_status, else 0."""
+    result = transition(conn, "cyber_incidents", "id", new_status, "id = ?", [int(incident_id)])
+    return result["changed"] + result["unchanged"]
 
 def delete_incident(conn, incident_id):
     """DELETE: Remove an incident from the database."""
@@ -88,4 +87,34 @@ def get_incidents_by_type_count(conn):
     ORDER BY count DESC
     """
     df = pd.read_sql_query(query, conn)
-    return df
\ No newline at end of file
+    return df
+
+def insert_incidents_bulk(conn, rows):
+    """CREATE (batch): Insert many incidents, each (date, incident_type, severity, status, description, reported_by), in one transaction."""
+    query = """
+    INSERT INTO cyber_incidents
+    (date, incident_type, severity, status, description, reported_by)
+    VALUES (?, ?, ?, ?, ?, ?)
+    """
+    return execute_batch(conn, query, rows)
+
+def update_incident_status_bulk(conn, incident_ids, new_status):
+    """UPDATE (batch): Move many incidents through the status workflow in one transaction. Returns (rows now in new_status, [(index, error)]); missing incidents and blocked moves are errors."""
+    return transition_keys(conn, "cyber_incidents", "id", [int(iid) for iid in incident_ids], new_status)
+
+def delete_incidents_bulk(conn, incident_ids):
+    """DELETE (batch): Remove many incidents in one transaction. Returns (rows deleted, [(index, error)])."""
+    incident_ids = [int(iid) for iid in incident_ids]
+    missing = missing_keys(conn, "cyber_incidents", "id", incident_ids)
+    deleted, errors = execute_batch(conn, "DELETE FROM cyber_incidents WHERE id = ?", [(iid,) for iid in incident_ids])
+    return deleted, sorted(errors + missing)
+
+def transition_incidents(conn, new_status, incident_ids=None, incident_types=(), severities=(), statuses=(),
+                         older_than_days=None, dry_run=False):
+    """UPDATE (set-based): Move every incident matching the filters to new_status in one statement, e.g. close all Low Phishing older than 30 days."""
+    where, params = build_filter(
+        keys=None if incident_ids is None else [int(iid) for iid in incident_ids],
+        equals={"incident_type": incident_types, "severity": severities, "status": statuses},
+        date_column="date", older_than_days=older_than_days,
+    )
+    return transition(conn, "cyber_incidents", "id", new_status, where, params, dry_run=dry_run)
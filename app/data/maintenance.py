@@ -0,0 +1,187 @@
+"""
+Background database maintenance for the app database.
+
+Deletes leave free pages and nothing collects planner statistics, so inside
+the off-peak window a daemon thread reclaims pages (auto_vacuum=INCREMENTAL),
+runs ANALYZE / PRAGMA optimize and quick_check, and checkpoints the WAL.
+Each run has a time budget, enforced with a progress handler, and every task's
+outcome (skipped for lack of budget included) is written to the maintenance_log
+table and the maintenance log file. A task stays due until a run completes it.
+The scheduler thread is started once, by Home.py.
+
+Run now, ignoring the window (from the project root):
+    PYTHONPATH=app python -m data.maintenance [--task optimize] [--budget 120]
+"""
+import calendar
+import json
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+
+# Same settings (and environment variables) as multi_domain_platform/config.py
+MAINTENANCE_ENABLED = os.environ.get("PLATFORM_MAINTENANCE", "1") == "1"
+MAINTENANCE_WINDOW = os.environ.get("PLATFORM_MAINTENANCE_WINDOW", "01:00-05:00")
+MAINTENANCE_BUDGET_SECONDS = float(os.environ.get("PLATFORM_MAINTENANCE_BUDGET_SECONDS", "60"))
+MAINTENANCE_CHECK_SECONDS = int(os.environ.get("PLATFORM_MAINTENANCE_CHECK_SECONDS", "300"))
+MAINTENANCE_LOG = Path(os.environ.get("PLATFORM_MAINTENANCE_LOG", Path("DATA") / "maintenance.log"))
+
+# task -> hours between runs; tasks run in this order and share one run's budget
+TASK_INTERVAL_HOURS = {"incremental_vacuum": 20, "optimize": 20, "quick_check": 20, "wal_checkpoint": 1}
+VACUUM_STEP_PAGES = 256
+ANALYSIS_LIMIT = 1000
+
+_scheduler_started = False
+_scheduler_lock = threading.Lock()
+_run_lock = threading.Lock()
+
+def in_window(window, now=None):
+    """Whether `now` (local time) is inside an "HH:MM-HH:MM" window, which may wrap midnight."""
+    if not window:
+        return True
+    start, end = (datetime.strptime(part.strip(), "%H:%M").time() for part in window.split("-"))
+    current = (now or datetime.now()).time()
+    return start <= current < end if start <= end else (current >= start or current < end)
+
+def _pragma(conn, pragma):
+    return conn.execute(f"PRAGMA {pragma}").fetchone()[0]
+
+def _incremental_vacuum(conn, deadline):
+    details = {}
+    if _pragma(conn, "auto_vacuum") != 2:
+        #the one-time VACUUM switching the file to incremental mode cannot resume, so it is not budgeted
+        conn.set_progress_handler(None, 0)
+        try:
+            conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+            conn.execute("VACUUM")
+        finally:
+            conn.set_progress_handler(lambda: time.monotonic() > deadline, 10_000)
+        details["converted"] = True
+    free_before = _pragma(conn, "freelist_count")
+    while _pragma(conn, "freelist_count") and time.monotonic() < deadline:
+        # executescript steps the pragma to completion; execute() would free a single page
+        conn.executescript(f"PRAGMA incremental_vacuum({VACUUM_STEP_PAGES})")
+    free_after = _pragma(conn, "freelist_count")
+    details.update(pages_freed=free_before - free_after, free_pages_left=free_after,
+                   bytes_freed=(free_before - free_after) * _pragma(conn, "page_size"))
+    return details
+
+def _optimize(conn, deadline):
+    conn.execute(f"PRAGMA analysis_limit = {ANALYSIS_LIMIT}")
+    has_stats = conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'sqlite_stat1'").fetchone()
+    conn.execute("PRAGMA optimize" if has_stats else "ANALYZE")
+    return {"mode": "optimize" if has_stats else "analyze",
+            "tables_with_stats": conn.execute("SELECT COUNT(DISTINCT tbl) FROM sqlite_stat1").fetchone()[0]}
+
+def _quick_check(conn, deadline):
+    rows = [row[0] for row in conn.execute("PRAGMA quick_check(20)")]
+    if rows != ["ok"]:
+        raise sqlite3.DatabaseError("quick_check found problems: " + "; ".join(rows))
+    return {"result": "ok"}
+
+def _wal_checkpoint(conn, deadline):
+    mode = _pragma(conn, "journal_mode")
+    if mode != "wal":
+        return {"not_needed": f"journal_mode is {mode}"}
+    busy, log_frames, checkpointed = conn.execute("PRAGMA wal_checkpoint(TRUNCATE)").fetchone()
+    if busy:
+        busy, log_frames, checkpointed = conn.execute("PRAGMA wal_checkpoint(PASSIVE)").fetchone()
+    return {"busy": bool(busy), "log_frames": log_frames, "checkpointed_frames": checkpointed}
+
+TASKS = {"incremental_vacuum": _incremental_vacuum, "optimize": _optimize,
+         "quick_check": _quick_check, "wal_checkpoint": _wal_checkpoint}
+
+def _ensure_log_table(conn):
+    conn.execute("""
+    CREATE TABLE IF NOT EXISTS maintenance_log (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        task TEXT NOT NULL,
+        started_at TIMESTAMP NOT NULL,
+        seconds REAL NOT NULL,
+        status TEXT NOT NULL,
+        details TEXT
+    )""")
+
+def due_tasks(conn):
+    """Tasks whose interval has passed since they last completed (interrupted or skipped runs don't count)."""
+    _ensure_log_table(conn)
+    last = dict(conn.execute("SELECT task, MAX(started_at) FROM maintenance_log WHERE status = 'done' GROUP BY task"))
+    now = time.time()
+    return [task for task, hours in TASK_INTERVAL_HOURS.items()
+            if task not in last or now - calendar.timegm(time.strptime(last[task], "%Y-%m-%d %H:%M:%S")) >= hours * 3600]
+
+def run_maintenance(db_path, tasks=None, budget_seconds=MAINTENANCE_BUDGET_SECONDS):
+    """
+    Run `tasks` (default: the due ones) until the budget is spent; a task still running then
+    is interrupted and rolled back. Returns [(task, status, seconds, details)].
+    """
+    results = []
+    with _run_lock:
+        conn = sqlite3.connect(db_path, timeout=5, isolation_level=None)
+        try:
+            tasks = due_tasks(conn) if tasks is None else list(tasks)
+            deadline = time.monotonic() + budget_seconds
+            for task in (t for t in TASK_INTERVAL_HOURS if t in tasks):
+                started_at = time.strftime("%Y-%m-%d %H:%M:%S", time.gmtime())
+                start = time.perf_counter()
+                conn.set_progress_handler(lambda: time.monotonic() > deadline, 10_000)
+                try:
+                    if time.monotonic() > deadline:
+                        status, details = "skipped", {"reason": f"out of budget ({budget_seconds:g}s)"}
+                    else:
+                        status, details = "done", TASKS[task](conn, deadline)
+                except sqlite3.OperationalError as e:
+                    if conn.in_transaction:
+                        conn.rollback()
+                    status, details = ("interrupted", {"reason": f"out of budget ({budget_seconds:g}s)"}) \
+                        if "interrupted" in str(e) else ("error", {"error": str(e)})
+                except sqlite3.DatabaseError as e:
+                    status, details = "failed", {"error": str(e)}
+                conn.set_progress_handler(None, 0)
+                seconds = round(time.perf_counter() - start, 3)
+                conn.execute("INSERT INTO maintenance_log (task, started_at, seconds, status, details) VALUES (?, ?, ?, ?, ?)",
+                             (task, started_at, seconds, status, json.dumps(details)))
+                MAINTENANCE_LOG.parent.mkdir(parents=True, exist_ok=True)
+                with open(MAINTENANCE_LOG, "a", encoding="utf-8") as log:
+                    log.write(json.dumps({"db": str(db_path), "task": task, "started_at": started_at,
+                                          "seconds": seconds, "status": status, **details}) + "\n")
+                print(f"  - Maintenance {task}: {status} in {seconds:.2f}s {details}")
+                results.append((task, status, seconds, details))
+        finally:
+            conn.close()
+    return results
+
+def start_scheduler(db_path, window=MAINTENANCE_WINDOW, check_seconds=MAINTENANCE_CHECK_SECONDS):
+    """Start (once per process) the daemon thread running due maintenance inside the window."""
+    global _scheduler_started
+    if not MAINTENANCE_ENABLED:
+        return
+    with _scheduler_lock:
+        if _scheduler_started:
+            return
+        in_window(window)  # fail fast on a malformed window
+
+        def loop():
+            while True:
+                time.sleep(check_seconds)
+                if in_window(window):
+                    try:
+                        run_maintenance(db_path)
+                    except sqlite3.Error as e:
+                        print(f"Database maintenance failed: {e}")
+
+        threading.Thread(target=loop, name="db-maintenance", daemon=True).start()
+        _scheduler_started = True
+
+if __name__ == "__main__":
+    import argparse
+    from data.db import DB_PATH
+
+    parser = argparse.ArgumentParser(description="Run database maintenance now, ignoring the off-peak window.")
+    parser.add_argument("--task", action="append", choices=list(TASK_INTERVAL_HOURS))
+    parser.add_argument("--due", action="store_true", help="only run the tasks that are due")
+    parser.add_argument("--budget", type=float, default=MAINTENANCE_BUDGET_SECONDS)
+    args = parser.parse_args()
+    run_maintenance(DB_PATH, None if args.due else (args.task or list(TASK_INTERVAL_HOURS)), args.budget)
@@ -0,0 +1,30 @@
+"""
+Metrics for the app. The registry, exposition and the metrics shared with
+multi_domain_platform live in platform_core/metrics.py; this module adds the
+per-statement SQL metrics (recorded by data/tracing.py) and reads the exporter settings.
+"""
+import os
+from platform_core import metrics as _core
+# the shared metrics and helpers, under the names the pages and services already use
+from platform_core.metrics import BCRYPT_SECONDS, LOGINS, REGISTRY, metered_stream, record_llm_request
+
+# Same settings (and environment variables) as multi_domain_platform/config.py
+METRICS_PORT = int(os.environ.get("PLATFORM_METRICS_PORT", "0"))
+METRICS_TEXTFILE = os.environ.get("PLATFORM_METRICS_TEXTFILE", "")
+METRICS_TEXTFILE_SECONDS = float(os.environ.get("PLATFORM_METRICS_TEXTFILE_SECONDS", "15"))
+
+DB_QUERIES = REGISTRY.counter("platform_db_queries_total", "SQL statements by verb.", ["op"])
+DB_QUERY_SECONDS = REGISTRY.histogram("platform_db_query_seconds", "SQL statement latency by verb.", ["op"])
+
+
+def write_textfile(path=METRICS_TEXTFILE) -> None:
+    """Write the exposition atomically, e.g. for node_exporter's textfile collector."""
+    _core.write_textfile(path)
+
+
+def start_exporter(port: int = METRICS_PORT, textfile=METRICS_TEXTFILE) -> None:
+    """
+    Start (once per process) the configured exporters: an HTTP /metrics endpoint on
+    PLATFORM_METRICS_PORT and/or a text file rewritten every few seconds. Both are off by default.
+    """
+    _core.start_exporter(port, textfile, METRICS_TEXTFILE_SECONDS)
@@ -0,0 +1,105 @@
+"""
+Dataset profiler: fills datasets_metadata.record_count and file_size_mb from
+the dataset files on local disk instead of the values typed into the form.
+
+A dataset's file is its file_path (relative to the dataset folder, or
+absolute), else <dataset_name>.csv/.jsonl/.parquet in the dataset folder.
+CSV and JSONL records are counted as lines over a memory map, with large files
+split into chunks counted in a process pool; Parquet row counts come from the
+file footers, so no data is loaded.
+
+Profile every dataset (from the project root):
+    PYTHONPATH=app python -m data.profiler [--id 3] [--dir DATA/datasets] [--dry-run]
+"""
+import os
+import time
+from pathlib import Path
+from data.db import connect_database
+from platform_core import profiling
+# file counting is shared with multi_domain_platform/services/dataset_profiler.py
+from platform_core.profiling import FORMATS, MB
+
+# Same settings (and environment variables) as multi_domain_platform/config.py
+DATASET_DIR = Path(os.environ.get("PLATFORM_DATASET_DIR", Path("DATA") / "datasets"))
+PROFILER_WORKERS = int(os.environ.get("PLATFORM_PROFILER_WORKERS", "0"))
+PROFILER_CHUNK_MB = int(os.environ.get("PLATFORM_PROFILER_CHUNK_MB", "64"))
+
+def profile_files(paths, workers=PROFILER_WORKERS, chunk_mb=PROFILER_CHUNK_MB):
+    """
+    {path: FileProfile(path, file_format, record_count, size_bytes, error)} for data files
+    or folders of them. CSV counts leave out the header line.
+    """
+    return profiling.profile_files(paths, workers, chunk_mb * MB)
+
+def ensure_columns(conn):
+    """Add datasets_metadata.file_path and profiled_at, and the indexes the watcher uses, if missing."""
+    columns = {row[1] for row in conn.execute("PRAGMA table_info(datasets_metadata)")}
+    for name, kind in (("file_path", "TEXT"), ("profiled_at", "TIMESTAMP")):
+        if name not in columns:
+            conn.execute(f"ALTER TABLE datasets_metadata ADD COLUMN {name} {kind}")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_datasets_file_path ON datasets_metadata(file_path)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_datasets_unlinked_name ON datasets_metadata(dataset_name) "
+                 "WHERE file_path IS NULL")
+    conn.commit()
+
+def resolve(dataset_name, file_path=None, dataset_dir=DATASET_DIR):
+    """The file or folder holding a dataset, or None."""
+    return profiling.resolve(dataset_dir, dataset_name, file_path)
+
+def profile_datasets(dataset_ids=None, dataset_dir=DATASET_DIR, dry_run=False):
+    """
+    UPDATE: Profile the files of the given datasets (all by default) and store
+    record_count, file_size_mb and file_path. Returns one dict per dataset.
+    """
+    conn = connect_database()
+    try:
+        ensure_columns(conn)
+        sql = "SELECT id, dataset_name, file_path FROM datasets_metadata"
+        params = []
+        if dataset_ids is not None:
+            params = [int(did) for did in dataset_ids]
+            sql += f" WHERE id IN ({', '.join('?' * len(params))})" if params else " WHERE 0"
+        rows = conn.execute(sql + " ORDER BY id", params).fetchall()
+
+        located = {row[0]: resolve(row[1], row[2], dataset_dir) for row in rows}
+        found = profile_files({path for path in located.values() if path is not None})
+        results = []
+        for dataset_id, path in located.items():
+            if path is None:
+                results.append({"id": dataset_id, "error": f"no file found in {dataset_dir}"})
+                continue
+            profile = found[path]
+            results.append({"id": dataset_id, "file_path": profiling.stored_path(dataset_dir, path),
+                            "record_count": profile.record_count, "file_size_mb": profile.file_size_mb,
+                            "error": profile.error})
+
+        if not dry_run:
+            with conn:
+                conn.executemany(
+                    "UPDATE datasets_metadata SET record_count = ?, file_size_mb = ?, file_path = ?, "
+                    "profiled_at = CURRENT_TIMESTAMP WHERE id = ?",
+                    [(r["record_count"], r["file_size_mb"], r["file_path"], r["id"]) for r in results if not r["error"]],
+                )
+        return results
+    finally:
+        conn.close()
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Fill dataset record counts and sizes from the files on disk.")
+    parser.add_argument("--dir", default=str(DATASET_DIR))
+    parser.add_argument("--id", type=int, action="append")
+    parser.add_argument("--dry-run", action="store_true")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    results = profile_datasets(args.id, Path(args.dir), args.dry_run)
+    for r in results:
+        if r["error"]:
+            print(f"  #{r['id']}: {r['error']}")
+        else:
+            print(f"  #{r['id']} {r['file_path']}: {r['record_count']:,} records, {r['file_size_mb']:,.2f} MB")
+    profiled = sum(1 for r in results if not r["error"])
+    print(f"✅ {profiled} of {len(results)} dataset(s) profiled in {time.perf_counter() - started:.2f}s"
+          + (" (dry run)" if args.dry_run else ""))
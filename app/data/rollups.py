@@ -0,0 +1,57 @@
+"""
+Daily/weekly rollup tables for the dashboards' time-series charts.
+
+The daily tables are kept up to date by SQLite triggers, so every
+insert/update/delete done through app/data (or anything else writing to the
+database) adjusts the matching count. Weekly numbers are views over the daily
+tables. The SQL is shared with multi_domain_platform (platform_core/rollups.py).
+
+Rebuild from scratch (run from the project root):
+    PYTHONPATH=app python -m data.rollups
+"""
+import pandas as pd
+from data.db import connect_database
+from platform_core.rollups import ROLLUPS, rebuild_script, recount_sql, schema_script, trend_query
+
+def create_rollup_tables(conn):
+    """Create the rollup tables, weekly views and maintenance triggers.
+
+    Tables that did not exist yet are filled from the current data.
+    """
+    cursor = conn.cursor()
+    cursor.execute("SELECT name FROM sqlite_master WHERE type = 'table'")
+    existing = {row[0] for row in cursor.fetchall()}
+    conn.executescript(schema_script(existing))
+    print("  - ✅ Rollup tables created.")
+
+def rebuild_rollups(conn):
+    """Recompute every rollup table from the raw tables (and their archives, see data/archive.py). Returns rows per rollup."""
+    create_rollup_tables(conn)
+    views = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'view'")}
+    conn.executescript(rebuild_script(views))
+
+    cursor = conn.cursor()
+    results = {}
+    for rollup in ROLLUPS:
+        cursor.execute(f"SELECT COUNT(*) FROM {rollup}")
+        results[rollup] = cursor.fetchone()[0]
+    return results
+
+def _get_trend(conn, rollup, by, freq, start=None, end=None):
+    """Read a time series of counts per `by` value from a rollup table."""
+    query, params = trend_query(rollup, by, freq, start, end)
+    return pd.read_sql_query(query, conn, params=params)
+
+def get_incident_trend(conn, by="severity", freq="daily", start=None, end=None):
+    """ANALYTICAL QUERY: Incident counts per day/week grouped by type, severity or status."""
+    return _get_trend(conn, "incident_daily_rollup", by, freq, start, end)
+
+def get_ticket_trend(conn, by="priority", freq="daily", start=None, end=None):
+    """ANALYTICAL QUERY: Ticket counts per day/week grouped by priority, status or category."""
+    return _get_trend(conn, "ticket_daily_rollup", by, freq, start, end)
+
+if __name__ == "__main__":
+    conn = connect_database()
+    for rollup, rows in rebuild_rollups(conn).items():
+        print(f"✅ Rebuilt '{rollup}' ({rows} rows)")
+    conn.close()
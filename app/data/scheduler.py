@@ -0,0 +1,181 @@
+"""
+IT ticket work queue: what each assigned_to group should pick up next.
+
+Active tickets (Open / In Progress) are mirrored into ticket_queue by SQLite
+triggers, with a queue key = SLA due date (SLA_DAYS after created_date) pulled
+forward SCHEDULER_BOOST_HOURS per priority step. The key never depends on the
+clock, so the partial index on open rows is the priority queue: insert, update
+and "pop next" are B-tree operations (O(log n)) and it is persisted with the
+database. ticket_load keeps each group's priority-weighted load up to date the
+same way, so assign_unassigned() can hand unassigned tickets to the least-loaded
+group handling their category without counting tickets. Assignment only runs
+when asked for (--assign, the dashboard's Assign button); reads never write.
+
+Show the queues (from the project root):
+    PYTHONPATH=app python -m data.scheduler [--group IT_Support] [--assign]
+"""
+import datetime
+import os
+import pandas as pd
+from data.db import connect_database
+
+# Same settings (and environment variables) as multi_domain_platform/config.py
+SCHEDULER_BOOST_HOURS = float(os.environ.get("PLATFORM_SCHEDULER_BOOST_HOURS", "12"))
+
+# Same targets as multi_domain_platform/services/mttr_engine.py
+SLA_DAYS = {"critical": 1, "high": 2, "medium": 5, "low": 10}
+DEFAULT_SLA_DAYS = 5
+PRIORITY_WEIGHTS = {"low": 1, "medium": 2, "high": 3, "critical": 4}
+
+def _case(ref, mapping, default):
+    whens = " ".join(f"WHEN '{key}' THEN {value}" for key, value in mapping.items())
+    return f"(CASE lower({ref}.priority) {whens} ELSE {default} END)"
+
+def _queue_ddl():
+    """ticket_queue, ticket_load and the triggers keeping them in step with it_tickets."""
+    def add(ref):
+        weight = _case(ref, PRIORITY_WEIGHTS, 2)
+        key = (f"COALESCE(julianday({ref}.created_date), julianday('now')) + {_case(ref, SLA_DAYS, DEFAULT_SLA_DAYS)} "
+               f"- {weight} * {SCHEDULER_BOOST_HOURS} / 24.0")
+        return (f"INSERT INTO ticket_queue (id, assigned_to, category, status, weight, due_key) "
+                f"SELECT {ref}.id, COALESCE({ref}.assigned_to, ''), {ref}.category, {ref}.status, {weight}, {key} "
+                f"WHERE {ref}.status IN ('Open', 'In Progress'); "
+                f"INSERT INTO ticket_load (assigned_to, load) SELECT COALESCE({ref}.assigned_to, ''), {weight} "
+                f"WHERE {ref}.status IN ('Open', 'In Progress') "
+                f"ON CONFLICT(assigned_to) DO UPDATE SET load = load + excluded.load;")
+
+    def remove(ref):
+        return (f"UPDATE ticket_load SET load = load - (SELECT weight FROM ticket_queue WHERE id = {ref}.id) "
+                f"WHERE assigned_to = (SELECT assigned_to FROM ticket_queue WHERE id = {ref}.id); "
+                f"DELETE FROM ticket_queue WHERE id = {ref}.id;")
+
+    return f"""
+    CREATE TABLE IF NOT EXISTS ticket_queue (
+        id INTEGER PRIMARY KEY,
+        assigned_to TEXT NOT NULL,
+        category TEXT,
+        status TEXT NOT NULL,
+        weight INTEGER NOT NULL,
+        due_key REAL NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS idx_ticket_queue_open ON ticket_queue(assigned_to, due_key, id) WHERE status = 'Open';
+    CREATE TABLE IF NOT EXISTS ticket_load (
+        assigned_to TEXT PRIMARY KEY,
+        load INTEGER NOT NULL
+    );
+    CREATE TRIGGER IF NOT EXISTS trg_ticket_queue_insert AFTER INSERT ON it_tickets
+    BEGIN {add("NEW")} END;
+    CREATE TRIGGER IF NOT EXISTS trg_ticket_queue_delete AFTER DELETE ON it_tickets
+    BEGIN {remove("OLD")} END;
+    CREATE TRIGGER IF NOT EXISTS trg_ticket_queue_update
+    AFTER UPDATE OF status, priority, created_date, assigned_to, category ON it_tickets
+    BEGIN {remove("OLD")} {add("NEW")} END;
+    """
+
+def ensure_queue(conn):
+    """Create the queue tables and triggers; a new queue is filled from the current tickets."""
+    existing = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    script = ["BEGIN;", _queue_ddl()]
+    if "ticket_queue" not in existing:
+        weight = _case("it_tickets", PRIORITY_WEIGHTS, 2)
+        script.append(f"""
+        INSERT INTO ticket_queue (id, assigned_to, category, status, weight, due_key)
+            SELECT id, COALESCE(assigned_to, ''), category, status, {weight},
+                   COALESCE(julianday(created_date), julianday('now')) + {_case("it_tickets", SLA_DAYS, DEFAULT_SLA_DAYS)}
+                   - {weight} * {SCHEDULER_BOOST_HOURS} / 24.0
+            FROM it_tickets WHERE status IN ('Open', 'In Progress');
+        DELETE FROM ticket_load;
+        INSERT INTO ticket_load (assigned_to, load) SELECT assigned_to, SUM(weight) FROM ticket_queue GROUP BY assigned_to;
+        """)
+    script.append("COMMIT;")
+    conn.executescript("\n".join(script))
+
+def _due(row):
+    ticket = dict(row)
+    try:
+        due = datetime.date.fromisoformat(str(ticket["created_date"])[:10])
+        due += datetime.timedelta(days=SLA_DAYS.get(str(ticket["priority"] or "").lower(), DEFAULT_SLA_DAYS))
+        ticket["due_date"], ticket["overdue"] = due.isoformat(), due < datetime.date.today()
+    except ValueError:
+        ticket["due_date"], ticket["overdue"] = None, False
+    return ticket
+
+QUEUE_SQL = """
+    SELECT t.id, t.ticket_id, t.priority, t.category, t.subject, q.assigned_to, t.created_date
+    FROM ticket_queue q JOIN it_tickets t ON t.id = q.id
+    WHERE q.status = 'Open' {group}
+    ORDER BY q.due_key, q.id LIMIT ?
+"""
+
+def get_queue(conn, group=None, limit=20):
+    """The next `limit` open tickets of a group (or across groups), most urgent first."""
+    params = ([group] if group is not None else []) + [int(limit)]
+    cursor = conn.execute(QUEUE_SQL.format(group="AND q.assigned_to = ?" if group is not None else ""), params)
+    columns = [c[0] for c in cursor.description]
+    return pd.DataFrame([_due(zip(columns, row)) for row in cursor.fetchall()],
+                        columns=columns + ["due_date", "overdue"])
+
+def next_ticket(conn, group=None):
+    """The open ticket `group` (any group by default) should work on next, as a dict, or None."""
+    queue = get_queue(conn, group, limit=1)
+    return None if queue.empty else queue.iloc[0].to_dict()
+
+def claim_next(conn, group):
+    """UPDATE: Move `group`'s next ticket to In Progress. Returns its ticket_id, or None."""
+    row = conn.execute(
+        "UPDATE it_tickets SET status = 'In Progress' WHERE id = (SELECT id FROM ticket_queue "
+        "WHERE assigned_to = ? AND status = 'Open' ORDER BY due_key, id LIMIT 1) RETURNING ticket_id", (group,)
+    ).fetchone()
+    conn.commit()
+    return row[0] if row else None
+
+def get_loads(conn):
+    """Per group: open and in-progress tickets and their priority-weighted load."""
+    return pd.read_sql_query("""
+        SELECT CASE WHEN l.assigned_to = '' THEN 'Unassigned' ELSE l.assigned_to END AS assigned_to,
+               (SELECT COUNT(*) FROM ticket_queue q WHERE q.assigned_to = l.assigned_to AND q.status = 'Open') AS queued,
+               (SELECT COUNT(*) FROM ticket_queue q WHERE q.assigned_to = l.assigned_to AND q.status != 'Open') AS in_progress,
+               l.load
+        FROM ticket_load l WHERE l.load > 0 ORDER BY l.assigned_to
+    """, conn)
+
+def assign_unassigned(conn, limit=None):
+    """
+    UPDATE: Give unassigned open tickets, most urgent first, to the least-loaded group
+    that handles their category (any group if none has yet). Returns tickets assigned.
+    """
+    loads = dict(conn.execute("SELECT assigned_to, load FROM ticket_load WHERE assigned_to != ''"))
+    waiting = conn.execute("SELECT id, category, weight FROM ticket_queue WHERE assigned_to = '' AND status = 'Open' "
+                           "ORDER BY due_key, id LIMIT ?", (-1 if limit is None else int(limit),)).fetchall()
+    if not loads or not waiting:
+        return 0
+    groups_for = {}
+    for category, group in conn.execute("SELECT DISTINCT category, assigned_to FROM ticket_queue WHERE assigned_to != ''"):
+        groups_for.setdefault(category, []).append(group)
+    assignments = []
+    for ticket, category, weight in waiting:
+        group = min(groups_for.get(category) or loads, key=lambda g: (loads.get(g, 0), g))
+        loads[group] = loads.get(group, 0) + weight
+        assignments.append((group, ticket))
+    with conn:
+        #only still-unassigned rows: a ticket someone assigned meanwhile keeps its group
+        return conn.executemany("UPDATE it_tickets SET assigned_to = ? WHERE id = ? AND COALESCE(assigned_to, '') = ''",
+                                assignments).rowcount
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Show what each IT group should work on next.")
+    parser.add_argument("--group", help="only this assigned_to group")
+    parser.add_argument("--limit", type=int, default=10)
+    parser.add_argument("--assign", action="store_true", help="assign unassigned open tickets first")
+    args = parser.parse_args()
+
+    conn = connect_database()
+    ensure_queue(conn)
+    if args.assign:
+        print(f"✅ {assign_unassigned(conn)} ticket(s) assigned")
+    print(get_loads(conn).to_string(index=False))
+    print(get_queue(conn, args.group, args.limit)[["ticket_id", "priority", "assigned_to", "due_date", "overdue", "subject"]]
+          .to_string(index=False))
+    conn.close()
@@ -2,6 +2,7 @@ from pathlib import Path
 from data.users import migrate_users_from_file
 from data.incidents import load_all_csv_data
 from data.db import connect_database
+from data.rollups import create_rollup_tables
 DB_PATH = Path("DATA") / "intelligence_platform.db"
 
 def create_users_table(conn):
@@ -95,6 +96,7 @@ def create_all_tables(conn):
     create_cyber_incidents_table(conn)
     create_datasets_metadata_table(conn)
     create_it_tickets_table(conn)
+    create_rollup_tables(conn)
     print("All tables schema established.")
 
 def setup_database_complete():
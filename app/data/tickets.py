@@ -1,12 +1,20 @@
 import pandas as pd
 import sqlite3
+from data.bulk import execute_batch, missing_keys
+from data.transitions import build_filter, transition, transition_keys
+
+def _last_ticket_number(conn):
+    """Highest TICKET-n in use in it_tickets or it_tickets_archive."""
+    tables = ["it_tickets"] + [row[0] for row in conn.execute(
+        "SELECT name FROM sqlite_master WHERE type = 'table' AND name = 'it_tickets_archive'")]
+    return max(conn.execute(
+        f"SELECT MAX(CAST(SUBSTR(ticket_id, 8) AS INTEGER)) FROM {table} WHERE ticket_id LIKE 'TICKET-%'"
+    ).fetchone()[0] or 0 for table in tables)
 
 def insert_ticket(conn, priority, status, category, subject, description, created_date, resolved_date, assigned_to):
     cursor = conn.cursor()
-    #auto-generate ticket_id
-    cursor.execute("SELECT COUNT(*) FROM it_tickets")
-    count = cursor.fetchone()[0] + 1
-    ticket_id = f"TICKET-{count:03d}"
+    #auto-generate ticket_id after the highest one (archived tickets included); the row count drops as tickets are archived
+    ticket_id = f"TICKET-{_last_ticket_number(conn) + 1:03d}"
     
     query = """
     INSERT INTO it_tickets 
@@ -46,23 +54,28 @@ def get_tickets_by_status_count(conn: sqlite3.Connection):
     df = pd.read_sql_query(query, conn)
     return df
 
+def _resolved_date_set(new_status: str, resolved_date: str = None):
+    """SET fragment and parameters for resolved_date when a ticket moves to new_status."""
+    if resolved_date:
+        return ", resolved_date = ?", [str(resolved_date)]
+    if new_status in ("Resolved", "Closed"):
+        # resolving or closing stamps today where no date is set yet
+        return ", resolved_date = COALESCE(NULLIF(trim(resolved_date), ''), date('now'))", []
+    if new_status in ("Open", "In Progress"):
+        return ", resolved_date = NULL", []
+    return "", []
+
 def update_ticket_status(conn: sqlite3.Connection, ticket_id: str, new_status: str, resolved_date: str = None):
     """
-    UPDATE: Modify the status and optionally the resolution date for a ticket.
-    
-    Returns: The number of rows updated (should be 1).
+    UPDATE: Move one ticket to new_status through the status workflow (see data/transitions.py),
+    setting resolved_date when given, else stamping it on resolve/close and clearing it on reopen.
+
+    Returns: 1 if the ticket is now in new_status, 0 if it does not exist or may not move there.
     """
-    cursor = conn.cursor()
-    
-    if new_status.lower() == 'closed' and not resolved_date:
-        #if closing, set resolved_date to today if not provided
-        resolved_date = pd.to_datetime('today').strftime('%Y-%m-%d')
-        
-    query = "UPDATE it_tickets SET status = ?, resolved_date = ? WHERE ticket_id = ?"
-    cursor.execute(query, (new_status, resolved_date, ticket_id))
-    
-    conn.commit()
-    return cursor.rowcount
+    extra_set, extra_params = _resolved_date_set(new_status, resolved_date)
+    result = transition(conn, "it_tickets", "ticket_id", new_status, "ticket_id = ?", [ticket_id],
+                        extra_set, extra_params=extra_params)
+    return result["changed"] + result["unchanged"]
 
 def delete_ticket(conn: sqlite3.Connection, ticket_id: str):
     """
@@ -76,4 +89,62 @@ def delete_ticket(conn: sqlite3.Connection, ticket_id: str):
     cursor.execute(query, (ticket_id,))
     
     conn.commit()
-    return cursor.rowcount
\ No newline at end of file
+    return cursor.rowcount
+
+def insert_tickets_bulk(conn: sqlite3.Connection, rows):
+    """
+    CREATE (batch): Insert many tickets with one executemany transaction.
+    Each row is (ticket_id, priority, status, category, subject, description,
+    created_date, resolved_date, assigned_to); a blank ticket_id is numbered after the highest TICKET-n.
+
+    Returns: (rows inserted, [(row index, error)])
+    """
+    last = _last_ticket_number(conn)
+    numbered = []
+    for row in rows:
+        if not row[0]:
+            last += 1
+            row = (f"TICKET-{last:03d}",) + tuple(row[1:])
+        numbered.append(row)
+    query = """
+    INSERT INTO it_tickets
+    (ticket_id, priority, status, category, subject, description,
+     created_date, resolved_date, assigned_to)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+    """
+    return execute_batch(conn, query, numbered)
+
+def update_ticket_status_bulk(conn: sqlite3.Connection, ticket_ids, new_status: str, resolved_date: str = None):
+    """
+    UPDATE (batch): Move many tickets through the status workflow in one transaction,
+    handling resolved_date as update_ticket_status() does.
+
+    Returns: (rows now in new_status, [(index, error)]); missing tickets and blocked moves are errors.
+    """
+    extra_set, extra_params = _resolved_date_set(new_status, resolved_date)
+    return transition_keys(conn, "it_tickets", "ticket_id", ticket_ids, new_status, extra_set, extra_params)
+
+def delete_tickets_bulk(conn: sqlite3.Connection, ticket_ids):
+    """
+    DELETE (batch): Remove many tickets in one transaction.
+
+    Returns: (rows deleted, [(index, error)])
+    """
+    ticket_ids = list(ticket_ids)
+    missing = missing_keys(conn, "it_tickets", "ticket_id", ticket_ids)
+    deleted, errors = execute_batch(conn, "DELETE FROM it_tickets WHERE ticket_id = ?", [(tid,) for tid in ticket_ids])
+    return deleted, sorted(errors + missing)
+
+def transition_tickets(conn: sqlite3.Connection, new_status: str, ticket_ids=None, priorities=(), categories=(),
+                       statuses=(), assigned_to=(), older_than_days=None, dry_run=False):
+    """
+    UPDATE (set-based): Move every ticket matching the filters to new_status in one statement.
+    Resolving or closing sets resolved_date to today where it is empty; reopening clears it.
+    """
+    where, params = build_filter(
+        keys=ticket_ids, key_column="ticket_id",
+        equals={"priority": priorities, "category": categories, "status": statuses, "assigned_to": assigned_to},
+        date_column="created_date", older_than_days=older_than_days,
+    )
+    extra_set, _ = _resolved_date_set(new_status)
+    return transition(conn, "it_tickets", "ticket_id", new_status, where, params, extra_set, dry_run)
@@ -0,0 +1,56 @@
+"""
+SQL tracing for the app's connections (data/db.py): the tracer itself is shared with
+multi_domain_platform (platform_core/tracing.py); this module binds it to the
+PLATFORM_SQL_TRACE* settings and also counts every statement in data/metrics.py.
+"""
+import os
+from pathlib import Path
+from data import metrics
+from platform_core.tracing import Tracer, report_from_log as _report_from_log
+
+# Same settings (and environment variables) as multi_domain_platform/config.py
+SQL_TRACE_ENABLED = os.environ.get("PLATFORM_SQL_TRACE", "1") == "1"
+SLOW_QUERY_MS = float(os.environ.get("PLATFORM_SLOW_QUERY_MS", "200"))
+SQL_TRACE_LOG = Path(os.environ.get("PLATFORM_SQL_TRACE_LOG", Path("DATA") / "logs" / "sql_trace.log"))
+SQL_TRACE_LOG_ALL = os.environ.get("PLATFORM_SQL_TRACE_LOG_ALL", "0") == "1"
+SQL_TRACE_LOG_BYTES = int(os.environ.get("PLATFORM_SQL_TRACE_LOG_BYTES", str(5 * 1024 * 1024)))
+
+
+def _record_metrics(trace) -> None:
+    op = trace.sql.split(" ", 1)[0].lower() or "unknown"
+    metrics.DB_QUERIES.labels(op).inc()
+    metrics.DB_QUERY_SECONDS.labels(op).observe(trace.seconds)
+
+
+TRACER = Tracer(SQL_TRACE_LOG, SLOW_QUERY_MS, SQL_TRACE_LOG_ALL, SQL_TRACE_LOG_BYTES,
+                internal_files=(f"data{os.sep}db.py",), on_finish=_record_metrics)
+
+
+def connect(database, **kwargs):
+    """sqlite3.connect() that traces every statement when PLATFORM_SQL_TRACE is on."""
+    return TRACER.connect(database, SQL_TRACE_ENABLED, **kwargs)
+
+
+def top_statements(n: int = 10):
+    """Statements traced in this process, ordered by total time."""
+    return TRACER.top_statements(n)
+
+
+def report_from_log(log_path=SQL_TRACE_LOG, n: int = 10):
+    """Top-N statements by total time across the trace log and its rotated backups."""
+    return _report_from_log(log_path, n)
+
+
+if __name__ == "__main__":
+    # Report command, run from the repository root:
+    #   PYTHONPATH=app python -m data.tracing --top 20
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Summarise the SQL trace log.")
+    parser.add_argument("--log", default=str(SQL_TRACE_LOG))
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args()
+
+    import pandas as pd
+    with pd.option_context("display.max_colwidth", 80, "display.width", 200):
+        print(report_from_log(args.log, args.top).to_string(index=False))
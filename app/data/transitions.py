@@ -0,0 +1,55 @@
+import sqlite3
+# Status workflow shared by tickets and incidents; the table and the SQL are shared with
+# multi_domain_platform/models/status_workflow.py (platform_core/status_workflow.py).
+from platform_core.status_workflow import (STATUSES, TRANSITIONS, batch_errors, build_filter, count_statement,
+                                           status_statement, tally, transition_statements)
+
+
+def _run_immediate(conn: sqlite3.Connection, statements):
+    """Run (sql, params) statements in one write transaction (BEGIN IMMEDIATE); returns the rows of each."""
+    if not conn.in_transaction:
+        conn.execute("BEGIN IMMEDIATE")
+    try:
+        results = [conn.execute(sql, params).fetchall() for sql, params in statements]
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    return results
+
+
+def transition(conn: sqlite3.Connection, table, key_column, new_status, where, params, extra_set="", dry_run=False,
+               extra_params=()):
+    """
+    Move every row matching `where` to `new_status` with one UPDATE ... RETURNING.
+    Rows the workflow does not allow to move are left alone and counted as blocked.
+    The counts and the UPDATE share one write transaction (BEGIN IMMEDIATE), so they agree.
+    `extra_params` fill the placeholders of `extra_set`.
+
+    Returns: {"new_status", "dry_run", "changed", "unchanged", "blocked": {status: rows}, "changed_keys"}
+    """
+    if dry_run:
+        counts = conn.execute(*count_statement(table, where, params)).fetchall()
+        return tally(new_status, counts, dry_run=True)._asdict()
+    count_rows, rows = _run_immediate(
+        conn, transition_statements(table, key_column, new_status, where, params, extra_set, extra_params)
+    )
+    return tally(new_status, count_rows, [row[0] for row in rows])._asdict()
+
+
+def transition_keys(conn: sqlite3.Connection, table, key_column, keys, new_status, extra_set="", extra_params=(),
+                    name="{}"):
+    """
+    Batch form of transition() for a list of keys, in one write transaction. Keys that do
+    not exist or whose status may not move to new_status are reported as errors.
+
+    Returns: (rows now in new_status, [(index, error)])
+    """
+    keys = list(keys)
+    where, params = build_filter(keys, key_column)
+    count_rows, rows, after = _run_immediate(
+        conn, transition_statements(table, key_column, new_status, where, params, extra_set, extra_params)
+        + [status_statement(table, key_column, where, params)]
+    )
+    result = tally(new_status, count_rows, [row[0] for row in rows])
+    return result.changed + result.unchanged, batch_errors(keys, after, new_status, name)
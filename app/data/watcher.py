@@ -0,0 +1,248 @@
+"""
+Dataset folder watcher: keeps datasets_metadata in step with the files in the
+watched folders.
+
+Every top-level CSV/JSONL/Parquet file (or folder of them) in a watched folder
+is one dataset, matched to its row by file_path (rows without one are linked
+by dataset_name, new files get a new row). File events come from watchdog when
+it is installed, otherwise from a stat-only poll. A dataset is re-profiled
+(data/profiler.py) once its files have been quiet for the debounce period, and
+the rows are upserted WATCH_BATCH_ROWS per transaction. A full rescan runs at
+start and every WATCH_RESCAN_SECONDS to catch anything the events missed.
+
+Full rescan now (from the project root):
+    PYTHONPATH=app python -m data.watcher [--dir DATA/datasets]
+"""
+import calendar
+import os
+import threading
+import time
+from pathlib import Path
+from data.db import connect_database
+from data.profiler import DATASET_DIR, FORMATS, ensure_columns, profile_files
+
+# Same settings (and environment variables) as multi_domain_platform/config.py
+DATASET_WATCH_ENABLED = os.environ.get("PLATFORM_DATASET_WATCH", "1") == "1"
+WATCH_DIRS = [Path(p) for p in os.environ.get("PLATFORM_WATCH_DIRS", str(DATASET_DIR)).split(os.pathsep) if p]
+WATCH_DEBOUNCE_SECONDS = float(os.environ.get("PLATFORM_WATCH_DEBOUNCE_SECONDS", "2"))
+WATCH_POLL_SECONDS = float(os.environ.get("PLATFORM_WATCH_POLL_SECONDS", "10"))
+WATCH_RESCAN_SECONDS = int(os.environ.get("PLATFORM_WATCH_RESCAN_SECONDS", "3600"))
+WATCH_BATCH_ROWS = int(os.environ.get("PLATFORM_WATCH_BATCH_ROWS", "500"))
+
+SOURCE = "Local files"
+# reads raise "opened"/"closed_no_write" events on Linux; only writes schedule a profile
+WRITE_EVENTS = {"created", "modified", "deleted", "moved", "closed"}
+
+_pending = {}  # dataset path -> monotonic time of its latest event
+_pending_lock = threading.Lock()
+_watcher_started = False
+_start_lock = threading.Lock()
+
+def _state(path):
+    """(bytes, newest mtime in ns, data files) of a dataset file or folder, or None if it is gone."""
+    try:
+        if not path.is_dir():
+            stat = path.stat()
+            return stat.st_size, stat.st_mtime_ns, 1
+        size = mtime = files = 0
+        for root, _dirs, names in os.walk(path):
+            for name in names:
+                if os.path.splitext(name)[1].lower() in FORMATS:
+                    stat = os.stat(os.path.join(root, name))
+                    size, mtime, files = size + stat.st_size, max(mtime, stat.st_mtime_ns), files + 1
+        return size, mtime, files
+    except OSError:
+        return None
+
+def scan(watch_dirs=WATCH_DIRS):
+    """{dataset path: state} for every dataset in the watched folders (stat calls only)."""
+    snapshot = {}
+    for root in watch_dirs:
+        root = Path(root).resolve()
+        if not root.is_dir():
+            continue
+        for entry in os.scandir(root):
+            path = Path(entry.path)
+            if entry.is_dir(follow_symlinks=False) or path.suffix.lower() in FORMATS:
+                state = _state(path)
+                if state and state[2]:
+                    snapshot[path] = state
+    return snapshot
+
+def _dataset_for(path, watch_dirs):
+    path = Path(path)
+    for root in watch_dirs:
+        root = Path(root).resolve()
+        try:
+            parts = path.relative_to(root).parts
+        except ValueError:
+            continue
+        return root / parts[0] if parts else None
+    return None
+
+def _stored(path, dataset_dir):
+    try:
+        return str(path.relative_to(Path(dataset_dir).resolve()))
+    except ValueError:
+        return str(path)
+
+def sync(paths, dataset_dir=DATASET_DIR):
+    """UPSERT: Re-profile the given dataset files/folders and write their rows. Returns counts."""
+    result = {"profiled": 0, "inserted": 0, "updated": 0, "missing": [], "errors": []}
+    paths = list(dict.fromkeys(paths))
+    conn = connect_database()
+    try:
+        ensure_columns(conn)
+        for start in range(0, len(paths), WATCH_BATCH_ROWS):
+            batch = []
+            for path in paths[start:start + WATCH_BATCH_ROWS]:
+                state = _state(path)
+                if state is None or not state[2]:
+                    result["missing"].append(_stored(path, dataset_dir))
+                else:
+                    batch.append((path, state))
+            profiles = profile_files([path for path, _ in batch])
+            with conn:
+                for path, state in batch:
+                    profile = profiles[path]
+                    if not profile.ok:
+                        result["errors"].append(f"{path.name}: {profile.error}")
+                        continue
+                    key = _stored(path, dataset_dir)
+                    name = path.name if path.is_dir() else path.stem
+                    values = (profile.record_count, profile.file_size_mb,
+                              time.strftime("%Y-%m-%d", time.localtime(state[1] / 1e9)))
+                    updated = conn.execute(
+                        "UPDATE datasets_metadata SET record_count = ?, file_size_mb = ?, last_updated = ?, "
+                        "profiled_at = CURRENT_TIMESTAMP WHERE file_path = ?", values + (key,)).rowcount
+                    if not updated:
+                        #a row registered by hand for the same dataset name
+                        updated = conn.execute(
+                            "UPDATE datasets_metadata SET record_count = ?, file_size_mb = ?, last_updated = ?, "
+                            "file_path = ?, profiled_at = CURRENT_TIMESTAMP WHERE id = (SELECT MIN(id) "
+                            "FROM datasets_metadata WHERE file_path IS NULL AND dataset_name = ?)",
+                            values + (key, name)).rowcount
+                    if not updated:
+                        conn.execute(
+                            "INSERT INTO datasets_metadata (dataset_name, source, last_updated, record_count, "
+                            "file_size_mb, file_path, profiled_at) VALUES (?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)",
+                            (name, SOURCE, values[2], values[0], values[1], key))
+                        result["inserted"] += 1
+                    result["updated"] += bool(updated)
+                    result["profiled"] += 1
+    finally:
+        conn.close()
+    return result
+
+def reconcile(watch_dirs=WATCH_DIRS, dataset_dir=DATASET_DIR):
+    """Full rescan: re-profile every dataset whose row is missing or older than its files."""
+    snapshot = scan(watch_dirs)
+    conn = connect_database()
+    try:
+        ensure_columns(conn)
+        rows = dict(conn.execute("SELECT file_path, MIN(profiled_at) FROM datasets_metadata "
+                                 "WHERE file_path IS NOT NULL GROUP BY file_path").fetchall())
+    finally:
+        conn.close()
+    stale = []
+    for path, (_size, mtime_ns, _files) in snapshot.items():
+        profiled_at = rows.get(_stored(path, dataset_dir))
+        #profiled_at has whole seconds, so allow a little slack
+        if profiled_at is None or mtime_ns / 1e9 > calendar.timegm(time.strptime(profiled_at, "%Y-%m-%d %H:%M:%S")) - 2:
+            stale.append(path)
+    result = sync(stale, dataset_dir)
+    result["scanned"] = len(snapshot)
+    return result
+
+def _mark(path, watch_dirs):
+    dataset = _dataset_for(path, watch_dirs)
+    if dataset is not None:
+        with _pending_lock:
+            _pending[dataset] = time.monotonic()
+
+def _flush_due(debounce):
+    now = time.monotonic()
+    with _pending_lock:
+        due = [path for path, seen in _pending.items() if now - seen >= debounce]
+    ready = []
+    for path in due:
+        state = _state(path)
+        if state is not None and time.time() - state[1] / 1e9 < debounce:
+            with _pending_lock:
+                _pending[path] = now  # still being written
+        else:
+            ready.append(path)
+    with _pending_lock:
+        for path in ready:
+            _pending.pop(path, None)
+    if ready:
+        sync(ready)
+
+def start_watcher(watch_dirs=WATCH_DIRS):
+    """Start (once per process) the thread keeping datasets_metadata in sync with the watched folders."""
+    global _watcher_started
+    if not DATASET_WATCH_ENABLED or not any(Path(d).is_dir() for d in watch_dirs):
+        return
+    with _start_lock:
+        if _watcher_started:
+            return
+        _watcher_started = True
+    polling = True
+    try:
+        from watchdog.events import FileSystemEventHandler  # optional dependency
+        from watchdog.observers import Observer
+
+        class Handler(FileSystemEventHandler):
+            def on_any_event(self, event):
+                if event.event_type in WRITE_EVENTS:
+                    _mark(event.src_path, watch_dirs)
+                    if getattr(event, "dest_path", ""):
+                        _mark(event.dest_path, watch_dirs)
+
+        observer = Observer()
+        for folder in watch_dirs:
+            if Path(folder).is_dir():
+                observer.schedule(Handler(), str(Path(folder).resolve()), recursive=True)
+        observer.daemon = True
+        observer.start()
+        polling = False
+    except ImportError:
+        print(f"⚠️ watchdog is not installed; polling the dataset folders every {WATCH_POLL_SECONDS:g}s.")
+
+    def loop():
+        snapshot = {}
+        next_rescan = next_poll = time.monotonic()
+        while True:
+            try:
+                now = time.monotonic()
+                if next_rescan is not None and now >= next_rescan:
+                    reconcile(watch_dirs)
+                    snapshot = scan(watch_dirs)
+                    next_rescan = now + WATCH_RESCAN_SECONDS if WATCH_RESCAN_SECONDS else None
+                    next_poll = now + WATCH_POLL_SECONDS
+                elif polling and now >= next_poll:
+                    current = scan(watch_dirs)
+                    for path in current.keys() | snapshot.keys():
+                        if current.get(path) != snapshot.get(path):
+                            _mark(path, watch_dirs)
+                    snapshot = current
+                    next_poll = now + WATCH_POLL_SECONDS
+                _flush_due(WATCH_DEBOUNCE_SECONDS)
+            except Exception as e:
+                print(f"❌ Dataset watcher: {e}")
+            time.sleep(max(0.2, min(WATCH_DEBOUNCE_SECONDS, WATCH_POLL_SECONDS) / 2))
+
+    threading.Thread(target=loop, name="dataset-watcher", daemon=True).start()
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Reconcile datasets_metadata with the dataset folders.")
+    parser.add_argument("--dir", action="append", help="folder to scan (repeatable); default: WATCH_DIRS")
+    args = parser.parse_args()
+
+    result = reconcile([Path(d) for d in args.dir] if args.dir else WATCH_DIRS)
+    print(f"✅ {result['scanned']} scanned, {result['profiled']} profiled: {result['inserted']} added, "
+          f"{result['updated']} updated" + (f", {len(result['errors'])} error(s)" if result["errors"] else ""))
+    for key in result["missing"]:
+        print(f"  missing: {key}")
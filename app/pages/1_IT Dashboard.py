@@ -1,15 +1,4 @@
 import streamlit as st
-import altair as alt
-from openai import OpenAI
-from data.db import connect_database
-from data.tickets import(
-   insert_ticket, get_all_tickets, update_ticket_status, delete_ticket
-)
-
-conn = connect_database()
-
-# Initialize OpenAI client with API key from Streamlit secrets
-client = OpenAI(api_key=st.secrets["OPENAI_API_KEY"])
 
 # Ensure state keys exist (in case user opens this page first)
 if "logged_in" not in st.session_state:
@@ -24,6 +13,21 @@ if not st.session_state.logged_in:
         st.switch_page("Home.py")   # back to the first page
     st.stop()
 
+# Page dependencies are imported after the guard, so the login redirect stays cheap
+import time
+import altair as alt
+from services.llm_client import get_openai_client
+from data.metrics import metered_stream
+from data.db import connect_database
+from data.tickets import(
+   insert_ticket, get_all_tickets, update_ticket_status, delete_ticket
+)
+from data.scheduler import (
+    ensure_queue, assign_unassigned, next_ticket, claim_next, get_queue, get_loads
+)
+
+conn = connect_database()
+
 # If logged in, show dashboard content
 st.title("📌 IT Dashboard")
 
@@ -103,6 +107,33 @@ with tab_tickets:
         st.metric("Open Tickets", open_tickets)
     st.dataframe(tickets)
 
+    #work queue: ticket_queue is kept current by triggers, so "next" is one index lookup
+    st.subheader("🗂️ Work Queue")
+    queue_conn = connect_database()
+    ensure_queue(queue_conn)
+    loads = get_loads(queue_conn)
+    groups = [g for g in loads["assigned_to"] if g != "Unassigned"]
+    if groups:
+        col_group, col_next = st.columns([1, 3])
+        group = col_group.selectbox("Group", groups)
+        if col_group.button("Claim Next Ticket"):
+            claimed = claim_next(queue_conn, group)
+            if claimed:
+                st.success(f"{claimed} moved to In Progress for {group}.")
+        if "Unassigned" in set(loads["assigned_to"]) and col_group.button("Assign Unassigned Tickets"):
+            st.success(f"{assign_unassigned(queue_conn)} ticket(s) assigned to the least-loaded groups.")
+            loads = get_loads(queue_conn)
+        queued = next_ticket(queue_conn, group)
+        if queued is None:
+            col_next.info(f"{group} has no open tickets.")
+        else:
+            (col_next.error if queued["overdue"] else col_next.info)(
+                f"Next for {group}: **{queued['ticket_id']}** ({queued['priority']}, {queued['category']}) "
+                f"{queued['subject']} — due {queued['due_date']}" + (" (overdue)" if queued["overdue"] else ""))
+        st.dataframe(get_queue(queue_conn, group).drop(columns=["id", "assigned_to"]), hide_index=True)
+        st.dataframe(loads, hide_index=True)
+    queue_conn.close()
+
     st.subheader("⚙️ Manage Tickets")
     cola, colb, colc, = st.columns(3)
 
@@ -147,8 +178,10 @@ with tab_tickets:
             submitted = st.form_submit_button("Update Ticket")
 
             if submitted:
-                ticket_id = update_ticket_status(conn, ticket_id, new_status, resolved_date or None)
-                st.success(f"Ticket #{ticket_id} updated successfully.")
+                if update_ticket_status(conn, ticket_id, new_status, resolved_date or None):
+                    st.success(f"Ticket #{ticket_id} updated successfully.")
+                else:
+                    st.error(f"Ticket #{ticket_id} not found, or it cannot move to {new_status}.")
                 st.rerun()
 
     if st.session_state.form == "delete":
@@ -219,18 +252,21 @@ with tab_chatbot:
 
         #Call OpenAI API with streaming
         with st.spinner("Thinking..."):
+            client = get_openai_client(st.secrets["OPENAI_API_KEY"])
+            started = time.perf_counter()
             completion = client.chat.completions.create(
                 model=model,
                 messages=st.session_state.it_messages,
                 temperature=temperature,
-                stream=True
+                stream=True,
+                stream_options={"include_usage": True}
             )
 
         with st.chat_message("assistant"):
             container = st.empty()
             full_reply = ""
 
-            for chunk in completion:
+            for chunk in metered_stream(model, completion, started):
                 delta = chunk.choices[0].delta
                 if delta.content:
                     full_reply += delta.content
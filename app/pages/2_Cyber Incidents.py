@@ -1,15 +1,4 @@
 import streamlit as st
-import altair as alt
-from openai import OpenAI
-from data.db import connect_database
-from data.incidents import (
-    insert_incident, get_all_incidents, update_incident_status, delete_incident
-)
-
-conn = connect_database()
-
-# Initialize OpenAI client with API key from Streamlit secrets
-client = OpenAI(api_key=st.secrets["OPENAI_API_KEY"])
 
 # Ensure state keys exist (in case user opens this page first)
 if "logged_in" not in st.session_state:
@@ -24,6 +13,20 @@ if not st.session_state.logged_in:
         st.switch_page("Home.py")   # back to the first page
     st.stop()
 
+# Page dependencies are imported after the guard, so the login redirect stays cheap
+import time
+import altair as alt
+from services.llm_client import get_openai_client
+from data.metrics import metered_stream
+from data.db import connect_database
+from data.incidents import (
+    insert_incident, get_all_incidents, update_incident_status, delete_incident
+)
+from data.dedup import sync as sync_dedup, collapse
+from data.anomaly import sync as sync_alerts, get_open_alerts, acknowledge_alerts
+
+conn = connect_database()
+
 # If logged in, show dashboard content
 st.title("🚨 Cyber Incidents")
 
@@ -98,7 +101,31 @@ with tab_incidents:
     with col3:
         open_incidents = incidents[incidents["status"].isin(["Open", "In Progress"])].shape[0]
         st.metric("Open Incidents", open_incidents)
-    st.dataframe(incidents)
+
+    #incident-rate alerts: only incidents added since the last run are read
+    alert_conn = connect_database()
+    sync_alerts(alert_conn)
+    alerts = get_open_alerts(alert_conn)
+    if not alerts.empty:
+        st.error(f"🚨 {len(alerts)} incident-rate alert(s): " + "; ".join(
+            f"{row.value} ({row.kind.replace('_', ' ')}) {row.count} on {row.day}, ~{row.expected:g} expected"
+            for row in alerts.head(3).itertuples()))
+        with st.expander("Rate Alerts"):
+            st.dataframe(alerts, hide_index=True)
+            if st.button("Acknowledge Alerts"):
+                st.success(f"{acknowledge_alerts(alert_conn, alerts['id'])} alert(s) acknowledged.")
+    alert_conn.close()
+
+    #near-duplicates (one campaign reported many times) fold into one row per group
+    if st.toggle("Collapse duplicates"):
+        dedup_conn = connect_database()
+        sync_dedup(dedup_conn)
+        collapsed = collapse(dedup_conn, incidents)
+        dedup_conn.close()
+        st.caption(f"{len(incidents)} incidents in {len(collapsed)} groups")
+        st.dataframe(collapsed)
+    else:
+        st.dataframe(incidents)
 
     st.subheader("⚙️ Manage Incidents")
     cola, colb, colc, = st.columns(3)
@@ -138,8 +165,10 @@ with tab_incidents:
             submitted = st.form_submit_button("Update Incident")
 
         if submitted:
-            update_incident_status(conn, incident_id, new_status)
-            st.success(f"Incident #{incident_id} updated successfully.")
+            if update_incident_status(conn, incident_id, new_status):
+                st.success(f"Incident #{incident_id} updated successfully.")
+            else:
+                st.error(f"Incident #{incident_id} not found, or it cannot move to {new_status}.")
             st.rerun()
 
     if st.session_state.form == "delete":
@@ -210,18 +239,21 @@ with tab_chatbot:
 
         #Call OpenAI API with streaming
         with st.spinner("Thinking..."):
+            client = get_openai_client(st.secrets["OPENAI_API_KEY"])
+            started = time.perf_counter()
             completion = client.chat.completions.create(
                 model=model,
                 messages=st.session_state.cyber_messages,
                 temperature=temperature,
-                stream=True
+                stream=True,
+                stream_options={"include_usage": True}
             )
 
         with st.chat_message("assistant"):
             container = st.empty()
             full_reply = ""
 
-            for chunk in completion:
+            for chunk in metered_stream(model, completion, started):
                 delta = chunk.choices[0].delta
                 if delta.content:
                     full_reply += delta.content
@@ -1,15 +1,4 @@
 import streamlit as st
-import altair as alt
-import pandas as pd
-from openai import OpenAI
-from data.datasets import (
-    insert_dataset, get_all_datasets, update_dataset, delete_dataset
-)
-
-DB_PATH = "DATA/intelligence_platform.db"
-
-# Initialize OpenAI client with API key from Streamlit secrets
-client = OpenAI(api_key=st.secrets["OPENAI_API_KEY"])
 
 # Ensure state keys exist (in case user opens this page first)
 if "logged_in" not in st.session_state:
@@ -24,38 +13,61 @@ if not st.session_state.logged_in:
         st.switch_page("Home.py")   # back to the first page
     st.stop()
 
+# Page dependencies are imported after the guard, so the login redirect stays cheap
+import time
+import altair as alt
+import pandas as pd
+from services.llm_client import get_openai_client
+from data.metrics import metered_stream
+from data.binning import histogram, STRATEGIES, DEFAULT_BINS
+from data.profiler import profile_datasets
+from data.watcher import start_watcher
+from data.datasets import (
+    insert_dataset, get_all_datasets, update_dataset, delete_dataset
+)
+
+DB_PATH = "DATA/intelligence_platform.db"
+
 # If logged in, show dashboard content
 st.title("📁 Ai and Data Science")
 
 st.set_page_config(page_title="AI and Data Science", page_icon="📁", layout="wide")
 
+#datasets_metadata follows the files in the dataset folders (data/watcher.py)
+start_watcher()
 datasets = get_all_datasets()
 
 #Tabs
 tab_analytics, tab_data, tab_chatbot = st.tabs(["Analytics", "Dataset Manager", "AI and Data Science Chatbot"])
 with tab_analytics:
     st.header("Charts")
+    col_strategy, col_bins = st.columns(2)
+    with col_strategy:
+        strategy = st.selectbox("Binning", STRATEGIES, format_func=str.title, key="bin_strategy")
+    with col_bins:
+        bins = st.slider("Bins", min_value=5, max_value=50, value=DEFAULT_BINS, key="bin_count")
 
     st.subheader("Dataset by Record")
-    record_counts = datasets["record_count"].value_counts().reset_index()
-    record_counts.columns = ["record_count", "count"]
+    #binned: a bar per range of values, not one per distinct value
+    record_counts = histogram(datasets["record_count"], strategy, bins)
 
     chart_records = alt.Chart(record_counts).mark_bar().encode(
-        x=alt.X("record_count", sort="-y", title="Record Count"),
-        y=alt.Y("count", title="Number of Datasets"),
-        color=alt.Color("record_count", legend=None)
+        x=alt.X("label:O", sort=list(record_counts["label"]), title="Record Count"),
+        y=alt.Y("count:Q", title="Number of Datasets"),
+        color=alt.Color("bin:O", legend=None),
+        tooltip=["label", "count"]
     )
-    st.altair_chart(chart_records)
+    st.altair_chart(chart_records, use_container_width=True)
 
     st.subheader("Dataset by Size")
 
-    size_counts = datasets["file_size_mb"].value_counts().reset_index()
-    size_counts.columns = ["file_size_mb", "count"]
+    size_counts = histogram(datasets["file_size_mb"], strategy, bins)
 
     chart_size = alt.Chart(size_counts).mark_bar().encode(
-        x=alt.X("file_size_mb:Q", sort="-y", title="File Size (MB)"),
+        x=alt.X("label:O", sort=list(size_counts["label"]), title="File Size (MB)"),
         y=alt.Y("count:Q",title="Number of Datasets"),
-        color=alt.Color("file_size_mb:Q",legend=None)
+        color=alt.Color("bin:O",legend=None),
+        tooltip=["label", "count"]
     )
     st.altair_chart(chart_size, use_container_width=True)
 
@@ -76,7 +88,7 @@ with tab_data:
     st.dataframe(datasets)
 
     st.subheader("⚙️ Manage Datasets")
-    cola, colb, colc = st.columns(3)
+    cola, colb, colc, cold = st.columns(4)
 
     with cola:
         if st.button("Insert Metadata"):
@@ -90,6 +102,13 @@ with tab_data:
         if st.button("Delete Metadata"):
             st.session_state.form = "delete"
 
+    with cold:
+        #record counts and sizes read from the dataset files (data/profiler.py)
+        if st.button("Profile Files"):
+            results = profile_datasets()
+            profiled = sum(1 for r in results if not r["error"])
+            st.success(f"{profiled} of {len(results)} dataset(s) profiled from their files.")
+
     #Insert / Update / Delete
     if st.session_state.form == "insert":
         with st.form("new_dataset"):
@@ -194,18 +213,21 @@ with tab_chatbot:
 
         #Call OpenAI API with streaming
         with st.spinner("Thinking..."):
+            client = get_openai_client(st.secrets["OPENAI_API_KEY"])
+            started = time.perf_counter()
             completion = client.chat.completions.create(
                 model=model,
                 messages=st.session_state.ai_messages,
                 temperature=temperature,
-                stream=True
+                stream=True,
+                stream_options={"include_usage": True}
             )
 
         with st.chat_message("assistant"):
             container = st.empty()
             full_reply = ""
 
-            for chunk in completion:
+            for chunk in metered_stream(model, completion, started):
                 delta = chunk.choices[0].delta
                 if delta.content:
                     full_reply += delta.content
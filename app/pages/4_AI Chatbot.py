@@ -1,8 +1,4 @@
 import streamlit as st
-from openai import OpenAI
-
-# Initialize OpenAI client with API key from Streamlit secrets
-client = OpenAI(api_key=st.secrets["OPENAI_API_KEY"])
 
 # Ensure state keys exist (in case user opens this page first)
 if "logged_in" not in st.session_state:
@@ -17,6 +13,11 @@ if not st.session_state.logged_in:
         st.switch_page("Home.py")   # back to the first page
     st.stop()
 
+# Page dependencies are imported after the guard, so the login redirect stays cheap
+import time
+from services.llm_client import get_openai_client
+from data.metrics import metered_stream
+
 #Page configuration
 st.set_page_config(
     page_title="ShaiahGPT",
@@ -71,18 +72,21 @@ if prompt:
 
     #Call OpenAI API with streaming
     with st.spinner("Thinking..."):
+        client = get_openai_client(st.secrets["OPENAI_API_KEY"])
+        started = time.perf_counter()
         completion = client.chat.completions.create(
             model=model,
             messages=st.session_state.messages,
             temperature=temperature,
-            stream=True
+            stream=True,
+            stream_options={"include_usage": True}
         )
 
     with st.chat_message("assistant"):
         container = st.empty()
         full_reply = ""
 
-        for chunk in completion:
+        for chunk in metered_stream(model, completion, started):
             delta = chunk.choices[0].delta
             if delta.content:
                 full_reply += delta.content
@@ -95,4 +99,3 @@ if prompt:
         "content": full_reply
     })
 
-
@@ -0,0 +1,19 @@
+import threading
+from typing import Any, Dict
+
+# api key -> OpenAI client, shared by every session in the process
+_CLIENTS: Dict[str, Any] = {}
+_CLIENTS_LOCK = threading.Lock()
+
+
+def get_openai_client(api_key: str):
+    """
+    OpenAI client for `api_key`, built on first use and then reused process-wide.
+    openai (and httpx under it) is only imported when a chat message is actually sent.
+    """
+    with _CLIENTS_LOCK:
+        client = _CLIENTS.get(api_key)
+        if client is None:
+            from openai import OpenAI
+            client = _CLIENTS[api_key] = OpenAI(api_key=api_key)
+        return client
@@ -2,6 +2,7 @@ import sqlite3
 import bcrypt
 from pathlib import Path
 from data.db import connect_database
+from data import metrics
 DATA_DIR = Path("DATA")
 
 def register_user(username, password, role='user'):
@@ -19,7 +20,8 @@ def register_user(username, password, role='user'):
     #hash the password
     password_bytes = password.encode('utf-8')
     salt = bcrypt.gensalt()
-    hashed = bcrypt.hashpw(password_bytes, salt)
+    with metrics.BCRYPT_SECONDS.labels("hash").time():
+        hashed = bcrypt.hashpw(password_bytes, salt)
     password_hash = hashed.decode('utf-8')
     
     #insert new user
@@ -47,6 +49,7 @@ def login_user(username, password):
     conn.close()
     
     if not user:
+        metrics.LOGINS.labels("unknown_user").inc()
         return False, "Username not found."
     
     #verify password (user[2] is password_hash column)
@@ -54,7 +57,11 @@ def login_user(username, password):
     password_bytes = password.encode('utf-8')
     hash_bytes = stored_hash.encode('utf-8')
     
-    if bcrypt.checkpw(password_bytes, hash_bytes):
+    with metrics.BCRYPT_SECONDS.labels("check").time():
+        valid = bcrypt.checkpw(password_bytes, hash_bytes)
+    if valid:
+        metrics.LOGINS.labels("success").inc()
         return True, f"Welcome, {username}!"
     else:
+        metrics.LOGINS.labels("wrong_password").inc()
         return False, "Invalid password."
\ No newline at end of file
@@ -0,0 +1,107 @@
+"""Compare the SQLite and DuckDB analytics engines on the dashboard queries.
+
+Builds a scratch copy of the platform database with the incident and ticket
+tables grown to --rows rows (by replaying the existing rows with new ids),
+exports it to Parquet, then times every dashboard aggregation on each engine.
+
+Usage (from the repository root):
+    python -m benchmarks.bench_analytics_engines --rows 2000000
+"""
+import argparse
+import itertools
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "multi_domain_platform"))
+
+from services.database_manager import DatabaseManager  # noqa: E402
+from services.analytics_engine import SQLiteEngine, DuckDBEngine  # noqa: E402
+from services.parquet_export import ParquetExporter  # noqa: E402
+
+SOURCE_DB = Path(__file__).resolve().parent.parent / "multi_domain_platform" / "database" / "platform.db"
+
+QUERIES = [
+    ("incidents by severity", "count_by", ("cyber_incidents", "severity")),
+    ("incidents by type", "count_by", ("cyber_incidents", "incident_type")),
+    ("tickets by priority", "count_by", ("it_tickets", "priority")),
+    ("tickets by category", "count_by", ("it_tickets", "category")),
+    ("weekly incidents", "weekly_counts", ("cyber_incidents", "date", "severity")),
+    ("weekly tickets", "weekly_counts", ("it_tickets", "created_date", "priority")),
+    ("resolution percentiles", "resolution_percentiles", ("priority",)),
+    ("dataset summary", "dataset_summary", ()),
+]
+
+
+def grow_table(connection: sqlite3.Connection, table: str, rows: int) -> None:
+    """Re-insert the existing rows (without their ids) until the table holds `rows` rows."""
+    columns = [row[1] for row in connection.execute(f"PRAGMA table_info({table})") if row[1] != "id"]
+    column_list = ", ".join(columns)
+    for copy in itertools.count(1):
+        current = connection.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+        if current >= rows:
+            break
+        # ticket_id is UNIQUE, so suffix the copies
+        select_list = column_list.replace("ticket_id", f"ticket_id || '-' || id || '-{copy}'")
+        connection.execute(
+            f"INSERT INTO {table} ({column_list}) SELECT {select_list} FROM {table} LIMIT ?",
+            (rows - current,)
+        )
+    connection.commit()
+
+
+def build_database(workdir: Path, rows: int) -> Path:
+    db_path = workdir / "platform.db"
+    shutil.copy(SOURCE_DB, db_path)
+    connection = sqlite3.connect(db_path)
+    # triggers (rollups, change log) would dominate the build time and are not under test
+    for (name,) in connection.execute("SELECT name FROM sqlite_master WHERE type = 'trigger'").fetchall():
+        connection.execute(f"DROP TRIGGER {name}")
+    for table in ("cyber_incidents", "it_tickets"):
+        grow_table(connection, table, rows)
+    connection.close()
+    return db_path
+
+
+def time_query(engine, method: str, args: tuple, repeat: int) -> float:
+    """Best-of-`repeat` wall time in seconds."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        getattr(engine, method)(*args)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000, help="rows per incident/ticket table")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        workdir = Path(tmp)
+        print(f"Building a {args.rows:,}-row database in {workdir} ...")
+        db_path = build_database(workdir, args.rows)
+        db = DatabaseManager(str(db_path))
+        ParquetExporter(db, workdir / "parquet").export(full=True)
+
+        engines = {"sqlite": SQLiteEngine(db)}
+        for source in ("sqlite", "parquet"):
+            try:
+                engines[f"duckdb ({source})"] = DuckDBEngine(db_path, source=source, parquet_dir=workdir / "parquet")
+            except Exception as e:
+                print(f"⚠️ Skipping DuckDB with {source} source: {e}")
+
+        print(f"\n{'query':<24}" + "".join(f"{name:>20}" for name in engines))
+        for label, method, query_args in QUERIES:
+            timings = [time_query(engine, method, query_args, args.repeat) for engine in engines.values()]
+            print(f"{label:<24}" + "".join(f"{seconds * 1000:>18.1f}ms" for seconds in timings))
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""Throughput benchmark for the streaming incident-rate anomaly detector.
+
+Generates --events synthetic incidents over --days days (a weekly pattern per
+incident type, plus injected spikes), then times:
+
+- the in-memory RateAnomalyDetector on the event tuples (target: 100k events/s);
+- with --sync, the full IncidentAnomalyMonitor.sync() path on a scratch copy of
+  the platform database: the events are inserted as cyber_incidents rows and
+  consumed from the change log, baselines and alerts written back.
+
+Usage (from the repository root):
+    python -m benchmarks.bench_anomaly --events 1000000 [--sync]
+"""
+import argparse
+import datetime
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "multi_domain_platform"))
+
+from services.database_manager import DatabaseManager  # noqa: E402
+from services.incident_anomaly import RateAnomalyDetector, IncidentAnomalyMonitor  # noqa: E402
+
+SOURCE_DB = Path(__file__).resolve().parent.parent / "multi_domain_platform" / "database" / "platform.db"
+INCIDENT_TYPES = ["Phishing", "Malware", "DDoS", "Unauthorised Access", "Data Leak", "Ransomware",
+                  "Credential Stuffing", "Insider Threat", "Supply Chain Attack", "Zero-Day Exploit"]
+SEVERITIES = ["Low", "Medium", "High", "Critical"]
+TARGET_EVENTS_PER_SECOND = 100_000
+
+
+def synthetic_events(events: int, days: int, spikes: int, seed: int = 42):
+    """(date, incident_type, severity) tuples in date order, and the (type, date) pairs that were spiked."""
+    rng = np.random.default_rng(seed)
+    start = datetime.date(2025, 1, 1)  # after the sample incidents, so the sync run extends their baselines
+    weekday_weight = np.array([1.2, 1.1, 1.0, 1.0, 1.1, 0.5, 0.4])  # quieter weekends
+    day_weight = weekday_weight[(np.arange(days) + start.weekday()) % 7]
+    day_of_event = np.sort(rng.choice(days, size=events, p=day_weight / day_weight.sum()))
+    types = rng.integers(0, len(INCIDENT_TYPES), events)
+    severities = rng.choice(len(SEVERITIES), size=events, p=[0.4, 0.3, 0.2, 0.1])
+
+    # a spike: one type takes over a fifth of a (late enough) day's incidents
+    spiked = set()
+    for day in rng.choice(np.arange(days // 4, days), size=spikes, replace=False):
+        on_day = np.flatnonzero(day_of_event == day)
+        kind = int(rng.integers(0, len(INCIDENT_TYPES)))
+        types[on_day[: len(on_day) // 5]] = kind
+        spiked.add((INCIDENT_TYPES[kind], (start + datetime.timedelta(days=int(day))).isoformat()))
+
+    dates = [(start + datetime.timedelta(days=d)).isoformat() for d in range(days)]
+    rows = [(dates[d], INCIDENT_TYPES[t], SEVERITIES[s]) for d, t, s in zip(day_of_event, types, severities)]
+    return rows, spiked
+
+
+def bench_detector(rows, spiked) -> None:
+    detector = RateAnomalyDetector()
+    start = time.perf_counter()
+    detector.process(rows)
+    seconds = time.perf_counter() - start
+    rate = len(rows) / seconds
+    mark = "✅" if rate >= TARGET_EVENTS_PER_SECOND else "❌"
+    print(f"{mark} detector: {len(rows):,} events in {seconds:.2f}s = {rate:,.0f} events/s "
+          f"(target {TARGET_EVENTS_PER_SECOND:,})")
+
+    alerts = detector.alerts + detector.open_alerts()
+    flagged = {(a.value, a.day) for a in alerts if a.kind == "incident_type"}
+    print(f"   {len(spiked & flagged)} of {len(spiked)} injected spikes flagged; "
+          f"{len(flagged - spiked)} other type-day alert(s), {sum(a.kind == 'severity' for a in alerts)} severity alert(s)")
+
+
+def bench_sync(rows) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = Path(tmp) / "platform.db"
+        shutil.copy(SOURCE_DB, db_path)
+        db = DatabaseManager(str(db_path))
+        monitor = IncidentAnomalyMonitor(db)
+        monitor.sync()  # baselines for the existing incidents; the change log starts here
+
+        start = time.perf_counter()
+        db.execute_many(
+            "INSERT INTO cyber_incidents (date, incident_type, severity, status, description, reported_by) "
+            "VALUES (?, ?, ?, 'Open', 'synthetic', 'bench')", rows
+        )
+        inserted = time.perf_counter() - start
+
+        start = time.perf_counter()
+        processed = monitor.sync()
+        seconds = time.perf_counter() - start
+        print(f"   sync: {processed:,} inserts consumed from the change log in {seconds:.2f}s "
+              f"= {processed / seconds:,.0f} events/s (inserting them took {inserted:.2f}s)")
+        print(f"   {len(monitor.recent_alerts(limit=1_000_000)):,} open alert(s) stored")
+        db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--events", type=int, default=1_000_000)
+    parser.add_argument("--days", type=int, default=730)
+    parser.add_argument("--spikes", type=int, default=20)
+    parser.add_argument("--sync", action="store_true", help="also time the change-log path on a scratch database")
+    args = parser.parse_args()
+
+    rows, spiked = synthetic_events(args.events, args.days, args.spikes)
+    bench_detector(rows, spiked)
+    if args.sync:
+        bench_sync(rows)
+
+
+if __name__ == "__main__":
+    main()
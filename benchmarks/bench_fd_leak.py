@@ -0,0 +1,125 @@
+"""File-descriptor leak check for the multi_domain_platform pages.
+
+Runs many reruns against a scratch copy of multi_domain_platform and checks
+that the process's open file descriptors stay flat, i.e. reruns reuse the
+shared services from services/service_registry.py instead of opening new
+connections.
+
+Two modes:
+  - default: each rerun runs in a fresh thread (as Streamlit does) and goes
+    through the same services a page uses: database, managers, snapshot
+    reader, analytics engine
+  - --page: reruns the real page script with streamlit's AppTest
+
+Usage (from the repository root):
+    python -m benchmarks.bench_fd_leak --reruns 1000
+    python -m benchmarks.bench_fd_leak --reruns 200 --page "pages/2_IT Operations.py"
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def open_fds() -> int:
+    """Open file descriptors of this process."""
+    if os.path.isdir("/proc/self/fd"):
+        return len(os.listdir("/proc/self/fd"))
+    import psutil  # optional; only needed where /proc is missing
+    return psutil.Process().num_fds()
+
+
+def scratch_copy() -> Path:
+    """Copy multi_domain_platform (with its database) to a temp dir so the benchmark never writes the real one."""
+    target = Path(tempfile.mkdtemp(prefix="fd_leak_")) / "multi_domain_platform"
+    shutil.copytree(ROOT / "multi_domain_platform", target,
+                    ignore=shutil.ignore_patterns("__pycache__", "logs", "*_analytics.db*"))
+    return target
+
+
+def simulated_rerun() -> None:
+    """What one rerun of the IT Operations and Cybersecurity pages asks of the services."""
+    from services.service_registry import get_database, get_ticket_manager, get_incident_manager, \
+        get_snapshot_manager
+    from services.analytics_engine import get_analytics_engine
+    from services.live_refresh import LiveDataCache
+
+    get_database().fetch_one("SELECT COUNT(*) FROM it_tickets")
+    get_ticket_manager().get_tickets_by_status_count()
+    get_incident_manager().get_all_incidents_df()
+    reader = get_snapshot_manager().reader()
+    LiveDataCache(reader).get("bench_priority", ["it_tickets"],
+                              lambda: get_analytics_engine(reader).count_by("it_tickets", "priority"))
+
+
+def run_simulated(reruns: int) -> None:
+    for _ in range(reruns):
+        errors = []
+
+        def target():
+            try:
+                simulated_rerun()
+            except Exception as e:  # surfaced after the thread ends
+                errors.append(e)
+
+        thread = threading.Thread(target=target)
+        thread.start()
+        thread.join()
+        if errors:
+            raise errors[0]
+
+
+def run_page(page: str, reruns: int) -> None:
+    from streamlit.testing.v1 import AppTest
+
+    app = AppTest.from_file(str(Path(page).resolve()), default_timeout=60)
+    app.secrets["OPENAI_API_KEY"] = "sk-benchmark"
+    app.session_state["logged_in"] = True
+    app.session_state["username"] = "benchmark"
+    for _ in range(reruns):
+        app.run()
+        if app.exception:
+            raise RuntimeError(app.exception[0].message)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Check that page reruns do not leak file descriptors.")
+    parser.add_argument("--reruns", type=int, default=1000)
+    parser.add_argument("--page", help="rerun this page script with AppTest instead of the simulated rerun")
+    parser.add_argument("--warmup", type=int, default=3, help="reruns before the baseline count")
+    args = parser.parse_args()
+
+    tree = scratch_copy()
+    sys.path.insert(0, str(tree))
+    os.chdir(tree)
+
+    if args.page:
+        def run(n):
+            run_page(args.page, n)
+    else:
+        run = run_simulated
+
+    run(args.warmup)
+    before = open_fds()
+    start = time.perf_counter()
+    run(args.reruns)
+    seconds = time.perf_counter() - start
+    after = open_fds()
+
+    from services.service_registry import shutdown
+    shutdown()
+    closed = open_fds()
+    shutil.rmtree(tree.parent, ignore_errors=True)
+
+    print(f"{args.reruns} reruns in {seconds:.1f}s ({seconds * 1000 / args.reruns:.2f} ms/rerun)")
+    print(f"open file descriptors: {before} before, {after} after, {closed} after shutdown()")
+    if after > before:
+        print(f"❌ {after - before} file descriptors leaked")
+        sys.exit(1)
+    print("✅ File descriptor count stayed flat")
@@ -0,0 +1,132 @@
+"""Import-time benchmark for every Streamlit page entry point.
+
+For each page the top-level imports are split in two:
+  - guard: imports above the login guard (what a logged-out visitor pays)
+  - page:  every top-level import in the file
+Each set is run in a fresh interpreter under `python -X importtime` from the
+page's tree (app/ or multi_domain_platform/), and the cumulative import time
+of the top-level modules is reported, best of --repeat runs.
+
+The run fails (exit code 1) when a guard import set exceeds --guard-max-ms, or
+when any measurement regresses more than --tolerance against a --baseline
+JSON written earlier with --output.
+
+Usage (from the repository root):
+    python -m benchmarks.bench_importtime --output importtime.json
+    python -m benchmarks.bench_importtime --baseline importtime.json --tolerance 0.25
+"""
+import argparse
+import ast
+import json
+import re
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# page tree -> entry points, relative to the tree
+PAGES = {
+    "app": ["Home.py", "pages/1_IT Dashboard.py", "pages/2_Cyber Incidents.py",
+            "pages/3_AI and Data Science.py", "pages/4_AI Chatbot.py"],
+    "multi_domain_platform": ["1_Home.py", "pages/2_IT Operations.py", "pages/3_Cybersecurity.py",
+                              "pages/4_Data Science.py"],
+}
+
+# "import time:  self [us] | cumulative | imported package"; top-level modules have no indent
+_IMPORTTIME_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$")
+
+
+def _calls_st_stop(node: ast.AST) -> bool:
+    return any(
+        isinstance(n, ast.Call) and isinstance(n.func, ast.Attribute) and n.func.attr == "stop"
+        for n in ast.walk(node)
+    )
+
+
+def page_imports(path: Path) -> Tuple[List[str], List[str]]:
+    """(imports above the login guard, all top-level imports) as source lines."""
+    source = path.read_text(encoding="utf-8")
+    guard: List[str] = []
+    every: List[str] = []
+    guard_seen = False
+    for node in ast.parse(source).body:
+        if isinstance(node, (ast.Import, ast.ImportFrom)):
+            line = ast.get_source_segment(source, node)
+            every.append(line)
+            if not guard_seen:
+                guard.append(line)
+        elif _calls_st_stop(node):
+            guard_seen = True
+    return guard, every
+
+
+def import_ms(imports: List[str], cwd: Path) -> float:
+    """Cumulative import time in ms of `imports` in a fresh interpreter."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "\n".join(imports) or "pass"],
+        cwd=cwd, capture_output=True, text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"imports failed in {cwd}:\n{result.stderr[-2000:]}")
+    total_us = 0
+    for line in result.stderr.splitlines():
+        match = _IMPORTTIME_LINE.match(line)
+        if match and match.group(3) == " ":
+            total_us += int(match.group(2))
+    return total_us / 1000
+
+
+def measure(repeat: int) -> List[dict]:
+    results: List[dict] = []
+    for tree, pages in PAGES.items():
+        cwd = ROOT / tree
+        for page in pages:
+            guard, every = page_imports(cwd / page)
+            for scope, imports in (("guard", guard), ("page", every)):
+                best = min(import_ms(imports, cwd) for _ in range(repeat))
+                results.append({"tree": tree, "page": page, "scope": scope, "ms": round(best, 1)})
+                print(f"  {tree:<22} {page:<32} {scope:<6} {best:>9.1f} ms")
+    return results
+
+
+def check(results: List[dict], guard_max_ms: float, baseline: Dict[Tuple[str, str, str], float],
+          tolerance: float) -> List[str]:
+    """Regression messages; empty when everything is within its threshold."""
+    failures = []
+    for r in results:
+        key = (r["tree"], r["page"], r["scope"])
+        if r["scope"] == "guard" and r["ms"] > guard_max_ms:
+            failures.append(f"{r['tree']}/{r['page']}: login guard imports take {r['ms']} ms (max {guard_max_ms})")
+        previous = baseline.get(key)
+        if previous and r["ms"] > previous * (1 + tolerance):
+            failures.append(f"{r['tree']}/{r['page']} {r['scope']}: {r['ms']} ms vs baseline {previous} ms")
+    return failures
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure page import times.")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per measurement; the best is kept")
+    parser.add_argument("--guard-max-ms", type=float, default=500.0,
+                        help="fail if the imports above a page's login guard take longer")
+    parser.add_argument("--baseline", help="JSON from an earlier --output run to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed slowdown vs the baseline")
+    parser.add_argument("--output", help="write results as JSON")
+    args = parser.parse_args()
+
+    results = measure(args.repeat)
+
+    baseline = {}
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = {(r["tree"], r["page"], r["scope"]): r["ms"] for r in json.load(f)["results"]}
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"python": sys.version.split()[0], "results": results}, f, indent=2)
+        print(f"✅ Results written to {args.output}")
+
+    failures = check(results, args.guard_max_ms, baseline, args.tolerance)
+    for message in failures:
+        print(f"❌ {message}")
+    sys.exit(1 if failures else 0)
@@ -0,0 +1,90 @@
+"""Memory and construction-time benchmark for the multi_domain_platform record types.
+
+Compares the slotted, interned SecurityIncident against the original
+__dict__-based layout it replaced.
+
+Usage (from the repository root):
+    python -m benchmarks.bench_models --rows 1000000
+"""
+import argparse
+import gc
+import random
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "multi_domain_platform"))
+
+from models.security_incident import SecurityIncident  # noqa: E402
+
+INCIDENT_TYPES = ["Phishing", "Malware", "DDoS", "Unauthorized Access", "Data Leak", "Ransomware"]
+SEVERITIES = ["Low", "Medium", "High", "Critical"]
+STATUSES = ["Open", "In Progress", "Resolved", "Closed"]
+REPORTERS = ["alice", "bob", "security_team", "soc_analyst", "it_admin"]
+
+
+class LegacySecurityIncident:
+    """Copy of the original SecurityIncident layout (per-instance __dict__, no interning)."""
+
+    def __init__(self, incident_id, date, incident_type, severity, status,
+                 description, reported_by, created_at):
+        self.__id = incident_id
+        self.__date = date
+        self.__incident_type = incident_type
+        self.__severity = severity
+        self.__status = status
+        self.__description = description
+        self.__reported_by = reported_by
+        self.__created_at = created_at
+
+
+def generate_rows(n: int, seed: int = 42):
+    """Yield rows the way sqlite3 returns them: fresh str objects for every column."""
+    rng = random.Random(seed)
+    for i in range(n):
+        yield (
+            i + 1,
+            f"2024-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+            "".join(rng.choice(INCIDENT_TYPES)),
+            "".join(rng.choice(SEVERITIES)),
+            "".join(rng.choice(STATUSES)),
+            f"Incident description {i}",
+            "".join(rng.choice(REPORTERS)),
+            "2024-11-20 10:00:00",
+        )
+
+
+def measure(cls, n: int):
+    """Return (seconds to construct, bytes retained) for one instance per generated row."""
+    rows = list(generate_rows(n))
+    gc.collect()
+    start = time.perf_counter()
+    objects = [cls(*row) for row in rows]
+    elapsed = time.perf_counter() - start
+    del objects, rows
+
+    gc.collect()
+    tracemalloc.start()
+    objects = [cls(*row) for row in generate_rows(n)]
+    retained, _peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del objects
+    return elapsed, retained
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100_000)
+    args = parser.parse_args()
+
+    print(f"{'Class':<26} {'Rows':>10} {'Seconds':>10} {'MB':>10} {'Bytes/row':>10}")
+    print("-" * 70)
+    for cls in (LegacySecurityIncident, SecurityIncident):
+        elapsed, retained = measure(cls, args.rows)
+        print(f"{cls.__name__:<26} {args.rows:>10} {elapsed:>10.3f} "
+              f"{retained / 1e6:>10.1f} {retained / args.rows:>10.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,234 @@
+"""End-to-end benchmark suite for both platform trees.
+
+For each requested size it generates synthetic CSVs (benchmarks.synthetic),
+then times, against a scratch database:
+  - ingestion with app/data load_all_csv_data
+  - every CRUD function in app/data and in multi_domain_platform/models
+  - the dashboard aggregations (SQL group-bys, rollup trends, MTTR, risk queue)
+
+Results are written as JSON so runs can be compared over time.
+
+Usage (from the repository root):
+    python -m benchmarks.bench_platform --sizes 10k,1m --output bench_results.json
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, List
+
+ROOT = Path(__file__).resolve().parent.parent
+# both trees have a `services` package; the multi_domain_platform one must win
+sys.path.insert(0, str(ROOT / "app"))
+sys.path.insert(0, str(ROOT / "multi_domain_platform"))
+
+from benchmarks.synthetic import generate_all, parse_size  # noqa: E402
+from data import datasets as app_datasets, incidents as app_incidents  # noqa: E402
+from data import rollups as app_rollups, tickets as app_tickets, users as app_users  # noqa: E402
+from data.db import connect_database  # noqa: E402
+from data.schema import create_all_tables  # noqa: E402
+from services.database_manager import DatabaseManager  # noqa: E402
+from services.change_tracking import ChangeTracker  # noqa: E402
+from services.rollup_manager import RollupManager  # noqa: E402
+from services.mttr_engine import MTTREngine  # noqa: E402
+from services.risk_scoring import rank_incidents  # noqa: E402
+from services.analytics_engine import SQLiteEngine  # noqa: E402
+from models.security_incident import SecurityIncident, SecurityIncidentManager  # noqa: E402
+from models.it_ticket import TicketManager  # noqa: E402
+from models.dataset import DatasetManager  # noqa: E402
+
+STATUSES = ["Open", "In Progress", "Resolved", "Closed"]
+
+
+class Recorder:
+    """Collects timings as flat records: size, group, name, ops, seconds."""
+
+    def __init__(self, size: int):
+        self.size = size
+        self.results: List[dict] = []
+
+    def time(self, group: str, name: str, fn: Callable[[int], object], ops: int = 1) -> None:
+        """Call fn(i) for i in range(ops) and record the total and per-op time."""
+        start = time.perf_counter()
+        for i in range(ops):
+            fn(i)
+        seconds = time.perf_counter() - start
+        self.results.append({
+            "size": self.size, "group": group, "name": name, "ops": ops,
+            "seconds": round(seconds, 6), "ms_per_op": round(seconds * 1000 / ops, 4),
+        })
+        print(f"  {group:<14} {name:<44} {seconds * 1000 / ops:>12.3f} ms/op  ({ops} ops)")
+
+
+@contextmanager
+def working_directory(path: Path):
+    """app/data resolves DATA/intelligence_platform.db relative to the cwd."""
+    previous = Path.cwd()
+    os.chdir(path)
+    try:
+        yield
+    finally:
+        os.chdir(previous)
+
+
+def bench_app(rec: Recorder, csv_dir: Path, rows: int, ops: int, rng: random.Random) -> None:
+    """Ingestion, CRUD and aggregations in the functional app/ tree."""
+    conn = connect_database()
+    create_all_tables(conn)
+    rec.time("ingest", "app.load_all_csv_data", lambda _: app_incidents.load_all_csv_data(conn, csv_dir))
+
+    ids = lambda: rng.randint(1, rows)  # noqa: E731
+    rec.time("app.create", "insert_incident", lambda i: app_incidents.insert_incident(
+        conn, "2024-12-01", "Phishing", "High", "Open", f"bench incident {i}", "bench"), ops)
+    rec.time("app.create", "insert_ticket", lambda i: app_tickets.insert_ticket(
+        conn, "High", "Open", "Software", f"bench ticket {i}", "bench", "2024-12-01", None, "bench"), ops)
+    rec.time("app.create", "insert_dataset", lambda i: app_datasets.insert_dataset(
+        f"bench_dataset_{i}", "Bench", "bench", "2024-12-01", 1000, 1.5), ops)
+    rec.time("app.create", "insert_user", lambda i: app_users.insert_user(f"bench_user_{i}", "x" * 60), ops)
+
+    rec.time("app.read", "get_all_incidents", lambda _: app_incidents.get_all_incidents(conn))
+    rec.time("app.read", "get_all_tickets", lambda _: app_tickets.get_all_tickets(conn))
+    rec.time("app.read", "get_all_datasets", lambda _: app_datasets.get_all_datasets())
+    rec.time("app.read", "get_user_by_username", lambda i: app_users.get_user_by_username(f"bench_user_{i}"), ops)
+
+    rec.time("app.update", "update_incident_status", lambda _: app_incidents.update_incident_status(
+        conn, ids(), rng.choice(STATUSES)), ops)
+    rec.time("app.update", "update_ticket_status", lambda _: app_tickets.update_ticket_status(
+        conn, f"TICKET-{ids():03d}", "Closed"), ops)
+    rec.time("app.update", "update_dataset", lambda _: app_datasets.update_dataset(ids(), record_count=42), ops)
+    rec.time("app.update", "update_user", lambda i: app_users.update_user(f"bench_user_{i}", role="admin"), ops)
+
+    rec.time("app.aggregate", "get_incidents_by_type_count", lambda _: app_incidents.get_incidents_by_type_count(conn))
+    rec.time("app.aggregate", "get_tickets_by_status_count", lambda _: app_tickets.get_tickets_by_status_count(conn))
+    rec.time("app.aggregate", "get_incident_trend(weekly)", lambda _: app_rollups.get_incident_trend(conn, freq="weekly"))
+    rec.time("app.aggregate", "get_ticket_trend(weekly)", lambda _: app_rollups.get_ticket_trend(conn, freq="weekly"))
+    conn.close()
+
+
+def bench_app_deletes(rec: Recorder, rows: int, ops: int, rng: random.Random) -> None:
+    """
+    Run last: both trees derive new ticket ids from COUNT(*), so inserting
+    after deletes would reuse ids that are still taken.
+    """
+    conn = connect_database()
+    ids = lambda: rng.randint(1, rows)  # noqa: E731
+    rec.time("app.delete", "delete_incident", lambda _: app_incidents.delete_incident(conn, ids()), ops)
+    rec.time("app.delete", "delete_ticket", lambda _: app_tickets.delete_ticket(conn, f"TICKET-{ids():03d}"), ops)
+    rec.time("app.delete", "delete_dataset", lambda _: app_datasets.delete_dataset(ids()), ops)
+    rec.time("app.delete", "delete_user", lambda i: app_users.delete_user(f"bench_user_{i}"), ops)
+    conn.close()
+
+
+def bench_models(rec: Recorder, db_path: Path, rows: int, ops: int, rng: random.Random) -> None:
+    """CRUD and dashboard aggregations in the OOP multi_domain_platform tree."""
+    db = DatabaseManager(str(db_path))
+    ChangeTracker(db).ensure_schema()
+    RollupManager(db).ensure_schema()
+    incidents = SecurityIncidentManager(db)
+    tickets = TicketManager(db)
+    datasets = DatasetManager(db)
+    ids = lambda: rng.randint(1, rows)  # noqa: E731
+
+    rec.time("models.create", "SecurityIncident.insert", lambda i: SecurityIncident.insert(
+        db, "2024-12-01", "Malware", "Critical", "Open", f"bench incident {i}", "bench"), ops)
+    rec.time("models.create", "TicketManager.insert_ticket", lambda i: tickets.insert_ticket(
+        "Low", "Open", "Network", f"bench ticket {i}", "bench", "2024-12-01", None, "bench"), ops)
+    rec.time("models.create", "DatasetManager.insert_dataset", lambda i: datasets.insert_dataset(
+        f"bench_model_dataset_{i}", "Bench", "bench", "2024-12-01", 1000, 1.5), ops)
+
+    rec.time("models.read", "SecurityIncident.load_all", lambda _: SecurityIncident.load_all(db))
+    rec.time("models.read", "SecurityIncident.search(id)", lambda _: SecurityIncident.search(db, str(ids())), ops)
+    rec.time("models.read", "SecurityIncident.search(text)", lambda _: SecurityIncident.search(db, "phish"))
+    rec.time("models.read", "SecurityIncidentManager.get_all_incidents_df",
+             lambda _: incidents.get_all_incidents_df())
+    rec.time("models.read", "TicketManager.get_all_tickets", lambda _: tickets.get_all_tickets())
+    rec.time("models.read", "TicketManager.load_all", lambda _: tickets.load_all())
+    rec.time("models.read", "DatasetManager.get_all_datasets_df", lambda _: datasets.get_all_datasets_df())
+    rec.time("models.read", "DatasetManager.load_all", lambda _: datasets.load_all())
+
+    rec.time("models.update", "SecurityIncident.update_status_in_db", lambda _: SecurityIncident.update_status_in_db(
+        db, ids(), rng.choice(STATUSES)), ops)
+    rec.time("models.update", "TicketManager.update_ticket_status", lambda _: tickets.update_ticket_status(
+        f"TICKET-{ids():03d}", "Resolved", "2024-12-02"), ops)
+    rec.time("models.update", "DatasetManager.update_dataset", lambda _: datasets.update_dataset(
+        ids(), file_size_mb=2.5), ops)
+
+    engine = SQLiteEngine(db)
+    incidents_df = incidents.get_all_incidents_df()
+    rec.time("dashboard", "count_by(cyber_incidents.severity)", lambda _: engine.count_by("cyber_incidents", "severity"))
+    rec.time("dashboard", "count_by(it_tickets.category)", lambda _: engine.count_by("it_tickets", "category"))
+    rec.time("dashboard", "dataset_summary", lambda _: engine.dataset_summary())
+    rec.time("dashboard", "TicketManager.get_tickets_by_status_count", lambda _: tickets.get_tickets_by_status_count())
+    rec.time("dashboard", "RollupManager.get_incident_trend(weekly)",
+             lambda _: RollupManager(db).get_incident_trend(by="severity", freq="weekly"))
+    rec.time("dashboard", "RollupManager.get_ticket_trend(weekly)",
+             lambda _: RollupManager(db).get_ticket_trend(by="priority", freq="weekly"))
+    rec.time("dashboard", "MTTREngine.summary (cold)", lambda _: MTTREngine(db).summary(by="priority"))
+    rec.time("dashboard", "rank_incidents(top 20)", lambda _: rank_incidents(incidents_df, top_n=20))
+
+    rec.time("models.delete", "SecurityIncident.delete", lambda _: SecurityIncident.delete(db, ids()), ops)
+    rec.time("models.delete", "TicketManager.delete_ticket", lambda _: tickets.delete_ticket(
+        f"TICKET-{ids():03d}"), ops)
+    rec.time("models.delete", "DatasetManager.delete_dataset", lambda _: datasets.delete_dataset(ids()), ops)
+    db.close()
+
+
+def run_size(rows: int, ops: int, seed: int) -> List[dict]:
+    print(f"\n=== {rows:,} rows per table ===")
+    rec = Recorder(rows)
+    rng = random.Random(seed)
+    with tempfile.TemporaryDirectory() as tmp:
+        workdir = Path(tmp)
+        start = time.perf_counter()
+        generate_all(rows, workdir / "csv", seed)
+        print(f"  generated CSVs in {time.perf_counter() - start:.1f}s")
+        (workdir / "DATA").mkdir()
+        with working_directory(workdir):
+            bench_app(rec, workdir / "csv", rows, ops, rng)
+            bench_models(rec, workdir / "DATA" / "intelligence_platform.db", rows, ops, rng)
+            bench_app_deletes(rec, rows, ops, rng)
+    return rec.results
+
+
+def environment() -> dict:
+    try:
+        commit = subprocess.run(["git", "rev-parse", "HEAD"], cwd=ROOT, capture_output=True,
+                                text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "commit": commit,
+        "python": platform.python_version(),
+        "sqlite": sqlite3.sqlite_version,
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark ingestion, CRUD and dashboard queries.")
+    parser.add_argument("--sizes", default="10k", help="comma-separated rows per table, e.g. 10k,1m,10m")
+    parser.add_argument("--ops", type=int, default=200, help="calls per single-row CRUD benchmark")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", default="bench_results.json")
+    args = parser.parse_args()
+
+    report = {"environment": environment(), "results": []}
+    for size in args.sizes.split(","):
+        report["results"].extend(run_size(parse_size(size), args.ops, args.seed))
+
+    Path(args.output).write_text(json.dumps(report, indent=2))
+    print(f"\n✅ Wrote {len(report['results'])} results to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
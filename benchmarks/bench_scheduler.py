@@ -0,0 +1,98 @@
+"""Latency and memory benchmark for the IT ticket scheduling queue.
+
+Builds a scratch copy of the platform database with --tickets extra open
+tickets spread over the assigned_to groups, then times:
+
+- rebuilding the queue from it_tickets, and reloading it from ticket_queue;
+- next_ticket() per group (the "what next" API) and claim_next();
+- raw IndexedHeap push / key update / pop at that size.
+
+Usage (from the repository root):
+    python -m benchmarks.bench_scheduler --tickets 1000000
+"""
+import argparse
+import random
+import resource
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "multi_domain_platform"))
+
+from services.database_manager import DatabaseManager  # noqa: E402
+from services.ticket_scheduler import IndexedHeap, TicketScheduler  # noqa: E402
+
+SOURCE_DB = Path(__file__).resolve().parent.parent / "multi_domain_platform" / "database" / "platform.db"
+PRIORITIES = ["Low", "Medium", "High", "Critical"]
+CATEGORIES = ["Hardware", "Software", "Network", "Access", "Security"]
+GROUPS = ["Helpdesk", "IT_Support", "Network_Ops", "Security", "System_Admin"]
+
+
+def build_database(workdir: Path, tickets: int) -> Path:
+    db_path = workdir / "platform.db"
+    shutil.copy(SOURCE_DB, db_path)
+    connection = sqlite3.connect(db_path)
+    # triggers (rollups, change log) would dominate the build time and are not under test
+    for (name,) in connection.execute("SELECT name FROM sqlite_master WHERE type = 'trigger'").fetchall():
+        connection.execute(f"DROP TRIGGER {name}")
+    rng = random.Random(42)
+    connection.executemany(
+        "INSERT INTO it_tickets (ticket_id, priority, status, category, subject, created_date, assigned_to) "
+        "VALUES (?, ?, ?, ?, 'synthetic', ?, ?)",
+        ((f"BENCH-{n}", rng.choice(PRIORITIES), "Open" if rng.random() < 0.8 else "In Progress",
+          rng.choice(CATEGORIES), f"2024-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}", rng.choice(GROUPS))
+         for n in range(tickets))
+    )
+    connection.commit()
+    connection.close()
+    return db_path
+
+
+def timed(label: str, calls: int, action) -> None:
+    start = time.perf_counter()
+    for _ in range(calls):
+        action()
+    seconds = time.perf_counter() - start
+    print(f"{label:<34}{seconds / calls * 1e6:>12.1f} µs/call  ({calls:,} calls)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tickets", type=int, default=1_000_000)
+    parser.add_argument("--calls", type=int, default=10_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        print(f"Building a database with {args.tickets:,} extra active tickets ...")
+        db = DatabaseManager(str(build_database(Path(tmp), args.tickets)))
+
+        rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        start = time.perf_counter()
+        scheduler = TicketScheduler(db).load()
+        print(f"{'rebuild from it_tickets':<34}{time.perf_counter() - start:>12.2f} s")
+        print(f"{'peak RSS growth':<34}{(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - rss) / 1024:>12.0f} MB")
+        start = time.perf_counter()
+        scheduler = TicketScheduler(db).load()
+        print(f"{'reload from ticket_queue':<34}{time.perf_counter() - start:>12.2f} s")
+        print(scheduler.loads().to_string(index=False))
+
+        groups = scheduler.groups()
+        timed("next_ticket(group)", args.calls, lambda: scheduler.next_ticket(random.choice(groups)))
+        timed("next_ticket() across groups", args.calls, scheduler.next_ticket)
+        timed("queue(group, 20)", args.calls // 10, lambda: scheduler.queue(random.choice(groups), 20))
+        timed("claim_next(group)", min(args.calls, 1_000), lambda: scheduler.claim_next(random.choice(groups)))
+
+        heap = IndexedHeap.build((n, random.random()) for n in range(args.tickets))
+        items = iter(range(args.tickets, args.tickets * 2))
+        timed("IndexedHeap.push (new item)", args.calls * 10, lambda: heap.push(next(items), random.random()))
+        timed("IndexedHeap.push (update key)", args.calls * 10,
+              lambda: heap.push(random.randrange(args.tickets), random.random()))
+        timed("IndexedHeap.pop", args.calls * 10, heap.pop)
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""Synthetic CSV generator for the platform tables.
+
+Produces cyber_incidents.csv, it_tickets.csv and datasets_metadata.csv of any
+size with the same column distributions as the sample files in DATA/.
+Whole sample rows are resampled, so correlations (e.g. open tickets have no
+resolved_date) are kept; dates are then spread uniformly over the sample's
+date range and unique columns are renumbered.
+
+Usage (from the repository root):
+    python -m benchmarks.synthetic --rows 1m --out /tmp/synthetic
+"""
+import argparse
+from pathlib import Path
+from typing import Dict
+
+import numpy as np
+import pandas as pd
+
+SAMPLE_DIR = Path(__file__).resolve().parent.parent / "DATA"
+TABLES = ("cyber_incidents", "it_tickets", "datasets_metadata")
+CHUNK_ROWS = 500_000
+
+# table -> (primary date column, dates that move with it)
+DATE_COLUMNS = {
+    "cyber_incidents": ("date", ()),
+    "it_tickets": ("created_date", ("resolved_date",)),
+    "datasets_metadata": ("last_updated", ()),
+}
+
+SIZE_SUFFIXES = {"k": 1_000, "m": 1_000_000}
+
+
+def parse_size(text: str) -> int:
+    """'10k' -> 10000, '1m' -> 1000000, '2500' -> 2500."""
+    text = text.strip().lower()
+    if text[-1:] in SIZE_SUFFIXES:
+        return int(float(text[:-1]) * SIZE_SUFFIXES[text[-1]])
+    return int(text)
+
+
+def _dates(values: pd.Series) -> pd.Series:
+    """Parse sample dates, tolerating stray whitespace and blanks."""
+    return pd.to_datetime(values.astype("string").str.strip(), format="%Y-%m-%d", errors="coerce")
+
+
+def _generate_chunk(table: str, sample: pd.DataFrame, start: int, size: int,
+                    rng: np.random.Generator) -> pd.DataFrame:
+    chunk = sample.iloc[rng.integers(0, len(sample), size)].reset_index(drop=True)
+
+    date_column, linked = DATE_COLUMNS[table]
+    original = _dates(chunk[date_column])
+    days = _dates(sample[date_column])
+    span = max((days.max() - days.min()).days, 1)
+    shifted = days.min() + pd.to_timedelta(rng.integers(0, span + 1, size), unit="D")
+    chunk[date_column] = shifted.strftime("%Y-%m-%d")
+    for column in linked:
+        # keep the original gap, e.g. time to resolve a ticket
+        moved = shifted + (_dates(chunk[column]) - original)
+        chunk[column] = moved.dt.strftime("%Y-%m-%d")
+
+    numbers = pd.Series(np.arange(start + 1, start + size + 1)).astype(str)
+    if table == "it_tickets":
+        chunk["ticket_id"] = "TICKET-" + numbers.str.zfill(3)
+    elif table == "datasets_metadata":
+        chunk["dataset_name"] = chunk["dataset_name"] + "_" + numbers
+    return chunk
+
+
+def generate_table(table: str, rows: int, out_dir: Path, seed: int = 42,
+                   sample_dir: Path = SAMPLE_DIR) -> Path:
+    """Write `rows` synthetic rows for one table to out_dir/<table>.csv and return the path."""
+    sample = pd.read_csv(sample_dir / f"{table}.csv")
+    rng = np.random.default_rng(seed)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    path = out_dir / f"{table}.csv"
+
+    for start in range(0, rows, CHUNK_ROWS):
+        size = min(CHUNK_ROWS, rows - start)
+        chunk = _generate_chunk(table, sample, start, size, rng)
+        chunk.to_csv(path, mode="w" if start == 0 else "a", header=start == 0, index=False)
+    if rows == 0:
+        sample.head(0).to_csv(path, index=False)
+    return path
+
+
+def generate_all(rows: int, out_dir: Path, seed: int = 42) -> Dict[str, Path]:
+    """Generate every table with `rows` rows each."""
+    return {table: generate_table(table, rows, Path(out_dir), seed) for table in TABLES}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate synthetic platform CSVs.")
+    parser.add_argument("--rows", default="10k", help="rows per table, e.g. 10k, 1m, 10m")
+    parser.add_argument("--out", required=True, help="output directory")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    for name, csv_path in generate_all(parse_size(args.rows), Path(args.out), args.seed).items():
+        print(f"✅ {name}: {csv_path}")
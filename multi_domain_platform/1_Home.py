@@ -1,13 +1,18 @@
 import streamlit as st
 from pathlib import Path
-from services.database_manager import DatabaseManager
-from services.auth_manager import AuthManager
+from services.service_registry import get_database, get_auth_manager
+from services.change_tracking import ChangeLog
 
 # Get absolute path to database file
 BASE_DIR = Path(__file__).parent
 DB_PATH = BASE_DIR / "database" / "platform.db"
-db = DatabaseManager("database/platform.db")
-auth = AuthManager(db)
+
+# Shared by every session; created on the first page load in this process
+db = get_database()
+auth = get_auth_manager()
+
+# Record changes to the domain tables from the first page load onwards
+ChangeLog(db).ensure_schema()
 
 # ---------- Initialise session state ----------
 if "users" not in st.session_state:
@@ -0,0 +1,102 @@
+"""Platform settings. Each value can be overridden with an environment variable."""
+import os
+from pathlib import Path
+
+BASE_DIR = Path(__file__).parent
+
+# How often (seconds) live dashboard sections poll the data-version counters
+LIVE_REFRESH_SECONDS = int(os.environ.get("PLATFORM_LIVE_REFRESH_SECONDS", "15"))
+
+# Analytics snapshot: charts and metrics read a read-only copy of the database
+# that is republished once it is older than SNAPSHOT_MAX_AGE_SECONDS
+SNAPSHOT_ENABLED = os.environ.get("PLATFORM_SNAPSHOT_ENABLED", "1") == "1"
+SNAPSHOT_MAX_AGE_SECONDS = int(os.environ.get("PLATFORM_SNAPSHOT_MAX_AGE_SECONDS", "60"))
+
+# Where the partitioned Parquet export of the domain tables is written
+PARQUET_EXPORT_DIR = Path(os.environ.get("PLATFORM_PARQUET_EXPORT_DIR", BASE_DIR / "database" / "parquet"))
+
+# Engine for the dashboard aggregations: "sqlite" (default) or "duckdb" (optional dependency).
+# DuckDB reads either the SQLite file itself ("sqlite") or the Parquet export ("parquet").
+ANALYTICS_ENGINE = os.environ.get("PLATFORM_ANALYTICS_ENGINE", "sqlite")
+DUCKDB_SOURCE = os.environ.get("PLATFORM_DUCKDB_SOURCE", "sqlite")
+
+# Developer render profiler: per-rerun step timings in a sidebar panel.
+# Set PLATFORM_PROFILE_DUMP_DIR to also write a cProfile (or pyinstrument) trace per rerun.
+DEV_PROFILER = os.environ.get("PLATFORM_DEV_PROFILER", "0") == "1"
+PROFILE_DUMP_DIR = os.environ.get("PLATFORM_PROFILE_DUMP_DIR", "")
+PROFILE_BACKEND = os.environ.get("PLATFORM_PROFILE_BACKEND", "cprofile")
+
+# SQL tracing: every statement is timed; ones slower than SLOW_QUERY_MS go to the rotating trace log
+# (set PLATFORM_SQL_TRACE_LOG_ALL=1 to log every statement). Report: python -m services.query_tracer
+SQL_TRACE_ENABLED = os.environ.get("PLATFORM_SQL_TRACE", "1") == "1"
+SLOW_QUERY_MS = float(os.environ.get("PLATFORM_SLOW_QUERY_MS", "200"))
+SQL_TRACE_LOG = Path(os.environ.get("PLATFORM_SQL_TRACE_LOG", BASE_DIR / "logs" / "sql_trace.log"))
+SQL_TRACE_LOG_ALL = os.environ.get("PLATFORM_SQL_TRACE_LOG_ALL", "0") == "1"
+SQL_TRACE_LOG_BYTES = int(os.environ.get("PLATFORM_SQL_TRACE_LOG_BYTES", str(5 * 1024 * 1024)))
+
+# Metrics exposition (Prometheus text format): an HTTP endpoint on a side port and/or a text
+# file for node_exporter's textfile collector. Both are off unless configured.
+METRICS_PORT = int(os.environ.get("PLATFORM_METRICS_PORT", "0"))
+METRICS_TEXTFILE = os.environ.get("PLATFORM_METRICS_TEXTFILE", "")
+METRICS_TEXTFILE_SECONDS = int(os.environ.get("PLATFORM_METRICS_TEXTFILE_SECONDS", "15"))
+
+# Bulk CSV imports and multi-row edits run in background jobs, one transaction per chunk of rows
+BULK_CHUNK_ROWS = int(os.environ.get("PLATFORM_BULK_CHUNK_ROWS", "500"))
+
+# Hot/cold archiving: Closed/Resolved rows older than ARCHIVE_AFTER_DAYS move from cyber_incidents and
+# it_tickets into *_archive tables, ARCHIVE_CHUNK_ROWS per transaction. *_all views union both.
+ARCHIVE_AFTER_DAYS = int(os.environ.get("PLATFORM_ARCHIVE_AFTER_DAYS", "90"))
+ARCHIVE_CHUNK_ROWS = int(os.environ.get("PLATFORM_ARCHIVE_CHUNK_ROWS", "1000"))
+ARCHIVE_STATUSES = tuple(s.strip() for s in os.environ.get("PLATFORM_ARCHIVE_STATUSES", "Closed,Resolved").split(","))
+
+# Database maintenance (services/maintenance.py): a background scheduler runs incremental vacuum,
+# ANALYZE/PRAGMA optimize, quick_check and WAL checkpoints inside the off-peak window (local time,
+# "HH:MM-HH:MM", may wrap midnight; empty = any time), within a time budget per run.
+MAINTENANCE_ENABLED = os.environ.get("PLATFORM_MAINTENANCE", "1") == "1"
+MAINTENANCE_WINDOW = os.environ.get("PLATFORM_MAINTENANCE_WINDOW", "01:00-05:00")
+MAINTENANCE_BUDGET_SECONDS = float(os.environ.get("PLATFORM_MAINTENANCE_BUDGET_SECONDS", "60"))
+MAINTENANCE_CHECK_SECONDS = int(os.environ.get("PLATFORM_MAINTENANCE_CHECK_SECONDS", "300"))
+MAINTENANCE_LOG = Path(os.environ.get("PLATFORM_MAINTENANCE_LOG", BASE_DIR / "logs" / "maintenance.log"))
+
+# Dataset profiler (services/dataset_profiler.py): fills datasets_metadata.record_count and file_size_mb
+# from the files under DATASET_DIR, found by the row's file_path or as <dataset_name>.csv/.jsonl/.parquet.
+# Files over PROFILER_CHUNK_MB are line-counted in chunks across PROFILER_WORKERS processes (0 = one per CPU).
+DATASET_DIR = Path(os.environ.get("PLATFORM_DATASET_DIR", BASE_DIR / "datasets"))
+PROFILER_WORKERS = int(os.environ.get("PLATFORM_PROFILER_WORKERS", "0"))
+PROFILER_CHUNK_MB = int(os.environ.get("PLATFORM_PROFILER_CHUNK_MB", "64"))
+
+# Dataset watcher (services/dataset_watcher.py): keeps datasets_metadata in step with the files in WATCH_DIRS
+# (os.pathsep-separated; default DATASET_DIR). Uses watchdog (inotify and friends) when installed, else polls
+# every WATCH_POLL_SECONDS. A dataset is re-profiled once its files have been quiet for WATCH_DEBOUNCE_SECONDS,
+# WATCH_BATCH_ROWS per transaction; a full rescan reconciles everything every WATCH_RESCAN_SECONDS (0 = at start only).
+DATASET_WATCH_ENABLED = os.environ.get("PLATFORM_DATASET_WATCH", "1") == "1"
+WATCH_DIRS = [Path(p) for p in os.environ.get("PLATFORM_WATCH_DIRS", str(DATASET_DIR)).split(os.pathsep) if p]
+WATCH_DEBOUNCE_SECONDS = float(os.environ.get("PLATFORM_WATCH_DEBOUNCE_SECONDS", "2"))
+WATCH_POLL_SECONDS = float(os.environ.get("PLATFORM_WATCH_POLL_SECONDS", "10"))
+WATCH_RESCAN_SECONDS = int(os.environ.get("PLATFORM_WATCH_RESCAN_SECONDS", "3600"))
+WATCH_BATCH_ROWS = int(os.environ.get("PLATFORM_WATCH_BATCH_ROWS", "500"))
+
+# Near-duplicate incidents (services/incident_dedup.py): descriptions are cut into character DEDUP_SHINGLE-grams
+# and MinHashed with DEDUP_NUM_PERM hash functions, split into DEDUP_BANDS LSH bands (rows per band =
+# NUM_PERM / BANDS, so 128/16 catches pairs from about 0.7 similarity). Pairs whose estimated Jaccard
+# similarity reaches DEDUP_THRESHOLD are clustered together.
+DEDUP_SHINGLE = int(os.environ.get("PLATFORM_DEDUP_SHINGLE", "5"))
+DEDUP_NUM_PERM = int(os.environ.get("PLATFORM_DEDUP_NUM_PERM", "128"))
+DEDUP_BANDS = int(os.environ.get("PLATFORM_DEDUP_BANDS", "16"))
+DEDUP_THRESHOLD = float(os.environ.get("PLATFORM_DEDUP_THRESHOLD", "0.7"))
+
+# Incident-rate alerts (services/incident_anomaly.py): daily incident counts per type and per severity are
+# tracked with an EWMA level/variance (smoothing ANOMALY_ALPHA) and day-of-week factors (ANOMALY_SEASON_GAMMA).
+# A day alerts once its count reaches ANOMALY_MIN_COUNT and sits ANOMALY_Z deviations above the expected
+# count; keys need ANOMALY_WARMUP_DAYS days of history first.
+ANOMALY_ALPHA = float(os.environ.get("PLATFORM_ANOMALY_ALPHA", "0.1"))
+ANOMALY_SEASON_GAMMA = float(os.environ.get("PLATFORM_ANOMALY_SEASON_GAMMA", "0.05"))
+ANOMALY_Z = float(os.environ.get("PLATFORM_ANOMALY_Z", "3.0"))
+ANOMALY_MIN_COUNT = int(os.environ.get("PLATFORM_ANOMALY_MIN_COUNT", "3"))
+ANOMALY_WARMUP_DAYS = int(os.environ.get("PLATFORM_ANOMALY_WARMUP_DAYS", "7"))
+
+# Ticket scheduling (services/ticket_scheduler.py): open tickets are queued by SLA due date (mttr_engine.SLA_DAYS
+# after created_date), each priority step pulling a ticket forward by SCHEDULER_BOOST_HOURS. Tickets without an
+# assigned_to group go to the least-loaded group that handles their category, but only when someone asks for it
+# (the IT Operations "Assign" button or `--assign`): reading the queue never writes to it_tickets.
+SCHEDULER_BOOST_HOURS = float(os.environ.get("PLATFORM_SCHEDULER_BOOST_HOURS", "12"))
@@ -1,18 +1,22 @@
 import pandas as pd
+from typing import Iterable, List, Tuple
 from services.database_manager import DatabaseManager
+from models.interning import intern_str
 
 class Dataset:
-    """Represents a dataset and provides DB access to datasets_metadata table."""
+    """Represents a single row of the datasets_metadata table."""
 
-    def __init__(self, db: DatabaseManager, dataset_id: int = None, dataset_name: str = None,
+    __slots__ = ("__id", "__name", "__category", "__source", "__last_updated",
+                 "__record_count", "__file_size_mb", "__created_at")
+
+    def __init__(self, dataset_id: int = None, dataset_name: str = None,
                  category: str = None, source: str = None, last_updated: str = None,
                  record_count: int = None, file_size_mb: float = None, created_at: str = None):
-        self._db = db
         self.__id = dataset_id
         self.__name = dataset_name
-        self.__category = category
-        self.__source = source
-        self.__last_updated = last_updated
+        self.__category = intern_str(category)
+        self.__source = intern_str(source)
+        self.__last_updated = intern_str(last_updated)
         self.__record_count = record_count
         self.__file_size_mb = file_size_mb
         self.__created_at = created_at
@@ -27,7 +31,18 @@ class Dataset:
     def get_file_size_mb(self) -> float: return self.__file_size_mb
     def get_created_at(self) -> str: return self.__created_at
 
-    # Database methods
+    # String representation
+    def __str__(self) -> str:
+        return (f"Dataset {self.__id}: {self.__name} "
+                f"({self.__file_size_mb:.2f} MB, {self.__record_count} rows, Source: {self.__source})")
+
+
+class DatasetManager:
+    """Provides DB access to the datasets_metadata table."""
+
+    def __init__(self, db: DatabaseManager):
+        self._db = db
+
     def fetch_all(self) -> pd.DataFrame:
         """Fetch all datasets from the database."""
         query = "SELECT * FROM datasets_metadata"
@@ -37,7 +52,68 @@ class Dataset:
         """Return all datasets as a pandas DataFrame."""
         return pd.DataFrame(self.fetch_all())
 
-    # String representation
-    def __str__(self) -> str:
-        return (f"Dataset {self.__id}: {self.__name} "
-                f"({self.__file_size_mb:.2f} MB, {self.__record_count} rows, Source: {self.__source})")
\ No newline at end of file
+    def load_all(self) -> List[Dataset]:
+        """Return all datasets as Dataset records."""
+        rows = self._db.fetch_all(
+            "SELECT id, dataset_name, category, source, last_updated, record_count, file_size_mb, created_at "
+            "FROM datasets_metadata"
+        )
+        return [Dataset(*row) for row in rows]
+
+    def insert_dataset(self, dataset_name: str, category: str, source: str, last_updated: str,
+                       record_count: int, file_size_mb: float) -> int:
+        cursor = self._db.execute_query(
+            "INSERT INTO datasets_metadata "
+            "(dataset_name, category, source, last_updated, record_count, file_size_mb) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (dataset_name, category, source, last_updated, record_count, file_size_mb)
+        )
+        return cursor.lastrowid
+
+    def update_dataset(self, dataset_id: int, dataset_name: str = None, category: str = None,
+                       source: str = None, last_updated: str = None, record_count: int = None,
+                       file_size_mb: float = None) -> int:
+        fields = {
+            "dataset_name": dataset_name,
+            "category": category,
+            "source": source,
+            "last_updated": last_updated,
+            "record_count": record_count,
+            "file_size_mb": file_size_mb,
+        }
+        updates = {column: value for column, value in fields.items() if value is not None}
+        if not updates:
+            return 0  # nothing to update
+
+        set_clause = ", ".join(f"{column} = ?" for column in updates)
+        params = list(updates.values()) + [dataset_id]
+        cursor = self._db.execute_query(f"UPDATE datasets_metadata SET {set_clause} WHERE id = ?", params)
+        return cursor.rowcount
+
+    def delete_dataset(self, dataset_id: int) -> int:
+        cursor = self._db.execute_query("DELETE FROM datasets_metadata WHERE id = ?", (dataset_id,))
+        return cursor.rowcount
+
+    # --- Batch operations: one transaction per call, errors reported per row ---
+
+    # Parameter order of insert_datasets rows (and the columns of a bulk import CSV)
+    CSV_COLUMNS = ("dataset_name", "category", "source", "last_updated", "record_count", "file_size_mb")
+
+    def insert_datasets(self, rows: Iterable[tuple]) -> Tuple[int, List[Tuple[int, str]]]:
+        """Insert many dataset records with one executemany. Returns (rows inserted, [(row index, error)])."""
+        return self._db.execute_batch(
+            "INSERT INTO datasets_metadata "
+            "(dataset_name, category, source, last_updated, record_count, file_size_mb) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            rows
+        )
+
+    def delete_datasets(self, dataset_ids: Iterable[int]) -> Tuple[int, List[Tuple[int, str]]]:
+        """Delete many dataset records in one transaction. Returns (rows deleted, [(index, error)])."""
+        dataset_ids = [int(did) for did in dataset_ids]
+        existing = self._db.existing_keys("datasets_metadata", "id", dataset_ids)
+        missing = [(i, f"#{did} not found") for i, did in enumerate(dataset_ids) if did not in existing]
+        deleted, errors = self._db.execute_batch(
+            "DELETE FROM datasets_metadata WHERE id = ?", [(did,) for did in dataset_ids]
+        )
+        return deleted, sorted(errors + missing)
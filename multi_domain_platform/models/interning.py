@@ -0,0 +1,7 @@
+import sys
+from typing import Optional
+
+
+def intern_str(value: Optional[str]) -> Optional[str]:
+    """Intern a categorical string so repeated values share a single object."""
+    return sys.intern(value) if isinstance(value, str) else value
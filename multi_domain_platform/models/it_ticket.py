@@ -1,5 +1,60 @@
 import pandas as pd
+from typing import Iterable, List, Optional, Sequence, Tuple
 from services.database_manager import DatabaseManager
+from models.interning import intern_str
+from models.status_workflow import TransitionResult, build_filter, transition, transition_keys
+
+
+def _resolved_date_set(new_status: str, resolved_date: Optional[str] = None) -> Tuple[str, list]:
+    """SET fragment and parameters for resolved_date when tickets move to `new_status`."""
+    if resolved_date:
+        return ", resolved_date = ?", [str(resolved_date)]
+    if new_status in ("Resolved", "Closed"):
+        # resolving or closing stamps today where no date is set yet
+        return ", resolved_date = COALESCE(NULLIF(trim(resolved_date), ''), date('now'))", []
+    if new_status in ("Open", "In Progress"):
+        return ", resolved_date = NULL", []
+    return "", []
+
+
+class ITTicket:
+    """Represents a single row of the it_tickets table."""
+
+    __slots__ = ("__id", "__ticket_id", "__priority", "__status", "__category", "__subject",
+                 "__description", "__created_date", "__resolved_date", "__assigned_to", "__created_at")
+
+    def __init__(self, row_id: int, ticket_id: str, priority: str, status: str, category: str,
+                 subject: str, description: str, created_date: str, resolved_date: str,
+                 assigned_to: str, created_at: str):
+        self.__id = row_id
+        self.__ticket_id = ticket_id
+        self.__priority = intern_str(priority)
+        self.__status = intern_str(status)
+        self.__category = intern_str(category)
+        self.__subject = subject
+        self.__description = description
+        self.__created_date = intern_str(created_date)
+        self.__resolved_date = intern_str(resolved_date)
+        self.__assigned_to = intern_str(assigned_to)
+        self.__created_at = created_at
+
+    # --- Getters ---
+    def get_id(self) -> int: return self.__id
+    def get_ticket_id(self) -> str: return self.__ticket_id
+    def get_priority(self) -> str: return self.__priority
+    def get_status(self) -> str: return self.__status
+    def get_category(self) -> str: return self.__category
+    def get_subject(self) -> str: return self.__subject
+    def get_description(self) -> str: return self.__description
+    def get_created_date(self) -> str: return self.__created_date
+    def get_resolved_date(self) -> str: return self.__resolved_date
+    def get_assigned_to(self) -> str: return self.__assigned_to
+    def get_created_at(self) -> str: return self.__created_at
+
+    def __str__(self) -> str:
+        return (f"Ticket {self.__ticket_id} | Priority: {self.__priority} | Status: {self.__status} | "
+                f"Category: {self.__category} | Subject: {self.__subject}")
+
 
 class TicketManager:
     """Manages IT ticket operations using a DatabaseManager."""
@@ -7,11 +62,18 @@ class TicketManager:
     def __init__(self, db: DatabaseManager):
         self._db = db
 
+    def _last_ticket_number(self) -> int:
+        """Highest TICKET-n in use, archived tickets included, so numbers are never handed out twice."""
+        tables = ["it_tickets"] + [row[0] for row in self._db.fetch_all(
+            "SELECT name FROM sqlite_master WHERE type = 'table' AND name = 'it_tickets_archive'")]
+        return max(self._db.fetch_one(
+            f"SELECT MAX(CAST(SUBSTR(ticket_id, 8) AS INTEGER)) FROM {table} WHERE ticket_id LIKE 'TICKET-%'"
+        )[0] or 0 for table in tables)
+
     def insert_ticket(self, priority: str, status: str, category: str, subject: str,
                       description: str, created_date: str, resolved_date: str, assigned_to: str) -> int:
-        cursor = self._db.execute_query("SELECT COUNT(*) FROM it_tickets")
-        count = cursor.fetchone()[0] + 1
-        ticket_id = f"TICKET-{count:03d}"
+        # numbered after the highest ticket rather than the row count, which drops as tickets are archived
+        ticket_id = f"TICKET-{self._last_ticket_number() + 1:03d}"
 
         query = """
         INSERT INTO it_tickets 
@@ -26,10 +88,14 @@ class TicketManager:
         return ticket_id
 
     def get_all_tickets(self) -> pd.DataFrame:
-        return pd.read_sql_query(
-            "SELECT * FROM it_tickets ORDER BY created_date DESC",
-            self._db._connection
+        return self._db.fetch_dataframe("SELECT * FROM it_tickets ORDER BY created_date DESC")
+
+    def load_all(self) -> List[ITTicket]:
+        rows = self._db.fetch_all(
+            "SELECT id, ticket_id, priority, status, category, subject, description, "
+            "created_date, resolved_date, assigned_to, created_at FROM it_tickets"
         )
+        return [ITTicket(*row) for row in rows]
 
     def get_tickets_by_status_count(self) -> pd.DataFrame:
         query = """
@@ -38,17 +104,91 @@ class TicketManager:
         GROUP BY status
         ORDER BY count DESC
         """
-        return pd.read_sql_query(query, self._db._connection)
+        return self._db.fetch_dataframe(query)
 
     def update_ticket_status(self, ticket_id: str, new_status: str, resolved_date: str = None) -> int:
-        if new_status.lower() == 'closed' and not resolved_date:
-            resolved_date = pd.to_datetime('today').strftime('%Y-%m-%d')
-
-        query = "UPDATE it_tickets SET status = ?, resolved_date = ? WHERE ticket_id = ?"
-        cursor = self._db.execute_query(query, (new_status, resolved_date, ticket_id))
-        return cursor.rowcount
+        """
+        Move one ticket to `new_status` through the status workflow; `resolved_date` is set when
+        given, otherwise handled as in transition_tickets(). Returns 1 if the ticket is now in
+        `new_status`, 0 if it does not exist or the workflow does not allow the move.
+        """
+        extra_set, extra_params = _resolved_date_set(new_status, resolved_date)
+        result = transition(self._db, "it_tickets", "ticket_id", new_status, "ticket_id = ?", [ticket_id],
+                            extra_set=extra_set, extra_params=extra_params)
+        return result.changed + result.unchanged
 
     def delete_ticket(self, ticket_id: str) -> int:
         query = "DELETE FROM it_tickets WHERE ticket_id = ?"
         cursor = self._db.execute_query(query, (ticket_id,))
-        return cursor.rowcount
\ No newline at end of file
+        return cursor.rowcount
+
+    # --- Batch operations: one transaction per call, errors reported per row ---
+
+    # Parameter order of insert_tickets rows (and the columns of a bulk import CSV)
+    CSV_COLUMNS = ("ticket_id", "priority", "status", "category", "subject", "description",
+                   "created_date", "resolved_date", "assigned_to")
+
+    def insert_tickets(self, rows: Iterable[tuple]) -> Tuple[int, List[Tuple[int, str]]]:
+        """
+        Insert many tickets with one executemany. Rows follow CSV_COLUMNS; rows without a
+        ticket_id are numbered after the highest existing TICKET-n.
+        Returns (rows inserted, [(row index, error)]).
+        """
+        last = self._last_ticket_number()
+        numbered = []
+        for row in rows:
+            if not row[0]:
+                last += 1
+                row = (f"TICKET-{last:03d}",) + tuple(row[1:])
+            numbered.append(row)
+        return self._db.execute_batch(
+            "INSERT INTO it_tickets (ticket_id, priority, status, category, subject, description, "
+            "created_date, resolved_date, assigned_to) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            numbered
+        )
+
+    def _not_found(self, ticket_ids: List[str]) -> List[Tuple[int, str]]:
+        existing = self._db.existing_keys("it_tickets", "ticket_id", ticket_ids)
+        return [(i, f"{tid} not found") for i, tid in enumerate(ticket_ids) if tid not in existing]
+
+    def update_ticket_statuses(self, ticket_ids: Iterable[str], new_status: str,
+                               resolved_date: str = None) -> Tuple[int, List[Tuple[int, str]]]:
+        """
+        Move many tickets through the status workflow in one transaction; resolved_date is
+        handled as in update_ticket_status(). Returns (rows now in new_status, [(index, error)]);
+        missing tickets and blocked moves are errors.
+        """
+        extra_set, extra_params = _resolved_date_set(new_status, resolved_date)
+        return transition_keys(self._db, "it_tickets", "ticket_id", ticket_ids, new_status,
+                               extra_set=extra_set, extra_params=extra_params)
+
+    def delete_tickets(self, ticket_ids: Iterable[str]) -> Tuple[int, List[Tuple[int, str]]]:
+        """Delete many tickets in one transaction. Returns (rows deleted, [(index, error)])."""
+        ticket_ids = list(ticket_ids)
+        missing = self._not_found(ticket_ids)
+        deleted, errors = self._db.execute_batch(
+            "DELETE FROM it_tickets WHERE ticket_id = ?", [(tid,) for tid in ticket_ids]
+        )
+        return deleted, sorted(errors + missing)
+
+    # --- Set-based status transitions: one UPDATE for every matching row ---
+
+    def transition_tickets(self, new_status: str, ticket_ids: Optional[Iterable[str]] = None,
+                           priorities: Sequence[str] = (), categories: Sequence[str] = (),
+                           statuses: Sequence[str] = (), assigned_to: Sequence[str] = (),
+                           older_than_days: Optional[int] = None, dry_run: bool = False) -> TransitionResult:
+        """
+        Move the tickets matching every given filter to `new_status`, e.g.
+        transition_tickets("Closed", priorities=["Low"], statuses=["Resolved"], older_than_days=30).
+        Resolving or closing stamps today's resolved_date where none is set; reopening clears it.
+        Transitions the status state machine does not allow are skipped and counted as blocked.
+        """
+        where, params = build_filter(
+            keys=None if ticket_ids is None else list(ticket_ids), key_column="ticket_id",
+            equals={"priority": priorities, "category": categories, "status": statuses,
+                    "assigned_to": assigned_to},
+            date_column="created_date", older_than_days=older_than_days,
+        )
+        extra_set, _ = _resolved_date_set(new_status)
+        return transition(self._db, "it_tickets", "ticket_id", new_status, where, params,
+                          extra_set=extra_set, dry_run=dry_run)
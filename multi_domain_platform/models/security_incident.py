@@ -1,6 +1,10 @@
 import pandas as pd
-from typing import List, Optional
+from typing import Iterable, List, Optional, Sequence, Tuple
 from services.database_manager import DatabaseManager
+from models.interning import intern_str
+from models.status_workflow import TransitionResult, build_filter, transition, transition_keys
+
+SEVERITY_LEVELS = {"low": 1, "medium": 2, "high": 3, "critical": 4}
 
 class SecurityIncidentManager:
     """Manager class to handle DB operations for cyber_incidents table."""
@@ -12,20 +16,90 @@ class SecurityIncidentManager:
         query = "SELECT * FROM cyber_incidents"
         return self._db.fetch_dataframe(query)
 
+    def insert_incident(self, date: str, incident_type: str, severity: str, status: str,
+                        description: str, reported_by: str) -> Optional[int]:
+        return SecurityIncident.insert(self._db, date, incident_type, severity, status, description, reported_by)
+
+    def update_incident_status(self, incident_id: int, new_status: str) -> bool:
+        return SecurityIncident.update_status_in_db(self._db, incident_id, new_status)
+
+    def delete_incident(self, incident_id: int) -> int:
+        return SecurityIncident.delete(self._db, incident_id)
+
+    # --- Batch operations: one transaction per call, errors reported per row ---
+
+    # Parameter order of insert_incidents rows (and the columns of a bulk import CSV)
+    CSV_COLUMNS = ("date", "incident_type", "severity", "status", "description", "reported_by")
+
+    def insert_incidents(self, rows: Iterable[tuple]) -> Tuple[int, List[Tuple[int, str]]]:
+        """Insert many incidents with one executemany. Returns (rows inserted, [(row index, error)])."""
+        return self._db.execute_batch(
+            "INSERT INTO cyber_incidents (date, incident_type, severity, status, description, reported_by) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            rows
+        )
+
+    def _not_found(self, incident_ids: List[int]) -> List[Tuple[int, str]]:
+        existing = self._db.existing_keys("cyber_incidents", "id", incident_ids)
+        return [(i, f"#{iid} not found") for i, iid in enumerate(incident_ids) if iid not in existing]
+
+    def update_incident_statuses(self, incident_ids: Iterable[int],
+                                 new_status: str) -> Tuple[int, List[Tuple[int, str]]]:
+        """
+        Move many incidents through the status workflow in one transaction. Returns (rows now in
+        new_status, [(index, error)]); missing incidents and blocked moves are errors.
+        """
+        return transition_keys(self._db, "cyber_incidents", "id", [int(iid) for iid in incident_ids], new_status,
+                               name="#{}")
+
+    def delete_incidents(self, incident_ids: Iterable[int]) -> Tuple[int, List[Tuple[int, str]]]:
+        """Delete many incidents in one transaction. Returns (rows deleted, [(index, error)])."""
+        incident_ids = [int(iid) for iid in incident_ids]
+        missing = self._not_found(incident_ids)
+        deleted, errors = self._db.execute_batch(
+            "DELETE FROM cyber_incidents WHERE id = ?", [(iid,) for iid in incident_ids]
+        )
+        return deleted, sorted(errors + missing)
+
+    # --- Set-based status transitions: one UPDATE for every matching row ---
+
+    def transition_incidents(self, new_status: str, incident_ids: Optional[Iterable[int]] = None,
+                             incident_types: Sequence[str] = (), severities: Sequence[str] = (),
+                             statuses: Sequence[str] = (), older_than_days: Optional[int] = None,
+                             dry_run: bool = False) -> TransitionResult:
+        """
+        Move the incidents matching every given filter to `new_status`, e.g.
+        transition_incidents("Closed", incident_types=["Phishing"], severities=["Low"], older_than_days=30).
+        Transitions the status state machine does not allow are skipped and counted as blocked.
+        """
+        where, params = build_filter(
+            keys=None if incident_ids is None else [int(iid) for iid in incident_ids],
+            equals={"incident_type": incident_types, "severity": severities, "status": statuses},
+            date_column="date", older_than_days=older_than_days,
+        )
+        return transition(self._db, "cyber_incidents", "id", new_status, where, params, dry_run=dry_run)
+
 
 class SecurityIncident:
-    """Represents a single cybersecurity incident."""
+    """Represents a single cybersecurity incident.
+
+    Uses __slots__ and interned categorical strings so that loading large
+    numbers of incidents stays compact in memory.
+    """
+
+    __slots__ = ("__id", "__date", "__incident_type", "__severity", "__status",
+                 "__description", "__reported_by", "__created_at")
 
     def __init__(self, incident_id: int, date: str, incident_type: str,
                  severity: str, status: str, description: str,
                  reported_by: str, created_at: str):
         self.__id = incident_id
-        self.__date = date
-        self.__incident_type = incident_type
-        self.__severity = severity
-        self.__status = status
+        self.__date = intern_str(date)
+        self.__incident_type = intern_str(incident_type)
+        self.__severity = intern_str(severity)
+        self.__status = intern_str(status)
         self.__description = description
-        self.__reported_by = reported_by
+        self.__reported_by = intern_str(reported_by)
         self.__created_at = created_at
 
     # --- Getters ---
@@ -40,12 +114,11 @@ class SecurityIncident:
 
     # --- Update status in memory ---
     def update_status(self, new_status: str) -> None:
-        self.__status = new_status
+        self.__status = intern_str(new_status)
 
     # --- Severity mapping ---
     def get_severity_level(self) -> int:
-        mapping = {"low": 1, "medium": 2, "high": 3, "critical": 4}
-        return mapping.get(self.__severity.lower(), 0)
+        return SEVERITY_LEVELS.get(self.__severity.lower(), 0) if self.__severity else 0
 
     # --- String representation ---
     def __str__(self) -> str:
@@ -96,12 +169,9 @@ class SecurityIncident:
 
     @classmethod
     def update_status_in_db(cls, db: DatabaseManager, incident_id: int, new_status: str) -> bool:
-        db.execute_query(
-            "UPDATE cyber_incidents SET status = ? WHERE id = ?",
-            (new_status, incident_id)
-        )
-        res = db.fetch_one("SELECT id FROM cyber_incidents WHERE id = ?", (incident_id,))
-        return bool(res)
+        """Move one incident through the status workflow. False if it does not exist or may not move there."""
+        result = transition(db, "cyber_incidents", "id", new_status, "id = ?", [int(incident_id)])
+        return result.changed + result.unchanged > 0
 
     @classmethod
     def delete(cls, db: DatabaseManager, incident_id: int) -> int:
@@ -0,0 +1,44 @@
+from typing import Iterable, List, Sequence, Tuple
+from services.database_manager import DatabaseManager
+# the workflow and its SQL are shared with app/data/transitions.py
+from platform_core.status_workflow import (STATUSES, TRANSITIONS, TransitionResult, batch_errors, build_filter,
+                                           can_transition, count_statement, sources_for, status_statement, tally,
+                                           transition_statements)
+
+
+def transition(db: DatabaseManager, table: str, key_column: str, new_status: str, where: str,
+               params: Sequence[object], extra_set: str = "", dry_run: bool = False,
+               extra_params: Sequence[object] = ()) -> TransitionResult:
+    """
+    Move every row matching `where` to `new_status` with a single
+    UPDATE ... WHERE ... AND status IN (allowed sources) RETURNING key.
+    Rows whose current status may not move to `new_status` are left alone and counted
+    as blocked. The per-status counts and the UPDATE run in one write transaction, so
+    the counts describe exactly the rows the UPDATE saw. `extra_params` fill the
+    placeholders of `extra_set`. With dry_run=True nothing is written.
+    """
+    if dry_run:
+        return tally(new_status, db.fetch_all(*count_statement(table, where, params)), dry_run=True)
+    count_rows, rows = db.execute_returning_transaction(
+        transition_statements(table, key_column, new_status, where, params, extra_set, extra_params)
+    )
+    changed_keys: List[object] = [row[0] for row in rows]
+    return tally(new_status, count_rows, changed_keys)
+
+
+def transition_keys(db: DatabaseManager, table: str, key_column: str, keys: Iterable[object], new_status: str,
+                    extra_set: str = "", extra_params: Sequence[object] = (),
+                    name: str = "{}") -> Tuple[int, List[Tuple[int, str]]]:
+    """
+    Batch form of transition() for a list of keys, in one write transaction. Keys that do
+    not exist or whose status may not move to `new_status` are reported as errors.
+    Returns (rows now in new_status, [(index, error)]).
+    """
+    keys = list(keys)
+    where, params = build_filter(keys, key_column)
+    count_rows, rows, after = db.execute_returning_transaction(
+        transition_statements(table, key_column, new_status, where, params, extra_set, extra_params)
+        + [status_statement(table, key_column, where, params)]
+    )
+    result = tally(new_status, count_rows, [row[0] for row in rows])
+    return result.changed + result.unchanged, batch_errors(keys, after, new_status, name)
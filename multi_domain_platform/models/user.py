@@ -1,8 +1,13 @@
+from models.interning import intern_str
+
+
 class User:
+    __slots__ = ("__username", "__password_hash", "__role")
+
     def __init__(self, username: str, password_hash: str, role: str):
         self.__username = username
         self.__password_hash = password_hash
-        self.__role = role
+        self.__role = intern_str(role)
 
     def get_username(self) -> str:
         return self.__username
@@ -14,4 +19,4 @@ class User:
         return hasher.check_password(plain_password, self.__password_hash)
     
     def __str__(self) -> str:
-        return f"User({self.username}, role={self.role})"
\ No newline at end of file
+        return f"User({self.__username}, role={self.__role})"
@@ -1,12 +1,4 @@
 import streamlit as st
-import altair as alt
-from pathlib import Path
-from openai import OpenAI
-from services.database_manager import DatabaseManager
-from models.it_ticket import TicketManager   # <-- OOP TicketManager
-
-# Initialize OpenAI client with API key from Streamlit secrets
-client = OpenAI(api_key=st.secrets["OPENAI_API_KEY"])
 
 # Ensure state keys exist
 if "logged_in" not in st.session_state:
@@ -21,78 +13,153 @@ if not st.session_state.logged_in:
         st.switch_page("1_Home.py")
     st.stop()
 
+# Page dependencies are imported after the guard, so the login redirect stays cheap
+import time
+import altair as alt
+import pandas as pd
+from services.service_registry import (
+    get_database, get_ticket_manager, get_ticket_scheduler, get_snapshot_manager, get_openai_client
+)
+from models.it_ticket import TicketManager   # <-- OOP TicketManager
+from models.status_workflow import STATUSES
+from services.rollup_manager import RollupManager
+from services.archive_manager import ArchiveManager
+from services.mttr_engine import MTTREngine, GROUP_COLUMNS
+from services.live_refresh import LiveDataCache
+from services.change_tracking import ChangeTracker
+from services.analytics_engine import get_analytics_engine
+from services.render_profiler import start_rerun, profiled, timed, render_panel
+from services.ticket_scheduler import UNASSIGNED
+from services.metrics import metered_stream
+from services.bulk_jobs import start_job, rows_from_csv, parse_id_list, render_job
+from config import LIVE_REFRESH_SECONDS, ARCHIVE_AFTER_DAYS
+
+start_rerun("IT Operations")
+
 # If logged in, show dashboard content
 st.set_page_config(page_title="IT Operations", page_icon="📌", layout="wide")
 st.title("📌 IT Operations")
 
-# Connect to database and initialize TicketManager
-BASE_DIR = Path(__file__).parent.parent
-DB_PATH = BASE_DIR / "database" / "platform.db"
-db = DatabaseManager(str(DB_PATH))
-db.connect()
-tickets_manager = TicketManager(db)
+# Database and managers are shared process-wide (services/service_registry.py)
+db = get_database()
+tickets_manager = get_ticket_manager()
+
+with profiled("db", "schema checks"):
+    ChangeTracker(db).ensure_schema()
+    RollupManager(db).ensure_schema()
+    ArchiveManager(db).ensure_schema()
 
-# Load tickets
-tickets = tickets_manager.get_all_tickets()
+# Charts and metrics read the analytics snapshot; the forms below write to the primary db
+snapshots = get_snapshot_manager()
 
 # Tabs
 tab_analytics, tab_tickets, tab_chatbot = st.tabs(["Analytics", "Ticket Manager", "IT Chatbot"])
 
-with tab_analytics:
+# Live sections poll the data-version counters and only re-query when tickets changed
+@st.fragment(run_every=LIVE_REFRESH_SECONDS)
+def live_analytics():
+    analytics_db = snapshots.reader()
+    live = LiveDataCache(analytics_db)
+    # group-bys run in the configured analytics engine (SQLite or DuckDB)
+    engine = get_analytics_engine(analytics_db)
+
     st.header("Charts")
 
     # Tickets by Priority
     st.subheader("Tickets by Priority")
-    priority_counts = tickets["priority"].value_counts().reset_index()
-    priority_counts.columns = ["priority", "count"]
+    priority_counts = live.get(
+        "priority_counts", ["it_tickets"], timed("db", "count by priority")(lambda: engine.count_by(engine.history("it_tickets"), "priority"))
+    )
 
     custom_colors = alt.Scale(
         domain=["Critical", "High", "Medium", "Low"],
         range=["#D62728", "#FF7F0E", "#FFC300", "#2CA02C"]
     )
 
-    chart_priority = alt.Chart(priority_counts).mark_bar().encode(
-        x=alt.X("priority", sort="-y", title="Ticket Priority"),
-        y=alt.Y("count", title="Number of Tickets"),
-        color=alt.Color("priority", scale=custom_colors, legend=alt.Legend(title="Priority"))
-    )
-    st.altair_chart(chart_priority)
+    with profiled("chart", "priority chart"):
+        chart_priority = alt.Chart(priority_counts).mark_bar().encode(
+            x=alt.X("priority", sort="-y", title="Ticket Priority"),
+            y=alt.Y("count", title="Number of Tickets"),
+            color=alt.Color("priority", scale=custom_colors, legend=alt.Legend(title="Priority"))
+        )
+        st.altair_chart(chart_priority)
 
     # Tickets by Status
     st.subheader("Tickets by Status")
-    status_counts = tickets["status"].value_counts().reset_index()
-    status_counts.columns = ["status", "count"]
+    status_counts = live.get(
+        "status_counts", ["it_tickets"], timed("db", "count by status")(lambda: engine.count_by(engine.history("it_tickets"), "status"))
+    )
 
     custom_colors = alt.Scale(
         domain=["Open", "In Progress", "Closed", "Resolved"],
         range=["#595959","#A6A6A6", "#D9D9D9", "#2E2E2E"]
     )
 
-    chart_status = (alt.Chart(status_counts).mark_bar().encode(
-        y=alt.Y("status", sort="-y", title="Status"),
-        x=alt.X("count", title="Count"),
-        color=alt.Color(
-            "status",
-            sort=["Resolved", "Open", "In Progress", "Closed"],
-            scale=alt.Scale(range=["#2E2E2E","#595959", "#A6A6A6", "#D9D9D9" ]),
-            legend=alt.Legend(title="Status")
+    with profiled("chart", "status chart"):
+        chart_status = (alt.Chart(status_counts).mark_bar().encode(
+            y=alt.Y("status", sort="-y", title="Status"),
+            x=alt.X("count", title="Count"),
+            color=alt.Color(
+                "status",
+                sort=["Resolved", "Open", "In Progress", "Closed"],
+                scale=alt.Scale(range=["#2E2E2E","#595959", "#A6A6A6", "#D9D9D9" ]),
+                legend=alt.Legend(title="Status")
+            )
         )
-    )
-)
-    st.altair_chart(chart_status)
+        )
+        st.altair_chart(chart_status)
 
     # Tickets by Category
     st.subheader("Tickets by Category")
-    category_counts = tickets["category"].value_counts().reset_index()
-    category_counts.columns = ["category", "count"]
+    category_counts = live.get(
+        "category_counts", ["it_tickets"], timed("db", "count by category")(lambda: engine.count_by(engine.history("it_tickets"), "category"))
+    )
+
+    with profiled("chart", "category chart"):
+        chart_category = alt.Chart(category_counts).mark_bar(color="#2C7FB8").encode(
+            x=alt.X("category", sort="-y", title="Ticket Category"),
+            y=alt.Y("count", title="Number of Tickets")
+        )
+        st.altair_chart(chart_category)
+
+    # Tickets over Time (read from the daily rollup table)
+    st.subheader("Tickets over Time")
+    ticket_trend = live.get(
+        "ticket_trend", ["it_tickets"],
+        timed("db", "weekly ticket trend")(
+            lambda: RollupManager(analytics_db).get_ticket_trend(by="priority", freq="weekly")
+        )
+    )
+
+    with profiled("chart", "trend chart"):
+        chart_trend = alt.Chart(ticket_trend).mark_line(point=True).encode(
+            x=alt.X("period:T", title="Week"),
+            y=alt.Y("count:Q", title="Number of Tickets"),
+            color=alt.Color("priority", legend=alt.Legend(title="Priority"))
+        )
+        st.altair_chart(chart_trend, use_container_width=True)
+
+    # Resolution time (MTTR) and SLA breaches
+    st.subheader("⏱️ Resolution Time")
+    group_by = st.selectbox("Group by", list(GROUP_COLUMNS), key="mttr_group_by")
+    mttr = timed("pandas", f"MTTR by {group_by}")(MTTREngine(analytics_db).summary)(by=group_by)
+    st.dataframe(mttr)
+
+    with profiled("chart", "mttr chart"):
+        chart_mttr = alt.Chart(mttr).mark_bar(color="#2C7FB8").encode(
+            x=alt.X(group_by, sort="-y", title=group_by.replace("_", " ").title()),
+            y=alt.Y("p50_days", title="Median Days to Resolve"),
+            tooltip=[group_by, "tickets", "mean_days", "p90_days", "sla_breaches", "open_breaches"]
+        )
+        st.altair_chart(chart_mttr, use_container_width=True)
 
-    chart_category = alt.Chart(category_counts).mark_bar(color="#2C7FB8").encode(
-        x=alt.X("category", sort="-y", title="Ticket Category"),
-        y=alt.Y("count", title="Number of Tickets")
+@st.fragment(run_every=LIVE_REFRESH_SECONDS)
+def live_ticket_overview():
+    analytics_db = snapshots.reader()
+    tickets = LiveDataCache(analytics_db).get(
+        "tickets", ["it_tickets"], timed("db", "SELECT * tickets")(TicketManager(analytics_db).get_all_tickets)
     )
-    st.altair_chart(chart_category)
 
-with tab_tickets:
     # Dashboard metrics
     col1, col2, col3 = st.columns(3)
     with col1:
@@ -104,10 +171,56 @@ with tab_tickets:
         open_tickets = tickets[tickets["status"].isin(["Open", "In Progress"])].shape[0]
         st.metric("Open Tickets", open_tickets)
 
-    st.dataframe(tickets)
+    with profiled("other", "ticket table") as span:
+        st.dataframe(tickets)
+        span.rows = len(tickets)
+
+@st.fragment(run_every=LIVE_REFRESH_SECONDS)
+def live_work_queue():
+    # Shared scheduler: heaps stay in memory, so only changes since the last rerun are applied
+    scheduler = get_ticket_scheduler()
+    with profiled("db", "scheduler sync"):
+        scheduler.sync()
+
+    st.subheader("🗂️ Work Queue")
+    groups = scheduler.groups()
+    if not groups:
+        st.info("No open tickets.")
+        return
+    col_group, col_next = st.columns([1, 3])
+    group = col_group.selectbox("Group", groups, key="queue_group")
+    if col_group.button("Claim Next Ticket"):
+        claimed = scheduler.claim_next(group)
+        if claimed:
+            st.success(f"{claimed.ticket_id} moved to In Progress for {group}.")
+    unassigned = scheduler.next_ticket(UNASSIGNED)
+    if unassigned is not None and col_group.button("Assign Unassigned Tickets"):
+        st.success(f"{scheduler.assign_unassigned()} ticket(s) assigned to the least-loaded groups.")
+    queued = scheduler.next_ticket(group)
+    if queued is None:
+        col_next.info(f"{group} has no open tickets.")
+    else:
+        (col_next.error if queued.overdue else col_next.info)(
+            f"Next for {group}: **{queued.ticket_id}** ({queued.priority}, {queued.category}) "
+            f"{queued.subject} — due {queued.due_date}" + (" (overdue)" if queued.overdue else "")
+        )
+    with profiled("other", "work queue") as span:
+        queue = scheduler.queue(group, limit=20)
+        st.dataframe(queue[["ticket_id", "priority", "category", "subject", "created_date", "due_date", "overdue"]],
+                     hide_index=True)
+        span.rows = len(queue)
+    st.caption("Load per group (open and in-progress tickets, weighted by priority)")
+    st.dataframe(scheduler.loads(), hide_index=True)
+
+with tab_analytics:
+    live_analytics()
+
+with tab_tickets:
+    live_ticket_overview()
+    live_work_queue()
 
     st.subheader("⚙️ Manage Tickets")
-    cola, colb, colc = st.columns(3)
+    cola, colb, colc, cold = st.columns(4)
 
     if "form" not in st.session_state:
         st.session_state.form = None
@@ -121,6 +234,9 @@ with tab_tickets:
     with colc:
         if st.button("Delete Ticket"):
             st.session_state.form = "delete"
+    with cold:
+        if st.button("Bulk Operations"):
+            st.session_state.form = "bulk"
 
     # Insert 
     if st.session_state.form == "insert":
@@ -159,7 +275,7 @@ with tab_tickets:
                 if rows_updated:
                     st.success(f"Ticket {ticket_id} updated successfully.")
                 else:
-                    st.error(f"Ticket {ticket_id} not found.")
+                    st.error(f"Ticket {ticket_id} not found, or it cannot move to {new_status}.")
                 st.rerun()
 
     # Delete
@@ -173,9 +289,88 @@ with tab_tickets:
                 if rows_deleted:
                     st.success(f"Ticket {ticket_id} deleted successfully.")
                 else:
-                    st.error(f"Ticket {ticket_id} not found.")
+                    st.error(f"Ticket {ticket_id} not found, or it cannot move to {new_status}.")
                 st.rerun()
 
+    # Bulk: CSV import and multi-row status/delete run as background jobs, one transaction per chunk
+    if st.session_state.form == "bulk":
+        with st.form("bulk_import_tickets"):
+            st.caption("CSV columns: " + ", ".join(TicketManager.CSV_COLUMNS) + " (ticket_id may be left blank)")
+            upload = st.file_uploader("Tickets CSV", type="csv")
+            submitted = st.form_submit_button("Import Tickets")
+
+            if submitted and upload is not None:
+                try:
+                    rows, lines, invalid = rows_from_csv(
+                        pd.read_csv(upload, dtype=str), TicketManager.CSV_COLUMNS,
+                        required=["subject"],
+                        choices={"priority": ["Low", "Medium", "High", "Critical"], "status": ["Open", "In Progress", "Resolved", "Closed"]},
+                        dates=["created_date", "resolved_date"],
+                    )
+                except (ValueError, pd.errors.ParserError) as e:
+                    st.error(f"Could not read {upload.name}: {e}")
+                else:
+                    job = start_job(f"Import {upload.name}", rows, tickets_manager.insert_tickets, lines, invalid)
+                    st.session_state.ticket_job = job.id
+
+        with st.form("bulk_edit_tickets"):
+            ticket_ids = parse_id_list(st.text_area("Ticket IDs (one per line or comma-separated)"))
+            new_status = st.selectbox("New Status", ["Open", "In Progress", "Resolved", "Closed"])
+            col_status, col_delete = st.columns(2)
+            with col_status:
+                set_status = st.form_submit_button("Set Status")
+            with col_delete:
+                delete_selected = st.form_submit_button("Delete Tickets")
+
+            if ticket_ids and (set_status or delete_selected):
+                rows = [(ticket_id,) for ticket_id in ticket_ids]
+                if set_status:
+                    job = start_job(f"Set {len(rows)} ticket(s) to {new_status}", rows,
+                                    lambda chunk: tickets_manager.update_ticket_statuses([r[0] for r in chunk], new_status))
+                else:
+                    job = start_job(f"Delete {len(rows)} ticket(s)", rows,
+                                    lambda chunk: tickets_manager.delete_tickets([r[0] for r in chunk]))
+                st.session_state.ticket_job = job.id
+
+        # Archive: closed tickets past the policy age move to it_tickets_archive; charts keep counting them
+        with st.form("archive_it_tickets"):
+            older_than = st.number_input("Archive Closed/Resolved tickets older than (days)", min_value=0,
+                                         value=ARCHIVE_AFTER_DAYS, step=1)
+            archive_now = st.form_submit_button("Archive Tickets")
+
+            if archive_now:
+                job = ArchiveManager(db).start_archive_job("it_tickets", int(older_than))
+                st.session_state.ticket_job = job.id
+
+        render_job("ticket_job")
+
+        # Mass transition: one UPDATE for every ticket matching the filters, checked against the status workflow
+        with st.form("transition_tickets"):
+            st.caption("Move every ticket matching the filters; empty filters match all.")
+            categories = [row[0] for row in db.fetch_all(
+                "SELECT DISTINCT category FROM it_tickets WHERE category IS NOT NULL ORDER BY 1")]
+            assignees = [row[0] for row in db.fetch_all(
+                "SELECT DISTINCT assigned_to FROM it_tickets WHERE assigned_to IS NOT NULL ORDER BY 1")]
+            col_filters, col_target = st.columns(2)
+            with col_filters:
+                priorities = st.multiselect("Priority", ["Low", "Medium", "High", "Critical"])
+                chosen_categories = st.multiselect("Category", categories)
+                chosen_assignees = st.multiselect("Assigned To", assignees)
+                from_statuses = st.multiselect("Current Status", STATUSES)
+            with col_target:
+                older_than = st.number_input("Created more than (days ago, 0 = any age)", min_value=0, value=30, step=1)
+                target_status = st.selectbox("Move To", STATUSES, index=STATUSES.index("Closed"))
+                preview = st.form_submit_button("Preview")
+                apply = st.form_submit_button("Apply Transition", type="primary")
+
+            if preview or apply:
+                result = tickets_manager.transition_tickets(
+                    target_status, priorities=priorities, categories=chosen_categories,
+                    assigned_to=chosen_assignees, statuses=from_statuses,
+                    older_than_days=int(older_than) or None, dry_run=preview,
+                )
+                (st.info if preview else st.success)(result.summary())
+
 with tab_chatbot:
     st.title("💬 ShaiahGPT - IT Chatbot")
     st.caption("Ask me anything about your IT issues. I'm here to help!")
@@ -198,7 +393,6 @@ with tab_chatbot:
         message_count = len([m for m in st.session_state.it_messages if m["role"] != "system"])
         st.metric("Messages", message_count)
 
-
         # Clear chat button
         if st.button("🗑️ Clear IT Chat", use_container_width=True):
             st.session_state.it_messages = []
@@ -229,22 +423,27 @@ with tab_chatbot:
         st.session_state.it_messages.append({"role": "user", "content": prompt})
 
         # Call OpenAI with streaming
-        with st.spinner("Thinking..."):
+        with st.spinner("Thinking..."), profiled("llm", "chat request"):
+            client = get_openai_client(st.secrets["OPENAI_API_KEY"])
+            started = time.perf_counter()
             completion = client.chat.completions.create(
                 model=model,
                 messages=st.session_state.it_messages,
                 temperature=temperature,
-                stream=True
+                stream=True,
+                stream_options={"include_usage": True}
             )
 
-        with st.chat_message("assistant"):
+        with st.chat_message("assistant"), profiled("llm", "chat stream"):
             container = st.empty()
             full_reply = ""
-            for chunk in completion:
+            for chunk in metered_stream(model, completion, started):
                 delta = chunk.choices[0].delta
                 if delta.content:
                     full_reply += delta.content
                     container.markdown(full_reply + " ")
             container.markdown(full_reply)
 
-        st.session_state.it_messages.append({"role": "assistant", "content": full_reply})
\ No newline at end of file
+        st.session_state.it_messages.append({"role": "assistant", "content": full_reply})
+
+render_panel()
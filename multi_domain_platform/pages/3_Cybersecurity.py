@@ -1,12 +1,4 @@
 import streamlit as st
-import altair as alt
-from pathlib import Path
-from openai import OpenAI
-from services.database_manager import DatabaseManager
-from models.security_incident import SecurityIncidentManager  # <-- OOP SecurityIncidentManager
-
-# Initialize OpenAI client
-client = OpenAI(api_key=st.secrets["OPENAI_API_KEY"])
 
 # Ensure state keys exist
 if "logged_in" not in st.session_state:
@@ -25,88 +17,221 @@ if not st.session_state.logged_in:
         st.switch_page("1_Home.py")
     st.stop()
 
+# Page dependencies are imported after the guard, so the login redirect stays cheap
+import time
+import altair as alt
+import pandas as pd
+import datetime
+from services.service_registry import get_database, get_incident_manager, get_snapshot_manager, get_openai_client
+from models.security_incident import SecurityIncidentManager  # <-- OOP SecurityIncidentManager
+from models.status_workflow import STATUSES
+from services.risk_scoring import ensure_risk_column, has_risk_column, rank_incidents, risk_queue
+from services.rollup_manager import RollupManager
+from services.archive_manager import ArchiveManager
+from services.live_refresh import LiveDataCache
+from services.change_tracking import ChangeTracker
+from services.incident_dedup import IncidentDeduplicator
+from services.incident_anomaly import IncidentAnomalyMonitor
+from services.analytics_engine import get_analytics_engine
+from services.render_profiler import start_rerun, profiled, timed, render_panel
+from services.metrics import metered_stream
+from services.bulk_jobs import start_job, rows_from_csv, parse_id_list, render_job
+from config import LIVE_REFRESH_SECONDS, ARCHIVE_AFTER_DAYS
+
+start_rerun("Cybersecurity")
+
 # If logged in, show dashboard content
 st.set_page_config(page_title="Cybersecurity", page_icon="🚨", layout="wide")
 st.title("🚨 Cybersecurity")
 
-# Connect to database and initialize incident_manager
-BASE_DIR = Path(__file__).parent.parent
-DB_PATH = BASE_DIR / "database" / "platform.db"
-db = DatabaseManager(str(DB_PATH))
-db.connect()
-incident_manager = SecurityIncidentManager(db)
+# Database and managers are shared process-wide (services/service_registry.py)
+db = get_database()
+incident_manager = get_incident_manager()
+
+with profiled("db", "schema checks"):
+    ChangeTracker(db).ensure_schema()
+    RollupManager(db).ensure_schema()
+    ArchiveManager(db).ensure_schema()
 
-# Load incidents as DataFrame
-incidents_df = incident_manager.get_all_incidents_df()
+# Charts and metrics read the analytics snapshot; the forms below write to the primary db
+snapshots = get_snapshot_manager()
 
 # Tabs
 tab_analytics, tab_incidents, tab_chatbot = st.tabs(["Analytics", "Incident Manager", "Cyber Chatbot"])
 
-with tab_analytics:
+# Live sections poll the data-version counters and only re-query when incidents changed
+@st.fragment(run_every=LIVE_REFRESH_SECONDS)
+def live_analytics():
+    analytics_db = snapshots.reader()
+    live = LiveDataCache(analytics_db)
+    # group-bys run in the configured analytics engine (SQLite or DuckDB)
+    engine = get_analytics_engine(analytics_db)
+
     st.header("Charts")
 
     # Incidents by Severity
     st.subheader("Incidents by Severity")
-    severity_counts = incidents_df["severity"].value_counts().reset_index()
-    severity_counts.columns = ["severity", "count"]
+    severity_counts = live.get(
+        "severity_counts", ["cyber_incidents"], timed("db", "count by severity")(lambda: engine.count_by(engine.history("cyber_incidents"), "severity"))
+    )
 
     custom_colors = alt.Scale(
         domain=["Critical", "High", "Medium", "Low"],
         range=["#D62728","#FF7F0E", "#FFC300", "#2CA02C"]
     )
 
-    chart_severity = alt.Chart(severity_counts).mark_bar().encode(
-        x=alt.X("severity", sort="-y", title="Severity"),
-        y=alt.Y("count", title="Number of incidents"),
-        color=alt.Color("severity", scale=custom_colors, legend=alt.Legend(title="Severity"))
-    )
-    st.altair_chart(chart_severity)
+    with profiled("chart", "severity chart"):
+        chart_severity = alt.Chart(severity_counts).mark_bar().encode(
+            x=alt.X("severity", sort="-y", title="Severity"),
+            y=alt.Y("count", title="Number of incidents"),
+            color=alt.Color("severity", scale=custom_colors, legend=alt.Legend(title="Severity"))
+        )
+        st.altair_chart(chart_severity)
 
     # Incidents by Status
     st.subheader("Incidents by Status")
-    status_counts = incidents_df["status"].value_counts().reset_index()
-    status_counts.columns = ["status", "count"]
+    status_counts = live.get(
+        "status_counts", ["cyber_incidents"], timed("db", "count by status")(lambda: engine.count_by(engine.history("cyber_incidents"), "status"))
+    )
 
     custom_colors = alt.Scale(
         domain=["Open", "Closed", "Resolved"],
         range=["#595959","#A6A6A6","#2E2E2E"]
     )
-    chart_status = (alt.Chart(status_counts).mark_bar().encode(
-        y=alt.Y("status", sort="-y", title="Status"),
-        x=alt.X("count", title="Count"),
-        color=alt.Color(
-            "status",
-            sort=["Resolved", "Open", "Closed"],
-            scale=alt.Scale(range=["#2E2E2E","#595959", "#A6A6A6"]),
-            legend=alt.Legend(title="Status")
+    with profiled("chart", "status chart"):
+        chart_status = (alt.Chart(status_counts).mark_bar().encode(
+            y=alt.Y("status", sort="-y", title="Status"),
+            x=alt.X("count", title="Count"),
+            color=alt.Color(
+                "status",
+                sort=["Resolved", "Open", "Closed"],
+                scale=alt.Scale(range=["#2E2E2E","#595959", "#A6A6A6"]),
+                legend=alt.Legend(title="Status")
+            )
         )
-    )
-)
-    st.altair_chart(chart_status)
+        )
+        st.altair_chart(chart_status)
 
     # Incidents by Type
     st.subheader("Incidents by Type")
-    type_counts = incidents_df["incident_type"].value_counts().reset_index()
-    type_counts.columns = ["incident_type", "count"]
+    type_counts = live.get(
+        "incident_type_counts", ["cyber_incidents"], timed("db", "count by incident_type")(lambda: engine.count_by(engine.history("cyber_incidents"), "incident_type"))
+    )
 
-    chart_type = alt.Chart(type_counts).mark_bar(color="#2C7FB8").encode(
-        x=alt.X("incident_type", sort="-y", title="Incident Type"),
-        y=alt.Y("count", title="Number of Incidents")
+    with profiled("chart", "type chart"):
+        chart_type = alt.Chart(type_counts).mark_bar(color="#2C7FB8").encode(
+            x=alt.X("incident_type", sort="-y", title="Incident Type"),
+            y=alt.Y("count", title="Number of Incidents")
+        )
+        st.altair_chart(chart_type)
+
+    # Incidents over Time (read from the daily rollup table)
+    st.subheader("Incidents over Time")
+    incident_trend = live.get(
+        "incident_trend", ["cyber_incidents"],
+        timed("db", "weekly incident trend")(
+            lambda: RollupManager(analytics_db).get_incident_trend(by="severity", freq="weekly")
+        )
+    )
+
+    with profiled("chart", "trend chart"):
+        chart_trend = alt.Chart(incident_trend).mark_line(point=True).encode(
+            x=alt.X("period:T", title="Week"),
+            y=alt.Y("count:Q", title="Number of Incidents"),
+            color=alt.Color("severity", legend=alt.Legend(title="Severity"))
+        )
+        st.altair_chart(chart_trend, use_container_width=True)
+
+@st.fragment(run_every=LIVE_REFRESH_SECONDS)
+def live_incident_overview():
+    analytics_db = snapshots.reader()
+    live = LiveDataCache(analytics_db)
+    incidents_df = live.get(
+        "incidents_df", ["cyber_incidents"],
+        timed("db", "SELECT * incidents")(SecurityIncidentManager(analytics_db).get_all_incidents_df)
     )
-    st.altair_chart(chart_type)
 
-with tab_incidents:
     col1, col2, col3 = st.columns(3)
     col1.metric("Total Incidents", len(incidents_df))
-    high_severity = incidents_df[incidents_df["severity"].isin(["High", "Critical"])].shape[0]
+    with profiled("pandas", "overview metrics") as span:
+        high_severity = incidents_df[incidents_df["severity"].isin(["High", "Critical"])].shape[0]
+        open_incidents = incidents_df[incidents_df["status"].isin(["Open", "In Progress"])].shape[0]
+        span.rows = len(incidents_df)
     col2.metric("High Severity Incidents", high_severity)
-    open_incidents = incidents_df[incidents_df["status"].isin(["Open", "In Progress"])].shape[0]
     col3.metric("Open Incidents", open_incidents)
 
-    st.dataframe(incidents_df)
+    # Rate alerts: the monitor only consumes incidents inserted since its last sync
+    anomaly_monitor = IncidentAnomalyMonitor(get_database())
+    with profiled("db", "anomaly sync"):
+        anomaly_monitor.sync()
+    alerts = anomaly_monitor.recent_alerts()
+    if not alerts.empty:
+        st.error(f"🚨 {len(alerts)} incident-rate alert(s): " + "; ".join(
+            f"{row.value} ({row.kind.replace('_', ' ')}) {row.count} on {row.day}, ~{row.expected:g} expected"
+            for row in alerts.head(3).itertuples()
+        ))
+        with st.expander("Rate Alerts"):
+            st.dataframe(
+                alerts[["day", "kind", "value", "count", "expected", "score", "raised_at"]],
+                hide_index=True,
+                column_config={"score": st.column_config.ProgressColumn(
+                    "Score (deviations)", format="%.1f", min_value=0, max_value=float(alerts["score"].max()))},
+            )
+            if st.button("Acknowledge Alerts"):
+                acknowledged = anomaly_monitor.acknowledge(alerts["id"].tolist())
+                st.success(f"{acknowledged} alert(s) acknowledged.")
+
+    # Near-duplicates (one campaign reported many times) fold into one row per group
+    if st.toggle("Collapse duplicates", key="collapse_duplicates"):
+        dedup = IncidentDeduplicator(get_database())
+        with profiled("db", "dedup sync"):
+            dedup.sync()
+        with profiled("pandas", "collapse duplicates") as span:
+            collapsed = dedup.collapse(incidents_df)
+            span.rows = len(incidents_df)
+        st.caption(f"{len(incidents_df)} incidents in {len(collapsed)} groups")
+        st.dataframe(collapsed)
+
+        groups = collapsed[collapsed["incidents"] > 1]
+        if not groups.empty:
+            with st.form("transition_duplicates"):
+                col_group, col_status = st.columns(2)
+                group = col_group.selectbox(
+                    "Duplicate Group", groups.index,
+                    format_func=lambda i: f"#{groups.at[i, 'cluster_id']} ({groups.at[i, 'incidents']}): "
+                                          f"{groups.at[i, 'description']}"[:90],
+                )
+                target_status = col_status.selectbox("Move To", STATUSES, index=STATUSES.index("Closed"),
+                                                     key="duplicates_status")
+                if st.form_submit_button("Apply to Group"):
+                    ids = [int(iid) for iid in groups.at[group, "incident_ids"].split(", ")]
+                    st.success(incident_manager.transition_incidents(target_status, incident_ids=ids).summary())
+    else:
+        with profiled("other", "incident table") as span:
+            st.dataframe(incidents_df)
+            span.rows = len(incidents_df)
+
+    # Risk queue: read through the risk_base index once it exists, otherwise scored in pandas
+    st.subheader("🔥 Risk Queue")
+    today = pd.Timestamp(datetime.date.today())
+    if has_risk_column(analytics_db):
+        source, ranker = "index", timed("db", "risk_queue")(lambda: risk_queue(analytics_db, 20, today))
+    else:
+        source, ranker = "pandas", timed("pandas", "rank_incidents")(lambda: rank_incidents(incidents_df, top_n=20, as_of=today))
+    queue = live.get(f"risk_queue:{source}:{today.date()}", ["cyber_incidents"], ranker)
+    st.dataframe(queue[["risk_score", "id", "date", "incident_type", "severity", "status", "reported_by"]])
+    if st.button("Index Risk Scores"):
+        ensure_risk_column(get_database())
+        st.success("cyber_incidents.risk_base is indexed and follows every edit; ages are applied when read.")
+
+with tab_analytics:
+    live_analytics()
+
+with tab_incidents:
+    live_incident_overview()
 
     st.subheader("⚙️ Manage Incidents")
-    cola, colb, colc = st.columns(3)
+    cola, colb, colc, cold = st.columns(4)
     with cola:
         if st.button("Insert Incident"):
             st.session_state.form = "insert"
@@ -116,6 +241,9 @@ with tab_incidents:
     with colc:
         if st.button("Delete Incident"):
             st.session_state.form = "delete"
+    with cold:
+        if st.button("Bulk Operations"):
+            st.session_state.form = "bulk"
 
     # Insert
     if st.session_state.form == "insert":
@@ -133,7 +261,7 @@ with tab_incidents:
                 str(date), incident_type, severity, status, description, reported_by or "Unknown"
             )
             st.success(f"Incident #{incident_id} inserted successfully.")
-            st.experimental_rerun()
+            st.rerun()
 
     # Update
     if st.session_state.form == "update":
@@ -147,8 +275,8 @@ with tab_incidents:
             if success:
                 st.success(f"Incident #{incident_id} updated successfully.")
             else:
-                st.error(f"Incident #{incident_id} not found.")
-            st.experimental_rerun()
+                st.error(f"Incident #{incident_id} not found, or it cannot move to {new_status}.")
+            st.rerun()
 
     # Delete
     if st.session_state.form == "delete":
@@ -162,7 +290,87 @@ with tab_incidents:
                 st.success(f"Incident #{incident_id} deleted successfully.")
             else:
                 st.error(f"Incident #{incident_id} not found.")
-            st.experimental_rerun()
+            st.rerun()
+
+    # Bulk: CSV import and multi-row status/delete run as background jobs, one transaction per chunk
+    if st.session_state.form == "bulk":
+        with st.form("bulk_import_incidents"):
+            st.caption("CSV columns: " + ", ".join(SecurityIncidentManager.CSV_COLUMNS))
+            upload = st.file_uploader("Incidents CSV", type="csv")
+            submitted = st.form_submit_button("Import Incidents")
+
+            if submitted and upload is not None:
+                try:
+                    rows, lines, invalid = rows_from_csv(
+                        pd.read_csv(upload, dtype=str), SecurityIncidentManager.CSV_COLUMNS,
+                        required=["date", "incident_type"],
+                        choices={"severity": ["Low", "Medium", "High", "Critical"], "status": ["Open", "In Progress", "Resolved", "Closed"]},
+                        dates=["date"],
+                    )
+                except (ValueError, pd.errors.ParserError) as e:
+                    st.error(f"Could not read {upload.name}: {e}")
+                else:
+                    job = start_job(f"Import {upload.name}", rows, incident_manager.insert_incidents, lines, invalid)
+                    st.session_state.incident_job = job.id
+
+        with st.form("bulk_edit_incidents"):
+            incident_ids = parse_id_list(st.text_area("Incident IDs (one per line or comma-separated)"))
+            new_status = st.selectbox("New Status", ["Open", "In Progress", "Resolved", "Closed"])
+            col_status, col_delete = st.columns(2)
+            with col_status:
+                set_status = st.form_submit_button("Set Status")
+            with col_delete:
+                delete_selected = st.form_submit_button("Delete Incidents")
+
+            if incident_ids and (set_status or delete_selected):
+                not_numbers = [(i + 1, f"'{iid}' is not an incident ID") for i, iid in enumerate(incident_ids)
+                               if not iid.isdigit()]
+                rows = [(int(iid),) for iid in incident_ids if iid.isdigit()]
+                positions = [i + 1 for i, iid in enumerate(incident_ids) if iid.isdigit()]
+                if set_status:
+                    job = start_job(f"Set {len(rows)} incident(s) to {new_status}", rows,
+                                    lambda chunk: incident_manager.update_incident_statuses([r[0] for r in chunk], new_status),
+                                    positions, not_numbers)
+                else:
+                    job = start_job(f"Delete {len(rows)} incident(s)", rows,
+                                    lambda chunk: incident_manager.delete_incidents([r[0] for r in chunk]),
+                                    positions, not_numbers)
+                st.session_state.incident_job = job.id
+
+        # Archive: closed incidents past the policy age move to cyber_incidents_archive; charts keep counting them
+        with st.form("archive_cyber_incidents"):
+            older_than = st.number_input("Archive Closed/Resolved incidents older than (days)", min_value=0,
+                                         value=ARCHIVE_AFTER_DAYS, step=1)
+            archive_now = st.form_submit_button("Archive Incidents")
+
+            if archive_now:
+                job = ArchiveManager(db).start_archive_job("cyber_incidents", int(older_than))
+                st.session_state.incident_job = job.id
+
+        render_job("incident_job")
+
+        # Mass transition: one UPDATE for every incident matching the filters, checked against the status workflow
+        with st.form("transition_incidents"):
+            st.caption("Move every incident matching the filters; empty filters match all.")
+            incident_types = [row[0] for row in db.fetch_all(
+                "SELECT DISTINCT incident_type FROM cyber_incidents WHERE incident_type IS NOT NULL ORDER BY 1")]
+            col_filters, col_target = st.columns(2)
+            with col_filters:
+                types = st.multiselect("Incident Type", incident_types)
+                severities = st.multiselect("Severity", ["Low", "Medium", "High", "Critical"])
+                from_statuses = st.multiselect("Current Status", STATUSES)
+            with col_target:
+                older_than = st.number_input("Older than (days, 0 = any age)", min_value=0, value=30, step=1)
+                target_status = st.selectbox("Move To", STATUSES, index=STATUSES.index("Closed"))
+                preview = st.form_submit_button("Preview")
+                apply = st.form_submit_button("Apply Transition", type="primary")
+
+            if preview or apply:
+                result = incident_manager.transition_incidents(
+                    target_status, incident_types=types, severities=severities, statuses=from_statuses,
+                    older_than_days=int(older_than) or None, dry_run=preview,
+                )
+                (st.info if preview else st.success)(result.summary())
 
 with tab_chatbot:
     st.title("💬 ShaiahGPT - Cyber Chatbot")
@@ -219,19 +427,22 @@ with tab_chatbot:
         })
 
         #Call OpenAI API with streaming
-        with st.spinner("Thinking..."):
+        with st.spinner("Thinking..."), profiled("llm", "chat request"):
+            client = get_openai_client(st.secrets["OPENAI_API_KEY"])
+            started = time.perf_counter()
             completion = client.chat.completions.create(
                 model=model,
                 messages=st.session_state.cyber_messages,
                 temperature=temperature,
-                stream=True
+                stream=True,
+                stream_options={"include_usage": True}
             )
 
-        with st.chat_message("assistant"):
+        with st.chat_message("assistant"), profiled("llm", "chat stream"):
             container = st.empty()
             full_reply = ""
 
-            for chunk in completion:
+            for chunk in metered_stream(model, completion, started):
                 delta = chunk.choices[0].delta
                 if delta.content:
                     full_reply += delta.content
@@ -239,4 +450,6 @@ with tab_chatbot:
 
             container.markdown(full_reply)
 
-        st.session_state.cyber_messages.append({"role": "assistant", "content": full_reply})
\ No newline at end of file
+        st.session_state.cyber_messages.append({"role": "assistant", "content": full_reply})
+
+render_panel()
@@ -1,12 +1,4 @@
 import streamlit as st
-import altair as alt
-from pathlib import Path
-from openai import OpenAI
-from services.database_manager import DatabaseManager
-from models.dataset import Dataset  # <-- OOP Dataset
-
-# Initialize OpenAI client with API key from Streamlit secrets
-client = OpenAI(api_key=st.secrets["OPENAI_API_KEY"])
 
 # Ensure state keys exist
 if "logged_in" not in st.session_state:
@@ -21,63 +13,98 @@ if not st.session_state.logged_in:
         st.switch_page("1_Home.py")
     st.stop()
 
+# Page dependencies are imported after the guard, so the login redirect stays cheap
+import time
+import altair as alt
+import pandas as pd
+from services.service_registry import get_database, get_dataset_manager, get_dataset_watcher, get_openai_client
+from models.dataset import DatasetManager
+from services.analytics_engine import get_analytics_engine
+from services.change_tracking import ChangeTracker
+from services.binning import HistogramBinner, STRATEGIES, DEFAULT_BINS
+from services.dataset_profiler import DatasetProfiler
+from services.dataset_watcher import DatasetWatcher
+from config import DATASET_WATCH_ENABLED
+from services.render_profiler import start_rerun, profiled, timed, render_panel
+from services.metrics import metered_stream
+from services.bulk_jobs import start_job, rows_from_csv, parse_id_list, render_job
+
+start_rerun("Data Science")
+
 # If logged in, show dashboard content
 st.set_page_config(page_title="Data Science", page_icon="📁", layout="wide")
 st.title("📁 Data Science")
 
-# Connect to database and initialize DatasetManager
-BASE_DIR = Path(__file__).parent.parent
-DB_PATH = BASE_DIR / "database" / "platform.db"
-db = DatabaseManager(str(DB_PATH))
-db.connect()
-dataset_manager = Dataset(db)
+# Database and managers are shared process-wide (services/service_registry.py)
+db = get_database()
+dataset_manager = get_dataset_manager()
+# Aggregations run in the configured analytics engine (SQLite or DuckDB)
+engine = get_analytics_engine(db)
+tracker = ChangeTracker(db)
+with profiled("db", "schema checks"):
+    tracker.ensure_schema()
+    # record_count/file_size_mb can be measured from the dataset files (services/dataset_profiler.py)
+    profiler = DatasetProfiler(db)
+    profiler.ensure_schema()
+# Histogram bin edges are cached until datasets_metadata changes
+binner = HistogramBinner(engine, tracker, source=str(db._db_path))
 
 # Load datasets as DataFrame
-datasets_df = dataset_manager.get_all_datasets_df()
+datasets_df = timed("db", "SELECT * datasets")(dataset_manager.get_all_datasets_df)()
 
 # Tabs
 tab_analytics, tab_data, tab_chatbot = st.tabs(["Analytics", "Dataset Manager", "AI and Data Science Chatbot"])
 
 with tab_analytics:
     st.header("Charts")
+    col_strategy, col_bins = st.columns(2)
+    with col_strategy:
+        strategy = st.selectbox("Binning", STRATEGIES, format_func=str.title, key="bin_strategy")
+    with col_bins:
+        bins = st.slider("Bins", min_value=5, max_value=50, value=DEFAULT_BINS, key="bin_count")
 
     # Dataset by Record
     st.subheader("Dataset by Record")
-    record_counts = datasets_df["record_count"].value_counts().reset_index()
-    record_counts.columns = ["record_count", "count"]
-
-    chart_records = alt.Chart(record_counts).mark_bar().encode(
-        x=alt.X("record_count", sort="-y", title="Record Count"),
-        y=alt.Y("count", title="Number of Datasets"),
-        color=alt.Color("record_count", legend=None)
-    )
-    st.altair_chart(chart_records)
+    record_counts = timed("db", "record_count histogram")(binner.histogram)("datasets_metadata", "record_count", strategy, bins)
+
+    with profiled("chart", "records chart"):
+        chart_records = alt.Chart(record_counts).mark_bar().encode(
+            x=alt.X("label:O", sort=list(record_counts["label"]), title="Record Count"),
+            y=alt.Y("count:Q", title="Number of Datasets"),
+            color=alt.Color("bin:O", legend=None),
+            tooltip=["label", "count"]
+        )
+        st.altair_chart(chart_records, use_container_width=True)
 
     # Dataset by Size
     st.subheader("Dataset by Size")
-    size_counts = datasets_df["file_size_mb"].value_counts().reset_index()
-    size_counts.columns = ["file_size_mb", "count"]
-
-    chart_size = alt.Chart(size_counts).mark_bar().encode(
-        x=alt.X("file_size_mb:Q", sort="-y", title="File Size (MB)"),
-        y=alt.Y("count:Q", title="Number of Datasets"),
-        color=alt.Color("file_size_mb:Q", legend=None)
-    )
-    st.altair_chart(chart_size, use_container_width=True)
+    size_counts = timed("db", "file_size_mb histogram")(binner.histogram)("datasets_metadata", "file_size_mb", strategy, bins)
+
+    with profiled("chart", "size chart"):
+        chart_size = alt.Chart(size_counts).mark_bar().encode(
+            x=alt.X("label:O", sort=list(size_counts["label"]), title="File Size (MB)"),
+            y=alt.Y("count:Q", title="Number of Datasets"),
+            color=alt.Color("bin:O", legend=None),
+            tooltip=["label", "count"]
+        )
+        st.altair_chart(chart_size, use_container_width=True)
 
 with tab_data:
+    summary = timed("db", "dataset summary")(engine.dataset_summary)().iloc[0]
     col1, col2, col3 = st.columns(3)
     with col1:
-        st.metric("Total Datasets", len(datasets_df))
+        st.metric("Total Datasets", int(summary["datasets"]))
     with col2:
-        st.metric("Total Records", datasets_df["record_count"].sum())
+        st.metric("Total Records", int(summary["total_records"]))
     with col3:
-        st.metric("Total Size (MB)", f"{datasets_df['file_size_mb'].sum():.2f}")
+        st.metric("Total Size (MB)", f"{summary['total_size_mb']:.2f}")
 
-    st.dataframe(datasets_df)
+    with profiled("other", "dataset table") as span:
+        st.dataframe(datasets_df)
+        span.rows = len(datasets_df)
 
     st.subheader("⚙️ Manage Datasets")
-    cola, colb, colc = st.columns(3)
+    cola, colb, colc, cold = st.columns(4)
 
     if "form" not in st.session_state:
         st.session_state.form = None
@@ -91,6 +118,9 @@ with tab_data:
     with colc:
         if st.button("Delete Metadata"):
             st.session_state.form = "delete"
+    with cold:
+        if st.button("Bulk Operations"):
+            st.session_state.form = "bulk"
 
     # Insert
     if st.session_state.form == "insert":
@@ -99,6 +129,9 @@ with tab_data:
             category = st.text_input("Category")
             source = st.text_input("Source")
             last_updated = st.date_input("Last Updated")
+            file_path = st.text_input("File Path (optional; counts and size are then read from the file)",
+                                      help="Relative to the dataset folder, or absolute. A CSV, JSONL or Parquet "
+                                           "file, or a folder of them.")
             record_count = st.number_input("Record Count", min_value=0, step=1)
             file_size_mb = st.number_input("File Size (MB)", min_value=0.0, step=0.01)
             submitted = st.form_submit_button("Insert Metadata")
@@ -108,7 +141,15 @@ with tab_data:
                     dataset_name, category, source, str(last_updated), record_count, file_size_mb
                 )
                 st.success(f"Dataset metadata #{dataset_id} inserted successfully.")
-                st.rerun()
+                errors = []
+                if file_path:
+                    profiler.set_file_path(dataset_id, file_path)
+                    _profiled, errors = profiler.profile_batch([(dataset_id,)])
+                if errors:
+                    # no rerun, so the warning stays on screen
+                    st.warning(f"Could not profile {file_path}: {errors[0][1]}; the typed values were kept.")
+                else:
+                    st.rerun()
 
     # Update
     if st.session_state.form == "update":
@@ -152,6 +193,75 @@ with tab_data:
                     st.error(f"No dataset metadata found with ID #{dataset_id}.")
                 st.rerun()
 
+    # Bulk: CSV import and multi-row delete run as background jobs, one transaction per chunk
+    if st.session_state.form == "bulk":
+        with st.form("bulk_import_datasets"):
+            st.caption("CSV columns: " + ", ".join(DatasetManager.CSV_COLUMNS))
+            upload = st.file_uploader("Dataset metadata CSV", type="csv")
+            submitted = st.form_submit_button("Import Metadata")
+
+            if submitted and upload is not None:
+                try:
+                    rows, lines, invalid = rows_from_csv(
+                        pd.read_csv(upload, dtype=str), DatasetManager.CSV_COLUMNS,
+                        required=["dataset_name"],
+                        dates=["last_updated"],
+                        numbers=["record_count", "file_size_mb"],
+                    )
+                except (ValueError, pd.errors.ParserError) as e:
+                    st.error(f"Could not read {upload.name}: {e}")
+                else:
+                    job = start_job(f"Import {upload.name}", rows, dataset_manager.insert_datasets, lines, invalid)
+                    st.session_state.dataset_job = job.id
+
+        with st.form("bulk_delete_datasets"):
+            dataset_ids = parse_id_list(st.text_area("Dataset IDs (one per line or comma-separated)"))
+            submitted = st.form_submit_button("Delete Metadata")
+
+            if submitted and dataset_ids:
+                not_numbers = [(i + 1, f"'{did}' is not a dataset ID") for i, did in enumerate(dataset_ids)
+                               if not did.isdigit()]
+                rows = [(int(did),) for did in dataset_ids if did.isdigit()]
+                positions = [i + 1 for i, did in enumerate(dataset_ids) if did.isdigit()]
+                job = start_job(f"Delete {len(rows)} dataset record(s)", rows,
+                                lambda chunk: dataset_manager.delete_datasets([r[0] for r in chunk]),
+                                positions, not_numbers)
+                st.session_state.dataset_job = job.id
+
+        with st.form("profile_datasets"):
+            st.caption("Read record counts and file sizes from the dataset files on disk.")
+            dataset_ids = parse_id_list(st.text_area("Dataset IDs to profile (blank = all)"))
+            submitted = st.form_submit_button("Profile Files")
+
+            if submitted:
+                if dataset_ids:
+                    not_numbers = [(i + 1, f"'{did}' is not a dataset ID") for i, did in enumerate(dataset_ids)
+                                   if not did.isdigit()]
+                    rows = [(int(did),) for did in dataset_ids if did.isdigit()]
+                    positions = [i + 1 for i, did in enumerate(dataset_ids) if did.isdigit()]
+                else:
+                    rows = [(did,) for did in datasets_df["id"]]
+                    positions, not_numbers = [did for (did,) in rows], []
+                job = start_job(f"Profile {len(rows)} dataset file(s)", rows, profiler.profile_batch,
+                                positions, not_numbers)
+                st.session_state.dataset_job = job.id
+
+        # The watcher (services/dataset_watcher.py) re-profiles changed files as they change;
+        # a full rescan also picks up whatever changed while the platform was not running
+        watcher = get_dataset_watcher() if DATASET_WATCH_ENABLED else DatasetWatcher(db)
+        status = f"Dataset folder watcher: {watcher.backend}; {watcher.pending()} change(s) pending."
+        if watcher.last_report:
+            status += f" Last sync: {watcher.last_report.summary()}."
+        st.caption(status)
+        if st.button("Rescan Dataset Folders"):
+            with st.spinner("Rescanning..."):
+                report = watcher.reconcile()
+            st.success(report.summary())
+            if report.missing:
+                st.warning("Files missing for: " + ", ".join(report.missing[:20]))
+
+        render_job("dataset_job")
+
 with tab_chatbot:
     st.title("💬 ShaiahGPT - AI and Data Science Chatbot")
     st.caption("Ask me anything about your AI and Data Science issues. I'm here to help!")
@@ -200,22 +310,27 @@ with tab_chatbot:
         st.session_state.ai_messages.append({"role": "user", "content": prompt})
 
         # Call OpenAI API with streaming
-        with st.spinner("Thinking..."):
+        with st.spinner("Thinking..."), profiled("llm", "chat request"):
+            client = get_openai_client(st.secrets["OPENAI_API_KEY"])
+            started = time.perf_counter()
             completion = client.chat.completions.create(
                 model=model,
                 messages=st.session_state.ai_messages,
                 temperature=temperature,
-                stream=True
+                stream=True,
+                stream_options={"include_usage": True}
             )
 
-        with st.chat_message("assistant"):
+        with st.chat_message("assistant"), profiled("llm", "chat stream"):
             container = st.empty()
             full_reply = ""
-            for chunk in completion:
+            for chunk in metered_stream(model, completion, started):
                 delta = chunk.choices[0].delta
                 if delta.content:
                     full_reply += delta.content
                     container.markdown(full_reply + " ")
             container.markdown(full_reply)
 
-        st.session_state.ai_messages.append({"role": "assistant", "content": full_reply})
\ No newline at end of file
+        st.session_state.ai_messages.append({"role": "assistant", "content": full_reply})
+
+render_panel()
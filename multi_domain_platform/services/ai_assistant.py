@@ -1,4 +1,6 @@
+import time
 from typing import List, Dict
+from services import metrics
 
 class AIAssistant:
     """Simple wrapper around an AI/chat model.
@@ -10,9 +12,11 @@ class AIAssistant:
     def set_system_prompt(self, prompt: str) :
         self._system_prompt = prompt
     def send_message(self, user_message: str) :
+        start = time.perf_counter()
         self._history.append({"role": "user", "content": user_message})
         response = f"[AI reply to]: {user_message[:50]}"
         self._history.append({"role": "assistant", "content": response})
+        metrics.record_llm_request("assistant-stub", time.perf_counter() - start)
         return response
     def clear_history(self):
         self._history.clear()
\ No newline at end of file
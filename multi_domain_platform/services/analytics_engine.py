@@ -0,0 +1,195 @@
+import os
+import re
+import threading
+import pandas as pd
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Tuple
+from services.database_manager import DatabaseManager
+from services.archive_manager import ARCHIVE_TABLES, archive_table, history_source, history_view
+from config import ANALYTICS_ENGINE, DUCKDB_SOURCE, PARQUET_EXPORT_DIR
+
+ANALYTICS_TABLES = ("cyber_incidents", "it_tickets", "datasets_metadata")
+RESOLUTION_GROUPS = ("category", "priority", "assigned_to")
+_IDENTIFIER = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+
+# DuckDB engines are shared by every session in the process, keyed on their source
+_ENGINES: Dict[Tuple, "DuckDBEngine"] = {}
+_ENGINES_LOCK = threading.Lock()
+
+
+def _check_identifier(*names: str) -> None:
+    """Table and column names are interpolated into SQL, so only allow plain identifiers."""
+    for name in names:
+        if not _IDENTIFIER.match(name):
+            raise ValueError(f"Invalid SQL identifier: {name!r}")
+
+
+class SQLiteEngine:
+    """Runs the dashboard aggregations directly on SQLite (the default)."""
+
+    name = "sqlite"
+
+    def __init__(self, db: DatabaseManager):
+        self._db = db
+
+    def query(self, sql: str, params: tuple = ()) -> pd.DataFrame:
+        return self._db.fetch_dataframe(sql, params)
+
+    def history(self, table: str) -> str:
+        """What to query for `table` including archived rows."""
+        return history_source(self._db, table)
+
+    def count_by(self, table: str, column: str) -> pd.DataFrame:
+        """Rows per distinct value of column, largest first (columns: column, count)."""
+        _check_identifier(table, column)
+        return self.query(
+            f"SELECT {column}, COUNT(*) AS count FROM {table} GROUP BY {column} ORDER BY count DESC"
+        )
+
+    def dataset_summary(self) -> pd.DataFrame:
+        """One row with the dataset catalogue totals."""
+        return self.query("""
+            SELECT COUNT(*) AS datasets,
+                   CAST(COALESCE(SUM(record_count), 0) AS BIGINT) AS total_records,
+                   COALESCE(SUM(file_size_mb), 0) AS total_size_mb
+            FROM datasets_metadata
+        """)
+
+    def weekly_counts(self, table: str, date_column: str, by: str) -> pd.DataFrame:
+        """Rows per week (Monday start) and value of `by` (columns: period, by, count)."""
+        _check_identifier(table, date_column, by)
+        return self.query(f"""
+            SELECT date({date_column}, 'weekday 0', '-6 days') AS period, {by}, COUNT(*) AS count
+            FROM {table}
+            WHERE date({date_column}) IS NOT NULL
+            GROUP BY period, {by}
+            ORDER BY period, {by}
+        """)
+
+    def resolution_percentiles(self, by: str) -> pd.DataFrame:
+        """p50/p90 days to resolve per group. SQLite has no percentile function, so pandas does it."""
+        if by not in RESOLUTION_GROUPS:
+            raise ValueError(f"Cannot group tickets by '{by}'")
+        durations = self.query(f"""
+            SELECT {by}, julianday(resolved_date) - julianday(created_date) AS days
+            FROM {self.history("it_tickets")}
+            WHERE resolved_date IS NOT NULL AND resolved_date != ''
+        """)
+        grouped = durations.groupby(by)["days"]
+        return pd.DataFrame({
+            "tickets": grouped.size(),
+            "p50_days": grouped.quantile(0.5),
+            "p90_days": grouped.quantile(0.9),
+        }).reset_index().sort_values(by, ignore_index=True)
+
+
+class DuckDBEngine(SQLiteEngine):
+    """
+    Runs the same aggregations in embedded DuckDB (columnar, vectorised).
+
+    The data comes either from the SQLite file, attached read-only through
+    DuckDB's sqlite extension, or from the Parquet export. Either way the
+    tables are exposed as views with their usual names, so the SQL matches.
+    """
+
+    name = "duckdb"
+
+    def __init__(self, db_path, source: str = DUCKDB_SOURCE, parquet_dir=PARQUET_EXPORT_DIR,
+                 tables: Iterable[str] = ANALYTICS_TABLES):
+        import duckdb  # optional dependency, only needed when this engine is selected
+
+        self._connection = duckdb.connect()
+        if source == "sqlite":
+            self._connection.execute("INSTALL sqlite; LOAD sqlite;")
+            self._connection.execute(f"ATTACH '{Path(db_path).resolve()}' AS src (TYPE sqlite, READ_ONLY)")
+            for table in tables:
+                self._connection.execute(f"CREATE VIEW {table} AS SELECT * FROM src.{table}")
+            for table in ARCHIVE_TABLES:
+                try:
+                    self._connection.execute(
+                        f"CREATE VIEW {history_view(table)} AS SELECT * FROM src.{table} "
+                        f"UNION ALL BY NAME SELECT * EXCLUDE (archived_at) FROM src.{archive_table(table)}"
+                    )
+                except duckdb.Error:  # nothing archived yet
+                    self._connection.execute(f"CREATE VIEW {history_view(table)} AS SELECT * FROM src.{table}")
+        elif source == "parquet":
+            for table in tables:
+                pattern = Path(parquet_dir) / table / "**" / "*.parquet"
+                self._connection.execute(
+                    f"CREATE VIEW {table} AS SELECT * FROM read_parquet('{pattern}', hive_partitioning = true)"
+                )
+            # the Parquet export holds the hot tables only
+            for table in ARCHIVE_TABLES:
+                self._connection.execute(f"CREATE VIEW {history_view(table)} AS SELECT * FROM {table}")
+        else:
+            raise ValueError("DuckDB source must be 'sqlite' or 'parquet'")
+
+    def query(self, sql: str, params: tuple = ()) -> pd.DataFrame:
+        # a cursor per query lets several sessions share the engine from different threads
+        cursor = self._connection.cursor()
+        try:
+            return cursor.execute(sql, list(params)).df()
+        finally:
+            cursor.close()
+
+    def close(self) -> None:
+        self._connection.close()
+
+    def history(self, table: str) -> str:
+        return history_view(table)
+
+    def weekly_counts(self, table: str, date_column: str, by: str) -> pd.DataFrame:
+        _check_identifier(table, date_column, by)
+        return self.query(f"""
+            SELECT strftime(date_trunc('week', TRY_CAST({date_column} AS DATE)), '%Y-%m-%d') AS period,
+                   {by}, COUNT(*) AS count
+            FROM {table}
+            WHERE TRY_CAST({date_column} AS DATE) IS NOT NULL
+            GROUP BY period, {by}
+            ORDER BY period, {by}
+        """)
+
+    def resolution_percentiles(self, by: str) -> pd.DataFrame:
+        if by not in RESOLUTION_GROUPS:
+            raise ValueError(f"Cannot group tickets by '{by}'")
+        return self.query(f"""
+            SELECT {by},
+                   COUNT(*) AS tickets,
+                   quantile_cont(days, 0.5) AS p50_days,
+                   quantile_cont(days, 0.9) AS p90_days
+            FROM (
+                SELECT {by}, date_diff('day', TRY_CAST(created_date AS DATE), TRY_CAST(resolved_date AS DATE)) AS days
+                FROM {self.history("it_tickets")}
+            )
+            WHERE days IS NOT NULL
+            GROUP BY {by}
+            ORDER BY {by}
+        """)
+
+
+def get_analytics_engine(db: DatabaseManager, engine: Optional[str] = None, source: str = DUCKDB_SOURCE):
+    """
+    Return the analytics engine selected in config (PLATFORM_ANALYTICS_ENGINE).
+    Falls back to SQLite if DuckDB is not installed or cannot open its source.
+    """
+    engine = engine or ANALYTICS_ENGINE
+    if engine != "duckdb":
+        return SQLiteEngine(db)
+
+    db_path = Path(db._db_path)
+    if source == "sqlite":
+        # a republished snapshot is a new file, so re-attach when the inode changes
+        key = (str(db_path), source, os.stat(db_path).st_ino)
+    else:
+        key = (str(PARQUET_EXPORT_DIR), source)
+
+    with _ENGINES_LOCK:
+        if key not in _ENGINES:
+            try:
+                _ENGINES[key] = DuckDBEngine(db_path, source=source)
+            except Exception as e:  # ImportError, or duckdb failing to load the extension/files
+                print(f"⚠️ DuckDB analytics engine unavailable ({e}); using SQLite instead.")
+                return SQLiteEngine(db)
+            for stale in [k for k in _ENGINES if k[:2] == key[:2] and k != key]:
+                del _ENGINES[stale]  # closed once the sessions still using it are done
+        return _ENGINES[key]
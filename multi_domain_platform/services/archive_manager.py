@@ -0,0 +1,175 @@
+from typing import TYPE_CHECKING, Dict, List, Sequence, Tuple
+from services.database_manager import DatabaseManager
+from services.change_tracking import ChangeLog
+from services.rollup_manager import RollupManager
+from config import ARCHIVE_AFTER_DAYS, ARCHIVE_CHUNK_ROWS, ARCHIVE_STATUSES
+
+if TYPE_CHECKING:
+    from services.bulk_jobs import BulkJob
+
+# hot table -> SQL expression for the age of a row (tickets age from when they were resolved)
+ARCHIVE_TABLES = {
+    "cyber_incidents": "date(trim(date))",
+    "it_tickets": "date(trim(COALESCE(NULLIF(trim(resolved_date), ''), created_date)))",
+}
+
+
+def archive_table(table: str) -> str:
+    return f"{table}_archive"
+
+
+def history_view(table: str) -> str:
+    """Name of the view over a table's hot and archived rows."""
+    return f"{table}_all"
+
+
+class ArchiveManager:
+    """
+    Hot/cold partitioning for incidents and tickets.
+
+    Closed work older than the policy age moves from the hot table into
+    <table>_archive in the same database, one chunk per transaction, so the
+    dashboards' tables and the managers' queries only scan open work.
+    <table>_all views union both for historical analytics, and the rollups
+    keep counting archived rows. The change log records the moves as ARCHIVE
+    rather than DELETE, so its consumers can tell archived rows from deleted ones.
+    """
+
+    def __init__(self, db: DatabaseManager):
+        self._db = db
+
+    # --- Schema ---
+    def _columns(self, table: str) -> List[Tuple[str, str]]:
+        return [(row[1], row[2]) for row in self._db.fetch_all(f"PRAGMA table_info({table})")]
+
+    def ensure_schema(self) -> None:
+        """Create the archive tables and *_all views; add columns the hot tables gained since."""
+        views = {row[0] for row in self._db.fetch_all("SELECT name FROM sqlite_master WHERE type = 'view'")}
+        script = []
+        for table in ARCHIVE_TABLES:
+            hot = self._columns(table)
+            archive = {name for name, _ in self._columns(archive_table(table))}
+            if not archive:
+                definitions = ", ".join(
+                    "id INTEGER PRIMARY KEY" if name == "id" else f"{name} {kind}".strip() for name, kind in hot
+                )
+                script.append(f"CREATE TABLE {archive_table(table)} ({definitions}, archived_at TIMESTAMP);")
+            missing = [(name, kind) for name, kind in hot if archive and name not in archive]
+            script.extend(f"ALTER TABLE {archive_table(table)} ADD COLUMN {name} {kind};" for name, kind in missing)
+            if missing or history_view(table) not in views:
+                column_list = ", ".join(name for name, _ in hot)
+                script.append(f"DROP VIEW IF EXISTS {history_view(table)};")
+                script.append(
+                    f"CREATE VIEW {history_view(table)} AS "
+                    f"SELECT {column_list} FROM {table} UNION ALL SELECT {column_list} FROM {archive_table(table)};"
+                )
+        if script:
+            self._db.execute_script("BEGIN;\n" + "\n".join(script) + "\nCOMMIT;")
+        ChangeLog(self._db).refresh()  # the change log logs moves into the archive tables as ARCHIVE
+
+    # --- Archiving ---
+    def _candidate_filter(self, table: str, older_than_days: int,
+                          statuses: Sequence[str]) -> Tuple[str, list]:
+        placeholders = ", ".join("?" * len(statuses))
+        return (f"status IN ({placeholders}) AND {ARCHIVE_TABLES[table]} < date('now', ?)",
+                [*statuses, f"-{int(older_than_days)} days"])
+
+    def candidates(self, table: str, older_than_days: int = ARCHIVE_AFTER_DAYS,
+                   statuses: Sequence[str] = ARCHIVE_STATUSES) -> List[int]:
+        """Ids of the rows the policy would archive, oldest id first."""
+        where, params = self._candidate_filter(table, older_than_days, statuses)
+        return [row[0] for row in self._db.fetch_all(f"SELECT id FROM {table} WHERE {where} ORDER BY id", params)]
+
+    def archive_ids(self, table: str, ids: Sequence[int],
+                    statuses: Sequence[str] = ARCHIVE_STATUSES) -> int:
+        """
+        Move the given rows into the archive in one transaction. Rows reopened since they
+        were selected (status no longer in `statuses`) stay hot. Returns rows archived.
+        """
+        if not ids:
+            return 0
+        columns = ", ".join(name for name, _ in self._columns(table))
+        id_list = ", ".join("?" * len(ids))
+        status_list = ", ".join("?" * len(statuses))
+        statements = [
+            (f"INSERT INTO {archive_table(table)} ({columns}, archived_at) "
+             f"SELECT {columns}, CURRENT_TIMESTAMP FROM {table} WHERE id IN ({id_list}) AND status IN ({status_list})",
+             [*ids, *statuses]),
+            (f"DELETE FROM {table} WHERE id IN (SELECT id FROM {archive_table(table)} WHERE id IN ({id_list}))",
+             list(ids)),
+        ]
+        # the delete triggers just took these rows out of the rollups; count them back in
+        existing = {row[0] for row in self._db.fetch_all("SELECT name FROM sqlite_master WHERE type = 'table'")}
+        for rollup, sql in RollupManager.recount_sql(table, archive_table(table), f"id IN ({id_list})"):
+            if rollup in existing:
+                statements.append((sql, list(ids)))
+        return self._db.execute_transaction(statements)[1]
+
+    def archive(self, table: str, older_than_days: int = ARCHIVE_AFTER_DAYS,
+                statuses: Sequence[str] = ARCHIVE_STATUSES, chunk_rows: int = ARCHIVE_CHUNK_ROWS) -> int:
+        """Archive everything the policy selects, chunk by chunk, in this thread. Returns rows archived."""
+        self.ensure_schema()
+        ids = self.candidates(table, older_than_days, statuses)
+        return sum(self.archive_ids(table, ids[start:start + chunk_rows], statuses)
+                   for start in range(0, len(ids), chunk_rows))
+
+    def start_archive_job(self, table: str, older_than_days: int = ARCHIVE_AFTER_DAYS,
+                          statuses: Sequence[str] = ARCHIVE_STATUSES,
+                          chunk_rows: int = ARCHIVE_CHUNK_ROWS) -> "BulkJob":
+        """Archive in a background bulk job (see services/bulk_jobs.py), one transaction per chunk."""
+        from services.bulk_jobs import start_job  # Streamlit-side; the CLI and analytics do not need it
+
+        self.ensure_schema()
+        rows = [(row_id,) for row_id in self.candidates(table, older_than_days, statuses)]
+        return start_job(
+            f"Archive {len(rows):,} {table} row(s)", rows,
+            lambda chunk: (self.archive_ids(table, [r[0] for r in chunk], statuses), []),
+            row_numbers=[r[0] for r in rows], chunk_rows=chunk_rows,
+        )
+
+    # --- Reporting ---
+    def stats(self, older_than_days: int = ARCHIVE_AFTER_DAYS,
+              statuses: Sequence[str] = ARCHIVE_STATUSES) -> Dict[str, Dict[str, int]]:
+        """Per table: hot rows, archived rows and rows the policy would archive now."""
+        self.ensure_schema()
+        result = {}
+        for table in ARCHIVE_TABLES:
+            where, params = self._candidate_filter(table, older_than_days, statuses)
+            result[table] = {
+                "hot": self._db.fetch_one(f"SELECT COUNT(*) FROM {table}")[0],
+                "archived": self._db.fetch_one(f"SELECT COUNT(*) FROM {archive_table(table)}")[0],
+                "due": self._db.fetch_one(f"SELECT COUNT(*) FROM {table} WHERE {where}", params)[0],
+            }
+        return result
+
+
+def history_source(db: DatabaseManager, table: str) -> str:
+    """`table`'s *_all view when `db` has one (e.g. an older snapshot may not yet), else the table itself."""
+    view = history_view(table)
+    row = db.fetch_one("SELECT 1 FROM sqlite_master WHERE type = 'view' AND name = ?", (view,))
+    return view if row else table
+
+
+if __name__ == "__main__":
+    # Archive command, run from the multi_domain_platform folder:
+    #   python -m services.archive_manager [--days 90] [--table it_tickets] [--dry-run]
+    import argparse
+    from pathlib import Path
+
+    parser = argparse.ArgumentParser(description="Move closed incidents and tickets into the archive tables.")
+    parser.add_argument("--db", default=str(Path(__file__).parent.parent / "database" / "platform.db"))
+    parser.add_argument("--table", action="append", choices=list(ARCHIVE_TABLES))
+    parser.add_argument("--days", type=int, default=ARCHIVE_AFTER_DAYS, help="archive rows closed longer ago")
+    parser.add_argument("--chunk-rows", type=int, default=ARCHIVE_CHUNK_ROWS)
+    parser.add_argument("--dry-run", action="store_true", help="only report what would be archived")
+    args = parser.parse_args()
+
+    db = DatabaseManager(args.db)
+    manager = ArchiveManager(db)
+    if args.dry_run:
+        for name, counts in manager.stats(args.days).items():
+            print(f"  {name}: {counts['hot']} hot, {counts['archived']} archived, {counts['due']} due")
+    else:
+        for name in args.table or ARCHIVE_TABLES:
+            print(f"✅ {name}: {manager.archive(name, args.days, chunk_rows=args.chunk_rows)} rows archived")
+    db.close()
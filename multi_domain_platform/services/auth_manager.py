@@ -1,6 +1,8 @@
 from typing import Optional
 from models.user import User
 from services.database_manager import DatabaseManager
+from services import query_tracer
+from services import metrics
 from pathlib import Path
 import sqlite3
 import bcrypt
@@ -11,11 +13,13 @@ DATA_DIR = Path("DATA")
 class BcryptHasher:
     @staticmethod
     def hash_password(plain: str) -> str:
-        return bcrypt.hashpw(plain.encode("utf-8"), bcrypt.gensalt()).decode("utf-8")
+        with metrics.BCRYPT_SECONDS.labels("hash").time():
+            return bcrypt.hashpw(plain.encode("utf-8"), bcrypt.gensalt()).decode("utf-8")
 
     @staticmethod
     def check_password(plain: str, hashed: str) -> bool:
-        return bcrypt.checkpw(plain.encode("utf-8"), hashed.encode("utf-8"))
+        with metrics.BCRYPT_SECONDS.labels("check").time():
+            return bcrypt.checkpw(plain.encode("utf-8"), hashed.encode("utf-8"))
 
 class AuthManager:
     """Handles user registration and login."""
@@ -43,11 +47,14 @@ class AuthManager:
             (username,)
         )
         if row is None:
+            metrics.LOGINS.labels("unknown_user").inc()
             return None
 
         username_db, password_hash_db, role_db = row
         if BcryptHasher.check_password(password, password_hash_db):
+            metrics.LOGINS.labels("success").inc()
             return User(username_db, password_hash_db, role_db)
+        metrics.LOGINS.labels("wrong_password").inc()
         return None
 
     def get_user_by_username(self, username: str) -> Optional[User]:
@@ -74,7 +81,7 @@ class AuthManager:
             print("   No users to migrate.")
             return
 
-        conn = sqlite3.connect(self._db._db_path)  # direct sqlite3 for bulk ops
+        conn = query_tracer.connect(self._db._db_path)  # direct sqlite3 for bulk ops
         cursor = conn.cursor()
         migrated_count = 0
 
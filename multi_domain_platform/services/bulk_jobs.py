@@ -0,0 +1,168 @@
+import re
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+import pandas as pd
+import streamlit as st
+from config import BULK_CHUNK_ROWS
+
+# A batch runner executes one chunk as one transaction:
+# rows -> (rows affected, [(index within the chunk, error message)])
+BatchRunner = Callable[[List[tuple]], Tuple[int, List[Tuple[int, str]]]]
+
+MAX_JOBS = 50  # finished jobs kept for their reports, per process
+_JOBS: "OrderedDict[str, BulkJob]" = OrderedDict()
+_JOBS_LOCK = threading.Lock()
+
+
+class BulkJob:
+    """A bulk insert/update/delete running chunk by chunk in a background thread."""
+
+    def __init__(self, label: str, total: int):
+        self.id = uuid.uuid4().hex[:12]
+        self.label = label
+        self.total = total
+        self.done = 0
+        self.affected = 0
+        self.errors: List[Tuple[int, str]] = []  # (CSV line or list position, message)
+        self.status = "running"
+        self.started_at = time.time()
+        self.seconds = 0.0
+
+    @property
+    def finished(self) -> bool:
+        return self.status != "running"
+
+    def progress(self) -> float:
+        return self.done / self.total if self.total else 1.0
+
+    def errors_frame(self) -> pd.DataFrame:
+        return pd.DataFrame(self.errors, columns=["row", "error"])
+
+
+def start_job(label: str, rows: Sequence[tuple], run_batch: BatchRunner,
+              row_numbers: Optional[Sequence[int]] = None, invalid: Iterable[Tuple[int, str]] = (),
+              chunk_rows: int = BULK_CHUNK_ROWS) -> BulkJob:
+    """
+    Run `rows` through `run_batch` in chunks of `chunk_rows` on a daemon thread and return
+    the job at once. `row_numbers` label each row in the error report (defaults to 1..n);
+    `invalid` are rows rejected before the job started, reported with the rest.
+    """
+    row_numbers = list(row_numbers) if row_numbers is not None else list(range(1, len(rows) + 1))
+    invalid = list(invalid)
+    job = BulkJob(label, len(rows) + len(invalid))
+    job.errors.extend(invalid)
+    job.done = len(invalid)
+
+    def work():
+        start = time.perf_counter()
+        offset = 0
+        try:
+            for offset in range(0, len(rows), chunk_rows):
+                chunk = list(rows[offset:offset + chunk_rows])
+                affected, errors = run_batch(chunk)
+                job.affected += affected
+                job.errors.extend((row_numbers[offset + index], message) for index, message in errors)
+                job.done += len(chunk)
+            job.status = "done"
+        except Exception as e:
+            job.errors.append((row_numbers[offset], f"batch starting here was not applied: {e}"))
+            job.status = "failed"
+            print(f"❌ Bulk job '{label}' failed: {e}")
+        finally:
+            job.errors.sort()
+            job.seconds = time.perf_counter() - start
+
+    with _JOBS_LOCK:
+        _JOBS[job.id] = job
+        while len(_JOBS) > MAX_JOBS:
+            _JOBS.popitem(last=False)
+    threading.Thread(target=work, name=f"bulk-job:{job.id}", daemon=True).start()
+    return job
+
+
+def get_job(job_id: Optional[str]) -> Optional[BulkJob]:
+    with _JOBS_LOCK:
+        return _JOBS.get(job_id) if job_id else None
+
+
+def rows_from_csv(frame: pd.DataFrame, columns: Sequence[str], required: Sequence[str] = (),
+                  choices: Optional[Dict[str, Sequence[str]]] = None, dates: Sequence[str] = (),
+                  numbers: Sequence[str] = ()) -> Tuple[List[tuple], List[int], List[Tuple[int, str]]]:
+    """
+    Validate an uploaded CSV (read with dtype=str) and turn it into parameter tuples in `columns`
+    order. Returns (rows, their CSV line numbers, [(line, error)] for rejected rows).
+    Raises ValueError when a required column is missing altogether.
+    """
+    frame = frame.rename(columns=lambda c: str(c).strip().lower())
+    missing = [c for c in required if c not in frame.columns]
+    if missing:
+        raise ValueError(f"Missing column(s): {', '.join(missing)}")
+    canonical = {c: {v.lower(): v for v in values} for c, values in (choices or {}).items()}
+
+    rows: List[tuple] = []
+    lines: List[int] = []
+    errors: List[Tuple[int, str]] = []
+    for position, record in enumerate(frame.reindex(columns=list(columns)).itertuples(index=False, name=None)):
+        line = position + 2  # the header is line 1
+        values = [None if pd.isna(v) or str(v).strip() == "" else str(v).strip() for v in record]
+        problem = None
+        for column, value in zip(columns, values):
+            if value is None:
+                if column in required:
+                    problem = f"{column} is empty"
+            elif column in canonical:
+                if value.lower() not in canonical[column]:
+                    problem = f"{column} '{value}' is not one of {', '.join(choices[column])}"
+            elif column in dates:
+                if not re.fullmatch(r"\d{4}-\d{2}-\d{2}", value) or pd.isna(pd.to_datetime(value, errors="coerce")):
+                    problem = f"{column} '{value}' is not a YYYY-MM-DD date"
+            elif column in numbers:
+                if pd.isna(pd.to_numeric(value, errors="coerce")):
+                    problem = f"{column} '{value}' is not a number"
+            if problem:
+                break
+        if problem:
+            errors.append((line, problem))
+            continue
+        values = [canonical[c][v.lower()] if c in canonical and v is not None else v for c, v in zip(columns, values)]
+        values = [float(v) if c in numbers and v is not None else v for c, v in zip(columns, values)]
+        rows.append(tuple(values))
+        lines.append(line)
+    return rows, lines, errors
+
+
+def parse_id_list(text: str) -> List[str]:
+    """IDs pasted one per line or comma/space separated, in order, without duplicates."""
+    return list(dict.fromkeys(part for part in re.split(r"[\s,;]+", text) if part))
+
+
+def render_job(session_key: str) -> None:
+    """
+    Progress bar while the job stored under st.session_state[session_key] runs, then its
+    summary and per-row errors. The page reruns once when the job finishes, so tables refresh.
+    """
+    job = get_job(st.session_state.get(session_key))
+    if job is None:
+        return
+
+    if not job.finished:
+        @st.fragment(run_every=1)
+        def job_progress():
+            st.progress(job.progress(), text=f"{job.label}: {job.done:,} of {job.total:,} rows")
+            if job.finished:
+                st.rerun()
+        job_progress()
+        return
+
+    message = f"{job.label}: {job.affected:,} row(s) affected, {len(job.errors):,} error(s) in {job.seconds:.1f}s"
+    if job.status == "failed":
+        st.error(message)
+    elif job.errors:
+        st.warning(message)
+    else:
+        st.success(message)
+    if job.errors:
+        st.dataframe(job.errors_frame(), hide_index=True)
@@ -0,0 +1,247 @@
+import json
+import sqlite3
+from typing import Dict, Iterable, List, NamedTuple, Optional
+from services.database_manager import DatabaseManager
+
+TRACKED_TABLES = ("users", "cyber_incidents", "it_tickets", "datasets_metadata")
+CDC_OPS = ("INSERT", "UPDATE", "DELETE")
+# Ops that take a row out of its table: a real delete, or a move into <table>_archive (archive_manager)
+REMOVED_OPS = ("DELETE", "ARCHIVE")
+
+# Columns that must never be copied into the change log
+EXCLUDED_COLUMNS = {"users": {"password_hash"}}
+
+
+class ChangeTracker:
+    """
+    Keeps a change counter per table in table_versions.
+
+    Triggers bump the counter on every insert/update/delete, so callers can
+    cheaply tell whether a table changed since they last cached something
+    derived from it.
+    """
+
+    def __init__(self, db: DatabaseManager):
+        self._db = db
+
+    def ensure_schema(self, tables: Iterable[str] = TRACKED_TABLES) -> None:
+        """Create the table_versions table and the counter triggers if missing."""
+        tables = list(tables)
+        existing = self._db.fetch_one(
+            "SELECT COUNT(*) FROM sqlite_master WHERE type = 'trigger' AND name LIKE 'trg_version_%'"
+        )[0]
+        if existing == 3 * len(tables):
+            return
+
+        script = ["BEGIN;", """
+        CREATE TABLE IF NOT EXISTS table_versions (
+            table_name TEXT PRIMARY KEY,
+            version INTEGER NOT NULL DEFAULT 0
+        );"""]
+        for table in tables:
+            script.append(f"INSERT OR IGNORE INTO table_versions (table_name, version) VALUES ('{table}', 0);")
+            for event in ("INSERT", "UPDATE", "DELETE"):
+                script.append(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_version_{table}_{event.lower()} AFTER {event} ON {table}
+        BEGIN UPDATE table_versions SET version = version + 1 WHERE table_name = '{table}'; END;""")
+        script.append("COMMIT;")
+        self._db.execute_script("\n".join(script))
+
+    def get_version(self, table: str) -> int:
+        """Return the current change counter for a table (0 if untracked)."""
+        return self.get_versions().get(table, 0)
+
+    def get_versions(self) -> Dict[str, int]:
+        """Return the change counter of every tracked table (empty before ensure_schema)."""
+        try:
+            return dict(self._db.fetch_all("SELECT table_name, version FROM table_versions"))
+        except sqlite3.OperationalError:
+            return {}  # e.g. a read-only copy made before the counters were installed
+
+
+class Change(NamedTuple):
+    """
+    One entry of the change log. row_data is the row after an INSERT or UPDATE
+    (before a DELETE or ARCHIVE); old_data is the row before an UPDATE.
+    """
+    seq: int
+    table_name: str
+    op: str
+    row_id: int
+    row_data: Optional[dict]
+    changed_at: str
+    old_data: Optional[dict] = None
+
+    def changed_columns(self) -> List[str]:
+        """Columns an UPDATE changed (every column for other ops, or updates logged before old_data existed)."""
+        if self.op != "UPDATE" or self.old_data is None or self.row_data is None:
+            return list(self.row_data or ())
+        return [column for column, value in self.row_data.items() if self.old_data.get(column) != value]
+
+
+class ChangeLog:
+    """
+    Append-only change-data-capture log for the four domain tables.
+
+    Triggers write one change_log row per inserted/updated/deleted row with a
+    monotonically increasing seq, so derived data (caches, rollups, indexes)
+    can catch up with changes_since(seq) instead of re-reading whole tables.
+    An UPDATE entry carries the row before (old_data) and after (row_data).
+    A delete is logged as ARCHIVE instead of DELETE when the row was just
+    copied into <table>_archive, so consumers can tell the two apart.
+    The triggers list each table's columns (and whether it has an archive),
+    so ensure_schema() recreates them whenever they no longer match; code
+    adding a column or an archive table calls refresh() afterwards.
+    """
+
+    def __init__(self, db: DatabaseManager):
+        self._db = db
+
+    def _row_json(self, table: str, ref: str) -> str:
+        """json_object(...) expression holding the NEW/OLD row, minus excluded columns."""
+        columns = [row[1] for row in self._db.fetch_all(f"PRAGMA table_info({table})")]
+        excluded = EXCLUDED_COLUMNS.get(table, set())
+        pairs = ", ".join(f"'{column}', {ref}.{column}" for column in columns if column not in excluded)
+        return f"json_object({pairs})"
+
+    def _trigger_sql(self, table: str, op: str, archived: bool = False) -> str:
+        """CREATE TRIGGER statement logging `op` on `table`, for the table's current columns."""
+        row_data = self._row_json(table, "OLD" if op == "DELETE" else "NEW")
+        old_data = self._row_json(table, "OLD") if op == "UPDATE" else "NULL"
+        logged_op = f"'{op}'"
+        if op == "DELETE" and archived:
+            # archive_ids() copies rows into the archive before deleting them from the hot table
+            logged_op = (f"CASE WHEN EXISTS (SELECT 1 FROM {table}_archive WHERE id = OLD.id) "
+                         f"THEN 'ARCHIVE' ELSE 'DELETE' END")
+        return f"""CREATE TRIGGER trg_cdc_{table}_{op.lower()} AFTER {op} ON {table}
+        BEGIN
+            INSERT INTO change_log (table_name, op, row_id, row_data, old_data)
+            VALUES ('{table}', {logged_op}, {"OLD" if op == "DELETE" else "NEW"}.id, {row_data}, {old_data});
+        END"""
+
+    def ensure_schema(self, tables: Iterable[str] = TRACKED_TABLES) -> None:
+        """Create the change_log table and its triggers if missing, and recreate triggers whose columns are stale."""
+        tables = list(tables)
+        archives = {row[0] for row in self._db.fetch_all(
+            "SELECT name FROM sqlite_master WHERE type = 'table' AND name LIKE '%\\_archive' ESCAPE '\\'")}
+        wanted = {f"trg_cdc_{table}_{op.lower()}": self._trigger_sql(table, op, f"{table}_archive" in archives)
+                  for table in tables for op in CDC_OPS}
+        current = dict(self._db.fetch_all(
+            "SELECT name, sql FROM sqlite_master WHERE type = 'trigger' AND name LIKE 'trg_cdc_%'"
+        ))
+        stale = [name for name, sql in wanted.items() if current.get(name) != sql]
+        if not stale:
+            return
+
+        log_columns = {row[1] for row in self._db.fetch_all("PRAGMA table_info(change_log)")}
+        script = ["BEGIN;", """
+        CREATE TABLE IF NOT EXISTS change_log (
+            seq INTEGER PRIMARY KEY AUTOINCREMENT,
+            table_name TEXT NOT NULL,
+            op TEXT NOT NULL,
+            row_id INTEGER,
+            row_data TEXT,
+            changed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            old_data TEXT
+        );
+        CREATE INDEX IF NOT EXISTS idx_change_log_table_seq ON change_log(table_name, seq);
+        CREATE TABLE IF NOT EXISTS change_log_state (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            purged_through INTEGER NOT NULL DEFAULT 0
+        );
+        INSERT OR IGNORE INTO change_log_state (id, purged_through) VALUES (1, 0);"""]
+        if log_columns and "old_data" not in log_columns:
+            script.append("ALTER TABLE change_log ADD COLUMN old_data TEXT;")
+        for name in stale:
+            script.append(f"\n        DROP TRIGGER IF EXISTS {name};\n        {wanted[name]};")
+        script.append("COMMIT;")
+        self._db.execute_script("\n".join(script))
+
+    def refresh(self) -> None:
+        """Recreate stale triggers after a tracked table gained a column or an archive, if the change log is installed."""
+        if self._db.fetch_one("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'change_log'"):
+            self.ensure_schema()
+
+    def latest_seq(self) -> int:
+        """Return the seq of the newest change (0 if the log is empty)."""
+        row = self._db.fetch_one("SELECT seq FROM sqlite_sequence WHERE name = 'change_log'")
+        return row[0] if row else 0
+
+    def purged_through(self) -> int:
+        """Return the highest seq removed by retention; older cursors must rebuild."""
+        return self._db.fetch_one("SELECT purged_through FROM change_log_state WHERE id = 1")[0]
+
+    def changes_since(self, seq: int, tables: Optional[Iterable[str]] = None,
+                      limit: int = 10_000) -> List[Change]:
+        """
+        Return up to `limit` changes with a seq greater than `seq`, oldest first.
+        Raises ValueError if changes after `seq` were already purged.
+        """
+        if seq < self.purged_through():
+            raise ValueError(f"Changes after seq {seq} were purged; rebuild from the tables instead.")
+
+        sql = "SELECT seq, table_name, op, row_id, row_data, changed_at, old_data FROM change_log WHERE seq > ?"
+        params: list = [seq]
+        if tables:
+            tables = list(tables)
+            sql += f" AND table_name IN ({', '.join('?' for _ in tables)})"
+            params.extend(tables)
+        sql += " ORDER BY seq LIMIT ?"
+        params.append(limit)
+
+        return [
+            Change(row[0], row[1], row[2], row[3], json.loads(row[4]) if row[4] else None, row[5],
+                   json.loads(row[6]) if row[6] else None)
+            for row in self._db.fetch_all(sql, params)
+        ]
+
+    def compact(self, upto_seq: int) -> int:
+        """
+        Keep only the newest change per row among entries with seq <= upto_seq.
+        Consumers still see every row's final state. Returns entries removed.
+        """
+        cursor = self._db.execute_query("""
+            DELETE FROM change_log
+            WHERE seq <= ?
+              AND seq NOT IN (
+                  SELECT MAX(seq) FROM change_log WHERE seq <= ? GROUP BY table_name, row_id
+              )
+        """, (upto_seq, upto_seq))
+        return cursor.rowcount
+
+    def purge(self, older_than_days: int = 30) -> int:
+        """Retention: delete changes older than the given age. Returns entries removed."""
+        row = self._db.fetch_one(
+            "SELECT MAX(seq) FROM change_log WHERE changed_at < datetime('now', ?)",
+            (f"-{int(older_than_days)} days",)
+        )
+        if not row or row[0] is None:
+            return 0
+        cursor = self._db.execute_query("DELETE FROM change_log WHERE seq <= ?", (row[0],))
+        self._db.execute_query(
+            "UPDATE change_log_state SET purged_through = MAX(purged_through, ?) WHERE id = 1", (row[0],)
+        )
+        return cursor.rowcount
+
+
+if __name__ == "__main__":
+    # Maintenance command, run from the multi_domain_platform folder:
+    #   python -m services.change_tracking --purge-days 30 --compact
+    import argparse
+    from pathlib import Path
+
+    parser = argparse.ArgumentParser(description="Change log compaction and retention.")
+    parser.add_argument("--db", default=str(Path(__file__).parent.parent / "database" / "platform.db"))
+    parser.add_argument("--purge-days", type=int, default=None, help="delete changes older than N days")
+    parser.add_argument("--compact", action="store_true", help="keep only the newest change per row")
+    args = parser.parse_args()
+
+    db = DatabaseManager(args.db)
+    change_log = ChangeLog(db)
+    change_log.ensure_schema()
+    if args.purge_days is not None:
+        print(f"✅ Purged {change_log.purge(args.purge_days)} changes older than {args.purge_days} days")
+    if args.compact:
+        print(f"✅ Compacted away {change_log.compact(change_log.latest_seq())} superseded changes")
+    print(f"Latest change seq: {change_log.latest_seq()}")
+    db.close()
@@ -1,26 +1,77 @@
 import sqlite3
-import pandas as pd
-from typing import Any, Iterable
+import threading
+import time
+from functools import wraps
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Iterable, Iterator, List, Tuple
+from services import query_tracer
+from services import metrics
+
+if TYPE_CHECKING:
+    import pandas as pd  # imported on first fetch_dataframe(); the login page never needs it
+
+
+def _instrumented(op: str):
+    """Count and time a DatabaseManager call in the metrics registry."""
+    calls = metrics.DB_QUERIES.labels(op)
+    latency = metrics.DB_QUERY_SECONDS.labels(op)
+    errors = metrics.DB_ERRORS.labels(op)
+
+    def decorator(method):
+        @wraps(method)
+        def wrapper(*args, **kwargs):
+            calls.inc()
+            start = time.perf_counter()
+            try:
+                return method(*args, **kwargs)
+            except sqlite3.Error:
+                errors.inc()
+                raise
+            finally:
+                latency.observe(time.perf_counter() - start)
+        return wrapper
+    return decorator
+
+
+def _serialized(method):
+    """Run a DatabaseManager method under the instance lock (one instance may be shared by every session)."""
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self._lock:
+            return method(self, *args, **kwargs)
+    return wrapper
 
 
 class DatabaseManager:
     """Handles SQLite database connections and queries safely."""
 
-    def __init__(self, db_path: str):
+    def __init__(self, db_path: str, read_only: bool = False):
         self._db_path = db_path
+        self._read_only = read_only
         self._connection: sqlite3.Connection | None = None
+        self._lock = threading.RLock()
 
+    @_serialized
     def connect(self) -> None:
         """Connect to the SQLite database if not already connected."""
         if self._connection is None:
-            self._connection = sqlite3.connect(self._db_path)
+            if self._read_only:
+                uri = f"{Path(self._db_path).resolve().as_uri()}?mode=ro"
+                self._connection = query_tracer.connect(uri, uri=True, check_same_thread=False)
+            else:
+                self._connection = query_tracer.connect(self._db_path, check_same_thread=False)
+            metrics.DB_CONNECTIONS.inc()
 
+    @_serialized
     def close(self) -> None:
         """Close the SQLite connection if open."""
         if self._connection is not None:
             self._connection.close()
             self._connection = None
+            metrics.DB_CONNECTIONS.dec()
 
+    @_instrumented("execute_query")
+    @_serialized
     def execute_query(self, sql: str, params: Iterable[Any] = ()) -> sqlite3.Cursor:
         """
         Execute a write query (INSERT, UPDATE, DELETE).
@@ -32,6 +83,134 @@ class DatabaseManager:
             cur.execute(sql, tuple(params))
         return cur
 
+    @_instrumented("execute_returning")
+    @_serialized
+    def execute_returning(self, sql: str, params: Iterable[Any] = ()) -> List[tuple]:
+        """
+        Execute a write query with a RETURNING clause and return its rows.
+        The rows are read before the transaction commits.
+        """
+        self.connect()
+        with self._connection:
+            cur = self._connection.cursor()
+            cur.execute(sql, tuple(params))
+            rows = cur.fetchall()
+        return rows
+
+    @_instrumented("execute_transaction")
+    @_serialized
+    def execute_transaction(self, statements: Iterable[Tuple[str, Iterable[Any]]]) -> List[int]:
+        """
+        Execute several parameterised write statements as one transaction; all or nothing.
+        Returns the rowcount of each statement.
+        """
+        self.connect()
+        with self._connection:
+            cur = self._connection.cursor()
+            counts = []
+            for sql, params in statements:
+                cur.execute(sql, tuple(params))
+                counts.append(cur.rowcount)
+        return counts
+
+    @_instrumented("execute_returning_transaction")
+    @_serialized
+    def execute_returning_transaction(self, statements: Iterable[Tuple[str, Iterable[Any]]]) -> List[List[tuple]]:
+        """
+        Execute several statements (SELECTs, or writes with RETURNING) as one write transaction.
+        BEGIN IMMEDIATE takes the write lock first, so no other connection changes the data
+        between them. Returns the rows of each statement.
+        """
+        self.connect()
+        with self._connection:
+            cur = self._connection.cursor()
+            if not self._connection.in_transaction:
+                cur.execute("BEGIN IMMEDIATE")
+            results = []
+            for sql, params in statements:
+                cur.execute(sql, tuple(params))
+                results.append(cur.fetchall())
+        return results
+
+    @_instrumented("execute_many")
+    @_serialized
+    def execute_many(self, sql: str, seq_of_params: Iterable[Iterable[Any]]) -> sqlite3.Cursor:
+        """
+        Execute the same write query for every parameter tuple in a single transaction.
+        Returns the cursor for additional info if needed.
+        """
+        self.connect()
+        with self._connection:
+            cur = self._connection.cursor()
+            cur.executemany(sql, (tuple(params) for params in seq_of_params))
+        return cur
+
+    @_instrumented("execute_many_transaction")
+    @_serialized
+    def execute_many_transaction(self, batches: Iterable[Tuple[str, Iterable[Iterable[Any]]]]) -> List[int]:
+        """
+        Like execute_transaction, but each statement runs once per parameter tuple (executemany):
+        several bulk writes commit together or not at all. Returns the rowcount of each batch.
+        """
+        self.connect()
+        with self._connection:
+            cur = self._connection.cursor()
+            counts = []
+            for sql, seq_of_params in batches:
+                cur.executemany(sql, (tuple(params) for params in seq_of_params))
+                counts.append(cur.rowcount)
+        return counts
+
+    @_instrumented("execute_batch")
+    @_serialized
+    def execute_batch(self, sql: str, seq_of_params: Iterable[Iterable[Any]]) -> Tuple[int, List[Tuple[int, str]]]:
+        """
+        Execute the same write query for every parameter tuple in a single transaction.
+        Unlike execute_many, a row that violates a constraint does not abort the batch:
+        it is skipped and reported. Returns (rows affected, [(row index, error message)]).
+        """
+        rows = [tuple(params) for params in seq_of_params]
+        self.connect()
+        with self._connection:
+            cur = self._connection.cursor()
+            cur.execute("SAVEPOINT batch")
+            try:
+                cur.executemany(sql, rows)
+                affected, errors = cur.rowcount, []
+            except sqlite3.IntegrityError:
+                # redo row by row to find the offending rows; still one transaction
+                cur.execute("ROLLBACK TO batch")
+                affected, errors = 0, []
+                for index, params in enumerate(rows):
+                    try:
+                        cur.execute(sql, params)
+                        affected += cur.rowcount
+                    except sqlite3.IntegrityError as e:
+                        errors.append((index, str(e)))
+            cur.execute("RELEASE batch")
+        return affected, errors
+
+    def existing_keys(self, table: str, column: str, keys: Iterable[Any]) -> set:
+        """The subset of `keys` present in table.column, looked up in chunks of 500."""
+        keys = list(keys)
+        found = set()
+        for start in range(0, len(keys), 500):
+            chunk = keys[start:start + 500]
+            placeholders = ", ".join("?" * len(chunk))
+            found.update(row[0] for row in self.fetch_all(
+                f"SELECT {column} FROM {table} WHERE {column} IN ({placeholders})", chunk
+            ))
+        return found
+
+    @_instrumented("execute_script")
+    @_serialized
+    def execute_script(self, sql_script: str) -> None:
+        """Execute several SQL statements at once (e.g. schema DDL)."""
+        self.connect()
+        self._connection.executescript(sql_script)
+
+    @_instrumented("fetch_one")
+    @_serialized
     def fetch_one(self, sql: str, params: Iterable[Any] = ()):
         """Fetch a single row from a query."""
         self.connect()
@@ -39,6 +218,8 @@ class DatabaseManager:
         cur.execute(sql, tuple(params))
         return cur.fetchone()
 
+    @_instrumented("fetch_all")
+    @_serialized
     def fetch_all(self, sql: str, params: Iterable[Any] = ()):
         """Fetch all rows from a query."""
         self.connect()
@@ -46,7 +227,9 @@ class DatabaseManager:
         cur.execute(sql, tuple(params))
         return cur.fetchall()
 
-    def fetch_dataframe(self, query: str, params: tuple = ()) -> pd.DataFrame:
+    @_instrumented("fetch_dataframe")
+    @_serialized
+    def fetch_dataframe(self, query: str, params: tuple = ()) -> "pd.DataFrame":
         """
         Execute a SQL query and return the result as a pandas DataFrame.
         """
@@ -55,4 +238,19 @@ class DatabaseManager:
         cur.execute(query, params)
         columns = [desc[0] for desc in cur.description]
         data = cur.fetchall()
+        import pandas as pd
         return pd.DataFrame(data, columns=columns)
+
+    def iter_dataframes(self, query: str, params: tuple = (), chunk_rows: int = 100_000) -> Iterator["pd.DataFrame"]:
+        """
+        Stream a query's result as DataFrames of up to `chunk_rows` rows. They are read on a
+        dedicated read-only connection, so a long read neither holds this instance's lock
+        nor interleaves with other sessions' statements on the shared connection.
+        """
+        import pandas as pd
+        uri = f"{Path(self._db_path).resolve().as_uri()}?mode=ro"
+        connection = query_tracer.connect(uri, uri=True)
+        try:
+            yield from pd.read_sql_query(query, connection, params=params, chunksize=chunk_rows)
+        finally:
+            connection.close()
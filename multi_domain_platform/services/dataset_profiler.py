@@ -0,0 +1,140 @@
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+from services.database_manager import DatabaseManager
+from services.change_tracking import ChangeLog
+from platform_core import profiling
+# file counting is shared with app/data/profiler.py
+from platform_core.profiling import FORMATS, MB, FileProfile
+from config import DATASET_DIR, PROFILER_WORKERS, PROFILER_CHUNK_MB
+
+
+def profile_files(paths, workers: int = PROFILER_WORKERS,
+                  chunk_bytes: int = PROFILER_CHUNK_MB * MB) -> Dict[Path, FileProfile]:
+    """Count the records and bytes of each path (see platform_core.profiling.profile_files)."""
+    return profiling.profile_files(paths, workers, chunk_bytes)
+
+
+class DatasetProfiler:
+    """
+    Fills datasets_metadata.record_count and file_size_mb from the dataset files on local disk,
+    instead of the numbers typed into the Insert Metadata form. A row's file is its file_path
+    (relative to the dataset folder, or absolute), else <dataset_name> with a known suffix in
+    the dataset folder; the path found is stored in file_path for next time.
+    """
+
+    def __init__(self, db: DatabaseManager, dataset_dir=DATASET_DIR, workers: int = PROFILER_WORKERS,
+                 chunk_bytes: int = PROFILER_CHUNK_MB * MB):
+        self._db = db
+        self._dataset_dir = Path(dataset_dir)
+        self._workers = workers
+        self._chunk_bytes = chunk_bytes
+
+    def ensure_schema(self) -> None:
+        """Add the file_path and profiled_at columns, and the watcher's indexes, to datasets_metadata if missing."""
+        columns = {row[1] for row in self._db.fetch_all("PRAGMA table_info(datasets_metadata)")}
+        script = [f"ALTER TABLE datasets_metadata ADD COLUMN {name} {kind};"
+                  for name, kind in (("file_path", "TEXT"), ("profiled_at", "TIMESTAMP")) if name not in columns]
+        indexes = {row[0] for row in self._db.fetch_all(
+            "SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = 'datasets_metadata'")}
+        # the dataset watcher looks rows up by file, and links rows without one by name
+        if "idx_datasets_file_path" not in indexes:
+            script.append("CREATE INDEX idx_datasets_file_path ON datasets_metadata(file_path);")
+        if "idx_datasets_unlinked_name" not in indexes:
+            script.append("CREATE INDEX idx_datasets_unlinked_name ON datasets_metadata(dataset_name) "
+                          "WHERE file_path IS NULL;")
+        if script:
+            self._db.execute_script("BEGIN;\n" + "\n".join(script) + "\nCOMMIT;")
+            ChangeLog(self._db).refresh()  # so the change log records the new columns
+
+    def resolve(self, dataset_name: str, file_path: Optional[str] = None) -> Optional[Path]:
+        """The file or folder holding a dataset, or None if there is none on disk."""
+        return profiling.resolve(self._dataset_dir, dataset_name, file_path)
+
+    def stored_path(self, path: Path) -> str:
+        """How a path is kept in file_path: relative to the dataset folder when inside it."""
+        return profiling.stored_path(self._dataset_dir, path)
+
+    def set_file_path(self, dataset_id: int, file_path: str) -> int:
+        cursor = self._db.execute_query("UPDATE datasets_metadata SET file_path = ? WHERE id = ?",
+                                        (file_path or None, dataset_id))
+        return cursor.rowcount
+
+    def profile(self, dataset_ids: Optional[Sequence[int]] = None) -> Dict[int, FileProfile]:
+        """Profile the files of the given datasets (all of them by default) without writing anything."""
+        sql = "SELECT id, dataset_name, file_path FROM datasets_metadata"
+        params: list = []
+        if dataset_ids is not None:
+            dataset_ids = [int(did) for did in dataset_ids]
+            sql += f" WHERE id IN ({', '.join('?' * len(dataset_ids))})" if dataset_ids else " WHERE 0"
+            params = dataset_ids
+        rows = self._db.fetch_all(sql + " ORDER BY id", params)
+
+        located = {row[0]: self.resolve(row[1], row[2]) for row in rows}
+        found = profile_files({path for path in located.values() if path is not None},
+                              self._workers, self._chunk_bytes)
+        missing = f"no file found in {self._dataset_dir}"
+        return {
+            dataset_id: (found[path]._replace(path=self.stored_path(path)) if path is not None
+                         else FileProfile("", "", None, 0, missing))
+            for dataset_id, path in located.items()
+        }
+
+    def save(self, profiles: Dict[int, FileProfile]) -> Tuple[int, List[Tuple[int, str]]]:
+        """
+        Write the successful profiles in one transaction.
+        Returns (rows updated, [(position in `profiles`, error)]).
+        """
+        items = list(profiles.items())
+        errors = [(i, f"#{did}: {profile.error}") for i, (did, profile) in enumerate(items) if not profile.ok]
+        ok = [i for i, (_did, profile) in enumerate(items) if profile.ok]
+        updated, failed = self._db.execute_batch(
+            "UPDATE datasets_metadata SET record_count = ?, file_size_mb = ?, file_path = ?, "
+            "profiled_at = CURRENT_TIMESTAMP WHERE id = ?",
+            [(items[i][1].record_count, items[i][1].file_size_mb, items[i][1].path, items[i][0]) for i in ok],
+        )
+        return updated, sorted(errors + [(ok[i], message) for i, message in failed])
+
+    def profile_batch(self, rows: Sequence[tuple]) -> Tuple[int, List[Tuple[int, str]]]:
+        """Bulk-job runner (services/bulk_jobs.py): profile and save a chunk of (dataset_id,) rows."""
+        dataset_ids = [int(row[0]) for row in rows]
+        profiles = self.profile(dataset_ids)
+        updated, errors = self.save(profiles)
+        position = {did: i for i, did in enumerate(dataset_ids)}
+        ordered = list(profiles)
+        errors = [(position[ordered[i]], message) for i, message in errors]
+        errors += [(i, f"#{did} not found") for i, did in enumerate(dataset_ids) if did not in profiles]
+        return updated, sorted(errors)
+
+
+if __name__ == "__main__":
+    # Profiler command, run from the multi_domain_platform folder:
+    #   python -m services.dataset_profiler [--id 3] [--dir /data/datasets] [--workers 8] [--dry-run]
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Fill dataset record counts and sizes from the files on disk.")
+    parser.add_argument("--db", default=str(Path(__file__).parent.parent / "database" / "platform.db"))
+    parser.add_argument("--dir", default=str(DATASET_DIR), help="folder holding the dataset files")
+    parser.add_argument("--id", type=int, action="append", help="dataset id (repeatable; default: all)")
+    parser.add_argument("--workers", type=int, default=PROFILER_WORKERS, help="processes (0 = one per CPU)")
+    parser.add_argument("--chunk-mb", type=int, default=PROFILER_CHUNK_MB)
+    parser.add_argument("--dry-run", action="store_true", help="print the profiles without saving them")
+    args = parser.parse_args()
+
+    db = DatabaseManager(args.db)
+    profiler = DatasetProfiler(db, args.dir, args.workers, args.chunk_mb * MB)
+    profiler.ensure_schema()
+    started = time.perf_counter()
+    profiles = profiler.profile(args.id)
+    seconds = time.perf_counter() - started
+    for dataset_id, result in profiles.items():
+        if result.ok:
+            print(f"  #{dataset_id} {result.path}: {result.record_count:,} records, {result.file_size_mb:,.2f} MB")
+        else:
+            print(f"  #{dataset_id}: {result.error}")
+    scanned = sum(result.size_bytes for result in profiles.values())
+    print(f"Profiled {len(profiles)} dataset(s), {scanned / MB:,.1f} MB in {seconds:.2f}s")
+    if not args.dry_run:
+        updated, errors = profiler.save(profiles)
+        print(f"✅ {updated} dataset record(s) updated" + (f", {len(errors)} not profiled" if errors else ""))
+    db.close()
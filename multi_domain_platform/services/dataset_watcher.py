@@ -0,0 +1,341 @@
+import calendar
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+from services.database_manager import DatabaseManager
+from services.dataset_profiler import DatasetProfiler, FORMATS, profile_files
+from config import (DATASET_DIR, WATCH_DIRS, WATCH_DEBOUNCE_SECONDS, WATCH_POLL_SECONDS,
+                    WATCH_RESCAN_SECONDS, WATCH_BATCH_ROWS)
+
+# (total bytes, newest mtime in ns, data files) of a dataset file or folder; a change in any means re-profile
+UnitState = Tuple[int, int, int]
+
+SOURCE = "Local files"  # source of the rows the watcher creates for new files
+# watchdog event types that can change a dataset; on Linux reads also raise "opened"/"closed_no_write",
+# and the profiler's own reads must not schedule another profile
+WRITE_EVENTS = {"created", "modified", "deleted", "moved", "closed"}
+MTIME_SLACK_SECONDS = 2  # profiled_at has whole seconds; a file written in the same second counts as changed
+
+
+class SyncReport(NamedTuple):
+    """Outcome of a sync or full rescan."""
+    scanned: int            # datasets (files or folders) looked at
+    profiled: int           # re-profiled because they were new or changed
+    inserted: int           # new datasets_metadata rows
+    updated: int            # existing rows refreshed
+    missing: List[str]      # file_path of rows whose files are gone (rows are kept)
+    errors: List[str]
+    seconds: float
+
+    def summary(self) -> str:
+        text = (f"{self.scanned:,} scanned, {self.profiled:,} profiled: {self.inserted:,} added, "
+                f"{self.updated:,} updated in {self.seconds:.1f}s")
+        if self.missing:
+            text += f"; {len(self.missing):,} file(s) missing"
+        if self.errors:
+            text += f"; {len(self.errors):,} error(s)"
+        return text
+
+
+def _scan_folder(path: str) -> UnitState:
+    size = mtime = files = 0
+    stack = [path]
+    while stack:
+        with os.scandir(stack.pop()) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(entry.path)
+                elif os.path.splitext(entry.name)[1].lower() in FORMATS:
+                    stat = entry.stat()
+                    size, mtime, files = size + stat.st_size, max(mtime, stat.st_mtime_ns), files + 1
+    return size, mtime, files
+
+
+class DatasetWatcher:
+    """
+    Keeps datasets_metadata in step with the dataset files in the watched folders.
+
+    Every top-level data file (CSV, JSONL, Parquet) or folder of them in a watched folder is
+    one dataset, matched to its row by file_path (rows without one are linked by dataset_name).
+    File events come from watchdog when it is installed, otherwise from a stat-only poll of the
+    tree. A dataset is re-profiled once it has been quiet for the debounce period, and the
+    results are upserted WATCH_BATCH_ROWS per transaction. reconcile() is the full rescan: it
+    re-profiles every dataset whose row is missing or older than its files.
+    """
+
+    def __init__(self, db: DatabaseManager, watch_dirs: Sequence[Path] = WATCH_DIRS, dataset_dir=DATASET_DIR,
+                 debounce_seconds: float = WATCH_DEBOUNCE_SECONDS, poll_seconds: float = WATCH_POLL_SECONDS,
+                 rescan_seconds: int = WATCH_RESCAN_SECONDS, batch_rows: int = WATCH_BATCH_ROWS):
+        self._db = db
+        self._dataset_dir = Path(dataset_dir).resolve()
+        self._profiler = DatasetProfiler(db, self._dataset_dir)
+        self._watch_dirs = [Path(d).resolve() for d in watch_dirs]
+        self._debounce = debounce_seconds
+        self._poll = poll_seconds
+        self._rescan = rescan_seconds
+        self._batch_rows = batch_rows
+
+        self._pending: Dict[Path, float] = {}  # dataset -> monotonic time of its latest event
+        self._pending_lock = threading.Lock()
+        self._snapshot: Dict[Path, UnitState] = {}  # last poll, for the polling backend
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._observer = None  # watchdog Observer, when watchdog is installed
+        self.backend = "stopped"
+        self.last_report: Optional[SyncReport] = None
+
+    # --- Datasets on disk ---
+    def unit_for(self, path) -> Optional[Path]:
+        """The dataset (top-level file or folder of a watched folder) a changed path belongs to."""
+        path = Path(path)
+        for root in self._watch_dirs:
+            try:
+                relative = path.relative_to(root)
+            except ValueError:
+                continue
+            if not relative.parts:
+                return None
+            unit = root / relative.parts[0]
+            if len(relative.parts) == 1 and unit.suffix.lower() not in FORMATS and not unit.is_dir():
+                return None  # a stray top-level file (notes, partial downloads)
+            return unit
+        return None
+
+    @staticmethod
+    def unit_state(unit: Path) -> Optional[UnitState]:
+        try:
+            if unit.is_dir():
+                return _scan_folder(str(unit))
+            stat = unit.stat()
+            return stat.st_size, stat.st_mtime_ns, 1
+        except OSError:
+            return None  # deleted (or replaced) while we looked
+
+    def scan(self) -> Dict[Path, UnitState]:
+        """Every dataset in the watched folders with its state; stat calls only, no file is read."""
+        snapshot = {}
+        for root in self._watch_dirs:
+            if not root.is_dir():
+                continue
+            with os.scandir(root) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        state = _scan_folder(entry.path)
+                        if state[2]:
+                            snapshot[Path(entry.path)] = state
+                    elif os.path.splitext(entry.name)[1].lower() in FORMATS:
+                        stat = entry.stat()
+                        snapshot[Path(entry.path)] = (stat.st_size, stat.st_mtime_ns, 1)
+        return snapshot
+
+    # --- Writing ---
+    def _upsert_statements(self, unit: Path, records: int, size_mb: float, mtime_ns: int) -> List[Tuple[str, list]]:
+        key = self._profiler.stored_path(unit)
+        name = unit.name if unit.is_dir() else unit.stem
+        last_updated = time.strftime("%Y-%m-%d", time.localtime(mtime_ns / 1e9))
+        values = [records, size_mb, last_updated]
+        return [
+            ("UPDATE datasets_metadata SET record_count = ?, file_size_mb = ?, last_updated = ?, "
+             "profiled_at = CURRENT_TIMESTAMP WHERE file_path = ?", values + [key]),
+            # a row registered by hand (no file_path yet) for the same dataset name
+            ("UPDATE datasets_metadata SET record_count = ?, file_size_mb = ?, last_updated = ?, file_path = ?, "
+             "profiled_at = CURRENT_TIMESTAMP WHERE id = (SELECT MIN(id) FROM datasets_metadata "
+             "WHERE file_path IS NULL AND dataset_name = ?) "
+             "AND NOT EXISTS (SELECT 1 FROM datasets_metadata WHERE file_path = ?)", values + [key, name, key]),
+            ("INSERT INTO datasets_metadata (dataset_name, source, last_updated, record_count, file_size_mb, "
+             "file_path, profiled_at) SELECT ?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP "
+             "WHERE NOT EXISTS (SELECT 1 FROM datasets_metadata WHERE file_path = ?)",
+             [name, SOURCE, last_updated, records, size_mb, key, key]),
+        ]
+
+    def sync(self, units: Iterable[Path], snapshot: Optional[Dict[Path, UnitState]] = None) -> SyncReport:
+        """Re-profile the given datasets and upsert their rows, WATCH_BATCH_ROWS per transaction."""
+        started = time.perf_counter()
+        units = list(dict.fromkeys(units))
+        inserted = updated = profiled = 0
+        missing: List[str] = []
+        errors: List[str] = []
+        for start in range(0, len(units), self._batch_rows):
+            batch = []
+            for unit in units[start:start + self._batch_rows]:
+                state = snapshot.get(unit) if snapshot else None
+                state = state or self.unit_state(unit)
+                if state is None or not state[2]:
+                    missing.append(self._profiler.stored_path(unit))
+                else:
+                    batch.append((unit, state))
+            profiles = profile_files([unit for unit, _ in batch])
+            statements = []
+            for unit, state in batch:
+                profile = profiles[unit]
+                if not profile.ok:
+                    errors.append(f"{unit.name}: {profile.error}")
+                    continue
+                statements += self._upsert_statements(unit, profile.record_count, profile.file_size_mb, state[1])
+                profiled += 1
+            if statements:
+                counts = self._db.execute_transaction(statements)
+                updated += sum(counts[i] + counts[i + 1] for i in range(0, len(counts), 3))
+                inserted += sum(counts[2::3])
+        for error in errors:
+            print(f"⚠️ Dataset watcher: {error}")
+        return SyncReport(len(units), profiled, inserted, updated, missing, errors, time.perf_counter() - started)
+
+    def reconcile(self) -> SyncReport:
+        """
+        Full rescan: profile every dataset in the watched folders whose row is missing or older
+        than its files, and report rows whose files are gone. Safe to run at any time.
+        """
+        self._profiler.ensure_schema()
+        snapshot = self.scan()
+        rows = dict(self._db.fetch_all(
+            "SELECT file_path, MIN(profiled_at) FROM datasets_metadata WHERE file_path IS NOT NULL GROUP BY file_path"
+        ))
+        stale = []
+        for unit, (_size, mtime_ns, _files) in snapshot.items():
+            profiled_at = rows.get(self._profiler.stored_path(unit))
+            if profiled_at is None or (mtime_ns / 1e9 > calendar.timegm(
+                    time.strptime(profiled_at, "%Y-%m-%d %H:%M:%S")) - MTIME_SLACK_SECONDS):
+                stale.append(unit)
+        report = self.sync(stale, snapshot)
+        known = {self._profiler.stored_path(unit) for unit in snapshot}
+        gone = [key for key in rows if key not in known and self._watched_and_gone(Path(key))]
+        report = report._replace(scanned=len(snapshot), missing=report.missing + gone)
+        self._snapshot = snapshot
+        self.last_report = report
+        return report
+
+    def _watched_and_gone(self, key: Path) -> bool:
+        path = key if key.is_absolute() else self._dataset_dir / key
+        return not path.exists() and any(root == path.parent for root in self._watch_dirs)
+
+    # --- Watching ---
+    def mark(self, path) -> None:
+        """Record a file event; the dataset is re-profiled once it has been quiet for the debounce period."""
+        unit = self.unit_for(path)
+        if unit is not None:
+            with self._pending_lock:
+                self._pending[unit] = time.monotonic()
+
+    def pending(self) -> int:
+        with self._pending_lock:
+            return len(self._pending)
+
+    def _poll_once(self) -> None:
+        snapshot = self.scan()
+        for unit, state in snapshot.items():
+            if self._snapshot.get(unit) != state:
+                self.mark(unit)
+        for unit in self._snapshot.keys() - snapshot.keys():
+            self.mark(unit)  # deleted: reported as missing
+        self._snapshot = snapshot
+
+    def _flush_due(self) -> None:
+        now = time.monotonic()
+        with self._pending_lock:
+            due = [unit for unit, seen in self._pending.items() if now - seen >= self._debounce]
+        ready = []
+        for unit in due:
+            state = self.unit_state(unit)
+            # still being written: the files changed within the debounce period
+            if state is not None and time.time() - state[1] / 1e9 < self._debounce:
+                with self._pending_lock:
+                    self._pending[unit] = now
+            else:
+                ready.append(unit)
+        if not ready:
+            return
+        with self._pending_lock:
+            for unit in ready:
+                self._pending.pop(unit, None)
+        self.last_report = self.sync(ready)
+
+    def _start_observer(self) -> bool:
+        try:
+            from watchdog.events import FileSystemEventHandler  # optional dependency
+            from watchdog.observers import Observer
+        except ImportError:
+            print(f"⚠️ watchdog is not installed; polling the dataset folders every {self._poll:g}s.")
+            return False
+
+        watcher = self
+
+        class Handler(FileSystemEventHandler):
+            def on_any_event(self, event):
+                if event.event_type not in WRITE_EVENTS:
+                    return
+                watcher.mark(event.src_path)
+                if getattr(event, "dest_path", ""):
+                    watcher.mark(event.dest_path)
+
+        self._observer = Observer()
+        for root in self._watch_dirs:
+            if root.is_dir():
+                self._observer.schedule(Handler(), str(root), recursive=True)
+        self._observer.daemon = True
+        self._observer.start()
+        return True
+
+    def start(self) -> "DatasetWatcher":
+        if self._thread is None:
+            self.backend = "events" if self._start_observer() else "polling"
+            self._thread = threading.Thread(target=self._loop, name="dataset-watcher", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._observer is not None:
+            self._observer.stop()
+        self.backend = "stopped"
+
+    def _loop(self) -> None:
+        tick = max(0.2, min(self._debounce, self._poll) / 2)
+        next_rescan = next_poll = time.monotonic()  # reconcile once at start
+        while not self._stop.is_set():
+            try:
+                now = time.monotonic()
+                if next_rescan is not None and now >= next_rescan:
+                    self.reconcile()
+                    next_rescan = now + self._rescan if self._rescan else None
+                    next_poll = now + self._poll
+                elif self.backend == "polling" and now >= next_poll:
+                    self._poll_once()
+                    next_poll = now + self._poll
+                self._flush_due()
+            except Exception as e:  # keep watching; the next rescan catches up
+                print(f"❌ Dataset watcher: {e}")
+            self._stop.wait(tick)
+
+
+if __name__ == "__main__":
+    # Watcher command, run from the multi_domain_platform folder:
+    #   python -m services.dataset_watcher --rescan          (one full reconciliation, then exit)
+    #   python -m services.dataset_watcher [--dir /data/a]   (watch until Ctrl+C)
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Keep datasets_metadata in sync with the dataset files.")
+    parser.add_argument("--db", default=str(Path(__file__).parent.parent / "database" / "platform.db"))
+    parser.add_argument("--dir", action="append", help="folder to watch (repeatable); default: WATCH_DIRS")
+    parser.add_argument("--rescan", action="store_true", help="run one full reconciliation and exit")
+    args = parser.parse_args()
+
+    db = DatabaseManager(args.db)
+    dirs = [Path(d) for d in args.dir] if args.dir else WATCH_DIRS
+    watcher = DatasetWatcher(db, dirs)
+    if args.rescan:
+        result = watcher.reconcile()
+        print(f"✅ {result.summary()}")
+        for key in result.missing:
+            print(f"  missing: {key}")
+    else:
+        watcher.start()
+        print(f"Watching {', '.join(map(str, dirs))} ({watcher.backend}); Ctrl+C to stop")
+        try:
+            while True:
+                time.sleep(1)
+        except KeyboardInterrupt:
+            watcher.stop()
+    db.close()
@@ -0,0 +1,177 @@
+import pandas as pd
+from typing import Iterable, Optional
+from services.database_manager import DatabaseManager
+from services.change_tracking import ChangeLog
+from config import ANOMALY_ALPHA, ANOMALY_SEASON_GAMMA, ANOMALY_Z, ANOMALY_MIN_COUNT, ANOMALY_WARMUP_DAYS
+# the detector is shared with app/data/anomaly.py
+from platform_core.anomaly import RateAnomalyDetector
+
+CHUNK_ROWS = 50_000
+
+
+class IncidentAnomalyMonitor:
+    """
+    Runs RateAnomalyDetector over cyber_incidents and keeps its alerts in incident_alerts.
+
+    The first sync() replays every incident in date order; later ones consume only the
+    inserts recorded in the change log since the last call. Baselines are persisted
+    (anomaly_baselines) together with the change-log position in one transaction, so a
+    restart picks up exactly where the last sync stopped.
+    """
+
+    def __init__(self, db: DatabaseManager, detector: Optional[RateAnomalyDetector] = None):
+        self._db = db
+        self._change_log = ChangeLog(db)
+        self._template = detector or RateAnomalyDetector(ANOMALY_ALPHA, ANOMALY_SEASON_GAMMA, ANOMALY_Z,
+                                                          ANOMALY_MIN_COUNT, ANOMALY_WARMUP_DAYS)
+
+    # --- Schema ---
+    def ensure_schema(self) -> None:
+        self._change_log.ensure_schema()
+        self._db.execute_script("""
+        BEGIN;
+        CREATE TABLE IF NOT EXISTS anomaly_baselines (
+            kind TEXT NOT NULL,
+            value TEXT NOT NULL,
+            day INTEGER NOT NULL,
+            count INTEGER NOT NULL,
+            level REAL NOT NULL,
+            var REAL NOT NULL,
+            days INTEGER NOT NULL,
+            season TEXT NOT NULL,
+            PRIMARY KEY (kind, value)
+        );
+        CREATE TABLE IF NOT EXISTS incident_alerts (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            kind TEXT NOT NULL,
+            value TEXT NOT NULL,
+            day TEXT NOT NULL,
+            count INTEGER NOT NULL,
+            expected REAL NOT NULL,
+            score REAL NOT NULL,
+            raised_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            acknowledged INTEGER NOT NULL DEFAULT 0,
+            UNIQUE (kind, value, day)
+        );
+        CREATE INDEX IF NOT EXISTS idx_incident_alerts_open ON incident_alerts(acknowledged, day);
+        CREATE TABLE IF NOT EXISTS anomaly_state (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            params TEXT NOT NULL,
+            last_seq INTEGER NOT NULL
+        );
+        COMMIT;""")
+        row = self._db.fetch_one("SELECT params FROM anomaly_state WHERE id = 1")
+        if row is None or row[0] != self._template.params:
+            self._db.execute_transaction([
+                ("DELETE FROM anomaly_baselines", []),
+                ("INSERT OR REPLACE INTO anomaly_state (id, params, last_seq) VALUES (1, ?, -1)",
+                 [self._template.params]),
+            ])
+
+    def _detector(self) -> RateAnomalyDetector:
+        """A fresh detector holding the persisted baselines."""
+        detector = self._template.fresh()
+        detector.load(self._db.fetch_all(
+            "SELECT kind, value, day, count, level, var, days, season FROM anomaly_baselines"))
+        return detector
+
+    def _save(self, detector: RateAnomalyDetector, last_seq: int) -> None:
+        alerts = {(a.kind, a.value, a.day): a for a in detector.alerts + detector.open_alerts()}
+        statements = [("DELETE FROM anomaly_baselines", [])]
+        statements += [
+            ("INSERT INTO anomaly_baselines (kind, value, day, count, level, var, days, season) "
+             "VALUES (?, ?, ?, ?, ?, ?, ?, ?)", list(row))
+            for row in detector.dump()
+        ]
+        # an alerting day keeps growing after it first fires: keep the row's peak count
+        statements += [
+            ("INSERT INTO incident_alerts (kind, value, day, count, expected, score) VALUES (?, ?, ?, ?, ?, ?) "
+             "ON CONFLICT(kind, value, day) DO UPDATE SET count = MAX(count, excluded.count), "
+             "score = MAX(score, excluded.score)", list(alert))
+            for alert in alerts.values()
+        ]
+        statements.append(("UPDATE anomaly_state SET last_seq = ? WHERE id = 1", [last_seq]))
+        self._db.execute_transaction(statements)
+        detector.alerts.clear()
+
+    # --- Streaming ---
+    def backfill(self) -> int:
+        """Rebuild the baselines from every incident, oldest date first. Returns events processed."""
+        self.ensure_schema()
+        latest = self._change_log.latest_seq()  # read first: inserts made meanwhile are replayed by sync()
+        detector = self._template.fresh()
+        processed, last = 0, ("", 0)
+        while True:
+            rows = self._db.fetch_all(
+                "SELECT date, incident_type, severity, id FROM cyber_incidents "
+                "WHERE (COALESCE(date, ''), id) > (?, ?) ORDER BY COALESCE(date, ''), id LIMIT ?",
+                (*last, CHUNK_ROWS),
+            )
+            if not rows:
+                break
+            last = (rows[-1][0] or "", rows[-1][3])
+            processed += detector.process(row[:3] for row in rows)
+        self._save(detector, latest)
+        return processed
+
+    def sync(self) -> int:
+        """Consume the incidents inserted since the last sync. Returns events processed."""
+        self.ensure_schema()
+        since = self._db.fetch_one("SELECT last_seq FROM anomaly_state WHERE id = 1")[0]
+        if since < 0:
+            return self.backfill()
+        detector, processed = None, 0
+        while True:
+            try:
+                changes = self._change_log.changes_since(since, tables=["cyber_incidents"], limit=CHUNK_ROWS)
+            except ValueError:  # fell behind the change-log retention window
+                return self.backfill()
+            if not changes:
+                return processed
+            detector = detector or self._detector()
+            processed += detector.process(
+                (c.row_data.get("date"), c.row_data.get("incident_type"), c.row_data.get("severity"))
+                for c in changes if c.op == "INSERT"
+            )
+            since = changes[-1].seq
+            self._save(detector, since)
+
+    # --- Alerts ---
+    def recent_alerts(self, limit: int = 50, include_acknowledged: bool = False) -> pd.DataFrame:
+        """Newest alerts first: id, kind, value, day, count, expected, score, raised_at, acknowledged."""
+        where = "" if include_acknowledged else "WHERE acknowledged = 0"
+        return self._db.fetch_dataframe(
+            f"SELECT id, kind, value, day, count, expected, score, raised_at, acknowledged FROM incident_alerts "
+            f"{where} ORDER BY day DESC, score DESC LIMIT ?", (int(limit),)
+        )
+
+    def acknowledge(self, alert_ids: Optional[Iterable[int]] = None) -> int:
+        """Mark the given alerts (all open ones by default) as seen. Returns alerts updated."""
+        if alert_ids is None:
+            return self._db.execute_query("UPDATE incident_alerts SET acknowledged = 1 WHERE acknowledged = 0").rowcount
+        return self._db.execute_many("UPDATE incident_alerts SET acknowledged = 1 WHERE id = ?",
+                                     [(int(aid),) for aid in alert_ids]).rowcount
+
+
+if __name__ == "__main__":
+    # Anomaly command, run from the multi_domain_platform folder:
+    #   python -m services.incident_anomaly [--backfill]
+    import argparse
+    import time
+    from pathlib import Path
+
+    parser = argparse.ArgumentParser(description="Update the incident-rate baselines and list open alerts.")
+    parser.add_argument("--db", default=str(Path(__file__).parent.parent / "database" / "platform.db"))
+    parser.add_argument("--backfill", action="store_true", help="rebuild the baselines from every incident")
+    args = parser.parse_args()
+
+    db = DatabaseManager(args.db)
+    monitor = IncidentAnomalyMonitor(db)
+    started = time.perf_counter()
+    processed = monitor.backfill() if args.backfill else monitor.sync()
+    print(f"✅ {processed} incident(s) processed in {time.perf_counter() - started:.2f}s")
+    alerts = monitor.recent_alerts()
+    print(f"{len(alerts)} open alert(s)")
+    if not alerts.empty:
+        print(alerts[["day", "kind", "value", "count", "expected", "score"]].to_string(index=False))
+    db.close()
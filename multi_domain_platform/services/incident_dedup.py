@@ -0,0 +1,238 @@
+import threading
+import numpy as np
+import pandas as pd
+from typing import Dict, Iterable, List, Optional, Tuple
+from services.database_manager import DatabaseManager
+from services.change_tracking import ChangeLog, REMOVED_OPS
+from services import metrics
+from models.security_incident import SEVERITY_LEVELS
+from config import DEDUP_SHINGLE, DEDUP_NUM_PERM, DEDUP_BANDS, DEDUP_THRESHOLD
+# MinHash, LSH buckets, clustering and collapsing are shared with app/data/dedup.py
+from platform_core.dedup import MinHasher, cluster_frame, collapse_frame
+
+CHUNK_ROWS = 5_000
+
+# Clusters are shared across reruns and keyed on the change-log position the index has reached
+_CLUSTERS: Dict[Tuple, pd.DataFrame] = {}
+_CLUSTERS_LOCK = threading.Lock()
+
+
+class IncidentDeduplicator:
+    """
+    Finds near-duplicate cyber_incidents (e.g. one phishing campaign reported dozens of times).
+
+    Each incident's description gets a MinHash signature, stored in incident_signatures, and
+    is filed under one LSH bucket per band in incident_lsh. Near-duplicates share at least one
+    bucket with high probability, so a lookup reads a handful of index entries instead of
+    comparing against every incident. sync() keeps the index current from the change log
+    (services/change_tracking.py), so inserted, edited and deleted incidents are picked up
+    incrementally, whatever wrote them.
+    """
+
+    def __init__(self, db: DatabaseManager, hasher: Optional[MinHasher] = None,
+                 threshold: float = DEDUP_THRESHOLD):
+        self._db = db
+        self._hasher = hasher or MinHasher(DEDUP_NUM_PERM, DEDUP_BANDS, DEDUP_SHINGLE)
+        self._threshold = threshold
+        self._change_log = ChangeLog(db)
+
+    # --- Schema ---
+    def ensure_schema(self) -> None:
+        """Create the index tables; empty them if the MinHash settings changed, so sync() rebuilds."""
+        self._change_log.ensure_schema()
+        self._db.execute_script("""
+        BEGIN;
+        CREATE TABLE IF NOT EXISTS incident_signatures (
+            incident_id INTEGER PRIMARY KEY,
+            signature BLOB NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS incident_lsh (
+            band INTEGER NOT NULL,
+            bucket INTEGER NOT NULL,
+            incident_id INTEGER NOT NULL,
+            PRIMARY KEY (band, bucket, incident_id)
+        ) WITHOUT ROWID;
+        CREATE INDEX IF NOT EXISTS idx_incident_lsh_incident ON incident_lsh(incident_id);
+        CREATE TABLE IF NOT EXISTS dedup_state (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            params TEXT NOT NULL,
+            last_seq INTEGER NOT NULL
+        );
+        COMMIT;""")
+        row = self._db.fetch_one("SELECT params FROM dedup_state WHERE id = 1")
+        if row is None or row[0] != self._hasher.params:
+            self._db.execute_transaction([
+                ("DELETE FROM incident_lsh", []),
+                ("DELETE FROM incident_signatures", []),
+                ("INSERT OR REPLACE INTO dedup_state (id, params, last_seq) VALUES (1, ?, -1)", [self._hasher.params]),
+            ])
+
+    def last_seq(self) -> int:
+        """Change-log position the index has caught up with (-1 before the first build)."""
+        return self._db.fetch_one("SELECT last_seq FROM dedup_state WHERE id = 1")[0]
+
+    # --- Indexing ---
+    def _write(self, descriptions: Dict[int, str], removed: Iterable[int], last_seq: int) -> int:
+        """(Re)index the given incidents, drop the removed ones and record the change-log position."""
+        signed = {}
+        cache: Dict[str, Optional[np.ndarray]] = {}  # a campaign repeats the same text
+        for incident_id, description in descriptions.items():
+            if description not in cache:
+                cache[description] = self._hasher.signature(description)
+            signed[incident_id] = cache[description]
+        touched = [(incident_id,) for incident_id in [*descriptions, *removed]]
+        indexed = [(incident_id, sig) for incident_id, sig in signed.items() if sig is not None]
+
+        # one transaction: clusters() and near_duplicates() never see an incident half re-indexed
+        self._db.execute_many_transaction([
+            ("DELETE FROM incident_lsh WHERE incident_id = ?", touched),
+            ("DELETE FROM incident_signatures WHERE incident_id = ?", touched),
+            ("INSERT INTO incident_signatures (incident_id, signature) VALUES (?, ?)",
+             [(incident_id, sig.tobytes()) for incident_id, sig in indexed]),
+            ("INSERT OR IGNORE INTO incident_lsh (band, bucket, incident_id) VALUES (?, ?, ?)",
+             [(band, bucket, incident_id) for incident_id, sig in indexed
+              for band, bucket in enumerate(self._hasher.buckets(sig))]),
+            ("UPDATE dedup_state SET last_seq = ? WHERE id = 1", [(last_seq,)]),
+        ])
+        return len(indexed)
+
+    def rebuild(self) -> int:
+        """Index every incident from scratch. Returns incidents indexed."""
+        self.ensure_schema()
+        latest = self._change_log.latest_seq()  # read first: changes made meanwhile are replayed by sync()
+        self._db.execute_transaction([("DELETE FROM incident_lsh", []), ("DELETE FROM incident_signatures", [])])
+        indexed, last_id = 0, 0
+        while True:
+            rows = self._db.fetch_all(
+                "SELECT id, description FROM cyber_incidents WHERE id > ? ORDER BY id LIMIT ?", (last_id, CHUNK_ROWS)
+            )
+            if not rows:
+                break
+            last_id = rows[-1][0]
+            indexed += self._write(dict(rows), [], -1)
+        self._db.execute_query("UPDATE dedup_state SET last_seq = ? WHERE id = 1", (latest,))
+        return indexed
+
+    def sync(self) -> int:
+        """Catch up with incidents inserted, edited or deleted since the last sync. Returns incidents (re)indexed."""
+        self.ensure_schema()
+        since = self.last_seq()
+        if since < 0:
+            return self.rebuild()
+        indexed = 0
+        while True:
+            try:
+                changes = self._change_log.changes_since(since, tables=["cyber_incidents"])
+            except ValueError:  # fell behind the change-log retention window
+                return self.rebuild()
+            if not changes:
+                return indexed
+            latest: Dict[int, Optional[dict]] = {}  # newest state per incident in this batch
+            for change in changes:
+                if change.op == "UPDATE" and "description" not in change.changed_columns():
+                    continue  # e.g. a status change: the signature stays valid
+                latest[change.row_id] = None if change.op in REMOVED_OPS else change.row_data
+            since = changes[-1].seq
+            indexed += self._write({row_id: data.get("description") for row_id, data in latest.items() if data},
+                                   [row_id for row_id, data in latest.items() if data is None], since)
+
+    # --- Queries ---
+    def _signatures(self, incident_ids: List[int]) -> Dict[int, np.ndarray]:
+        found = {}
+        for start in range(0, len(incident_ids), 500):
+            chunk = incident_ids[start:start + 500]
+            found.update(
+                (row[0], np.frombuffer(row[1], dtype=np.uint32)) for row in self._db.fetch_all(
+                    f"SELECT incident_id, signature FROM incident_signatures "
+                    f"WHERE incident_id IN ({', '.join('?' * len(chunk))})", chunk)
+            )
+        return found
+
+    def near_duplicates(self, incident_id: Optional[int] = None, text: Optional[str] = None,
+                        threshold: Optional[float] = None) -> pd.DataFrame:
+        """
+        Incidents whose description is estimated at least `threshold` similar to the given
+        incident's (or to `text`): incident_id, similarity, most similar first.
+        """
+        threshold = self._threshold if threshold is None else threshold
+        if incident_id is not None:
+            signature = self._signatures([incident_id]).get(incident_id)
+        else:
+            signature = self._hasher.signature(text or "")
+        if signature is None:
+            return pd.DataFrame({"incident_id": pd.Series(dtype="int64"), "similarity": pd.Series(dtype="float64")})
+
+        buckets = self._hasher.buckets(signature)
+        candidates = [row[0] for row in self._db.fetch_all(
+            "SELECT DISTINCT incident_id FROM incident_lsh WHERE "
+            + " OR ".join("(band = ? AND bucket = ?)" for _ in buckets),
+            [value for band, bucket in enumerate(buckets) for value in (band, bucket)],
+        ) if row[0] != incident_id]
+        signatures = self._signatures(candidates)
+        frame = pd.DataFrame({
+            "incident_id": list(signatures),
+            "similarity": [float(np.mean(sig == signature)) for sig in signatures.values()],
+        })
+        frame = frame[frame["similarity"] >= threshold]
+        return frame.sort_values(["similarity", "incident_id"], ascending=[False, True]).reset_index(drop=True)
+
+    def clusters(self, threshold: Optional[float] = None) -> pd.DataFrame:
+        """
+        Groups of near-duplicates: incident_id, cluster_id (the group's lowest id) and similarity
+        to that incident. Incidents without a near-duplicate are left out. Call sync() first.
+        """
+        threshold = self._threshold if threshold is None else threshold
+        key = (str(self._db._db_path), self.last_seq(), threshold)
+        with _CLUSTERS_LOCK:
+            if key in _CLUSTERS:
+                metrics.CACHE_REQUESTS.labels("dedup_clusters", "hit").inc()
+                return _CLUSTERS[key]
+        metrics.CACHE_REQUESTS.labels("dedup_clusters", "miss").inc()
+
+        groups = [[int(i) for i in row[0].split(",")] for row in self._db.fetch_all(
+            "SELECT group_concat(incident_id) FROM incident_lsh GROUP BY band, bucket HAVING COUNT(*) > 1")]
+        frame = cluster_frame(groups, self._signatures(sorted({i for group in groups for i in group})), threshold)
+
+        with _CLUSTERS_LOCK:
+            # drop clusters computed against older states of the index
+            for stale in [k for k in _CLUSTERS if k[0] == key[0] and k[1] != key[1]]:
+                del _CLUSTERS[stale]
+            _CLUSTERS[key] = frame
+        return frame
+
+    def collapse(self, incidents: pd.DataFrame, threshold: Optional[float] = None) -> pd.DataFrame:
+        """
+        One row per group of near-duplicate incidents (and per incident without duplicates):
+        the group's first incident, how many there are, their ids, date range, highest
+        severity and how many are still open. Largest groups first.
+        """
+        return collapse_frame(incidents, self.clusters(threshold), SEVERITY_LEVELS)
+
+if __name__ == "__main__":
+    # Dedup command, run from the multi_domain_platform folder:
+    #   python -m services.incident_dedup [--rebuild] [--similar-to 12] [--threshold 0.8]
+    import argparse
+    import time
+    from pathlib import Path
+
+    parser = argparse.ArgumentParser(description="Index incidents for near-duplicate detection and list the groups.")
+    parser.add_argument("--db", default=str(Path(__file__).parent.parent / "database" / "platform.db"))
+    parser.add_argument("--rebuild", action="store_true", help="re-index every incident")
+    parser.add_argument("--similar-to", type=int, help="list the near-duplicates of one incident")
+    parser.add_argument("--threshold", type=float, default=DEDUP_THRESHOLD)
+    args = parser.parse_args()
+
+    db = DatabaseManager(args.db)
+    dedup = IncidentDeduplicator(db, threshold=args.threshold)
+    started = time.perf_counter()
+    indexed = dedup.rebuild() if args.rebuild else dedup.sync()
+    print(f"✅ {indexed} incident(s) indexed in {time.perf_counter() - started:.2f}s")
+    if args.similar_to is not None:
+        print(dedup.near_duplicates(args.similar_to).to_string(index=False))
+    else:
+        clusters = dedup.clusters()
+        sizes = clusters.groupby("cluster_id").size().sort_values(ascending=False)
+        print(f"{len(clusters)} incident(s) in {len(sizes)} group(s) of near-duplicates")
+        for cluster_id, size in sizes.head(10).items():
+            print(f"  #{cluster_id}: {size} incidents")
+    db.close()
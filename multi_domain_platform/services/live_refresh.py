@@ -0,0 +1,49 @@
+import threading
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+from services.database_manager import DatabaseManager
+from services.change_tracking import ChangeTracker
+from services import metrics
+
+# (db path, key) -> (versions of the source tables, cached value), shared by all sessions
+_CACHE: Dict[Tuple[str, str], Tuple[Tuple[int, ...], Any]] = {}
+_CACHE_LOCK = threading.Lock()
+
+
+class LiveDataCache:
+    """
+    Reuses query results until one of their source tables changes.
+
+    Each instance reads the table_versions counters once (a single small
+    query), so a live dashboard section can poll on a timer and only re-run
+    the queries whose tables were written to since the last poll.
+    The counters are installed by ChangeTracker.ensure_schema() on the primary database.
+    """
+
+    def __init__(self, db: DatabaseManager, tracker: Optional[ChangeTracker] = None):
+        self._db = db
+        self._tracker = tracker or ChangeTracker(db)
+        self._versions: Optional[Dict[str, int]] = None
+
+    def versions(self) -> Dict[str, int]:
+        """Data version per table, read once per instance."""
+        if self._versions is None:
+            self._versions = self._tracker.get_versions()
+        return self._versions
+
+    def get(self, key: str, tables: Iterable[str], loader: Callable[[], Any]) -> Any:
+        """Return the cached value for key, calling loader() only if `tables` changed."""
+        versions = self.versions()
+        stamp = tuple(versions.get(table, 0) for table in tables)
+        cache_key = (str(self._db._db_path), key)
+
+        with _CACHE_LOCK:
+            cached = _CACHE.get(cache_key)
+        if cached is not None and cached[0] == stamp:
+            metrics.CACHE_REQUESTS.labels("live_data", "hit").inc()
+            return cached[1]
+
+        metrics.CACHE_REQUESTS.labels("live_data", "miss").inc()
+        value = loader()
+        with _CACHE_LOCK:
+            _CACHE[cache_key] = (stamp, value)
+        return value
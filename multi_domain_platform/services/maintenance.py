@@ -0,0 +1,309 @@
+import calendar
+import json
+import logging
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from logging.handlers import RotatingFileHandler
+from pathlib import Path
+from typing import Callable, Dict, List, NamedTuple, Optional, Sequence
+from services import query_tracer
+from config import (MAINTENANCE_BUDGET_SECONDS, MAINTENANCE_CHECK_SECONDS, MAINTENANCE_LOG,
+                    MAINTENANCE_WINDOW)
+
+# task -> hours between runs. Tasks run in this order, sharing one run's time budget.
+TASK_INTERVAL_HOURS = {
+    "incremental_vacuum": 20,
+    "optimize": 20,
+    "quick_check": 20,
+    "wal_checkpoint": 1,
+}
+VACUUM_STEP_PAGES = 256    # free pages returned to the OS per incremental_vacuum step
+ANALYSIS_LIMIT = 1000      # rows ANALYZE samples per index, keeps it bounded on big tables
+QUICK_CHECK_MAX_ERRORS = 20
+
+_logger: Optional[logging.Logger] = None
+_LOGGER_LOCK = threading.Lock()
+
+
+def _get_logger() -> logging.Logger:
+    """Logger writing one JSON object per task run to the rotating maintenance log."""
+    global _logger
+    with _LOGGER_LOCK:
+        if _logger is None:
+            logger = logging.getLogger("platform.maintenance")
+            logger.setLevel(logging.INFO)
+            logger.propagate = False
+            path = Path(MAINTENANCE_LOG)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            handler = RotatingFileHandler(path, maxBytes=1024 * 1024, backupCount=3, encoding="utf-8")
+            handler.setFormatter(logging.Formatter("%(message)s"))
+            logger.addHandler(handler)
+            _logger = logger
+        return _logger
+
+
+class TaskResult(NamedTuple):
+    task: str
+    status: str      # done | interrupted (out of budget) | skipped (no budget left) | failed | error
+    seconds: float
+    details: dict
+
+
+def in_window(window: str, now: Optional[datetime] = None) -> bool:
+    """Whether `now` (local time) falls in an "HH:MM-HH:MM" window; the window may wrap midnight."""
+    if not window:
+        return True
+    start, end = (datetime.strptime(part.strip(), "%H:%M").time() for part in window.split("-"))
+    current = (now or datetime.now()).time()
+    if start <= end:
+        return start <= current < end
+    return current >= start or current < end
+
+
+class MaintenanceManager:
+    """
+    Housekeeping for one SQLite database file.
+
+    Deletes leave free pages behind and nothing else collects planner
+    statistics, so this reclaims pages with auto_vacuum=INCREMENTAL, keeps
+    statistics current with ANALYZE / PRAGMA optimize, runs quick_check and
+    checkpoints the WAL. Each run has a time budget enforced with a progress
+    handler, and every task's outcome, including tasks skipped for lack of
+    budget, goes to the maintenance_log table and the rotating maintenance log.
+    A task stays due until a run completes it. A connection is only open while
+    a run is going.
+    """
+
+    def __init__(self, db_path, budget_seconds: float = MAINTENANCE_BUDGET_SECONDS):
+        self._db_path = str(db_path)
+        self._budget_seconds = budget_seconds
+        self._run_lock = threading.Lock()
+        self._tasks: Dict[str, Callable[[sqlite3.Connection, float], dict]] = {
+            "incremental_vacuum": self._incremental_vacuum,
+            "optimize": self._optimize,
+            "quick_check": self._quick_check,
+            "wal_checkpoint": self._wal_checkpoint,
+        }
+
+    # --- Tasks: each gets the connection and the run's deadline, and returns what it achieved ---
+    @staticmethod
+    def _pragma(conn: sqlite3.Connection, pragma: str):
+        return conn.execute(f"PRAGMA {pragma}").fetchone()[0]
+
+    def _incremental_vacuum(self, conn: sqlite3.Connection, deadline: float) -> dict:
+        details = {}
+        if self._pragma(conn, "auto_vacuum") != 2:
+            # One full VACUUM switches an existing file to incremental mode. It cannot pick up
+            # where it stopped, so it runs outside the budget: cut short, it would restart every run.
+            conn.set_progress_handler(None, 0)
+            try:
+                conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+                conn.execute("VACUUM")
+            finally:
+                conn.set_progress_handler(lambda: time.monotonic() > deadline, 10_000)
+            details["converted"] = True
+        page_size = self._pragma(conn, "page_size")
+        free_before = self._pragma(conn, "freelist_count")
+        while self._pragma(conn, "freelist_count") and time.monotonic() < deadline:
+            # executescript steps the pragma to completion; execute() would free a single page
+            conn.executescript(f"PRAGMA incremental_vacuum({VACUUM_STEP_PAGES})")
+        free_after = self._pragma(conn, "freelist_count")
+        details.update(pages_freed=free_before - free_after, bytes_freed=(free_before - free_after) * page_size,
+                       free_pages_left=free_after, file_pages=self._pragma(conn, "page_count"))
+        if free_after:
+            details["out_of_budget"] = True  # the rest is reclaimed on the next run
+        return details
+
+    def _optimize(self, conn: sqlite3.Connection, deadline: float) -> dict:
+        conn.execute(f"PRAGMA analysis_limit = {ANALYSIS_LIMIT}")
+        has_stats = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'sqlite_stat1'").fetchone()
+        if has_stats:
+            conn.execute("PRAGMA optimize")  # re-analyses only tables whose statistics have drifted
+        else:
+            conn.execute("ANALYZE")  # first run: the planner has no statistics at all yet
+        conn.commit()
+        stats = conn.execute("SELECT COUNT(DISTINCT tbl), COUNT(*) FROM sqlite_stat1").fetchone()
+        return {"mode": "optimize" if has_stats else "analyze", "tables_with_stats": stats[0],
+                "stat_rows": stats[1]}
+
+    def _quick_check(self, conn: sqlite3.Connection, deadline: float) -> dict:
+        rows = [row[0] for row in conn.execute(f"PRAGMA quick_check({QUICK_CHECK_MAX_ERRORS})")]
+        if rows != ["ok"]:
+            raise sqlite3.DatabaseError("quick_check found problems: " + "; ".join(rows))
+        return {"result": "ok"}
+
+    def _wal_checkpoint(self, conn: sqlite3.Connection, deadline: float) -> dict:
+        mode = self._pragma(conn, "journal_mode")
+        if mode != "wal":
+            return {"not_needed": f"journal_mode is {mode}"}
+        busy, log_frames, checkpointed = conn.execute("PRAGMA wal_checkpoint(TRUNCATE)").fetchone()
+        if busy:
+            # readers are still on old frames; copy what can be copied without waiting for them
+            busy, log_frames, checkpointed = conn.execute("PRAGMA wal_checkpoint(PASSIVE)").fetchone()
+        return {"busy": bool(busy), "log_frames": log_frames, "checkpointed_frames": checkpointed}
+
+    # --- Runs ---
+    def _ensure_log_table(self, conn: sqlite3.Connection) -> None:
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS maintenance_log (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                task TEXT NOT NULL,
+                started_at TIMESTAMP NOT NULL,
+                seconds REAL NOT NULL,
+                status TEXT NOT NULL,
+                details TEXT
+            )
+        """)
+        conn.commit()
+
+    def last_runs(self) -> Dict[str, str]:
+        """task -> when its last completed run started (UTC, 'YYYY-MM-DD HH:MM:SS')."""
+        conn = query_tracer.connect(self._db_path, timeout=5)
+        try:
+            self._ensure_log_table(conn)
+            return dict(conn.execute(
+                "SELECT task, MAX(started_at) FROM maintenance_log WHERE status = 'done' GROUP BY task"))
+        finally:
+            conn.close()
+
+    def due_tasks(self, now: Optional[float] = None) -> List[str]:
+        """Tasks whose interval has passed since they last completed (interrupted or skipped runs don't count)."""
+        now = now or time.time()
+        last = self.last_runs()
+        due = []
+        for task, hours in TASK_INTERVAL_HOURS.items():
+            started = last.get(task)
+            if started is None or now - calendar.timegm(time.strptime(started, "%Y-%m-%d %H:%M:%S")) >= hours * 3600:
+                due.append(task)
+        return due
+
+    def run(self, tasks: Optional[Sequence[str]] = None, budget_seconds: Optional[float] = None) -> List[TaskResult]:
+        """
+        Run `tasks` (default: the ones that are due) in TASK_INTERVAL_HOURS order until the budget
+        is spent. A task still running when the budget runs out is interrupted and rolled back;
+        the tasks after it are skipped. Both stay due for the next run.
+        """
+        tasks = self.due_tasks() if tasks is None else list(tasks)
+        unknown = [task for task in tasks if task not in self._tasks]
+        if unknown:
+            raise ValueError(f"Unknown maintenance task(s): {', '.join(unknown)}")
+        budget = self._budget_seconds if budget_seconds is None else budget_seconds
+        deadline = time.monotonic() + budget
+        results: List[TaskResult] = []
+        if not tasks:
+            return results
+
+        with self._run_lock:
+            conn = query_tracer.connect(self._db_path, timeout=5, isolation_level=None)
+            try:
+                self._ensure_log_table(conn)
+
+                def out_of_budget():
+                    return time.monotonic() > deadline  # a true value makes SQLite interrupt the statement
+
+                for task in (t for t in TASK_INTERVAL_HOURS if t in tasks):
+                    started_at = time.strftime("%Y-%m-%d %H:%M:%S", time.gmtime())
+                    start = time.perf_counter()
+                    if time.monotonic() > deadline:
+                        result = TaskResult(task, "skipped", 0.0, {"reason": f"out of budget ({budget:g}s)"})
+                        results.append(result)
+                        self._record(conn, started_at, result)
+                        continue
+                    conn.set_progress_handler(out_of_budget, 10_000)
+                    try:
+                        status, details = "done", self._tasks[task](conn, deadline)
+                    except sqlite3.OperationalError as e:
+                        if conn.in_transaction:
+                            conn.rollback()
+                        if "interrupted" in str(e):
+                            status, details = "interrupted", {"reason": f"out of budget ({budget:g}s)"}
+                        else:
+                            status, details = "error", {"error": str(e)}
+                    except sqlite3.DatabaseError as e:
+                        status, details = "failed", {"error": str(e)}
+                    result = TaskResult(task, status, round(time.perf_counter() - start, 3), details)
+                    results.append(result)
+                    self._record(conn, started_at, result)
+            finally:
+                conn.set_progress_handler(None, 0)
+                conn.close()
+        return results
+
+    def _record(self, conn: sqlite3.Connection, started_at: str, result: TaskResult) -> None:
+        conn.set_progress_handler(None, 0)  # the log entry must be written even when out of budget
+        conn.execute(
+            "INSERT INTO maintenance_log (task, started_at, seconds, status, details) VALUES (?, ?, ?, ?, ?)",
+            (result.task, started_at, result.seconds, result.status, json.dumps(result.details)),
+        )
+        _get_logger().info(json.dumps({"db": self._db_path, "task": result.task, "started_at": started_at,
+                                       "seconds": result.seconds, "status": result.status, **result.details}))
+        icon = {"done": "✅", "skipped": "⏭️", "interrupted": "⏸️"}.get(result.status, "❌")
+        print(f"{icon} Maintenance {result.task}: {result.status} in {result.seconds:.2f}s {result.details}")
+
+    def history(self, limit: int = 20) -> List[tuple]:
+        """The most recent maintenance_log entries, newest first."""
+        conn = query_tracer.connect(self._db_path, timeout=5)
+        try:
+            self._ensure_log_table(conn)
+            return conn.execute(
+                "SELECT started_at, task, status, seconds, details FROM maintenance_log ORDER BY id DESC LIMIT ?",
+                (limit,),
+            ).fetchall()
+        finally:
+            conn.close()
+
+
+class MaintenanceScheduler:
+    """Daemon thread that runs whatever maintenance is due while inside the off-peak window."""
+
+    def __init__(self, manager: MaintenanceManager, window: str = MAINTENANCE_WINDOW,
+                 check_seconds: int = MAINTENANCE_CHECK_SECONDS):
+        in_window(window)  # fail fast on a malformed window
+        self._manager = manager
+        self._window = window
+        self._check_seconds = check_seconds
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> "MaintenanceScheduler":
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._loop, name="db-maintenance", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def _loop(self) -> None:
+        while not self._stop.wait(self._check_seconds):
+            if not in_window(self._window):
+                continue
+            try:
+                self._manager.run()
+            except sqlite3.Error as e:
+                print(f"Database maintenance failed: {e}")
+
+
+if __name__ == "__main__":
+    # Maintenance command, run from the multi_domain_platform folder:
+    #   python -m services.maintenance [--task optimize] [--budget 120] [--due] [--history]
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Run database maintenance now, ignoring the off-peak window.")
+    parser.add_argument("--db", default=str(Path(__file__).parent.parent / "database" / "platform.db"))
+    parser.add_argument("--task", action="append", choices=list(TASK_INTERVAL_HOURS),
+                        help="task to run (repeatable); default: every task")
+    parser.add_argument("--due", action="store_true", help="only run the tasks that are due")
+    parser.add_argument("--budget", type=float, default=MAINTENANCE_BUDGET_SECONDS, help="seconds for the whole run")
+    parser.add_argument("--history", action="store_true", help="show recent runs instead of running")
+    args = parser.parse_args()
+
+    manager = MaintenanceManager(args.db)
+    if args.history:
+        for started_at, task, status, seconds, details in manager.history():
+            print(f"  {started_at}  {task:<20} {status:<12} {seconds:>7.2f}s  {details}")
+    else:
+        manager.run(None if args.due else (args.task or list(TASK_INTERVAL_HOURS)), args.budget)
@@ -0,0 +1,28 @@
+"""
+Platform metrics. The registry, exposition and the metrics both trees record live in
+platform_core/metrics.py; this module adds the DatabaseManager and cache metrics and
+binds the exporters to config.py.
+"""
+from platform_core import metrics as _core
+# the shared metrics and helpers, under the names the services and pages already use
+from platform_core.metrics import BCRYPT_SECONDS, LOGINS, REGISTRY, metered_stream, record_llm_request
+from config import METRICS_PORT, METRICS_TEXTFILE, METRICS_TEXTFILE_SECONDS
+
+DB_QUERIES = REGISTRY.counter("platform_db_queries_total", "SQL calls made through DatabaseManager.", ["op"])
+DB_QUERY_SECONDS = REGISTRY.histogram("platform_db_query_seconds", "DatabaseManager call latency.", ["op"])
+DB_ERRORS = REGISTRY.counter("platform_db_errors_total", "DatabaseManager calls that raised.", ["op"])
+DB_CONNECTIONS = REGISTRY.gauge("platform_db_connections_open", "Open DatabaseManager connections.")
+CACHE_REQUESTS = REGISTRY.counter("platform_cache_requests_total", "Cache lookups by result.", ["cache", "result"])
+
+
+def write_textfile(path=METRICS_TEXTFILE) -> None:
+    """Write the exposition atomically, e.g. for node_exporter's textfile collector."""
+    _core.write_textfile(path)
+
+
+def start_exporter(port: int = METRICS_PORT, textfile=METRICS_TEXTFILE) -> None:
+    """
+    Start (once per process) the configured exporters: an HTTP /metrics endpoint on
+    PLATFORM_METRICS_PORT and/or a text file rewritten every few seconds. Both are off by default.
+    """
+    _core.start_exporter(port, textfile, METRICS_TEXTFILE_SECONDS)
@@ -0,0 +1,104 @@
+import threading
+import pandas as pd
+from typing import Dict, Optional, Tuple
+from services.database_manager import DatabaseManager
+from services.change_tracking import ChangeTracker
+from services.archive_manager import history_source
+from services import metrics
+
+# Resolution target per ticket priority, in days
+SLA_DAYS = {"critical": 1, "high": 2, "medium": 5, "low": 10}
+DEFAULT_SLA_DAYS = 5
+GROUP_COLUMNS = ("category", "priority", "assigned_to")
+PERCENTILES = (0.5, 0.9, 0.95)
+
+# Results are shared across reruns and keyed on the it_tickets change counter
+_CACHE: Dict[Tuple, pd.DataFrame] = {}
+_CACHE_LOCK = threading.Lock()
+
+
+class MTTREngine:
+    """
+    Computes time-to-resolve statistics and SLA breaches for IT tickets.
+    Caching relies on the table_versions counter, installed by ChangeTracker.ensure_schema().
+    """
+
+    def __init__(self, db: DatabaseManager, tracker: Optional[ChangeTracker] = None):
+        self._db = db
+        self._tracker = tracker or ChangeTracker(db)
+
+    def _cached(self, key: Tuple, build) -> pd.DataFrame:
+        version = self._tracker.get_version("it_tickets")
+        full_key = (str(self._db._db_path), version) + key
+        with _CACHE_LOCK:
+            if full_key in _CACHE:
+                metrics.CACHE_REQUESTS.labels("mttr", "hit").inc()
+                return _CACHE[full_key]
+        metrics.CACHE_REQUESTS.labels("mttr", "miss").inc()
+        result = build()
+        with _CACHE_LOCK:
+            # drop entries computed against older versions of the table
+            for stale in [k for k in _CACHE if k[0] == full_key[0] and k[1] != version]:
+                del _CACHE[stale]
+            _CACHE[full_key] = result
+        return result
+
+    def _load_frame(self) -> pd.DataFrame:
+        """Read the tickets (archived ones included) once, with dates already converted to numeric day offsets."""
+        frame = self._db.fetch_dataframe(f"""
+            SELECT category, priority, assigned_to, status,
+                   julianday(created_date) AS created_day,
+                   julianday(resolved_date) - julianday(created_date) AS days_to_resolve
+            FROM {history_source(self._db, "it_tickets")}
+        """)
+        for column in GROUP_COLUMNS + ("status",):
+            frame[column] = frame[column].fillna("Unassigned").astype("category")
+        frame["created_day"] = frame["created_day"].astype("float64")
+        frame["days_to_resolve"] = frame["days_to_resolve"].astype("float64")
+        # Categorical.map only runs once per distinct priority
+        frame["sla_days"] = (
+            frame["priority"].map(lambda p: SLA_DAYS.get(str(p).lower(), DEFAULT_SLA_DAYS)).astype("float64")
+        )
+        return frame
+
+    def get_frame(self) -> pd.DataFrame:
+        """Return the parsed ticket frame, reloading only when it_tickets changed."""
+        return self._cached(("frame",), self._load_frame)
+
+    def summary(self, by: str = "category", as_of: Optional[str] = None) -> pd.DataFrame:
+        """
+        Return per-group resolution stats: ticket counts, mean and percentile
+        days to resolve, and SLA breaches (resolved late, or still open past the SLA).
+        """
+        if by not in GROUP_COLUMNS:
+            raise ValueError(f"Cannot group tickets by '{by}'. Choose one of: {', '.join(GROUP_COLUMNS)}")
+        as_of = pd.Timestamp(as_of) if as_of else pd.Timestamp.now().normalize()
+        return self._cached(("summary", by, as_of.date().isoformat()), lambda: self._summarise(by, as_of))
+
+    def _summarise(self, by: str, as_of: pd.Timestamp) -> pd.DataFrame:
+        frame = self.get_frame()
+        days = frame["days_to_resolve"]
+        resolved = days.notna()
+        open_age = as_of.to_julian_date() - frame["created_day"]
+
+        work = pd.DataFrame({
+            by: frame[by],
+            "days": days,
+            "resolved": resolved,
+            "late": resolved & (days > frame["sla_days"]),
+            "overdue": ~resolved & (open_age > frame["sla_days"]),
+        })
+        grouped = work.groupby(by, observed=True)
+        stats = grouped.agg(
+            tickets=("resolved", "size"),
+            resolved=("resolved", "sum"),
+            mean_days=("days", "mean"),
+            sla_breaches=("late", "sum"),
+            open_breaches=("overdue", "sum"),
+        )
+        quantiles = grouped["days"].quantile(list(PERCENTILES)).unstack()
+        quantiles.columns = [f"p{int(q * 100)}_days" for q in PERCENTILES]
+
+        stats = stats.join(quantiles)
+        stats["breach_rate"] = (stats["sla_breaches"] + stats["open_breaches"]) / stats["tickets"]
+        return stats.round(2).reset_index().sort_values("tickets", ascending=False, ignore_index=True)
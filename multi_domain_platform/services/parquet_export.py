@@ -0,0 +1,211 @@
+import json
+import os
+import shutil
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+from services.database_manager import DatabaseManager
+from services.change_tracking import ChangeLog
+from services.archive_manager import history_source
+from config import PARQUET_EXPORT_DIR
+
+# table -> (partition column name, SQL expression that computes it)
+EXPORT_TABLES = {
+    "cyber_incidents": ("month", "COALESCE(substr(date, 1, 7), 'unknown')"),
+    "it_tickets": ("month", "COALESCE(substr(created_date, 1, 7), 'unknown')"),
+    "datasets_metadata": ("category_key", "COALESCE(category, 'unknown')"),
+}
+DATE_COLUMNS = {"date", "created_date", "resolved_date", "last_updated"}
+SQLITE_TO_ARROW = {"INTEGER": pa.int64(), "REAL": pa.float64(), "TIMESTAMP": pa.timestamp("s")}
+STATE_FILE = "_export_state.json"
+CHUNK_ROWS = 100_000
+ID_BATCH = 10_000  # stays under SQLite's bound-parameter limit
+
+
+class ParquetExporter:
+    """
+    Exports the domain tables to a Hive-partitioned Parquet dataset
+    (e.g. cyber_incidents/month=2024-11/part-0.parquet) for offline analysis.
+
+    After the first full export, export() only rewrites the partitions touched
+    by changes recorded in the change log since the previous run. Incidents and
+    tickets are read through their *_all views, so archived rows stay in the
+    export and ARCHIVE changes leave it untouched.
+    """
+
+    def __init__(self, db: DatabaseManager, export_dir=PARQUET_EXPORT_DIR):
+        self._db = db
+        self._export_dir = Path(export_dir)
+        self._change_log = ChangeLog(db)
+
+    # --- Schema and conversion ---
+    def _arrow_schema(self, table: str) -> pa.Schema:
+        """Arrow schema built from the SQLite column types, with dates as date32."""
+        fields = []
+        for _cid, name, declared_type, *_rest in self._db.fetch_all(f"PRAGMA table_info({table})"):
+            if name in DATE_COLUMNS:
+                arrow_type = pa.date32()
+            else:
+                arrow_type = SQLITE_TO_ARROW.get(declared_type.upper(), pa.string())
+            fields.append(pa.field(name, arrow_type))
+        return pa.schema(fields)
+
+    @staticmethod
+    def _to_arrow(frame: pd.DataFrame, schema: pa.Schema) -> pa.Table:
+        for field in schema:
+            if pa.types.is_date32(field.type):
+                frame[field.name] = pd.to_datetime(frame[field.name], errors="coerce").dt.date
+            elif pa.types.is_timestamp(field.type):
+                frame[field.name] = pd.to_datetime(frame[field.name], errors="coerce")
+        return pa.Table.from_pandas(frame[schema.names], schema=schema, preserve_index=False)
+
+    # --- State ---
+    def _load_state(self) -> Dict[str, int]:
+        path = self._export_dir / STATE_FILE
+        return json.loads(path.read_text()) if path.exists() else {}
+
+    def _save_state(self, state: Dict[str, int]) -> None:
+        self._export_dir.mkdir(parents=True, exist_ok=True)
+        temp_path = self._export_dir / f"{STATE_FILE}.tmp"
+        temp_path.write_text(json.dumps(state, indent=2))
+        os.replace(temp_path, self._export_dir / STATE_FILE)
+
+    # --- Writing ---
+    def _full_export(self, table: str) -> int:
+        """Stream the whole table into a fresh dataset directory, then swap it in."""
+        part_column, part_sql = EXPORT_TABLES[table]
+        schema = self._arrow_schema(table)
+        source = history_source(self._db, table)
+        target = self._export_dir / table
+        staging = self._export_dir / f".{table}.staging"
+        shutil.rmtree(staging, ignore_errors=True)
+
+        writers: Dict[str, pq.ParquetWriter] = {}
+        rows = 0
+        try:
+            query = f"SELECT *, {part_sql} AS _partition FROM {source}"
+            for chunk in self._db.iter_dataframes(query, chunk_rows=CHUNK_ROWS):
+                for value, group in chunk.groupby("_partition"):
+                    if value not in writers:
+                        path = staging / f"{part_column}={value}" / "part-0.parquet"
+                        path.parent.mkdir(parents=True, exist_ok=True)
+                        writers[value] = pq.ParquetWriter(path, schema)
+                    writers[value].write_table(self._to_arrow(group.copy(), schema))
+                rows += len(chunk)
+        finally:
+            for writer in writers.values():
+                writer.close()
+
+        staging.mkdir(parents=True, exist_ok=True)
+        shutil.rmtree(target, ignore_errors=True)
+        os.replace(staging, target)
+        return rows
+
+    def _rewrite_partition(self, table: str, value: str) -> int:
+        """Re-export a single partition from SQLite (or remove it if now empty)."""
+        part_column, part_sql = EXPORT_TABLES[table]
+        schema = self._arrow_schema(table)
+        directory = self._export_dir / table / f"{part_column}={value}"
+        frame = self._db.fetch_dataframe(f"SELECT * FROM {history_source(self._db, table)} WHERE {part_sql} = ?",
+                                         (value,))
+        if frame.empty:
+            shutil.rmtree(directory, ignore_errors=True)
+            return 0
+
+        directory.mkdir(parents=True, exist_ok=True)
+        temp_path = directory / "part-0.parquet.tmp"
+        pq.write_table(self._to_arrow(frame, schema), temp_path)
+        os.replace(temp_path, directory / "part-0.parquet")
+        return len(frame)
+
+    def _partitions_holding(self, table: str, row_ids: Sequence[int]) -> set:
+        """Partitions of the current export that contain any of row_ids (reads only the id column)."""
+        part_column, _ = EXPORT_TABLES[table]
+        exported = read_parquet(table, columns=["id", part_column], export_dir=self._export_dir,
+                                filters=[("id", "in", list(row_ids))])
+        return set(exported[part_column].astype(str))
+
+    def export(self, tables: Iterable[str] = EXPORT_TABLES, full: bool = False) -> Dict[str, Tuple[str, int]]:
+        """
+        Export tables and return {table: (mode, rows written)}.
+        Runs a full export the first time, after change-log purges, or when full=True.
+        """
+        self._change_log.ensure_schema()
+        state = self._load_state()
+        results = {}
+        for table in tables:
+            # capture the cursor before reading so no change can slip between the two
+            latest = self._change_log.latest_seq()
+            since = state.get(table)
+            changes = None
+            if not full and since is not None and (self._export_dir / table).exists():
+                try:
+                    changes = self._collect_changes(table, since)
+                except ValueError:
+                    changes = None  # fell behind the retention window
+
+            if changes is None:
+                results[table] = ("full", self._full_export(table))
+            else:
+                # an archived row is still in the *_all view, unchanged
+                row_ids = sorted({change.row_id for change in changes if change.op != "ARCHIVE"})
+                partitions = self._partitions_holding(table, row_ids) if row_ids else set()
+                _, part_sql = EXPORT_TABLES[table]
+                source = history_source(self._db, table)
+                for start in range(0, len(row_ids), ID_BATCH):
+                    batch = row_ids[start:start + ID_BATCH]
+                    placeholders = ", ".join("?" for _ in batch)
+                    partitions |= {row[0] for row in self._db.fetch_all(
+                        f"SELECT DISTINCT {part_sql} FROM {source} WHERE id IN ({placeholders})", batch
+                    )}
+                rows = sum(self._rewrite_partition(table, value) for value in sorted(partitions))
+                results[table] = (f"incremental ({len(partitions)} partitions)", rows)
+
+            state[table] = latest
+            self._save_state(state)
+        return results
+
+    def _collect_changes(self, table: str, since: int) -> List:
+        changes = []
+        while True:
+            batch = self._change_log.changes_since(since, tables=[table])
+            if not batch:
+                return changes
+            changes.extend(batch)
+            since = batch[-1].seq
+
+
+def read_parquet(table: str, columns: Optional[List[str]] = None, filters: Optional[List[tuple]] = None,
+                 export_dir=PARQUET_EXPORT_DIR) -> pd.DataFrame:
+    """
+    Read an exported table back with column projection and predicate pushdown.
+
+    filters uses pyarrow's format, e.g. [("month", ">=", "2024-11"), ("severity", "=", "High")];
+    filters on the partition column skip whole directories.
+    """
+    path = Path(export_dir) / table
+    if not path.exists():
+        raise FileNotFoundError(f"No Parquet export found for '{table}' in {export_dir}")
+    arrow_table = pq.read_table(path, columns=columns, filters=filters, partitioning="hive")
+    return arrow_table.to_pandas()
+
+
+if __name__ == "__main__":
+    # Export command, run from the multi_domain_platform folder:
+    #   python -m services.parquet_export [--full] [--table cyber_incidents]
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Export domain tables to partitioned Parquet.")
+    parser.add_argument("--db", default=str(Path(__file__).parent.parent / "database" / "platform.db"))
+    parser.add_argument("--out", default=str(PARQUET_EXPORT_DIR))
+    parser.add_argument("--table", action="append", choices=list(EXPORT_TABLES))
+    parser.add_argument("--full", action="store_true", help="ignore the change log and export everything")
+    args = parser.parse_args()
+
+    db = DatabaseManager(args.db)
+    exporter = ParquetExporter(db, args.out)
+    for name, (mode, rows) in exporter.export(args.table or EXPORT_TABLES, full=args.full).items():
+        print(f"✅ {name}: {mode}, {rows} rows written")
+    db.close()
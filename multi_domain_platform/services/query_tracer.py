@@ -0,0 +1,39 @@
+"""
+SQL tracing for DatabaseManager connections: the tracer itself is shared with app/
+(platform_core/tracing.py); this module binds it to the PLATFORM_SQL_TRACE* settings in config.py.
+"""
+from platform_core.tracing import Tracer, report_from_log as _report_from_log
+from config import SQL_TRACE_ENABLED, SLOW_QUERY_MS, SQL_TRACE_LOG, SQL_TRACE_LOG_ALL, SQL_TRACE_LOG_BYTES
+
+TRACER = Tracer(SQL_TRACE_LOG, SLOW_QUERY_MS, SQL_TRACE_LOG_ALL, SQL_TRACE_LOG_BYTES,
+                internal_files=("database_manager.py",))
+
+
+def connect(database, **kwargs):
+    """sqlite3.connect() that traces every statement when PLATFORM_SQL_TRACE is on."""
+    return TRACER.connect(database, SQL_TRACE_ENABLED, **kwargs)
+
+
+def top_statements(n: int = 10):
+    """Statements traced in this process, ordered by total time."""
+    return TRACER.top_statements(n)
+
+
+def report_from_log(log_path=SQL_TRACE_LOG, n: int = 10):
+    """Top-N statements by total time across the trace log and its rotated backups."""
+    return _report_from_log(log_path, n)
+
+
+if __name__ == "__main__":
+    # Report command, run from the multi_domain_platform folder:
+    #   python -m services.query_tracer --top 20
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Summarise the SQL trace log.")
+    parser.add_argument("--log", default=str(SQL_TRACE_LOG))
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args()
+
+    import pandas as pd
+    with pd.option_context("display.max_colwidth", 80, "display.width", 200):
+        print(report_from_log(args.log, args.top).to_string(index=False))
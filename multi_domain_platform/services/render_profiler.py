@@ -0,0 +1,174 @@
+import cProfile
+import re
+import time
+from collections import deque
+from contextlib import contextmanager
+from functools import wraps
+from pathlib import Path
+from typing import Callable, Deque, Iterator, Optional
+import pandas as pd
+import streamlit as st
+from config import DEV_PROFILER, PROFILE_DUMP_DIR, PROFILE_BACKEND
+
+SPAN_KINDS = ("db", "pandas", "chart", "llm", "other")
+MAX_SPANS = 500      # per rerun; live fragments keep adding to the page's last profile
+HISTORY_RERUNS = 20  # reruns kept per session for the trend table
+
+
+class Span:
+    """One timed step of a rerun. Set `rows` inside a profiled() block to record a row count."""
+    __slots__ = ("kind", "label", "offset", "seconds", "rows")
+
+    def __init__(self, kind: str, label: str, offset: float):
+        self.kind = kind
+        self.label = label
+        self.offset = offset
+        self.seconds = 0.0
+        self.rows: Optional[int] = None
+
+
+class RenderProfile:
+    """Timings for one script run of a page."""
+
+    def __init__(self, page: str):
+        self.page = page
+        self.started_at = time.time()
+        self._start = time.perf_counter()
+        self.spans: Deque[Span] = deque(maxlen=MAX_SPANS)
+        self.tracer = None  # cProfile.Profile or pyinstrument.Profiler when dumping traces
+
+    def elapsed(self) -> float:
+        return time.perf_counter() - self._start
+
+    def to_frame(self) -> pd.DataFrame:
+        return pd.DataFrame(
+            [(s.kind, s.label, round(s.offset * 1000, 1), round(s.seconds * 1000, 2), s.rows) for s in self.spans],
+            columns=["kind", "step", "start_ms", "duration_ms", "rows"],
+        )
+
+
+def _start_tracer():
+    """Start a cProfile (default) or pyinstrument trace for the whole rerun."""
+    if PROFILE_BACKEND == "pyinstrument":
+        try:
+            from pyinstrument import Profiler  # optional dependency
+            tracer = Profiler()
+            tracer.start()
+            return tracer
+        except ImportError:
+            print("⚠️ pyinstrument is not installed; falling back to cProfile.")
+    tracer = cProfile.Profile()
+    tracer.enable()
+    return tracer
+
+
+def _stop_tracer(tracer) -> None:
+    if isinstance(tracer, cProfile.Profile):
+        tracer.disable()
+    else:
+        tracer.stop()
+
+
+def start_rerun(page: str) -> Optional[RenderProfile]:
+    """
+    Begin profiling this rerun of `page`. Call once near the top of the page.
+    Does nothing unless PLATFORM_DEV_PROFILER=1.
+    """
+    if not DEV_PROFILER:
+        return None
+    previous = st.session_state.get("_render_profile")
+    if previous is not None and previous.tracer is not None:
+        # the last rerun ended in st.rerun()/st.stop() before render_panel(): drop its trace
+        tracer, previous.tracer = previous.tracer, None
+        _stop_tracer(tracer)
+    profile = RenderProfile(page)
+    if PROFILE_DUMP_DIR:
+        profile.tracer = _start_tracer()
+    st.session_state["_render_profile"] = profile
+    return profile
+
+
+def current_profile() -> Optional[RenderProfile]:
+    if not DEV_PROFILER:
+        return None
+    return st.session_state.get("_render_profile")
+
+
+@contextmanager
+def profiled(kind: str, label: str) -> Iterator[Span]:
+    """Time the enclosed block as one step of the current rerun."""
+    profile = current_profile()
+    if profile is None:
+        yield Span(kind, label, 0.0)  # profiling off: nothing is recorded
+        return
+    span = Span(kind, label, profile.elapsed())
+    start = time.perf_counter()
+    try:
+        yield span
+    finally:
+        span.seconds = time.perf_counter() - start
+        profile.spans.append(span)
+
+
+def timed(kind: str, label: Optional[str] = None) -> Callable:
+    """Decorator form of profiled(); records len() of the result as the row count when it has one."""
+    def decorator(func: Callable) -> Callable:
+        step = label or getattr(func, "__qualname__", repr(func))
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with profiled(kind, step) as span:
+                result = func(*args, **kwargs)
+                try:
+                    span.rows = len(result)
+                except TypeError:
+                    pass
+                return result
+        return wrapper
+    return decorator
+
+
+def _dump_trace(profile: RenderProfile) -> Optional[Path]:
+    """Stop the rerun's tracer and write it to PROFILE_DUMP_DIR."""
+    tracer, profile.tracer = profile.tracer, None
+    if tracer is None:
+        return None
+    directory = Path(PROFILE_DUMP_DIR)
+    directory.mkdir(parents=True, exist_ok=True)
+    stem = f"{re.sub(r'[^A-Za-z0-9]+', '_', profile.page)}-{time.strftime('%Y%m%d-%H%M%S')}"
+    _stop_tracer(tracer)
+    if isinstance(tracer, cProfile.Profile):
+        path = directory / f"{stem}.prof"
+        tracer.dump_stats(path)
+    else:
+        path = directory / f"{stem}.html"
+        path.write_text(tracer.output_html())
+    return path
+
+
+def render_panel() -> None:
+    """
+    Show the developer timing panel in the sidebar. Call at the very end of the page,
+    so every step of the rerun has been recorded.
+    """
+    profile = current_profile()
+    if profile is None:
+        return
+    total = profile.elapsed()
+    trace_path = _dump_trace(profile)
+
+    history = st.session_state.setdefault("_render_history", deque(maxlen=HISTORY_RERUNS))
+    history.append((profile.page, time.strftime("%H:%M:%S", time.localtime(profile.started_at)),
+                    round(total * 1000, 1), len(profile.spans)))
+
+    frame = profile.to_frame()
+    with st.sidebar.expander("⏱️ Render profile", expanded=False):
+        st.metric("This rerun", f"{total * 1000:.0f} ms")
+        if not frame.empty:
+            by_kind = frame.groupby("kind")["duration_ms"].sum().reindex(SPAN_KINDS).dropna()
+            st.bar_chart(by_kind)
+            st.dataframe(frame.sort_values("duration_ms", ascending=False), hide_index=True)
+        st.caption("Recent reruns")
+        st.dataframe(pd.DataFrame(list(history), columns=["page", "time", "total_ms", "steps"]), hide_index=True)
+        if trace_path:
+            st.caption(f"Trace written to {trace_path}")
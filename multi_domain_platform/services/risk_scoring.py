@@ -0,0 +1,162 @@
+import numpy as np
+import pandas as pd
+from typing import Dict, Optional
+from models.security_incident import SEVERITY_LEVELS
+from services.database_manager import DatabaseManager
+from services.change_tracking import CDC_OPS, ChangeLog
+
+# Weight applied to the severity level based on the incident's status
+STATUS_WEIGHTS = {"open": 1.0, "in progress": 0.8, "resolved": 0.2, "closed": 0.0}
+
+# Incident types that deserve more attention than their severity alone suggests
+TYPE_WEIGHTS = {
+    "ransomware": 1.5,
+    "data exfiltration": 1.4,
+    "data leak": 1.4,
+    "zero-day exploit": 1.4,
+    "supply chain attack": 1.3,
+    "insider threat": 1.3,
+    "malware": 1.2,
+    "unauthorised access": 1.2,
+    "unauthorized access": 1.2,
+    "cloud service hijack": 1.2,
+    "credential stuffing": 1.1,
+    "ddos": 1.1,
+    "denial of service (dos)": 1.1,
+}
+DEFAULT_TYPE_WEIGHT = 1.0
+
+HALF_LIFE_DAYS = 30.0   # age at which the time factor has halved
+MIN_AGE_FACTOR = 0.25   # old incidents never drop below this share of their score
+
+
+def _lookup(values: pd.Series, weights: Dict[str, float], default: float) -> np.ndarray:
+    """Map a string column to weights, lowercasing each distinct value only once."""
+    categorical = values.astype("category")
+    table = np.array(
+        [weights.get(str(category).strip().lower(), default) for category in categorical.cat.categories]
+        + [default],  # code -1 (missing value) indexes this last slot
+        dtype=np.float64,
+    )
+    return table[categorical.cat.codes.to_numpy()]
+
+
+def age_factor(dates: pd.Series, as_of: Optional[pd.Timestamp] = None,
+               half_life_days: float = HALF_LIFE_DAYS) -> np.ndarray:
+    """Time factor per incident date: 1.0 today, halving every half_life_days, never below MIN_AGE_FACTOR."""
+    as_of = pd.Timestamp.now().normalize() if as_of is None else pd.Timestamp(as_of)
+    dates = pd.to_datetime(dates, format="%Y-%m-%d", errors="coerce")
+    age_days = ((as_of - dates).dt.days).to_numpy(dtype=np.float64, na_value=0.0)
+    age_days = np.clip(age_days, 0.0, None)
+    decay = np.exp2(-age_days / half_life_days)
+    return MIN_AGE_FACTOR + (1.0 - MIN_AGE_FACTOR) * decay
+
+
+def score_incidents(incidents: pd.DataFrame, as_of: Optional[pd.Timestamp] = None,
+                    half_life_days: float = HALF_LIFE_DAYS) -> np.ndarray:
+    """Return a risk score per incident row (higher means more urgent)."""
+    if incidents.empty:
+        return np.zeros(0, dtype=np.float64)
+
+    severity = _lookup(incidents["severity"], SEVERITY_LEVELS, 0.0)
+    status = _lookup(incidents["status"], STATUS_WEIGHTS, 1.0)
+    incident_type = _lookup(incidents["incident_type"], TYPE_WEIGHTS, DEFAULT_TYPE_WEIGHT)
+
+    return severity * status * incident_type * age_factor(incidents["date"], as_of, half_life_days)
+
+
+def rank_incidents(incidents: pd.DataFrame, top_n: Optional[int] = None,
+                   as_of: Optional[pd.Timestamp] = None) -> pd.DataFrame:
+    """
+    Return incidents with a risk_score column, highest risk first.
+    Incidents with a score of zero (e.g. closed) are left out of the queue.
+    """
+    scores = score_incidents(incidents, as_of=as_of)
+    order = np.argsort(-scores, kind="stable")
+    order = order[scores[order] > 0]
+    if top_n is not None:
+        order = order[:top_n]
+
+    ranked = incidents.iloc[order].copy()
+    ranked["risk_score"] = np.round(scores[order], 3)
+    return ranked.reset_index(drop=True)
+
+
+def _case_sql(column: str, weights: Dict[str, float], default: float) -> str:
+    whens = " ".join(f"WHEN '{value}' THEN {weight}" for value, weight in weights.items())
+    return f"CASE lower(trim({column})) {whens} ELSE {default} END"
+
+
+# Age-independent part of the score (severity x status x type), as SQL over a cyber_incidents row
+RISK_BASE_SQL = " * ".join([
+    _case_sql("severity", SEVERITY_LEVELS, 0.0),
+    _case_sql("status", STATUS_WEIGHTS, 1.0),
+    _case_sql("incident_type", TYPE_WEIGHTS, DEFAULT_TYPE_WEIGHT),
+])
+
+
+def has_risk_column(db: DatabaseManager) -> bool:
+    """
+    True when cyber_incidents.risk_base is indexed and follows the current weights, so
+    risk_queue() reads it without writing; also on read-only connections (snapshots).
+    """
+    table = db.fetch_one("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'cyber_incidents'")
+    indexed = db.fetch_one("SELECT 1 FROM sqlite_master WHERE type = 'index' AND name = 'idx_cyber_incidents_risk_base'")
+    columns = [row[1] for row in db.fetch_all("PRAGMA table_xinfo(cyber_incidents)")]
+    return bool(table and indexed and RISK_BASE_SQL in table[0] and "risk_score" not in columns)
+
+
+def ensure_risk_column(db: DatabaseManager) -> None:
+    """
+    Add cyber_incidents.risk_base, a VIRTUAL generated column holding RISK_BASE_SQL, and index it.
+    SQLite recomputes it whenever a row changes, so it never goes stale; the age factor changes
+    every day, so it is applied when the scores are read (risk_queue). The column is recreated
+    if the weights changed, and the risk_score column earlier versions stored is dropped.
+    """
+    table_sql = db.fetch_one("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'cyber_incidents'")[0]
+    columns = [row[1] for row in db.fetch_all("PRAGMA table_xinfo(cyber_incidents)")]
+    script = []
+    if "risk_score" in columns:
+        # a snapshot of each incident's score on the day it was saved; the change log
+        # triggers list it, so they go first and refresh() recreates them without it
+        script += [f"DROP TRIGGER IF EXISTS trg_cdc_cyber_incidents_{op.lower()};" for op in CDC_OPS]
+        script += ["DROP INDEX IF EXISTS idx_cyber_incidents_risk_score;",
+                   "ALTER TABLE cyber_incidents DROP COLUMN risk_score;"]
+    if "risk_base" in columns and RISK_BASE_SQL not in table_sql:
+        script += ["DROP INDEX IF EXISTS idx_cyber_incidents_risk_base;",
+                   "ALTER TABLE cyber_incidents DROP COLUMN risk_base;"]
+        columns.remove("risk_base")
+    if "risk_base" not in columns:
+        script.append(f"ALTER TABLE cyber_incidents ADD COLUMN risk_base REAL "
+                      f"GENERATED ALWAYS AS ({RISK_BASE_SQL}) VIRTUAL;")
+    indexed = db.fetch_one("SELECT 1 FROM sqlite_master WHERE type = 'index' AND name = 'idx_cyber_incidents_risk_base'")
+    if not script and indexed:
+        return
+    script.append("CREATE INDEX IF NOT EXISTS idx_cyber_incidents_risk_base ON cyber_incidents(risk_base DESC);")
+    db.execute_script("BEGIN;\n" + "\n".join(script) + "\nCOMMIT;")
+    if "risk_score" in columns:
+        ChangeLog(db).refresh()
+
+
+def risk_queue(db: DatabaseManager, top_n: int = 20, as_of: Optional[pd.Timestamp] = None) -> pd.DataFrame:
+    """
+    The top_n incidents by risk_score, read through the risk_base index (see ensure_risk_column)
+    with the age factor applied as of today. An incident's score lies between
+    MIN_AGE_FACTOR x risk_base and risk_base, so only rows whose risk_base reaches
+    MIN_AGE_FACTOR x the top_n-th largest risk_base are read.
+    """
+    ensure_risk_column(db)
+    cutoff = db.fetch_one(
+        "SELECT risk_base FROM cyber_incidents WHERE risk_base > 0 ORDER BY risk_base DESC LIMIT 1 OFFSET ?",
+        (max(top_n - 1, 0),)
+    )
+    candidates = db.fetch_dataframe(
+        "SELECT id, date, incident_type, severity, status, reported_by, risk_base FROM cyber_incidents "
+        "WHERE risk_base >= ? AND risk_base > 0 ORDER BY risk_base DESC",
+        (MIN_AGE_FACTOR * cutoff[0] if cutoff else 0.0,)
+    )
+    scores = candidates["risk_base"].to_numpy(dtype=np.float64) * age_factor(candidates["date"], as_of)
+    order = np.argsort(-scores, kind="stable")[:top_n]
+    ranked = candidates.iloc[order].drop(columns="risk_base")
+    ranked.insert(0, "risk_score", np.round(scores[order], 3))
+    return ranked.reset_index(drop=True)
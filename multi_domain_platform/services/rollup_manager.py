@@ -0,0 +1,64 @@
+import pandas as pd
+from typing import Dict, Optional
+from services.database_manager import DatabaseManager
+from platform_core import rollups
+from platform_core.rollups import ROLLUPS
+
+
+class RollupManager:
+    """
+    Maintains daily (and weekly view) count tables for incidents and tickets.
+
+    The daily tables are updated by SQLite triggers, so every insert/update/delete
+    made through the models keeps them current. Dashboards read these few
+    thousand rows instead of scanning the raw tables. The SQL is shared with
+    app/data/rollups.py (platform_core/rollups.py).
+    """
+
+    # (rollup, statement) pairs counting moved rows back in; see platform_core.rollups.recount_sql
+    recount_sql = staticmethod(rollups.recount_sql)
+
+    def __init__(self, db: DatabaseManager):
+        self._db = db
+
+    # --- Schema ---
+    def ensure_schema(self) -> None:
+        """Create rollup tables, views and triggers; fill any table that is new."""
+        existing = {row[0] for row in self._db.fetch_all("SELECT name FROM sqlite_master WHERE type = 'table'")}
+        if all(rollup in existing for rollup in ROLLUPS):
+            return
+        self._db.execute_script(rollups.schema_script(existing))
+
+    def rebuild(self) -> Dict[str, int]:
+        """Recompute every rollup table from the raw tables (and their archives). Returns rows per rollup."""
+        self.ensure_schema()
+        views = {row[0] for row in self._db.fetch_all("SELECT name FROM sqlite_master WHERE type = 'view'")}
+        self._db.execute_script(rollups.rebuild_script(views))
+        return {rollup: self._db.fetch_one(f"SELECT COUNT(*) FROM {rollup}")[0] for rollup in ROLLUPS}
+
+    # --- Time-series queries ---
+    def _get_trend(self, rollup: str, by: str, freq: str,
+                   start: Optional[str] = None, end: Optional[str] = None) -> pd.DataFrame:
+        query, params = rollups.trend_query(rollup, by, freq, start, end)
+        return self._db.fetch_dataframe(query, tuple(params))
+
+    def get_incident_trend(self, by: str = "severity", freq: str = "daily",
+                           start: Optional[str] = None, end: Optional[str] = None) -> pd.DataFrame:
+        """Incident counts per day/week grouped by incident_type, severity or status."""
+        return self._get_trend("incident_daily_rollup", by, freq, start, end)
+
+    def get_ticket_trend(self, by: str = "priority", freq: str = "daily",
+                         start: Optional[str] = None, end: Optional[str] = None) -> pd.DataFrame:
+        """Ticket counts per day/week grouped by priority, status or category."""
+        return self._get_trend("ticket_daily_rollup", by, freq, start, end)
+
+
+if __name__ == "__main__":
+    # Rebuild command, run from the multi_domain_platform folder:
+    #   python -m services.rollup_manager
+    from pathlib import Path
+
+    db = DatabaseManager(str(Path(__file__).parent.parent / "database" / "platform.db"))
+    for name, rows in RollupManager(db).rebuild().items():
+        print(f"✅ Rebuilt '{name}' ({rows} rows)")
+    db.close()
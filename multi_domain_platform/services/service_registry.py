@@ -0,0 +1,126 @@
+import atexit
+import hashlib
+import threading
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from config import BASE_DIR, MAINTENANCE_ENABLED, DATASET_WATCH_ENABLED, WATCH_DIRS
+
+DB_PATH = BASE_DIR / "database" / "platform.db"
+
+# name -> service, created once per process and shared by every session
+_SERVICES: Dict[str, Any] = {}
+# (name, service, close) in creation order; closed in reverse on shutdown
+_CLOSERS: List[Tuple[str, Any, Callable[[Any], None]]] = []
+_LOCK = threading.RLock()  # re-entrant: a factory may ask for the services it depends on
+
+
+def get_service(name: str, factory: Callable[[], Any], close: Optional[Callable[[Any], None]] = None) -> Any:
+    """
+    Return the service registered as `name`, calling `factory` to create it on first use.
+    Works like st.cache_resource but also outside Streamlit (CLI, benchmarks). `close`
+    is called on the service when the process exits.
+    """
+    service = _SERVICES.get(name)
+    if service is not None:
+        return service
+    with _LOCK:
+        service = _SERVICES.get(name)
+        if service is None:
+            service = factory()
+            _SERVICES[name] = service
+            if close is not None:
+                _CLOSERS.append((name, service, close))
+        return service
+
+
+def shutdown() -> None:
+    """Close every registered service, newest first. Runs automatically at exit."""
+    with _LOCK:
+        closers = list(reversed(_CLOSERS))
+        _CLOSERS.clear()
+        _SERVICES.clear()
+    for name, service, close in closers:
+        try:
+            close(service)
+        except Exception as e:
+            print(f"⚠️ Failed to close {name}: {e}")
+
+
+atexit.register(shutdown)
+
+
+# --- Platform services. Imports are local so the login page only loads what it uses ---
+
+def _database():
+    from services.database_manager import DatabaseManager
+    return get_service("database", lambda: DatabaseManager(str(DB_PATH)), DatabaseManager.close)
+
+
+def get_database():
+    """
+    The read/write DatabaseManager for the platform database; also starts the metrics
+    exporters, its maintenance scheduler and, when a dataset folder exists, the dataset watcher.
+    """
+    from services import metrics
+    database = _database()
+    metrics.start_exporter()
+    if MAINTENANCE_ENABLED:
+        get_maintenance_scheduler()
+    if DATASET_WATCH_ENABLED and any(folder.is_dir() for folder in WATCH_DIRS):
+        get_dataset_watcher()
+    return database
+
+
+def get_maintenance_scheduler():
+    """Off-peak vacuum/ANALYZE/integrity check/checkpoint runs for the platform database."""
+    from services.maintenance import MaintenanceManager, MaintenanceScheduler
+    return get_service("maintenance", lambda: MaintenanceScheduler(MaintenanceManager(DB_PATH)).start(),
+                       MaintenanceScheduler.stop)
+
+
+def get_dataset_watcher():
+    """Keeps datasets_metadata in sync with the files in the watched dataset folders."""
+    from services.dataset_watcher import DatasetWatcher
+    return get_service("dataset_watcher", lambda: DatasetWatcher(_database()).start(), DatasetWatcher.stop)
+
+
+def get_auth_manager():
+    from services.auth_manager import AuthManager
+    return get_service("auth", lambda: AuthManager(get_database()))
+
+
+def get_ticket_manager():
+    from models.it_ticket import TicketManager
+    return get_service("tickets", lambda: TicketManager(get_database()))
+
+
+def get_ticket_scheduler():
+    """Priority/SLA work queues for the IT groups; loaded once, then kept current from the change log."""
+    from services.ticket_scheduler import TicketScheduler
+    return get_service("ticket_scheduler", lambda: TicketScheduler(get_database()).load())
+
+
+def get_incident_manager():
+    from models.security_incident import SecurityIncidentManager
+    return get_service("incidents", lambda: SecurityIncidentManager(get_database()))
+
+
+def get_dataset_manager():
+    from models.dataset import DatasetManager
+    return get_service("datasets", lambda: DatasetManager(get_database()))
+
+
+def get_snapshot_manager():
+    """SnapshotManager for the platform database; its reader connection is reused between reruns."""
+    from services.snapshot_manager import SnapshotManager
+    return get_service("snapshots", lambda: SnapshotManager(DB_PATH), SnapshotManager.close)
+
+
+def get_openai_client(api_key: str):
+    """OpenAI client for `api_key`; openai is only imported when the first chat message is sent."""
+    def build():
+        from openai import OpenAI
+        return OpenAI(api_key=api_key)
+
+    # the key itself is not kept in the registry's names
+    name = f"openai:{hashlib.sha256(api_key.encode('utf-8')).hexdigest()[:12]}"
+    return get_service(name, build, lambda client: client.close())
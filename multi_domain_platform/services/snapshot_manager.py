@@ -0,0 +1,130 @@
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Optional
+from services.database_manager import DatabaseManager
+from config import SNAPSHOT_ENABLED, SNAPSHOT_MAX_AGE_SECONDS
+
+# One background refresher per snapshot file, shared by every session in the process
+_REFRESHERS: Dict[str, threading.Thread] = {}
+_PUBLISH_LOCKS: Dict[str, threading.Lock] = {}
+_REGISTRY_LOCK = threading.Lock()
+
+
+class SnapshotManager:
+    """
+    Publishes a read-only analytics copy of the primary SQLite database.
+
+    Heavy chart and metric queries read the snapshot, so they never hold locks
+    on the file the CRUD forms write to. The copy is taken with the sqlite3
+    backup API into a temp file and swapped in atomically.
+    """
+
+    def __init__(self, db_path, snapshot_path=None, max_age_seconds: int = SNAPSHOT_MAX_AGE_SECONDS,
+                 enabled: bool = SNAPSHOT_ENABLED):
+        self._db_path = Path(db_path)
+        self._snapshot_path = Path(snapshot_path) if snapshot_path else \
+            self._db_path.with_name(f"{self._db_path.stem}_analytics.db")
+        self._max_age_seconds = max_age_seconds
+        self._enabled = enabled
+        with _REGISTRY_LOCK:
+            self._lock = _PUBLISH_LOCKS.setdefault(str(self._snapshot_path), threading.Lock())
+        # reused between reruns; the snapshot reader is reopened when a publish replaces the file
+        self._reader: Optional[DatabaseManager] = None
+        self._reader_inode: Optional[int] = None
+        self._reader_lock = threading.Lock()
+
+    def age_seconds(self) -> Optional[float]:
+        """Seconds since the snapshot was published, or None if there is none."""
+        try:
+            return time.time() - self._snapshot_path.stat().st_mtime
+        except FileNotFoundError:
+            return None
+
+    def is_fresh(self) -> bool:
+        age = self.age_seconds()
+        return age is not None and age <= self._max_age_seconds
+
+    def publish(self) -> Path:
+        """Copy the primary database into the snapshot file and return its path."""
+        with self._lock:
+            temp_path = self._snapshot_path.with_suffix(".tmp")
+            source = sqlite3.connect(self._db_path)
+            target = sqlite3.connect(temp_path)
+            try:
+                # copy in steps so writers are only blocked briefly at a time
+                source.backup(target, pages=1024)
+            finally:
+                target.close()
+                source.close()
+            os.replace(temp_path, self._snapshot_path)
+        return self._snapshot_path
+
+    def _primary_modified_at(self) -> float:
+        """Last write time of the primary database, including its WAL file if any."""
+        wal_path = self._db_path.with_name(self._db_path.name + "-wal")
+        times = [self._db_path.stat().st_mtime]
+        if wal_path.exists():
+            times.append(wal_path.stat().st_mtime)
+        return max(times)
+
+    def ensure_fresh(self) -> None:
+        """Republish the snapshot if it is missing or older than the allowed age."""
+        if self.is_fresh():
+            return
+        if self.age_seconds() is not None and self._primary_modified_at() <= self._snapshot_path.stat().st_mtime:
+            # nothing was written since the last copy, just mark it as checked
+            os.utime(self._snapshot_path)
+            return
+        self.publish()
+
+    def start_background_refresh(self) -> None:
+        """Start (once per process) a daemon thread that keeps the snapshot fresh."""
+        key = str(self._snapshot_path)
+        with _REGISTRY_LOCK:
+            if key in _REFRESHERS and _REFRESHERS[key].is_alive():
+                return
+
+            def refresh_loop():
+                while True:
+                    try:
+                        self.ensure_fresh()
+                    except sqlite3.Error as e:
+                        print(f"Snapshot refresh failed: {e}")
+                    time.sleep(max(1, self._max_age_seconds // 2))
+
+            thread = threading.Thread(target=refresh_loop, name=f"snapshot-refresh:{key}", daemon=True)
+            thread.start()
+            _REFRESHERS[key] = thread
+
+    def reader(self) -> DatabaseManager:
+        """
+        Return a read-only DatabaseManager over the latest snapshot.
+        Falls back to the primary database when snapshots are disabled.
+        """
+        if not self._enabled:
+            with self._reader_lock:
+                if self._reader is None:
+                    self._reader = DatabaseManager(str(self._db_path))
+                return self._reader
+        if self.age_seconds() is None:
+            self.publish()
+        self.start_background_refresh()
+        inode = self._snapshot_path.stat().st_ino
+        with self._reader_lock:
+            if self._reader is None or self._reader_inode != inode:
+                if self._reader is not None:
+                    # anyone still holding the old reader reconnects to the new file on its next query
+                    self._reader.close()
+                self._reader = DatabaseManager(str(self._snapshot_path), read_only=True)
+                self._reader_inode = inode
+            return self._reader
+
+    def close(self) -> None:
+        """Close the cached reader connection."""
+        with self._reader_lock:
+            if self._reader is not None:
+                self._reader.close()
+                self._reader = None
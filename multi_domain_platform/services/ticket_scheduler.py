@@ -0,0 +1,447 @@
+import datetime
+import threading
+from array import array
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+import pandas as pd
+from services.database_manager import DatabaseManager
+from services.change_tracking import ChangeLog, REMOVED_OPS
+from services.mttr_engine import SLA_DAYS, DEFAULT_SLA_DAYS
+from config import SCHEDULER_BOOST_HOURS
+
+PRIORITY_WEIGHTS = {"low": 1, "medium": 2, "high": 3, "critical": 4}
+QUEUED_STATUS = "Open"           # waiting to be picked up
+ACTIVE_STATUSES = ("Open", "In Progress")  # count towards a group's load
+UNASSIGNED = ""
+CHUNK_ROWS = 50_000
+
+
+class IndexedHeap:
+    """
+    Binary min-heap of integer items with float keys and a position index, so an item's
+    key can be changed or the item removed in O(log n). Keys and items live in typed
+    arrays (16 bytes per entry) rather than tuples.
+    """
+
+    def __init__(self):
+        self._keys = array("d")
+        self._items = array("q")
+        self._pos: Dict[int, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __contains__(self, item: int) -> bool:
+        return item in self._pos
+
+    def key(self, item: int) -> float:
+        return self._keys[self._pos[item]]
+
+    def _less(self, i: int, j: int) -> bool:
+        # ties go to the older (lower) item
+        return (self._keys[i], self._items[i]) < (self._keys[j], self._items[j])
+
+    def _swap(self, i: int, j: int) -> None:
+        keys, items = self._keys, self._items
+        keys[i], keys[j] = keys[j], keys[i]
+        items[i], items[j] = items[j], items[i]
+        self._pos[items[i]] = i
+        self._pos[items[j]] = j
+
+    def _up(self, i: int) -> None:
+        while i and self._less(i, (i - 1) >> 1):
+            self._swap(i, (i - 1) >> 1)
+            i = (i - 1) >> 1
+
+    def _down(self, i: int) -> None:
+        size = len(self._items)
+        while True:
+            smallest, left = i, 2 * i + 1
+            if left < size and self._less(left, smallest):
+                smallest = left
+            if left + 1 < size and self._less(left + 1, smallest):
+                smallest = left + 1
+            if smallest == i:
+                return
+            self._swap(i, smallest)
+            i = smallest
+
+    def push(self, item: int, key: float) -> None:
+        """Insert `item`, or move it to `key` if it is already queued."""
+        i = self._pos.get(item)
+        if i is None:
+            self._keys.append(key)
+            self._items.append(item)
+            self._pos[item] = len(self._items) - 1
+            self._up(len(self._items) - 1)
+        else:
+            old, self._keys[i] = self._keys[i], key
+            self._up(i) if key < old else self._down(i)
+
+    def remove(self, item: int) -> bool:
+        i = self._pos.pop(item, None)
+        if i is None:
+            return False
+        last = len(self._items) - 1
+        if i != last:
+            self._keys[i], self._items[i] = self._keys[last], self._items[last]
+            self._pos[self._items[i]] = i
+        self._keys.pop()
+        self._items.pop()
+        if i < last:
+            self._up(i)
+            self._down(i)
+        return True
+
+    def peek(self) -> Optional[Tuple[int, float]]:
+        return (self._items[0], self._keys[0]) if self._items else None
+
+    def pop(self) -> Optional[Tuple[int, float]]:
+        top = self.peek()
+        if top is not None:
+            self.remove(top[0])
+        return top
+
+    def smallest(self, k: int) -> List[Tuple[int, float]]:
+        """The k first items in order, without popping: O(k log k) walk of the heap's top."""
+        import heapq
+        found, frontier = [], [(self._keys[0], self._items[0], 0)] if self._items else []
+        while frontier and len(found) < k:
+            key, item, i = heapq.heappop(frontier)
+            found.append((item, key))
+            for child in (2 * i + 1, 2 * i + 2):
+                if child < len(self._items):
+                    heapq.heappush(frontier, (self._keys[child], self._items[child], child))
+        return found
+
+    @classmethod
+    def build(cls, entries: Iterable[Tuple[int, float]]) -> "IndexedHeap":
+        """Heapify (item, key) pairs in O(n): sift down every parent, last one first."""
+        heap = cls()
+        for item, key in entries:
+            heap._items.append(item)
+            heap._keys.append(key)
+        heap._pos = {item: i for i, item in enumerate(heap._items)}
+        for i in reversed(range(len(heap._items) // 2)):
+            heap._down(i)
+        return heap
+
+
+class QueuedTicket(NamedTuple):
+    """The next ticket for a group, as returned by TicketScheduler.next_ticket()."""
+    id: int
+    ticket_id: str
+    priority: str
+    category: str
+    subject: str
+    assigned_to: str
+    created_date: str
+    due_date: str
+    overdue: bool
+
+
+def queue_key(priority: Optional[str], created_date: Optional[str]) -> Tuple[float, int]:
+    """
+    (key, weight) of a ticket: its SLA due date as a day number, pulled forward
+    SCHEDULER_BOOST_HOURS per priority step. The key only depends on the ticket, never
+    on the clock, so queue order stays valid without re-scoring as tickets age.
+    """
+    level = str(priority or "").lower()
+    weight = PRIORITY_WEIGHTS.get(level, 2)
+    try:
+        created = datetime.date.fromisoformat(str(created_date)[:10]).toordinal()
+    except ValueError:
+        created = datetime.date.today().toordinal()
+    return created + SLA_DAYS.get(level, DEFAULT_SLA_DAYS) - weight * SCHEDULER_BOOST_HOURS / 24, weight
+
+
+class TicketScheduler:
+    """
+    What each IT group should work on next.
+
+    Open tickets sit in one IndexedHeap per assigned_to group (plus one for unassigned
+    tickets), ordered by queue_key(). The queue is persisted in ticket_queue and kept in
+    step with it_tickets through the change log, so inserts, edits and status changes
+    made anywhere show up on the next sync(); a restart reloads ticket_queue instead of
+    re-scoring every ticket. Unassigned tickets are handed to the least-loaded group
+    (open and in-progress tickets, weighted by priority) among those that handle the
+    ticket's category by assign_unassigned(), which only runs when asked to (the page's
+    Assign button, the --assign flag): loading and syncing never write to it_tickets.
+    One instance is shared per process (service_registry).
+    """
+
+    def __init__(self, db: DatabaseManager):
+        self._db = db
+        self._change_log = ChangeLog(db)
+        self._lock = threading.RLock()
+        self._heaps: Dict[str, IndexedHeap] = {}
+        self._in_progress: Dict[int, Tuple[str, int]] = {}  # id -> (group, weight)
+        self._weights: Dict[int, int] = {}                  # queued id -> weight
+        self._load: Dict[str, int] = {}
+        self._groups_for: Dict[str, set] = {}  # category -> groups that have handled it
+        self._last_seq = -1
+
+    # --- Schema and persistence ---
+    def ensure_schema(self) -> None:
+        self._change_log.ensure_schema()
+        self._db.execute_script("""
+        BEGIN;
+        CREATE TABLE IF NOT EXISTS ticket_queue (
+            id INTEGER PRIMARY KEY,
+            assigned_to TEXT NOT NULL,
+            category TEXT,
+            status TEXT NOT NULL,
+            weight INTEGER NOT NULL,
+            due_key REAL NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS scheduler_state (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            last_seq INTEGER NOT NULL
+        );
+        INSERT OR IGNORE INTO scheduler_state (id, last_seq) VALUES (1, -1);
+        COMMIT;""")
+
+    @staticmethod
+    def _entry(row: Optional[dict]) -> Optional[tuple]:
+        """ticket_queue values (assigned_to, category, status, weight, due_key) of a ticket row, or None if inactive."""
+        if not row or row.get("status") not in ACTIVE_STATUSES:
+            return None
+        key, weight = queue_key(row.get("priority"), row.get("created_date"))
+        return row.get("assigned_to") or UNASSIGNED, row.get("category"), row["status"], weight, key
+
+    def load(self) -> "TicketScheduler":
+        """Fill the heaps from ticket_queue (rebuilt from it_tickets on first use), then catch up."""
+        with self._lock:
+            self.ensure_schema()
+            self._last_seq = self._db.fetch_one("SELECT last_seq FROM scheduler_state WHERE id = 1")[0]
+            if self._last_seq < 0:
+                self.rebuild()
+            else:
+                self._fill(self._db.fetch_all(
+                    "SELECT id, assigned_to, category, status, weight, due_key FROM ticket_queue"))
+            self.sync()
+        return self
+
+    def _fill(self, rows: List[tuple]) -> None:
+        self._heaps, self._in_progress, self._load, self._weights = {}, {}, {}, {}
+        by_group: Dict[str, List[Tuple[int, float]]] = {}
+        for ticket, group, category, status, weight, key in rows:
+            if status == QUEUED_STATUS:
+                by_group.setdefault(group, []).append((ticket, key))
+                self._weights[ticket] = weight
+            else:
+                self._in_progress[ticket] = (group, weight)
+            if group != UNASSIGNED:
+                self._load[group] = self._load.get(group, 0) + weight
+        self._heaps = {group: IndexedHeap.build(entries) for group, entries in by_group.items()}
+        self._groups_for = {}
+        for category, group in self._db.fetch_all(
+                "SELECT DISTINCT category, assigned_to FROM it_tickets WHERE assigned_to IS NOT NULL AND assigned_to != ''"):
+            self._groups_for.setdefault(category, set()).add(group)
+
+    def rebuild(self) -> int:
+        """Re-score every open or in-progress ticket from it_tickets. Returns tickets queued."""
+        with self._lock:
+            self.ensure_schema()
+            latest = self._change_log.latest_seq()  # read first: changes made meanwhile are replayed by sync()
+            rows, last_id = [], 0
+            while True:
+                chunk = self._db.fetch_all(
+                    f"SELECT id, priority, created_date, assigned_to, category, status FROM it_tickets "
+                    f"WHERE id > ? AND status IN ({', '.join('?' * len(ACTIVE_STATUSES))}) ORDER BY id LIMIT ?",
+                    (last_id, *ACTIVE_STATUSES, CHUNK_ROWS))
+                if not chunk:
+                    break
+                last_id = chunk[-1][0]
+                for ticket, priority, created_date, assigned_to, category, status in chunk:
+                    key, weight = queue_key(priority, created_date)
+                    rows.append((ticket, assigned_to or UNASSIGNED, category, status, weight, key))
+            self._db.execute_query("DELETE FROM ticket_queue")
+            self._db.execute_many("INSERT INTO ticket_queue (id, assigned_to, category, status, weight, due_key) "
+                                  "VALUES (?, ?, ?, ?, ?, ?)", rows)
+            self._db.execute_query("UPDATE scheduler_state SET last_seq = ? WHERE id = 1", (latest,))
+            self._last_seq = latest
+            self._fill(rows)
+            return len(rows)
+
+    # --- Incremental updates ---
+    def _apply(self, ticket: int, entry: Optional[tuple]) -> None:
+        self._remove(ticket)
+        if entry is not None:
+            group, category, status, weight, key = entry
+            if status == QUEUED_STATUS:
+                self._heaps.setdefault(group, IndexedHeap()).push(ticket, key)
+                self._weights[ticket] = weight
+            else:
+                self._in_progress[ticket] = (group, weight)
+            if group != UNASSIGNED:
+                self._load[group] = self._load.get(group, 0) + weight
+                self._groups_for.setdefault(category, set()).add(group)
+
+    def _remove(self, ticket: int) -> None:
+        group, weight = self._in_progress.pop(ticket, (None, 0))
+        if group is None:
+            weight = self._weights.pop(ticket, 0)
+            group = next((name for name, heap in self._heaps.items() if heap.remove(ticket)), None)
+        if group not in (None, UNASSIGNED):
+            self._load[group] -= weight
+
+    def sync(self) -> int:
+        """Apply it_tickets changes since the last sync to the queue. Returns tickets updated."""
+        updated = 0
+        with self._lock:
+            while True:
+                try:
+                    changes = self._change_log.changes_since(self._last_seq, tables=["it_tickets"], limit=CHUNK_ROWS)
+                except ValueError:  # fell behind the change-log retention window
+                    self.rebuild()
+                    continue
+                if not changes:
+                    break
+                latest: Dict[int, Optional[tuple]] = {}
+                for change in changes:
+                    latest[change.row_id] = None if change.op in REMOVED_OPS else self._entry(change.row_data)
+                for ticket, entry in latest.items():
+                    self._apply(ticket, entry)
+                self._last_seq = changes[-1].seq
+                self._db.execute_transaction(
+                    [("DELETE FROM ticket_queue WHERE id = ?", [ticket]) for ticket, entry in latest.items() if entry is None]
+                    + [("INSERT OR REPLACE INTO ticket_queue (id, assigned_to, category, status, weight, due_key) "
+                        "VALUES (?, ?, ?, ?, ?, ?)", [ticket, *entry]) for ticket, entry in latest.items() if entry]
+                    + [("UPDATE scheduler_state SET last_seq = ? WHERE id = 1", [self._last_seq])]
+                )
+                updated += len(latest)
+        return updated
+
+    def assign_unassigned(self, limit: Optional[int] = None) -> int:
+        """
+        Give unassigned open tickets, most urgent first, to the least-loaded group handling
+        their category (any group if none has yet). Returns tickets assigned.
+        """
+        with self._lock:
+            self.sync()
+            heap = self._heaps.get(UNASSIGNED)
+            groups = sorted(self._load)
+            if not heap or not groups:
+                return 0
+            waiting = heap.smallest(limit or len(heap))
+            categories = {}
+            for start in range(0, len(waiting), 500):
+                chunk = [ticket for ticket, _key in waiting[start:start + 500]]
+                categories.update(self._db.fetch_all(
+                    f"SELECT id, category FROM it_tickets WHERE id IN ({', '.join('?' * len(chunk))})", chunk))
+            load = dict(self._load)
+            assignments = []
+            for ticket, _key in waiting:
+                group = min(self._groups_for.get(categories.get(ticket)) or groups, key=lambda g: (load.get(g, 0), g))
+                load[group] = load.get(group, 0) + self._weights.get(ticket, 0)
+                assignments.append((group, ticket))
+            # only still-unassigned rows: a ticket someone assigned meanwhile keeps its group
+            assigned = self._db.execute_many(
+                "UPDATE it_tickets SET assigned_to = ? WHERE id = ? AND COALESCE(assigned_to, '') = ''", assignments
+            ).rowcount
+            self.sync()
+            return assigned
+
+    # --- Queries ---
+    def _details(self, tickets: List[int]) -> Dict[int, tuple]:
+        if not tickets:
+            return {}
+        return {row[0]: row[1:] for row in self._db.fetch_all(
+            f"SELECT id, ticket_id, priority, category, subject, assigned_to, created_date FROM it_tickets "
+            f"WHERE id IN ({', '.join('?' * len(tickets))})", tickets)}
+
+    def _queued(self, ticket: int, key: float, row: tuple) -> QueuedTicket:
+        ticket_id, priority, category, subject, assigned_to, created_date = row
+        sla = SLA_DAYS.get(str(priority or "").lower(), DEFAULT_SLA_DAYS)
+        try:
+            due = datetime.date.fromisoformat(str(created_date)[:10]) + datetime.timedelta(days=sla)
+        except ValueError:
+            due = datetime.date.fromordinal(int(key))
+        return QueuedTicket(ticket, ticket_id, priority, category, subject, assigned_to or UNASSIGNED,
+                            created_date, due.isoformat(), due < datetime.date.today())
+
+    def next_ticket(self, group: Optional[str] = None) -> Optional[QueuedTicket]:
+        """The open ticket `group` (any group by default) should work on next, or None."""
+        with self._lock:
+            heaps = [self._heaps.get(group)] if group is not None else list(self._heaps.values())
+            tops = [heap.peek() for heap in heaps if heap]
+            if not tops:
+                return None
+            ticket, key = min(tops, key=lambda top: (top[1], top[0]))
+        row = self._details([ticket]).get(ticket)
+        return self._queued(ticket, key, row) if row else None
+
+    def claim_next(self, group: str) -> Optional[QueuedTicket]:
+        """Move `group`'s next ticket to In Progress and return it (None if its queue is empty)."""
+        while True:
+            with self._lock:
+                self.sync()
+                queued = self.next_ticket(group)
+                if queued is None:
+                    return None
+                claimed = self._db.execute_query(
+                    "UPDATE it_tickets SET status = 'In Progress' WHERE id = ? AND status = ?",
+                    (queued.id, QUEUED_STATUS)).rowcount
+                self.sync()
+                if claimed:
+                    return queued
+
+    def queue(self, group: Optional[str] = None, limit: int = 20) -> pd.DataFrame:
+        """The next `limit` tickets of a group (or across groups), in the order they should be worked."""
+        with self._lock:
+            heaps = [self._heaps.get(group)] if group is not None else list(self._heaps.values())
+            entries = sorted((entry for heap in heaps if heap for entry in heap.smallest(limit)),
+                             key=lambda entry: (entry[1], entry[0]))[:limit]
+        details = self._details([ticket for ticket, _ in entries])
+        return pd.DataFrame([self._queued(ticket, key, details[ticket])._asdict()
+                             for ticket, key in entries if ticket in details],
+                            columns=QueuedTicket._fields)
+
+    def loads(self) -> pd.DataFrame:
+        """Per group: queued and in-progress tickets and their priority-weighted load."""
+        with self._lock:
+            groups = sorted(set(self._load) | {group for group, heap in self._heaps.items() if len(heap)})
+            in_progress: Dict[str, int] = {}
+            for group, _weight in self._in_progress.values():
+                in_progress[group] = in_progress.get(group, 0) + 1
+            return pd.DataFrame({
+                "assigned_to": [group or "Unassigned" for group in groups],
+                "queued": [len(self._heaps.get(group, ())) for group in groups],
+                "in_progress": [in_progress.get(group, 0) for group in groups],
+                "load": [self._load.get(group, 0) for group in groups],
+            })
+
+    def groups(self) -> List[str]:
+        with self._lock:
+            return sorted(group for group in set(self._load) | set(self._heaps) if group != UNASSIGNED)
+
+
+if __name__ == "__main__":
+    # Scheduler command, run from the multi_domain_platform folder:
+    #   python -m services.ticket_scheduler [--rebuild] [--assign] [--group IT_Support] [--limit 10]
+    import argparse
+    import time
+    from pathlib import Path
+
+    parser = argparse.ArgumentParser(description="Show what each IT group should work on next.")
+    parser.add_argument("--db", default=str(Path(__file__).parent.parent / "database" / "platform.db"))
+    parser.add_argument("--rebuild", action="store_true", help="re-score every open ticket")
+    parser.add_argument("--assign", action="store_true", help="assign unassigned open tickets first")
+    parser.add_argument("--group", help="only this assigned_to group")
+    parser.add_argument("--limit", type=int, default=10)
+    args = parser.parse_args()
+
+    db = DatabaseManager(args.db)
+    started = time.perf_counter()
+    scheduler = TicketScheduler(db)
+    if args.rebuild:
+        scheduler.ensure_schema()
+        scheduler.rebuild()
+    scheduler.load()
+    print(f"✅ Queue loaded in {time.perf_counter() - started:.2f}s")
+    if args.assign:
+        print(f"✅ {scheduler.assign_unassigned()} ticket(s) assigned")
+    print(scheduler.loads().to_string(index=False))
+    print(scheduler.queue(args.group, args.limit)[["ticket_id", "priority", "assigned_to", "due_date", "overdue", "subject"]]
+          .to_string(index=False))
+    db.close()
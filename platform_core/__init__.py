@@ -0,0 +1,9 @@
+"""
+Logic shared by the two platform trees, app/ and multi_domain_platform/.
+
+The modules here build SQL, run the algorithms and hold process-wide state;
+they never read either tree's settings or open its database. Each tree keeps
+a thin module (app/data/*, multi_domain_platform/services/*) that binds them
+to its own configuration and connection type. Both trees put the repository
+root on sys.path when their package (data, services) is first imported.
+"""
@@ -0,0 +1,164 @@
+"""
+Streaming incident-rate anomaly detection shared by app/data/anomaly.py and
+multi_domain_platform/services/incident_anomaly.py: per incident_type and per
+severity, an EWMA level and variance of the day-of-week adjusted daily count,
+and an alert when a day's count runs well above it. The two trees keep their
+own tables and decide which incidents to feed in.
+"""
+import datetime
+import json
+import math
+import sys
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+KINDS = ("incident_type", "severity")
+NEVER = sys.maxsize       # trigger of a key still warming up
+MAX_GAP_DAYS = 366        # quiet days folded into a baseline; longer gaps have decayed it anyway
+SEASON_BOUNDS = (0.2, 5.0)
+
+
+class Alert(NamedTuple):
+    """A day on which one incident type or severity ran well above its baseline."""
+    kind: str
+    value: str
+    day: str
+    count: int
+    expected: float
+    score: float
+
+
+class Baseline:
+    """
+    Streaming state of one key: the open day's count, an EWMA level and variance of the
+    deseasonalised daily count, and seven day-of-week factors. Constant size, whatever the history.
+    """
+    __slots__ = ("day", "count", "level", "var", "days", "season", "expected", "spread", "trigger")
+
+    def __init__(self, day: int, count: int = 0, level: float = 0.0, var: float = 0.0, days: int = 0,
+                 season: Optional[List[float]] = None):
+        self.day, self.count, self.level, self.var, self.days = day, count, level, var, days
+        self.season = season or [1.0] * 7
+        self.expected, self.spread, self.trigger = 0.0, 1.0, NEVER
+
+
+class RateAnomalyDetector:
+    """
+    Flags spikes in the daily number of incidents per incident_type and per severity.
+
+    Events are fed in (roughly) date order. Each key keeps a Baseline; when a later day
+    arrives the open day is folded into it (quiet days in between count as zero) and the
+    next day's alert trigger is worked out once, so an event costs a dict lookup and an
+    integer compare. Events dated before a key's open day are counted into the open day.
+    """
+
+    def __init__(self, alpha: float = 0.1, gamma: float = 0.05, z: float = 3.0,
+                 min_count: int = 3, warmup_days: int = 7):
+        if not 0 < alpha <= 1 or not 0 <= gamma <= 1:
+            raise ValueError("ANOMALY_ALPHA must be in (0, 1] and ANOMALY_SEASON_GAMMA in [0, 1]")
+        self.alpha, self.gamma, self.z, self.min_count, self.warmup_days = alpha, gamma, z, min_count, warmup_days
+        self.baselines: Dict[str, Dict[str, Baseline]] = {kind: {} for kind in KINDS}
+        self.alerts: List[Alert] = []  # raised since the caller last cleared it
+        self._days: Dict[str, Optional[int]] = {}
+
+    @property
+    def params(self) -> str:
+        """The settings baselines depend on; baselines built with other params must be rebuilt."""
+        return json.dumps({"alpha": self.alpha, "gamma": self.gamma, "z": self.z,
+                           "min_count": self.min_count, "warmup_days": self.warmup_days})
+
+    def fresh(self) -> "RateAnomalyDetector":
+        """An empty detector with the same settings."""
+        return RateAnomalyDetector(self.alpha, self.gamma, self.z, self.min_count, self.warmup_days)
+
+    # --- Persistence ---
+    def load(self, rows: Iterable[Tuple[str, str, int, int, float, float, int, str]]) -> None:
+        """Restore baselines saved by dump(): (kind, value, day, count, level, var, days, season JSON)."""
+        for kind, value, day, count, level, var, days, season in rows:
+            baseline = self.baselines.setdefault(kind, {})[value] = Baseline(
+                day, 0, level, var, days, json.loads(season))
+            self._open(baseline, day)
+            baseline.count = count
+
+    def dump(self) -> List[Tuple[str, str, int, int, float, float, int, str]]:
+        """Every baseline as (kind, value, day, count, level, var, days, season JSON)."""
+        return [(kind, value, b.day, b.count, b.level, b.var, b.days, json.dumps([round(f, 6) for f in b.season]))
+                for kind, keyed in self.baselines.items() for value, b in keyed.items()]
+
+    # --- Streaming ---
+    def _day(self, text) -> Optional[int]:
+        """Day ordinal of a 'YYYY-MM-DD...' date, cached (incidents share few distinct dates)."""
+        try:
+            day = datetime.date.fromisoformat(str(text)[:10]).toordinal()
+        except ValueError:
+            day = None
+        self._days[text] = day
+        return day
+
+    def _fold(self, baseline: Baseline, day: int, count: int) -> None:
+        factor = baseline.season[day % 7]
+        value = count / factor
+        if baseline.days == 0:
+            baseline.level = value
+        diff = value - baseline.level
+        baseline.level += self.alpha * diff
+        baseline.var = (1 - self.alpha) * (baseline.var + self.alpha * diff * diff)
+        if baseline.level > 0:
+            factor = (1 - self.gamma) * factor + self.gamma * count / baseline.level
+            baseline.season[day % 7] = min(max(factor, SEASON_BOUNDS[0]), SEASON_BOUNDS[1])
+        baseline.days += 1
+
+    def _open(self, baseline: Baseline, day: int) -> None:
+        baseline.day, baseline.count = day, 0
+        if baseline.days < self.warmup_days:
+            baseline.trigger = NEVER
+            return
+        factor = baseline.season[day % 7]
+        baseline.expected = baseline.level * factor
+        # Poisson floor: a quiet, steady key should not alert on one extra incident
+        baseline.spread = max(math.sqrt(baseline.var) * factor, math.sqrt(max(baseline.expected, 1.0)))
+        baseline.trigger = max(self.min_count, math.ceil(baseline.expected + self.z * baseline.spread))
+
+    def _alert(self, kind: str, value: str, baseline: Baseline) -> Alert:
+        return Alert(kind, value, datetime.date.fromordinal(baseline.day).isoformat(), baseline.count,
+                     round(baseline.expected, 2), round((baseline.count - baseline.expected) / baseline.spread, 2))
+
+    def _roll(self, kind: str, value: str, baseline: Baseline, day: int) -> None:
+        if baseline.count >= baseline.trigger:
+            self.alerts.append(self._alert(kind, value, baseline))  # final count of the alerting day
+        self._fold(baseline, baseline.day, baseline.count)
+        for quiet in range(max(baseline.day + 1, day - MAX_GAP_DAYS), day):
+            self._fold(baseline, quiet, 0)
+        self._open(baseline, day)
+
+    def process(self, events: Iterable[Tuple[str, str, str]]) -> int:
+        """Feed (date, incident_type, severity) events. New alerts are appended to self.alerts. Returns events used."""
+        days, used = self._days, 0
+        by_type, by_severity = self.baselines["incident_type"], self.baselines["severity"]
+        # the hot loop: both keys are handled inline, with no per-event allocations
+        for date, incident_type, severity in events:
+            day = days[date] if date in days else self._day(date)
+            if day is None:
+                continue
+            used += 1
+            baseline = by_type.get(incident_type)
+            if baseline is None:
+                baseline = by_type[incident_type] = Baseline(day)
+            elif day > baseline.day:
+                self._roll("incident_type", incident_type, baseline, day)
+            baseline.count += 1
+            if baseline.count == baseline.trigger:
+                self.alerts.append(self._alert("incident_type", incident_type, baseline))
+            baseline = by_severity.get(severity)
+            if baseline is None:
+                baseline = by_severity[severity] = Baseline(day)
+            elif day > baseline.day:
+                self._roll("severity", severity, baseline, day)
+            baseline.count += 1
+            if baseline.count == baseline.trigger:
+                self.alerts.append(self._alert("severity", severity, baseline))
+        return used
+
+    def open_alerts(self) -> List[Alert]:
+        """Alerts for the days still open, with their current counts."""
+        return [self._alert(kind, value, baseline) for kind, keyed in self.baselines.items()
+                for value, baseline in keyed.items() if baseline.count >= baseline.trigger]
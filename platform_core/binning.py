@@ -0,0 +1,67 @@
+"""
+Histogram binning shared by the Data Science pages of both trees: bin edges for a numeric
+column, their labels and the SQL CASE ladder that assigns values to bins.
+"""
+import numpy as np
+
+# "log": equal width on a log scale, for long-tailed sizes and counts
+# "quantile": (about) the same number of datasets per bin
+# "linear": equal width
+STRATEGIES = ("log", "quantile", "linear")
+DEFAULT_BINS = 20
+MAX_BINS = 100
+
+
+def compute_edges(values: np.ndarray, strategy: str = "log", bins: int = DEFAULT_BINS) -> np.ndarray:
+    """
+    Increasing bin edges covering `values`, at most bins + 1 of them. Log bins start at the
+    smallest positive value; zeros and negatives fall into the first bin.
+    """
+    if strategy not in STRATEGIES:
+        raise ValueError(f"Unknown binning strategy '{strategy}'. Choose one of: {', '.join(STRATEGIES)}")
+    bins = max(1, min(int(bins), MAX_BINS))
+    values = np.asarray(values, dtype="float64")
+    values = values[np.isfinite(values)]
+    if values.size == 0:
+        return np.array([0.0, 1.0])
+    low, high = float(values.min()), float(values.max())
+    if low == high:
+        return np.array([low, high + 1.0])
+
+    if strategy == "quantile":
+        edges = np.quantile(values, np.linspace(0, 1, bins + 1))
+    elif strategy == "log":
+        positive = values[values > 0]
+        if positive.size == 0 or positive.min() == high:
+            edges = np.linspace(low, high, bins + 1)
+        else:
+            edges = np.geomspace(positive.min(), high, bins + 1)
+            edges[0] = min(edges[0], low)
+    else:
+        edges = np.linspace(low, high, bins + 1)
+    return np.unique(edges)  # repeated values collapse duplicate quantile edges
+
+
+def bin_expression(column: str, edges: np.ndarray) -> str:
+    """CASE ladder giving each value the index of its bin; the last bin includes its upper edge."""
+    inner = edges[1:-1]
+    if not len(inner):
+        return "0"
+    whens = " ".join(f"WHEN {column} < {float(edge)!r} THEN {i}" for i, edge in enumerate(inner))
+    return f"CASE {whens} ELSE {len(inner)} END"
+
+
+def _format(value: float, digits: int) -> str:
+    for divisor, suffix in ((1e9, "B"), (1e6, "M"), (1e3, "K")):
+        if abs(value) >= divisor:
+            return f"{value / divisor:.{digits}g}{suffix}"
+    return f"{value:.{digits}g}"
+
+
+def bin_labels(edges: np.ndarray) -> list:
+    """"start–end" per bin, with as few digits as keep the labels distinct."""
+    for digits in range(3, 10):
+        labels = [f"{_format(start, digits)}–{_format(end, digits)}" for start, end in zip(edges[:-1], edges[1:])]
+        if len(set(labels)) == len(labels):
+            break
+    return labels
@@ -0,0 +1,126 @@
+"""
+Near-duplicate detection shared by app/data/dedup.py and
+multi_domain_platform/services/incident_dedup.py: MinHash signatures over the
+character shingles of a description, their LSH band buckets, and the grouping of
+bucket-mates into clusters. The two trees keep their own index tables and sync.
+"""
+import hashlib
+import json
+import re
+import zlib
+import numpy as np
+import pandas as pd
+from typing import Dict, List, Mapping, Optional, Sequence
+
+PRIME = (1 << 32) + 15  # smallest prime above 2^32: a * hash + b stays below 2^64
+SEED = 1510             # fixed, so stored signatures stay comparable between processes
+
+
+def normalize(text: str) -> str:
+    """Lowercase, numbers (IPs, counts, ticket refs) masked, punctuation dropped, whitespace collapsed."""
+    text = re.sub(r"\d+", "0", str(text or "").lower())
+    return " ".join(re.sub(r"[^a-z0-9]+", " ", text).split())
+
+
+def shingles(text: str, size: int = 5) -> set:
+    """Character `size`-grams of the normalized text; a shorter text is one shingle."""
+    text = normalize(text)
+    if len(text) <= size:
+        return {text} if text else set()
+    return {text[i:i + size] for i in range(len(text) - size + 1)}
+
+
+class MinHasher:
+    """MinHash signatures (uint32) and their LSH band buckets."""
+
+    def __init__(self, num_perm: int = 128, bands: int = 16, shingle: int = 5, seed: int = SEED):
+        if num_perm % bands:
+            raise ValueError(f"DEDUP_NUM_PERM ({num_perm}) must be a multiple of DEDUP_BANDS ({bands})")
+        rng = np.random.default_rng(seed)
+        self.num_perm, self.bands, self.shingle, self.seed = num_perm, bands, shingle, seed
+        self._a = rng.integers(1, 1 << 32, num_perm, dtype=np.uint64)
+        self._b = rng.integers(0, 1 << 32, num_perm, dtype=np.uint64)
+
+    @property
+    def params(self) -> str:
+        """The settings signatures depend on; an index built with other params must be rebuilt."""
+        return json.dumps({"num_perm": self.num_perm, "bands": self.bands, "shingle": self.shingle,
+                           "seed": self.seed})
+
+    def signature(self, text: str) -> Optional[np.ndarray]:
+        """The text's signature, or None for an empty description (never a duplicate of anything)."""
+        parts = shingles(text, self.shingle)
+        if not parts:
+            return None
+        # crc32 rather than hash(): str hashes are salted per process
+        hashes = np.fromiter((zlib.crc32(s.encode("utf-8")) for s in parts), dtype=np.uint64, count=len(parts))
+        return ((self._a[:, None] * hashes[None, :] + self._b[:, None]) % PRIME).min(axis=1).astype(np.uint32)
+
+    def buckets(self, signature: np.ndarray) -> List[int]:
+        """One signed 64-bit bucket id per band."""
+        return [int.from_bytes(hashlib.blake2b(band.tobytes(), digest_size=8).digest(), "big", signed=True)
+                for band in signature.reshape(self.bands, -1)]
+
+
+def cluster_frame(groups: Sequence[Sequence[int]], signatures: Mapping[int, np.ndarray],
+                  threshold: float) -> pd.DataFrame:
+    """
+    Union the incidents of each LSH bucket (`groups`) whose estimated similarity reaches
+    `threshold`: incident_id, cluster_id (the group's lowest id) and similarity to that
+    incident, for every incident with at least one near-duplicate.
+    """
+    parent: Dict[int, int] = {}
+
+    def find(i: int) -> int:
+        parent.setdefault(i, i)
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    # each bucket is checked against its lowest id only, so a bucket of n incidents costs n comparisons
+    for group in groups:
+        group = sorted(group)
+        anchor = group[0]
+        others = [i for i in group[1:] if find(i) != find(anchor)]
+        if not others:
+            continue
+        matrix = np.stack([signatures[i] for i in others])
+        for i, similarity in zip(others, (matrix == signatures[anchor]).mean(axis=1)):
+            if similarity >= threshold:
+                parent[max(find(i), find(anchor))] = min(find(i), find(anchor))
+
+    roots = {i: find(i) for i in parent}
+    sizes = pd.Series(list(roots.values()), dtype="int64").value_counts()
+    frame = pd.DataFrame({"incident_id": list(roots), "cluster_id": list(roots.values())}, dtype="int64")
+    frame = frame[frame["cluster_id"].map(sizes) > 1]
+    frame["similarity"] = [float(np.mean(signatures[i] == signatures[c]))
+                           for i, c in zip(frame["incident_id"], frame["cluster_id"])]
+    return frame.sort_values(["cluster_id", "incident_id"]).reset_index(drop=True)
+
+
+def collapse_frame(incidents: pd.DataFrame, clusters: pd.DataFrame,
+                   severity_levels: Mapping[str, int]) -> pd.DataFrame:
+    """
+    One row per group of near-duplicate incidents (and per incident without duplicates):
+    the group's first incident, how many there are, their ids, date range, highest
+    severity and how many are still open. Largest groups first.
+    """
+    frame = incidents.merge(clusters[["incident_id", "cluster_id"]], how="left",
+                            left_on="id", right_on="incident_id")
+    frame["cluster_id"] = frame["cluster_id"].fillna(frame["id"]).astype("int64")
+    frame["severity_level"] = frame["severity"].map(lambda s: severity_levels.get(str(s).lower(), 0))
+    frame["is_open"] = frame["status"].isin(["Open", "In Progress"])
+    frame = frame.sort_values("id")
+    grouped = frame.groupby("cluster_id", sort=False)
+    collapsed = pd.DataFrame({
+        "incidents": grouped.size(),
+        "incident_ids": grouped["id"].agg(lambda ids: ", ".join(map(str, ids))),
+        "first_date": grouped["date"].min(),
+        "last_date": grouped["date"].max(),
+        "incident_type": grouped["incident_type"].first(),
+        "severity": grouped.apply(lambda g: g.loc[g["severity_level"].idxmax(), "severity"]),
+        "open": grouped["is_open"].sum(),
+        "description": grouped["description"].first(),
+    }).reset_index()
+    return collapsed.sort_values(["incidents", "last_date"], ascending=False).reset_index(drop=True)
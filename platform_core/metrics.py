@@ -0,0 +1,382 @@
+"""
+Process-wide metrics registry with Prometheus text exposition.
+
+Metrics both trees record (bcrypt, logins, LLM calls, sessions) are declared
+here; the database metrics differ per tree and are declared by
+app/data/metrics.py and multi_domain_platform/services/metrics.py, which also
+pass their settings to start_exporter().
+"""
+import os
+import threading
+import time
+from bisect import bisect_left
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+# Latency buckets in seconds, shared by the DB, bcrypt and LLM histograms
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+
+class _Sharded:
+    """
+    Per-thread value slots: a thread only ever writes its own slot, so updates
+    need no lock (the GIL makes the slot lookup/creation atomic). Reads sum all slots.
+    """
+
+    def __init__(self, width: int):
+        self._width = width
+        self._slots: Dict[int, List[float]] = {}
+
+    def slot(self) -> List[float]:
+        ident = threading.get_ident()
+        slot = self._slots.get(ident)
+        if slot is None:
+            slot = self._slots.setdefault(ident, [0.0] * self._width)
+        return slot
+
+    def totals(self) -> List[float]:
+        totals = [0.0] * self._width
+        for slot in list(self._slots.values()):
+            for i, value in enumerate(slot):
+                totals[i] += value
+        return totals
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], object] = {}
+        self._lock = threading.Lock()  # only taken when a new label combination first appears
+
+    def labels(self, *values: str, **kwargs: str):
+        key = tuple(str(v) for v in values) or tuple(str(kwargs[name]) for name in self.labelnames)
+        child = self._children.get(key)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(key, self._new_child())
+        return child
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def _label_text(self, key: Tuple[str, ...], extra: str = "") -> str:
+        pairs = [f'{name}="{_escape(value)}"' for name, value in zip(self.labelnames, key)]
+        if extra:
+            pairs.append(extra)
+        return "{" + ",".join(pairs) + "}" if pairs else ""
+
+    def expose(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        for key, child in sorted(self._children.items()):
+            lines.extend(self._expose_child(key, child))
+        return lines
+
+
+class _CounterChild:
+    __slots__ = ("_values",)
+
+    def __init__(self):
+        self._values = _Sharded(1)
+
+    def inc(self, amount: float = 1.0) -> None:
+        self._values.slot()[0] += amount
+
+    def value(self) -> float:
+        return self._values.totals()[0]
+
+
+class Counter(_Metric):
+    """Monotonic counter. Use .labels(...).inc() or .inc() when it has no labels."""
+    kind = "counter"
+
+    def _new_child(self):
+        return _CounterChild()
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.labels().inc(amount)
+
+    def _expose_child(self, key, child):
+        return [f"{self.name}{self._label_text(key)} {_number(child.value())}"]
+
+
+class _GaugeChild:
+    __slots__ = ("_value", "_deltas", "_callback")
+
+    def __init__(self):
+        self._value = 0.0
+        self._deltas = _Sharded(1)
+        self._callback: Optional[Callable[[], float]] = None
+
+    def set(self, value: float) -> None:
+        self._value = value
+        self._deltas = _Sharded(1)
+
+    def inc(self, amount: float = 1.0) -> None:
+        self._deltas.slot()[0] += amount
+
+    def dec(self, amount: float = 1.0) -> None:
+        self._deltas.slot()[0] -= amount
+
+    def set_function(self, callback: Callable[[], float]) -> None:
+        """Compute the value at scrape time instead of tracking it."""
+        self._callback = callback
+
+    def value(self) -> float:
+        if self._callback is not None:
+            return float(self._callback())
+        return self._value + self._deltas.totals()[0]
+
+
+class Gauge(_Metric):
+    """Value that can go up and down, or be computed on scrape with set_function()."""
+    kind = "gauge"
+
+    def _new_child(self):
+        return _GaugeChild()
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.labels().inc(amount)
+
+    def dec(self, amount: float = 1.0) -> None:
+        self.labels().dec(amount)
+
+    def set(self, value: float) -> None:
+        self.labels().set(value)
+
+    def set_function(self, callback: Callable[[], float]) -> None:
+        self.labels().set_function(callback)
+
+    def _expose_child(self, key, child):
+        try:
+            value = child.value()
+        except Exception:
+            return []  # a failing callback must not break the scrape
+        return [f"{self.name}{self._label_text(key)} {_number(value)}"]
+
+
+class _HistogramChild:
+    __slots__ = ("_buckets", "_values")
+
+    def __init__(self, buckets: Tuple[float, ...]):
+        self._buckets = buckets
+        # one slot per bucket, then +Inf, sum
+        self._values = _Sharded(len(buckets) + 2)
+
+    def observe(self, value: float) -> None:
+        slot = self._values.slot()
+        slot[bisect_left(self._buckets, value)] += 1
+        slot[-1] += value
+
+    def time(self) -> "_Timer":
+        return _Timer(self)
+
+
+class Histogram(_Metric):
+    """Latency histogram with cumulative le buckets, as Prometheus expects."""
+    kind = "histogram"
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, help_text, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def _new_child(self):
+        return _HistogramChild(self.buckets)
+
+    def observe(self, value: float) -> None:
+        self.labels().observe(value)
+
+    def time(self) -> "_Timer":
+        return self.labels().time()
+
+    def _expose_child(self, key, child):
+        totals = child._values.totals()
+        lines, cumulative = [], 0.0
+        for bound, count in zip(self.buckets + (float("inf"),), totals[:-1]):
+            cumulative += count
+            le = "+Inf" if bound == float("inf") else _number(bound)
+            le_label = f'le="{le}"'
+            lines.append(f"{self.name}_bucket{self._label_text(key, le_label)} {_number(cumulative)}")
+        lines.append(f"{self.name}_sum{self._label_text(key)} {_number(totals[-1])}")
+        lines.append(f"{self.name}_count{self._label_text(key)} {_number(cumulative)}")
+        return lines
+
+
+class _Timer:
+    """Context manager that observes the elapsed seconds into a histogram child."""
+    __slots__ = ("_child", "_start")
+
+    def __init__(self, child: _HistogramChild):
+        self._child = child
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self._child.observe(time.perf_counter() - self._start)
+        return False
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _number(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+class Registry:
+    """Holds every metric of the process; get-or-create so page reruns can re-declare them."""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def _get(self, cls, name: str, help_text: str, labelnames: Sequence[str], **kwargs):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, help_text, labelnames, **kwargs)
+            elif not isinstance(metric, cls):
+                raise ValueError(f"Metric '{name}' is already registered as a {metric.kind}")
+            return metric
+
+    def counter(self, name: str, help_text: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._get(Counter, name, help_text, labelnames)
+
+    def gauge(self, name: str, help_text: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._get(Gauge, name, help_text, labelnames)
+
+    def histogram(self, name: str, help_text: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._get(Histogram, name, help_text, labelnames, buckets=buckets)
+
+    def render_text(self) -> str:
+        """Prometheus text exposition format (version 0.0.4)."""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines: List[str] = []
+        for metric in metrics:
+            lines.extend(metric.expose())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+# --- Metrics recorded by both trees ---
+BCRYPT_SECONDS = REGISTRY.histogram("platform_bcrypt_seconds", "bcrypt hash/check latency.", ["op"])
+LOGINS = REGISTRY.counter("platform_logins_total", "Login attempts by result.", ["result"])
+LLM_REQUESTS = REGISTRY.counter("platform_llm_requests_total", "LLM requests by model and status.",
+                                ["model", "status"])
+LLM_SECONDS = REGISTRY.histogram("platform_llm_request_seconds", "LLM request latency, including streaming.",
+                                 ["model"])
+LLM_TOKENS = REGISTRY.counter("platform_llm_tokens_total", "LLM tokens by model and kind.", ["model", "kind"])
+ACTIVE_SESSIONS = REGISTRY.gauge("platform_streamlit_sessions_active", "Connected Streamlit sessions.")
+
+
+def _active_sessions() -> float:
+    from streamlit.runtime import Runtime  # imported lazily: only meaningful inside a Streamlit server
+    if not Runtime.exists():
+        return 0
+    return Runtime.instance()._session_mgr.num_active_sessions()
+
+
+ACTIVE_SESSIONS.set_function(_active_sessions)
+
+
+def record_llm_request(model: str, seconds: float, status: str = "ok",
+                       prompt_tokens: int = 0, completion_tokens: int = 0) -> None:
+    LLM_REQUESTS.labels(model, status).inc()
+    LLM_SECONDS.labels(model).observe(seconds)
+    if prompt_tokens:
+        LLM_TOKENS.labels(model, "prompt").inc(prompt_tokens)
+    if completion_tokens:
+        LLM_TOKENS.labels(model, "completion").inc(completion_tokens)
+
+
+def metered_stream(model: str, stream, started: Optional[float] = None):
+    """
+    Yield the chunks of a streamed chat completion, then record its latency and token
+    usage. The usage-only chunk sent with stream_options={"include_usage": True} is not yielded.
+    """
+    started = time.perf_counter() if started is None else started
+    prompt_tokens = completion_tokens = 0
+    status = "error"
+    try:
+        for chunk in stream:
+            usage = getattr(chunk, "usage", None)
+            if usage is not None:
+                prompt_tokens, completion_tokens = usage.prompt_tokens, usage.completion_tokens
+            if chunk.choices:
+                yield chunk
+        status = "ok"
+    finally:
+        record_llm_request(model, time.perf_counter() - started, status, prompt_tokens, completion_tokens)
+
+
+# --- Exposition ---
+_EXPORTERS: Dict[str, threading.Thread] = {}
+_EXPORTERS_LOCK = threading.Lock()
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] not in ("/", "/metrics"):
+            self.send_error(404)
+            return
+        body = REGISTRY.render_text().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass  # scrapes every few seconds would flood the console
+
+
+def write_textfile(path) -> None:
+    """Write the exposition atomically, e.g. for node_exporter's textfile collector."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temp_path = path.with_name(path.name + ".tmp")
+    temp_path.write_text(REGISTRY.render_text())
+    os.replace(temp_path, path)
+
+
+def start_exporter(port: int = 0, textfile="", textfile_seconds: float = 15) -> None:
+    """
+    Start (once per process) the requested exporters: an HTTP /metrics endpoint on `port`
+    and/or `textfile` rewritten every `textfile_seconds`. Nothing starts when both are unset.
+    """
+    if not port and not textfile:
+        return
+    with _EXPORTERS_LOCK:
+        if port and "http" not in _EXPORTERS:
+            try:
+                server = ThreadingHTTPServer(("0.0.0.0", int(port)), _MetricsHandler)
+            except OSError as e:
+                print(f"⚠️ Metrics endpoint not started on port {port}: {e}")
+            else:
+                thread = threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True)
+                thread.start()
+                _EXPORTERS["http"] = thread
+
+        if textfile and "textfile" not in _EXPORTERS:
+            def write_loop():
+                while True:
+                    try:
+                        write_textfile(textfile)
+                    except OSError as e:
+                        print(f"Metrics textfile write failed: {e}")
+                    time.sleep(textfile_seconds)
+
+            thread = threading.Thread(target=write_loop, name="metrics-textfile", daemon=True)
+            thread.start()
+            _EXPORTERS["textfile"] = thread
@@ -0,0 +1,150 @@
+"""
+Dataset file profiling shared by app/data/profiler.py and
+multi_domain_platform/services/dataset_profiler.py: record counts and sizes of CSV,
+JSONL and Parquet files (or folders of them), without loading the data.
+"""
+import mmap
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+# file suffix -> format
+FORMATS = {".csv": "csv", ".jsonl": "jsonl", ".ndjson": "jsonl", ".parquet": "parquet"}
+MB = 1024 * 1024
+SCAN_BYTES = 4 * MB  # slice of the memory map counted at a time, so a worker's memory stays flat
+
+
+class FileProfile(NamedTuple):
+    """What the profiler found for one dataset file (or directory of files)."""
+    path: str
+    file_format: str
+    record_count: Optional[int]
+    size_bytes: int
+    error: str = ""  # empty when the file was profiled
+
+    @property
+    def ok(self) -> bool:
+        return not self.error
+
+    @property
+    def file_size_mb(self) -> float:
+        return round(self.size_bytes / MB, 2)
+
+
+def _count_newlines(path: str, start: int, end: int) -> int:
+    """Newlines in bytes [start, end) of `path`, read through a memory map. Runs in the worker processes."""
+    offset = start - start % mmap.ALLOCATIONGRANULARITY  # mmap offsets must be aligned
+    with open(path, "rb") as handle, \
+            mmap.mmap(handle.fileno(), end - offset, access=mmap.ACCESS_READ, offset=offset) as view:
+        if hasattr(mmap, "MADV_SEQUENTIAL"):
+            view.madvise(mmap.MADV_SEQUENTIAL)
+        count = 0
+        for position in range(start - offset, end - offset, SCAN_BYTES):
+            count += view[position:min(position + SCAN_BYTES, end - offset)].count(b"\n")
+    return count
+
+
+def _parquet_rows(path: Path) -> int:
+    import pyarrow.parquet as pq  # only needed for Parquet datasets
+
+    return pq.read_metadata(path).num_rows  # reads the footer; no row group is loaded
+
+
+def data_files(path: Path) -> List[Path]:
+    """`path` itself, or the data files under it when it is a directory (e.g. a partitioned Parquet export)."""
+    if path.is_dir():
+        return sorted(p for p in path.rglob("*") if p.is_file() and p.suffix.lower() in FORMATS)
+    return [path]
+
+
+def profile_files(paths: Iterable[Path], workers: int = 0, chunk_bytes: int = 64 * MB) -> Dict[Path, FileProfile]:
+    """
+    Count the records and bytes of each path. CSV and JSONL records are lines (less the CSV
+    header); their files are split into `chunk_bytes` ranges and, once there is more than one
+    chunk's worth of bytes in total, the ranges are counted in a process pool of `workers` (0 = one
+    per CPU). Parquet row counts come from the file footers. A directory is profiled as the sum of
+    the data files under it.
+    """
+    paths = [Path(p) for p in paths]
+    members = {path: data_files(path) for path in paths}
+    ranges: List[Tuple[Path, int, int]] = []
+    results: Dict[Path, Tuple[int, str]] = {}  # file -> (records, error) for files needing no scan
+    sizes: Dict[Path, int] = {}
+    for files in members.values():
+        for file in files:
+            if file in sizes or file in results:
+                continue
+            file_format = FORMATS.get(file.suffix.lower())
+            try:
+                sizes[file] = file.stat().st_size
+                if file_format is None:
+                    results[file] = (None, f"unsupported file type '{file.suffix}'")
+                elif file_format == "parquet":
+                    results[file] = (_parquet_rows(file), "")
+                elif sizes[file] == 0:
+                    results[file] = (0, "")
+                else:
+                    ranges.extend((file, start, min(start + chunk_bytes, sizes[file]))
+                                  for start in range(0, sizes[file], chunk_bytes))
+            except Exception as e:  # missing/unreadable file or a corrupt Parquet footer
+                sizes.setdefault(file, 0)
+                results[file] = (None, str(e))
+
+    newlines: Dict[Path, int] = {}
+    if ranges:
+        jobs = ([str(r[0]) for r in ranges], [r[1] for r in ranges], [r[2] for r in ranges])
+        workers = workers or os.cpu_count() or 1
+        # a pool pays off once there is more than one chunk's worth of bytes to count
+        if workers > 1 and sum(end - start for _file, start, end in ranges) > chunk_bytes:
+            with ProcessPoolExecutor(max_workers=min(workers, len(ranges))) as pool:
+                counts = list(pool.map(_count_newlines, *jobs))
+        else:
+            counts = list(map(_count_newlines, *jobs))
+        for (file, _start, _end), count in zip(ranges, counts):
+            newlines[file] = newlines.get(file, 0) + count
+
+    for file, count in newlines.items():
+        with open(file, "rb") as handle:
+            handle.seek(-1, os.SEEK_END)
+            unterminated = handle.read(1) != b"\n"  # a last line without a newline is still a record
+        header = 1 if FORMATS[file.suffix.lower()] == "csv" else 0
+        results[file] = (max(count + unterminated - header, 0), "")
+
+    profiles = {}
+    for path, files in members.items():
+        formats = {FORMATS.get(f.suffix.lower(), f.suffix) for f in files}
+        errors = [f"{f.name}: {results[f][1]}" if len(files) > 1 else results[f][1] for f in files if results[f][1]]
+        if not files:
+            errors = ["no CSV, JSONL or Parquet files in the folder"]
+        profiles[path] = FileProfile(
+            str(path), formats.pop() if len(formats) == 1 else "mixed",
+            None if errors else sum(results[f][0] for f in files),
+            sum(sizes[f] for f in files), "; ".join(errors),
+        )
+    return profiles
+
+
+def resolve(dataset_dir: Path, dataset_name: str, file_path: Optional[str] = None) -> Optional[Path]:
+    """
+    The file or folder holding a dataset, or None if there is none on disk: `file_path`
+    (relative to `dataset_dir`, or absolute), else <dataset_name> with a known suffix in `dataset_dir`.
+    """
+    dataset_dir = Path(dataset_dir)
+    if file_path:
+        path = Path(file_path).expanduser()
+        path = path if path.is_absolute() else dataset_dir / path
+        return path if path.exists() else None
+    for suffix in ("", *FORMATS):
+        path = dataset_dir / f"{dataset_name}{suffix}"
+        if path.exists():
+            return path
+    return None
+
+
+def stored_path(dataset_dir: Path, path: Path) -> str:
+    """How a path is kept in datasets_metadata.file_path: relative to `dataset_dir` when inside it."""
+    try:
+        return str(Path(path).relative_to(dataset_dir))
+    except ValueError:
+        return str(path)
@@ -0,0 +1,146 @@
+"""
+SQL for the daily/weekly rollup tables behind the dashboards' time-series charts.
+
+The daily tables are kept current by SQLite triggers, so every insert, update
+or delete on the source tables adjusts the matching count; weekly numbers are
+views over the daily tables. app/data/rollups.py and
+multi_domain_platform/services/rollup_manager.py run these statements.
+"""
+from typing import List, Optional, Tuple
+
+# rollup table -> (source table, date column, grouping columns)
+ROLLUPS = {
+    "incident_daily_rollup": ("cyber_incidents", "date", ["incident_type", "severity", "status"]),
+    "ticket_daily_rollup": ("it_tickets", "created_date", ["priority", "status", "category"]),
+}
+
+
+def _key_values(ref: str, date_column: str, keys: List[str]) -> List[str]:
+    """SQL expressions for the rollup key of the NEW/OLD row."""
+    return [f"COALESCE(date({ref}.{date_column}), '')"] + [f"COALESCE({ref}.{key}, '')" for key in keys]
+
+
+def rollup_ddl(rollup: str, source: str, date_column: str, keys: List[str]) -> str:
+    """CREATE statements for one rollup table, its weekly view and its triggers."""
+    columns = ["day"] + keys
+    column_list = ", ".join(columns)
+    weekly = rollup.replace("_daily_", "_weekly_")
+
+    def add(ref: str) -> str:
+        values = ", ".join(_key_values(ref, date_column, keys))
+        return (f"INSERT INTO {rollup} ({column_list}, count) VALUES ({values}, 1) "
+                f"ON CONFLICT({column_list}) DO UPDATE SET count = count + 1;")
+
+    def remove(ref: str) -> str:
+        match = " AND ".join(f"{column} = {value}"
+                             for column, value in zip(columns, _key_values(ref, date_column, keys)))
+        return (f"UPDATE {rollup} SET count = count - 1 WHERE {match}; "
+                f"DELETE FROM {rollup} WHERE {match} AND count <= 0;")
+
+    key_definitions = ", ".join(f"{key} TEXT NOT NULL" for key in keys)
+    return f"""
+    CREATE TABLE IF NOT EXISTS {rollup} (
+        day TEXT NOT NULL,
+        {key_definitions},
+        count INTEGER NOT NULL,
+        PRIMARY KEY ({column_list})
+    );
+    CREATE VIEW IF NOT EXISTS {weekly} AS
+        SELECT date(day, 'weekday 0', '-6 days') AS week_start, {", ".join(keys)}, SUM(count) AS count
+        FROM {rollup}
+        WHERE day != ''
+        GROUP BY week_start, {", ".join(keys)};
+    CREATE TRIGGER IF NOT EXISTS trg_{rollup}_insert AFTER INSERT ON {source}
+    BEGIN {add("NEW")} END;
+    CREATE TRIGGER IF NOT EXISTS trg_{rollup}_delete AFTER DELETE ON {source}
+    BEGIN {remove("OLD")} END;
+    CREATE TRIGGER IF NOT EXISTS trg_{rollup}_update AFTER UPDATE OF {date_column}, {", ".join(keys)} ON {source}
+    BEGIN {remove("OLD")} {add("NEW")} END;
+    """
+
+
+def rebuild_sql(rollup: str, source: str, date_column: str, keys: List[str]) -> str:
+    """SQL that recomputes one rollup table from `source` (a table or view)."""
+    columns = ", ".join(["day"] + keys)
+    values = ", ".join(_key_values(source, date_column, keys))
+    group_by = ", ".join(str(i) for i in range(1, len(keys) + 2))
+    return f"""
+    DELETE FROM {rollup};
+    INSERT INTO {rollup} ({columns}, count)
+        SELECT {values}, COUNT(*) FROM {source} GROUP BY {group_by};
+    """
+
+
+def schema_script(existing_tables) -> str:
+    """
+    One transaction creating every rollup table, view and trigger; tables not in
+    `existing_tables` yet are filled from their source table.
+    """
+    script = ["BEGIN;"]
+    for rollup, (source, date_column, keys) in ROLLUPS.items():
+        script.append(rollup_ddl(rollup, source, date_column, keys))
+        if rollup not in existing_tables:
+            script.append(rebuild_sql(rollup, source, date_column, keys))
+    script.append("COMMIT;")
+    return "\n".join(script)
+
+
+def rebuild_script(views) -> str:
+    """One transaction recomputing every rollup, from <source>_all when that view is in `views`."""
+    script = ["BEGIN;"]
+    for rollup, (source, date_column, keys) in ROLLUPS.items():
+        if f"{source}_all" in views:
+            source = f"{source}_all"  # hot rows plus archived ones
+        script.append(rebuild_sql(rollup, source, date_column, keys))
+    script.append("COMMIT;")
+    return "\n".join(script)
+
+
+def recount_sql(source: str, rows_table: str, where: str) -> List[Tuple[str, str]]:
+    """
+    (rollup, statement) pairs adding the rows of `rows_table` matching `where` back into the rollups of
+    `source`. The archivers run them after moving rows out, since the delete trigger
+    has just subtracted them and the rollups count history, not just the hot table.
+    """
+    statements = []
+    for rollup, (rollup_source, date_column, keys) in ROLLUPS.items():
+        if rollup_source != source:
+            continue
+        columns = ", ".join(["day"] + keys)
+        values = ", ".join(_key_values(rows_table, date_column, keys))
+        group_by = ", ".join(str(i) for i in range(1, len(keys) + 2))
+        statements.append((rollup,
+            f"INSERT INTO {rollup} ({columns}, count) SELECT {values}, COUNT(*) FROM {rows_table} "
+            f"WHERE {where} GROUP BY {group_by} "
+            f"ON CONFLICT({columns}) DO UPDATE SET count = count + excluded.count"
+        ))
+    return statements
+
+
+def trend_query(rollup: str, by: str, freq: str, start: Optional[str] = None,
+                end: Optional[str] = None) -> Tuple[str, list]:
+    """SELECT (and its parameters) for counts per day/week and `by` value from a rollup table."""
+    keys = ROLLUPS[rollup][2]
+    if by not in keys:
+        raise ValueError(f"Cannot group {rollup} by '{by}'. Choose one of: {', '.join(keys)}")
+    if freq not in ("daily", "weekly"):
+        raise ValueError("freq must be 'daily' or 'weekly'")
+
+    period = "day" if freq == "daily" else "date(day, 'weekday 0', '-6 days')"
+    conditions = ["day != ''"]
+    params = []
+    if start:
+        conditions.append("day >= ?")
+        params.append(str(start))
+    if end:
+        conditions.append("day <= ?")
+        params.append(str(end))
+
+    query = f"""
+    SELECT {period} AS period, {by}, SUM(count) AS count
+    FROM {rollup}
+    WHERE {" AND ".join(conditions)}
+    GROUP BY period, {by}
+    ORDER BY period
+    """
+    return query, params
@@ -0,0 +1,130 @@
+"""
+Status workflow shared by tickets and incidents: which status may move to which, and
+the statements that move every row matching a filter in one UPDATE.
+multi_domain_platform/models/status_workflow.py runs them through DatabaseManager,
+app/data/transitions.py on a sqlite3 connection.
+"""
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+STATUSES = ("Open", "In Progress", "Resolved", "Closed")
+
+# status -> statuses it may move to. Closed work can only be reopened.
+TRANSITIONS: Dict[str, Tuple[str, ...]] = {
+    "Open": ("In Progress", "Resolved", "Closed"),
+    "In Progress": ("Open", "Resolved", "Closed"),
+    "Resolved": ("Open", "In Progress", "Closed"),
+    "Closed": ("Open",),
+}
+
+
+def can_transition(current: str, new_status: str) -> bool:
+    return new_status in TRANSITIONS.get(current, ())
+
+
+def sources_for(new_status: str) -> List[str]:
+    """Statuses allowed to move to `new_status`."""
+    if new_status not in TRANSITIONS:
+        raise ValueError(f"Unknown status '{new_status}'. Expected one of: {', '.join(STATUSES)}")
+    return [status for status in STATUSES if can_transition(status, new_status)]
+
+
+class TransitionResult(NamedTuple):
+    """Outcome (or, for a dry run, the forecast) of a multi-row status transition."""
+    new_status: str
+    dry_run: bool
+    changed: int                 # rows moved (or that would move) to new_status
+    unchanged: int               # rows already in new_status
+    blocked: Dict[str, int]      # current status -> rows the state machine does not allow to move
+    changed_keys: List[object]   # keys of the moved rows (from RETURNING); empty for a dry run
+
+    @property
+    def matched(self) -> int:
+        return self.changed + self.unchanged + sum(self.blocked.values())
+
+    def summary(self) -> str:
+        verb = "would move" if self.dry_run else "moved"
+        text = f"{self.matched:,} matched: {self.changed:,} {verb} to {self.new_status}, {self.unchanged:,} already {self.new_status}"
+        if self.blocked:
+            text += ", blocked: " + ", ".join(f"{n:,} {status}" for status, n in sorted(self.blocked.items()))
+        return text
+
+
+def build_filter(keys: Optional[Iterable[object]] = None, key_column: str = "id",
+                 equals: Optional[Dict[str, Sequence[str]]] = None, date_column: Optional[str] = None,
+                 older_than_days: Optional[int] = None) -> Tuple[str, list]:
+    """
+    WHERE clause (without the keyword) and its parameters for a transition.
+    `equals` maps column -> accepted values; empty/None lists are ignored.
+    Column names come from the callers, never from user input.
+    """
+    clauses: List[str] = []
+    params: list = []
+    if keys is not None:
+        keys = list(keys)
+        clauses.append(f"{key_column} IN ({', '.join('?' * len(keys))})" if keys else "0")
+        params.extend(keys)
+    for column, values in (equals or {}).items():
+        if values:
+            clauses.append(f"{column} IN ({', '.join('?' * len(values))})")
+            params.extend(values)
+    if older_than_days is not None and date_column:
+        # dates are TEXT YYYY-MM-DD, sometimes with stray whitespace
+        clauses.append(f"date(trim({date_column})) < date('now', ?)")
+        params.append(f"-{int(older_than_days)} days")
+    return " AND ".join(clauses) or "1", params
+
+
+def count_statement(table: str, where: str, params: Sequence[object]) -> Tuple[str, list]:
+    """Per-status counts of the rows matching `where`; all a dry run needs."""
+    return f"SELECT status, COUNT(*) FROM {table} WHERE {where} GROUP BY status", list(params)
+
+
+def transition_statements(table: str, key_column: str, new_status: str, where: str,
+                          params: Sequence[object], extra_set: str = "",
+                          extra_params: Sequence[object] = ()) -> List[Tuple[str, list]]:
+    """
+    The (sql, params) statements of a transition, to run in order in one write transaction
+    so the counts describe exactly the rows the UPDATE saw: the per-status counts, then
+    UPDATE ... WHERE ... AND status IN (allowed sources) RETURNING key.
+    `extra_params` fill the placeholders of `extra_set`.
+    """
+    sources = sources_for(new_status)
+    placeholders = ", ".join("?" * len(sources))
+    return [
+        count_statement(table, where, params),
+        (f"UPDATE {table} SET status = ?{extra_set} WHERE ({where}) AND status IN ({placeholders}) "
+         f"RETURNING {key_column}", [new_status, *extra_params, *params, *sources]),
+    ]
+
+
+def status_statement(table: str, key_column: str, where: str, params: Sequence[object]) -> Tuple[str, list]:
+    """(key, status) of every row matching `where`; run after the UPDATE, it shows which rows stayed put."""
+    return f"SELECT {key_column}, status FROM {table} WHERE {where}", list(params)
+
+
+def tally(new_status: str, counts: Iterable[Tuple[str, int]], changed_keys: Iterable[object] = (),
+          dry_run: bool = False) -> TransitionResult:
+    """TransitionResult from the per-status counts and the keys the UPDATE returned."""
+    sources = sources_for(new_status)
+    counts = dict(counts)
+    unchanged = counts.pop(new_status, 0)
+    blocked = {str(status): n for status, n in counts.items() if status not in sources}
+    changed = sum(n for status, n in counts.items() if status in sources)  # == len(changed_keys) when written
+    return TransitionResult(new_status, dry_run, changed, unchanged, blocked, list(changed_keys))
+
+
+def batch_errors(keys: Sequence[object], rows: Iterable[Tuple[object, str]], new_status: str,
+                 name: str = "{}") -> List[Tuple[int, str]]:
+    """
+    [(index, error)] for a transition of `keys`, from the (key, status) rows read after the
+    UPDATE: keys with no row do not exist, rows not in `new_status` were blocked.
+    `name` formats a key for the message, e.g. "#{}".
+    """
+    statuses = dict(rows)
+    errors = []
+    for i, key in enumerate(keys):
+        if key not in statuses:
+            errors.append((i, f"{name.format(key)} not found"))
+        elif statuses[key] != new_status:
+            errors.append((i, f"{name.format(key)} is {statuses[key]} and cannot move to {new_status}"))
+    return errors
@@ -0,0 +1,301 @@
+"""
+SQL tracing: connections whose cursors time every statement, count the statements
+SQLite runs for it (scripts, trigger bodies) and report it to a Tracer, which keeps
+per-process statistics and writes slow statements to a rotating JSON-lines log.
+app/data/tracing.py and multi_domain_platform/services/query_tracer.py each create
+a Tracer from their settings and open connections through it.
+"""
+import json
+import logging
+import os
+import re
+import sqlite3
+import sys
+import threading
+import time
+from functools import lru_cache
+from logging.handlers import RotatingFileHandler
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Sequence
+
+if TYPE_CHECKING:
+    import pandas as pd  # only the reports below need it
+
+# Frames from these files are always skipped when looking for the code that issued a query
+_INTERNAL_FILES = (__file__, f"{os.sep}pandas{os.sep}", f"{os.sep}sqlite3{os.sep}")
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"(?<![\w.])-?\d+(?:\.\d+)?(?![\w.])")
+_PLACEHOLDER_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_COMMENT = re.compile(r"--[^\n]*|/\*.*?\*/", re.S)
+_WHITESPACE = re.compile(r"\s+")
+
+
+@lru_cache(maxsize=4096)
+def normalize_sql(sql: str) -> str:
+    """
+    Collapse a statement to its shape: literals become ?, IN lists become (?...),
+    whitespace and comments are removed, so the same query always groups together.
+    """
+    sql = _COMMENT.sub(" ", sql)
+    sql = _STRING_LITERAL.sub("?", sql)
+    sql = _NUMBER_LITERAL.sub("?", sql)
+    sql = _PLACEHOLDER_LIST.sub("(?...)", sql)
+    return _WHITESPACE.sub(" ", sql).strip()
+
+
+def _caller(internal_files: Sequence[str]) -> str:
+    """file:line function of the first frame outside sqlite3, pandas, this module and `internal_files`."""
+    frame = sys._getframe(2)
+    while frame is not None:
+        filename = frame.f_code.co_filename
+        if not any(part in filename for part in internal_files):
+            return f"{Path(filename).name}:{frame.f_lineno} {frame.f_code.co_name}"
+        frame = frame.f_back
+    return "unknown"
+
+
+def _params_shape(params: Any, many: bool = False) -> str:
+    """Describe the bound parameters without logging their values (they may be password hashes)."""
+    if many:
+        return "executemany"
+    if isinstance(params, dict):
+        return f"{len(params)} named"
+    try:
+        return f"{len(params)} positional"
+    except TypeError:
+        return "none"
+
+
+class Tracer:
+    """
+    Where traced statements go: per-process statistics (top_statements) and, for statements
+    slower than slow_ms (or all of them with log_all), one JSON line each in `log_path`.
+    `internal_files` name the caller's wrappers, skipped when looking for the code that
+    issued a query; `on_finish` is called with every finished statement.
+    """
+
+    def __init__(self, log_path, slow_ms: float = 200, log_all: bool = False, log_bytes: int = 5 * 1024 * 1024,
+                 internal_files: Sequence[str] = (), on_finish: Optional[Callable[["_Trace"], None]] = None):
+        self.log_path = Path(log_path)
+        self.slow_ms = slow_ms
+        self.log_all = log_all
+        self.log_bytes = log_bytes
+        self.internal_files = _INTERNAL_FILES + tuple(internal_files)
+        self.on_finish = on_finish
+        # normalised sql -> [calls, total seconds, max seconds, rows, first caller]
+        self._stats: Dict[str, list] = {}
+        self._stats_lock = threading.Lock()
+        self._logger: Optional[logging.Logger] = None
+        self._logger_lock = threading.Lock()
+
+    def connect(self, database, enabled: bool = True, **kwargs) -> sqlite3.Connection:
+        """sqlite3.connect() whose statements are traced here; a plain connection when not `enabled`."""
+        if not enabled:
+            return sqlite3.connect(database, **kwargs)
+        kwargs.setdefault("factory", TracingConnection)
+        conn = sqlite3.connect(database, **kwargs)
+        if isinstance(conn, TracingConnection):
+            conn._tracer = self
+        return conn
+
+    def _get_logger(self) -> logging.Logger:
+        """Logger writing one JSON object per line to the rotating SQL trace log."""
+        with self._logger_lock:
+            if self._logger is None:
+                logger = logging.getLogger(f"platform.sql.{self.log_path}")
+                logger.setLevel(logging.INFO)
+                logger.propagate = False
+                if not logger.handlers:
+                    self.log_path.parent.mkdir(parents=True, exist_ok=True)
+                    handler = RotatingFileHandler(self.log_path, maxBytes=self.log_bytes, backupCount=3,
+                                                  encoding="utf-8")
+                    handler.setFormatter(logging.Formatter("%(message)s"))
+                    logger.addHandler(handler)
+                self._logger = logger
+            return self._logger
+
+    def record(self, trace: "_Trace") -> None:
+        if self.on_finish is not None:
+            self.on_finish(trace)
+        with self._stats_lock:
+            entry = self._stats.get(trace.sql)
+            if entry is None:
+                self._stats[trace.sql] = [1, trace.seconds, trace.seconds, trace.rows, trace.caller]
+            else:
+                entry[0] += 1
+                entry[1] += trace.seconds
+                entry[2] = max(entry[2], trace.seconds)
+                entry[3] += trace.rows
+
+        duration_ms = trace.seconds * 1000
+        if self.log_all or duration_ms >= self.slow_ms:
+            self._get_logger().info(json.dumps({
+                "ts": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(trace.started)),
+                "slow": duration_ms >= self.slow_ms,
+                "sql": trace.sql,
+                "params": trace.params,
+                "statements": trace.statements,
+                "duration_ms": round(duration_ms, 3),
+                "rows": trace.rows,
+                "caller": trace.caller,
+            }))
+
+    def top_statements(self, n: int = 10) -> "pd.DataFrame":
+        """Statements traced in this process, ordered by total time."""
+        import pandas as pd
+        with self._stats_lock:
+            rows = [(sql, *entry) for sql, entry in self._stats.items()]
+        frame = pd.DataFrame(rows, columns=["sql", "calls", "total_s", "max_s", "rows", "caller"])
+        frame["mean_ms"] = frame["total_s"] * 1000 / frame["calls"]
+        return frame.sort_values("total_s", ascending=False, ignore_index=True).head(n)
+
+
+class _Trace:
+    """One executed statement; finished once its rows have been fetched."""
+    __slots__ = ("tracer", "sql", "params", "statements", "started", "seconds", "rows", "caller")
+
+    def __init__(self, tracer: Tracer, sql: str, params: str):
+        self.tracer = tracer
+        self.sql = normalize_sql(sql)
+        self.params = params
+        self.statements = 0
+        self.started = time.time()
+        self.seconds = 0.0
+        self.rows = 0
+        self.caller = _caller(tracer.internal_files)
+
+    def finish(self) -> None:
+        self.tracer.record(self)
+
+
+class TracingCursor(sqlite3.Cursor):
+    """Cursor that times execute/fetch calls and reports each statement to the tracer."""
+
+    _trace: Optional[_Trace] = None
+
+    def _run(self, method, sql: str, params_shape: str, *args):
+        self._finish()
+        trace = self._trace = _Trace(self.connection._tracer, sql, params_shape)
+        self.connection._active_trace = trace
+        start = time.perf_counter()
+        try:
+            return method(*args)
+        finally:
+            trace.seconds += time.perf_counter() - start
+            self.connection._active_trace = None
+            if self.description is None:  # no result set: done now
+                trace.rows = max(self.rowcount, 0)
+                self._finish()
+
+    def _fetched(self, method, *args):
+        start = time.perf_counter()
+        result = method(*args)
+        trace = self._trace
+        if trace is not None:
+            trace.seconds += time.perf_counter() - start
+            return result, trace
+        return result, None
+
+    def _finish(self) -> None:
+        trace, self._trace = self._trace, None
+        if trace is not None:
+            trace.finish()
+
+    def execute(self, sql, parameters=()):
+        return self._run(super().execute, sql, _params_shape(parameters), sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self._run(super().executemany, sql, _params_shape(None, many=True), sql, seq_of_parameters)
+
+    def executescript(self, sql_script):
+        return self._run(super().executescript, sql_script, "script", sql_script)
+
+    def fetchone(self):
+        row, trace = self._fetched(super().fetchone)
+        if trace is not None:
+            if row is None:
+                self._finish()
+            else:
+                trace.rows += 1
+        return row
+
+    def fetchmany(self, size=None):
+        rows, trace = self._fetched(super().fetchmany, self.arraysize if size is None else size)
+        if trace is not None:
+            trace.rows += len(rows)
+            if not rows:
+                self._finish()
+        return rows
+
+    def fetchall(self):
+        rows, trace = self._fetched(super().fetchall)
+        if trace is not None:
+            trace.rows += len(rows)
+            self._finish()
+        return rows
+
+    def close(self):
+        self._finish()
+        super().close()
+
+    def __del__(self):
+        # a SELECT whose rows were never fetched to the end is reported when the cursor goes away
+        try:
+            self._finish()
+        except Exception:
+            pass
+
+
+class TracingConnection(sqlite3.Connection):
+    """
+    Connection whose cursors are TracingCursors. set_trace_callback counts the
+    statements SQLite actually runs for each call (scripts, trigger bodies).
+    """
+
+    _tracer: Tracer  # set by Tracer.connect()
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._active_trace: Optional[_Trace] = None
+        self.set_trace_callback(self._on_statement)
+
+    def _on_statement(self, _statement: str) -> None:
+        trace = self._active_trace
+        if trace is not None:
+            trace.statements += 1
+
+    def cursor(self, factory=TracingCursor):
+        return super().cursor(factory)
+
+    # the Connection shortcuts create plain cursors internally, so route them through ours
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+    def executescript(self, sql_script):
+        return self.cursor().executescript(sql_script)
+
+
+def report_from_log(log_path, n: int = 10) -> "pd.DataFrame":
+    """Top-N statements by total time across the trace log and its rotated backups."""
+    import pandas as pd
+    records: List[dict] = []
+    for path in sorted(Path(log_path).parent.glob(Path(log_path).name + "*")):
+        with open(path, encoding="utf-8") as f:
+            records.extend(json.loads(line) for line in f if line.strip())
+    if not records:
+        return pd.DataFrame(columns=["sql", "calls", "total_ms", "mean_ms", "max_ms", "rows", "caller"])
+    frame = pd.DataFrame(records)
+    grouped = frame.groupby("sql").agg(
+        calls=("duration_ms", "size"),
+        total_ms=("duration_ms", "sum"),
+        mean_ms=("duration_ms", "mean"),
+        max_ms=("duration_ms", "max"),
+        rows=("rows", "sum"),
+        caller=("caller", "first"),
+    )
+    return grouped.sort_values("total_ms", ascending=False).head(n).round(3).reset_index()
+
@@ -0,0 +1,114 @@
+"""
+Fixtures for the platform tests. They import multi_domain_platform's packages
+(config, models, services) the way `python -m services.X` does from inside
+multi_domain_platform, and platform_core, the code it shares with app/.
+Every test gets its own small database in a temporary folder.
+"""
+import os
+import sqlite3
+import sys
+import tempfile
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+# trace and maintenance logs go to a scratch folder rather than multi_domain_platform/logs
+_LOGS = tempfile.mkdtemp(prefix="platform-tests-")
+os.environ.setdefault("PLATFORM_SQL_TRACE_LOG", os.path.join(_LOGS, "sql_trace.log"))
+os.environ.setdefault("PLATFORM_MAINTENANCE_LOG", os.path.join(_LOGS, "maintenance.log"))
+sys.path[:0] = [str(ROOT / "multi_domain_platform"), str(ROOT)]
+
+# The four domain tables, as in multi_domain_platform/database/platform.db
+SCHEMA = """
+CREATE TABLE users (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    username TEXT NOT NULL UNIQUE,
+    password_hash TEXT NOT NULL,
+    role TEXT DEFAULT 'user',
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+CREATE TABLE cyber_incidents (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    date TEXT,
+    incident_type TEXT,
+    severity TEXT,
+    status TEXT,
+    description TEXT,
+    reported_by TEXT,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+CREATE TABLE datasets_metadata (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    dataset_name TEXT NOT NULL,
+    category TEXT,
+    source TEXT,
+    last_updated TEXT,
+    record_count INTEGER,
+    file_size_mb REAL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+CREATE TABLE it_tickets (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    ticket_id TEXT UNIQUE NOT NULL,
+    priority TEXT,
+    status TEXT,
+    category TEXT,
+    subject TEXT NOT NULL,
+    description TEXT,
+    created_date TEXT,
+    resolved_date TEXT,
+    assigned_to TEXT,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+"""
+
+INCIDENTS = [
+    ("2024-01-10", "Phishing", "High", "Closed", "Suspicious link in the payroll email sent from 10.0.0.1", "alice"),
+    ("2024-01-10", "Phishing", "High", "Open", "Suspicious link in the payroll email sent from 10.0.0.7", "bob"),
+    ("2024-01-11", "Malware", "Critical", "Open", "Ransomware encrypted the finance file share", "security_team"),
+    ("2024-01-12", "Unauthorised Access", "Medium", "Resolved", "Login attempt from a foreign IP on the VPN gateway",
+     "security_team"),
+    ("2024-01-12", "Malware", "Low", "In Progress", "Adware toolbar found on a kiosk laptop", "carol"),
+]
+
+TICKETS = [
+    ("TICKET-001", "High", "Closed", "Hardware", "Laptop screen replacement", "Screen is cracked",
+     "2024-01-02", "2024-01-04", "IT_Support"),
+    ("TICKET-002", "Medium", "Open", "Software", "Outlook licence", "Cannot activate Outlook",
+     "2024-01-05", None, "Helpdesk"),
+    ("TICKET-003", "Low", "Open", "Network", "VPN slow", "Slow connection over VPN",
+     "2024-01-06", None, "Network_Ops"),
+    ("TICKET-004", "Critical", "Open", "Network", "Core switch down", "Second floor is offline",
+     "2024-01-07", None, None),
+    ("TICKET-005", "High", "In Progress", "Software", "Excel crash", "Excel crashes on start",
+     "2024-01-03", None, "Helpdesk"),
+]
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    """A platform database holding a few users, incidents, tickets and datasets."""
+    path = tmp_path / "platform.db"
+    conn = sqlite3.connect(path)
+    conn.executescript(SCHEMA)
+    conn.execute("INSERT INTO users (username, password_hash, role) VALUES ('admin', 'not-a-hash', 'admin')")
+    conn.executemany("INSERT INTO cyber_incidents (date, incident_type, severity, status, description, reported_by) "
+                     "VALUES (?, ?, ?, ?, ?, ?)", INCIDENTS)
+    conn.executemany("INSERT INTO it_tickets (ticket_id, priority, status, category, subject, description, "
+                     "created_date, resolved_date, assigned_to) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", TICKETS)
+    conn.execute("INSERT INTO datasets_metadata (dataset_name, category, source, record_count, file_size_mb) "
+                 "VALUES ('phishing_emails', 'Security', 'internal', 1000, 1.5)")
+    conn.commit()
+    conn.close()
+    return path
+
+
+@pytest.fixture
+def db(db_path):
+    """DatabaseManager on the test database."""
+    from services.database_manager import DatabaseManager
+
+    manager = DatabaseManager(str(db_path))
+    yield manager
+    manager.close()
@@ -0,0 +1,78 @@
+from services.archive_manager import ArchiveManager, history_source
+from services.change_tracking import ChangeLog
+from services.rollup_manager import RollupManager
+
+
+def total(db, table):
+    return db.fetch_one(f"SELECT COUNT(*) FROM {table}")[0]
+
+
+def rollup_total(db, rollup):
+    return db.fetch_one(f"SELECT SUM(count) FROM {rollup}")[0]
+
+
+def test_stats_before_archiving(db):
+    stats = ArchiveManager(db).stats()
+    assert stats["cyber_incidents"] == {"hot": 5, "archived": 0, "due": 2}
+    assert stats["it_tickets"] == {"hot": 5, "archived": 0, "due": 1}
+    assert ArchiveManager(db).stats(older_than_days=100_000)["cyber_incidents"]["due"] == 0
+
+
+def test_archive_keeps_history_totals(db):
+    rollups = RollupManager(db)
+    rollups.ensure_schema()
+    log = ChangeLog(db)
+    log.ensure_schema()
+    start = log.latest_seq()
+    manager = ArchiveManager(db)
+
+    assert manager.archive("cyber_incidents", chunk_rows=1) == 2
+    assert manager.archive("it_tickets") == 1
+    assert (total(db, "cyber_incidents"), total(db, "cyber_incidents_archive")) == (3, 2)
+    assert (total(db, "cyber_incidents_all"), total(db, "it_tickets_all")) == (5, 5)
+    # the rollups count history, so archiving leaves their totals (and a rebuild) unchanged
+    assert rollup_total(db, "incident_daily_rollup") == 5
+    assert rollup_total(db, "ticket_daily_rollup") == 5
+    maintained = db.fetch_all("SELECT * FROM incident_daily_rollup ORDER BY 1, 2, 3, 4")
+    rollups.rebuild()
+    assert db.fetch_all("SELECT * FROM incident_daily_rollup ORDER BY 1, 2, 3, 4") == maintained
+
+    removed = [(c.table_name, c.row_id) for c in log.changes_since(start) if c.op in ("DELETE", "ARCHIVE")]
+    assert {c.op for c in log.changes_since(start)} == {"ARCHIVE"}
+    assert sorted(removed) == [("cyber_incidents", 1), ("cyber_incidents", 4), ("it_tickets", 1)]
+    assert manager.stats()["cyber_incidents"]["due"] == 0
+
+
+def test_deletes_are_still_logged_as_deletes(db):
+    log = ChangeLog(db)
+    log.ensure_schema()
+    ArchiveManager(db).archive("cyber_incidents")
+    start = log.latest_seq()
+    db.execute_query("DELETE FROM cyber_incidents WHERE id = 2")
+    assert [c.op for c in log.changes_since(start)] == ["DELETE"]
+
+
+def test_rows_reopened_after_selection_stay_hot(db):
+    manager = ArchiveManager(db)
+    manager.ensure_schema()
+    ids = manager.candidates("cyber_incidents")
+    assert ids == [1, 4]
+    db.execute_query("UPDATE cyber_incidents SET status = 'Open' WHERE id = 1")
+    assert manager.archive_ids("cyber_incidents", ids) == 1
+    assert db.fetch_one("SELECT status FROM cyber_incidents WHERE id = 1")[0] == "Open"
+    assert total(db, "cyber_incidents_all") == 5
+
+
+def test_archive_follows_new_columns(db):
+    manager = ArchiveManager(db)
+    manager.ensure_schema()
+    db.execute_script("ALTER TABLE it_tickets ADD COLUMN sla_days INTEGER")
+    db.execute_query("UPDATE it_tickets SET sla_days = 2 WHERE id = 1")
+    assert manager.archive("it_tickets") == 1
+    assert db.fetch_one("SELECT sla_days FROM it_tickets_all WHERE id = 1")[0] == 2
+
+
+def test_history_source(db):
+    assert history_source(db, "cyber_incidents") == "cyber_incidents"
+    ArchiveManager(db).ensure_schema()
+    assert history_source(db, "cyber_incidents") == "cyber_incidents_all"
@@ -0,0 +1,71 @@
+import sqlite3
+
+import pytest
+
+from models.it_ticket import TicketManager
+from models.security_incident import SecurityIncidentManager
+
+INSERT_TICKET = ("INSERT INTO it_tickets (ticket_id, priority, status, category, subject) "
+                 "VALUES (?, 'Low', 'Open', 'Software', ?)")
+
+
+def ticket_ids(db):
+    return [row[0] for row in db.fetch_all("SELECT ticket_id FROM it_tickets ORDER BY id")]
+
+
+def test_execute_batch_without_errors(db):
+    assert db.execute_batch(INSERT_TICKET, [("TICKET-101", "a"), ("TICKET-102", "b")]) == (2, [])
+    assert ticket_ids(db)[-2:] == ["TICKET-101", "TICKET-102"]
+
+
+def test_execute_batch_skips_and_reports_constraint_violations(db):
+    rows = [("TICKET-101", "a"), ("TICKET-001", "taken"), ("TICKET-102", "b"), ("TICKET-101", "repeated"),
+            ("TICKET-103", None)]
+    affected, errors = db.execute_batch(INSERT_TICKET, rows)
+    assert affected == 2
+    assert [index for index, _ in errors] == [1, 3, 4]
+    assert "UNIQUE" in errors[0][1] and "NOT NULL" in errors[2][1]
+    # the good rows were kept, in one transaction with nothing half-written
+    assert ticket_ids(db)[-2:] == ["TICKET-101", "TICKET-102"]
+    assert not db._connection.in_transaction
+
+
+def test_execute_batch_rolls_back_on_other_errors(db):
+    before = ticket_ids(db)
+    with pytest.raises(sqlite3.OperationalError):
+        db.execute_batch("INSERT INTO no_such_table VALUES (?)", [(1,)])
+    with pytest.raises(sqlite3.ProgrammingError):
+        db.execute_batch(INSERT_TICKET, [("TICKET-101", "a"), ("TICKET-102",)])  # wrong parameter count
+    assert ticket_ids(db) == before
+    # the savepoint did not outlive the failed batch: the next one commits normally
+    assert db.execute_batch(INSERT_TICKET, [("TICKET-104", "c")]) == (1, [])
+    assert not db._connection.in_transaction
+
+
+def test_execute_many_transaction_is_all_or_nothing(db):
+    before = ticket_ids(db)
+    with pytest.raises(sqlite3.IntegrityError):
+        db.execute_many_transaction([
+            (INSERT_TICKET, [("TICKET-101", "a")]),
+            (INSERT_TICKET, [("TICKET-001", "taken")]),
+        ])
+    assert ticket_ids(db) == before
+
+
+def test_insert_tickets_numbers_rows_without_an_id(db):
+    tickets = TicketManager(db)
+    row = ("", "Low", "Open", "Software", "Mouse", "", "2024-02-01", None, "Helpdesk")
+    inserted, errors = tickets.insert_tickets([row, row, ("TICKET-002",) + row[1:]])
+    assert inserted == 2
+    assert errors[0][0] == 2
+    assert ticket_ids(db)[-2:] == ["TICKET-006", "TICKET-007"]
+
+
+def test_batch_updates_and_deletes_report_missing_rows(db):
+    incidents = SecurityIncidentManager(db)
+    assert incidents.update_incident_statuses([2, 99, 3], "Closed") == (2, [(1, "#99 not found")])
+    assert db.fetch_all("SELECT status FROM cyber_incidents WHERE id IN (2, 3)") == [("Closed",), ("Closed",)]
+    assert incidents.delete_incidents([98, 5]) == (1, [(0, "#98 not found")])
+
+    tickets = TicketManager(db)
+    assert tickets.delete_tickets(["TICKET-003", "TICKET-404"]) == (1, [(1, "TICKET-404 not found")])
@@ -0,0 +1,61 @@
+import sqlite3
+
+import numpy as np
+import pytest
+
+from platform_core.binning import MAX_BINS, bin_expression, bin_labels, compute_edges
+
+SIZES = np.array([0, 0.5, 1, 2, 3, 10, 40, 100, 1_000, 25_000, 1e6, np.nan, np.inf])
+
+
+@pytest.mark.parametrize("strategy", ["log", "quantile", "linear"])
+def test_edges_cover_the_values(strategy):
+    edges = compute_edges(SIZES, strategy, bins=8)
+    finite = SIZES[np.isfinite(SIZES)]
+    assert np.all(np.diff(edges) > 0)
+    assert len(edges) <= 9
+    assert edges[0] <= finite.min() and edges[-1] >= finite.max()
+
+
+def test_log_edges_grow_geometrically_from_the_smallest_positive_value():
+    edges = compute_edges(np.array([0, 1, 10, 100, 1000]), "log", bins=3)
+    assert edges.tolist() == pytest.approx([0, 10, 100, 1000])  # the zero widens the first bin
+
+
+def test_log_edges_without_positive_values_fall_back_to_linear():
+    assert compute_edges(np.array([-4.0, -2.0, 0.0]), "log", bins=2).tolist() == [-4.0, -2.0, 0.0]
+
+
+def test_quantile_edges_split_the_values_evenly_and_drop_repeats():
+    assert compute_edges(np.arange(1, 101), "quantile", bins=4).tolist() == [1, 25.75, 50.5, 75.25, 100]
+    assert compute_edges(np.array([1, 1, 1, 1, 2]), "quantile", bins=4).tolist() == [1, 2]
+
+
+def test_degenerate_inputs():
+    assert compute_edges(np.array([]), "log").tolist() == [0.0, 1.0]
+    assert compute_edges(np.array([np.nan]), "linear").tolist() == [0.0, 1.0]
+    assert compute_edges(np.array([5, 5, 5]), "quantile").tolist() == [5.0, 6.0]
+    assert len(compute_edges(np.arange(10_000), "linear", bins=10_000)) == MAX_BINS + 1
+    assert len(compute_edges(np.arange(10), "linear", bins=0)) == 2
+    with pytest.raises(ValueError):
+        compute_edges(SIZES, "sqrt")
+
+
+@pytest.mark.parametrize("strategy", ["log", "quantile", "linear"])
+def test_sql_bins_match_the_edges(strategy):
+    values = SIZES[np.isfinite(SIZES)]
+    edges = compute_edges(values, strategy, bins=6)
+    conn = sqlite3.connect(":memory:")
+    conn.execute("CREATE TABLE t (v REAL)")
+    conn.executemany("INSERT INTO t VALUES (?)", [(float(v),) for v in values])
+    sql_bins = [row[0] for row in conn.execute(f"SELECT {bin_expression('v', edges)} FROM t ORDER BY rowid")]
+    # value in [edges[i], edges[i + 1]) -> bin i; the maximum lands in the last bin
+    expected = np.clip(np.searchsorted(edges, values, side="right") - 1, 0, len(edges) - 2)
+    assert sql_bins == expected.tolist()
+    assert bin_expression("v", np.array([0.0, 1.0])) == "0"
+
+
+def test_labels_are_distinct():
+    assert bin_labels(np.array([0, 1_500, 2_000_000, 3e9])) == ["0–1.5K", "1.5K–2M", "2M–3B"]
+    labels = bin_labels(np.array([1.0001, 1.0002, 1.0003]))
+    assert len(set(labels)) == 2
@@ -0,0 +1,98 @@
+import pytest
+
+from services.change_tracking import ChangeLog, ChangeTracker
+
+
+def test_change_log_round_trip(db):
+    log = ChangeLog(db)
+    log.ensure_schema()
+    start = log.latest_seq()
+    db.execute_query("INSERT INTO cyber_incidents (date, incident_type, severity, status, description, reported_by) "
+                     "VALUES ('2024-02-01', 'Phishing', 'Low', 'Open', 'Fake invoice', 'erin')")
+    new_id = db.fetch_one("SELECT MAX(id) FROM cyber_incidents")[0]
+    db.execute_query("UPDATE cyber_incidents SET status = 'Closed' WHERE id = ?", (new_id,))
+    db.execute_query("DELETE FROM cyber_incidents WHERE id = ?", (new_id,))
+
+    inserted, updated, deleted = log.changes_since(start)
+    assert [c.op for c in (inserted, updated, deleted)] == ["INSERT", "UPDATE", "DELETE"]
+    assert {c.row_id for c in (inserted, updated, deleted)} == {new_id}
+    assert inserted.row_data["description"] == "Fake invoice" and inserted.old_data is None
+    assert updated.old_data["status"] == "Open" and updated.row_data["status"] == "Closed"
+    assert updated.changed_columns() == ["status"]
+    assert deleted.row_data["status"] == "Closed"  # the row as it was before the delete
+    assert log.changes_since(deleted.seq) == []
+
+
+def test_changes_since_filters_by_table_and_limit(db):
+    log = ChangeLog(db)
+    log.ensure_schema()
+    start = log.latest_seq()
+    db.execute_query("UPDATE it_tickets SET priority = 'Low'")
+    db.execute_query("UPDATE cyber_incidents SET severity = 'Low' WHERE id = 1")
+    assert {c.table_name for c in log.changes_since(start)} == {"it_tickets", "cyber_incidents"}
+    assert [c.row_id for c in log.changes_since(start, tables=["cyber_incidents"])] == [1]
+    assert len(log.changes_since(start, limit=2)) == 2
+
+
+def test_password_hashes_stay_out_of_the_log(db):
+    log = ChangeLog(db)
+    log.ensure_schema()
+    start = log.latest_seq()
+    db.execute_query("UPDATE users SET role = 'user', password_hash = 'other' WHERE username = 'admin'")
+    change, = log.changes_since(start)
+    assert "password_hash" not in change.row_data and "password_hash" not in change.old_data
+    assert change.changed_columns() == ["role"]
+
+
+def test_refresh_picks_up_new_columns(db):
+    log = ChangeLog(db)
+    log.ensure_schema()
+    db.execute_script("ALTER TABLE it_tickets ADD COLUMN sla_days INTEGER")
+    log.refresh()
+    start = log.latest_seq()
+    db.execute_query("UPDATE it_tickets SET sla_days = 3 WHERE id = 1")
+    change, = log.changes_since(start)
+    assert change.row_data["sla_days"] == 3 and change.changed_columns() == ["sla_days"]
+
+
+def test_ensure_schema_is_idempotent(db):
+    log = ChangeLog(db)
+    log.ensure_schema()
+    triggers = db.fetch_all("SELECT name, sql FROM sqlite_master WHERE type = 'trigger' ORDER BY name")
+    log.ensure_schema()
+    assert db.fetch_all("SELECT name, sql FROM sqlite_master WHERE type = 'trigger' ORDER BY name") == triggers
+
+
+def test_compact_keeps_the_newest_change_per_row(db):
+    log = ChangeLog(db)
+    log.ensure_schema()
+    for status in ("In Progress", "Open", "Closed"):
+        db.execute_query("UPDATE cyber_incidents SET status = ? WHERE id = 2", (status,))
+    db.execute_query("UPDATE cyber_incidents SET status = 'Closed' WHERE id = 3")
+    assert log.compact(log.latest_seq()) == 2
+    changes = log.changes_since(0)
+    assert [(c.row_id, c.row_data["status"]) for c in changes] == [(2, "Closed"), (3, "Closed")]
+
+
+def test_purge_moves_the_retention_window(db):
+    log = ChangeLog(db)
+    log.ensure_schema()
+    db.execute_query("UPDATE cyber_incidents SET status = 'Closed' WHERE id = 2")
+    db.execute_query("UPDATE change_log SET changed_at = datetime('now', '-40 days')")
+    db.execute_query("UPDATE cyber_incidents SET status = 'Closed' WHERE id = 3")
+    assert log.purge(30) == 1
+    assert log.purged_through() == log.latest_seq() - 1
+    with pytest.raises(ValueError):
+        log.changes_since(0)
+    assert [c.row_id for c in log.changes_since(log.purged_through())] == [3]
+
+
+def test_change_tracker_counts_writes(db):
+    tracker = ChangeTracker(db)
+    assert tracker.get_versions() == {}
+    tracker.ensure_schema()
+    before = tracker.get_version("it_tickets")
+    db.execute_query("UPDATE it_tickets SET status = 'Closed' WHERE id = 2")
+    db.execute_query("DELETE FROM it_tickets WHERE id = 3")
+    assert tracker.get_version("it_tickets") == before + 2
+    assert tracker.get_version("cyber_incidents") == 0
@@ -0,0 +1,124 @@
+import datetime
+
+import pytest
+
+from platform_core.anomaly import RateAnomalyDetector
+from services.incident_anomaly import IncidentAnomalyMonitor
+
+START = datetime.date(2024, 3, 1)
+
+
+def day(n):
+    return (START + datetime.timedelta(days=n)).isoformat()
+
+
+def history(days, per_day=2):
+    return [(day(n), "Phishing", "Medium") for n in range(days) for _ in range(per_day)]
+
+
+def spike(n, count=15):
+    return [(day(n), "Phishing", "Medium")] * count
+
+
+def test_a_spike_after_warmup_alerts_once_per_key():
+    detector = RateAnomalyDetector()
+    assert detector.process(history(30)) == 60
+    assert detector.alerts == []
+    detector.process(spike(30))
+    assert {(a.kind, a.value, a.day) for a in detector.alerts} == {
+        ("incident_type", "Phishing", day(30)), ("severity", "Medium", day(30))}
+    first = detector.alerts[0]
+    assert first.expected == pytest.approx(2, abs=0.5) and first.score > 3
+    # the open day's alert reports its current count
+    assert {a.count for a in detector.open_alerts()} == {15}
+    detector.alerts.clear()
+    detector.process([(day(31), "Phishing", "Medium")])
+    assert [a.count for a in detector.alerts] == [15, 15]  # the spike day closed with its final count
+
+
+def test_no_alerts_while_warming_up():
+    detector = RateAnomalyDetector(warmup_days=7)
+    detector.process(history(3) + spike(3, 50))
+    assert detector.alerts == [] and detector.open_alerts() == []
+
+
+def test_unparseable_dates_are_skipped():
+    detector = RateAnomalyDetector()
+    assert detector.process([("not a date", "Phishing", "Low"), (None, "Malware", "Low"), (day(0), "Malware", "Low")]) == 1
+    assert list(detector.baselines["incident_type"]) == ["Malware"]
+
+
+def test_dump_and_load_continue_where_the_stream_stopped():
+    events = history(20) + spike(20) + [e for e in history(40) if e[0] > day(20)] + spike(40, 20)
+    whole = RateAnomalyDetector()
+    whole.process(events)
+
+    first = RateAnomalyDetector()
+    first.process(events[:31])  # stops in the middle of a day
+    resumed = first.fresh()
+    resumed.load(first.dump())
+    resumed.alerts = list(first.alerts)
+    resumed.process(events[31:])
+    assert resumed.alerts == whole.alerts
+    assert resumed.open_alerts() == whole.open_alerts()
+
+
+def test_settings_are_validated():
+    with pytest.raises(ValueError):
+        RateAnomalyDetector(alpha=0)
+    with pytest.raises(ValueError):
+        RateAnomalyDetector(gamma=1.5)
+
+
+def insert_incidents(db, events):
+    db.execute_many("INSERT INTO cyber_incidents (date, incident_type, severity, status, description) "
+                    "VALUES (?, ?, ?, 'Open', 'generated')", events)
+
+
+def test_monitor_streams_inserts_from_the_change_log(db):
+    monitor = IncidentAnomalyMonitor(db)
+    monitor.ensure_schema()
+    insert_incidents(db, history(30))
+    assert monitor.sync() == 65  # first sync replays every incident, the seeded ones included
+    assert monitor.sync() == 0
+
+    insert_incidents(db, spike(30))
+    db.execute_query("UPDATE cyber_incidents SET status = 'Closed' WHERE id = 1")  # only inserts are events
+    assert monitor.sync() == 15
+    alerts = monitor.recent_alerts()
+    assert sorted(alerts["kind"]) == ["incident_type", "severity"]
+    assert set(alerts["day"]) == {day(30)} and set(alerts["count"]) == {15}
+
+    insert_incidents(db, spike(30, 3))  # the alerting day keeps growing: its row keeps the peak
+    monitor.sync()
+    assert set(monitor.recent_alerts()["count"]) == {18}
+
+    assert monitor.acknowledge() == 2
+    assert monitor.recent_alerts().empty
+    assert len(monitor.recent_alerts(include_acknowledged=True)) == 2
+
+
+def test_monitor_backfill_matches_streaming(db):
+    monitor = IncidentAnomalyMonitor(db)
+    monitor.ensure_schema()
+    insert_incidents(db, history(30))
+    monitor.sync()
+    insert_incidents(db, spike(30))
+    monitor.sync()
+    streamed = db.fetch_all("SELECT kind, value, day, count FROM incident_alerts ORDER BY kind")
+    baselines = db.fetch_all("SELECT kind, value, day, count, days FROM anomaly_baselines ORDER BY kind, value")
+
+    db.execute_query("DELETE FROM incident_alerts")
+    assert monitor.backfill() == 80
+    assert db.fetch_all("SELECT kind, value, day, count FROM incident_alerts ORDER BY kind") == streamed
+    assert db.fetch_all("SELECT kind, value, day, count, days FROM anomaly_baselines "
+                        "ORDER BY kind, value") == baselines
+
+
+def test_changed_settings_reset_the_baselines(db):
+    IncidentAnomalyMonitor(db).sync()
+    assert db.fetch_one("SELECT COUNT(*) FROM anomaly_baselines")[0] > 0
+    monitor = IncidentAnomalyMonitor(db, RateAnomalyDetector(z=4.0))
+    monitor.ensure_schema()
+    assert db.fetch_one("SELECT COUNT(*) FROM anomaly_baselines")[0] == 0
+    assert monitor.sync() == 5
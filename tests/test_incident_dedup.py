@@ -0,0 +1,96 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from models.security_incident import SEVERITY_LEVELS
+from platform_core.dedup import MinHasher, cluster_frame, collapse_frame, normalize, shingles
+from services.incident_dedup import IncidentDeduplicator
+
+
+def test_normalize_and_shingles():
+    assert normalize("  Login FAILED from 10.0.0.7!! (x3) ") == "login failed from 0 0 0 0 x0"
+    assert shingles("abc", 5) == {"abc"}
+    assert shingles("", 5) == set()
+    assert shingles("Hello!", 3) == {"hel", "ell", "llo"}
+
+
+def test_signatures_are_stable_and_estimate_similarity():
+    hasher = MinHasher(num_perm=128, bands=16, shingle=5)
+    first = hasher.signature("Suspicious link in the payroll email sent from 10.0.0.1")
+    assert first.dtype == np.uint32 and first.shape == (128,)
+    # numbers are masked, so reports differing only in an IP are identical
+    assert np.array_equal(first, hasher.signature("suspicious link in the PAYROLL email sent from 192.168.1.20"))
+    assert np.array_equal(first, MinHasher(128, 16, 5).signature("Suspicious link in the payroll email sent from 10.0.0.1"))
+    assert np.mean(first == hasher.signature("Ransomware encrypted the finance file share")) < 0.2
+    assert hasher.signature("  !! ") is None
+    assert len(hasher.buckets(first)) == 16
+    assert hasher.params == '{"num_perm": 128, "bands": 16, "shingle": 5, "seed": 1510}'
+    with pytest.raises(ValueError):
+        MinHasher(num_perm=100, bands=16)
+
+
+def test_cluster_frame_unions_buckets_above_the_threshold():
+    a, b = np.zeros(8, dtype=np.uint32), np.arange(8, dtype=np.uint32)
+    near_a = a.copy()
+    near_a[0] = 9  # 7/8 similar to a
+    signatures = {1: a, 2: near_a, 3: a, 4: b, 5: b}
+    frame = cluster_frame([[3, 1], [2, 3], [4, 1], [5, 4]], signatures, threshold=0.8)
+    assert frame.values.tolist() == [[1, 1, 1.0], [2, 1, 0.875], [3, 1, 1.0], [4, 4, 1.0], [5, 4, 1.0]]
+    assert cluster_frame([[1, 2]], signatures, threshold=0.9).empty
+
+
+def test_collapse_frame():
+    incidents = pd.DataFrame({
+        "id": [1, 2, 3], "date": ["2024-01-10", "2024-01-12", "2024-01-11"],
+        "incident_type": ["Phishing", "Phishing", "Malware"], "severity": ["Medium", "High", "Low"],
+        "status": ["Closed", "Open", "Open"], "description": ["link", "link!", "adware"],
+    })
+    clusters = pd.DataFrame({"incident_id": [1, 2], "cluster_id": [1, 1], "similarity": [1.0, 0.9]})
+    collapsed = collapse_frame(incidents, clusters, SEVERITY_LEVELS)
+    assert collapsed[["cluster_id", "incidents", "incident_ids", "first_date", "last_date", "severity", "open"]] \
+        .values.tolist() == [[1, 2, "1, 2", "2024-01-10", "2024-01-12", "High", 1],
+                             [3, 1, "3", "2024-01-11", "2024-01-11", "Low", 1]]
+
+
+def clustered(dedup):
+    return {tuple(group) for group in dedup.clusters().groupby("cluster_id")["incident_id"].apply(list)}
+
+
+def test_deduplicator_follows_the_change_log(db):
+    dedup = IncidentDeduplicator(db)
+    assert dedup.sync() == 5  # first sync builds the index
+    assert clustered(dedup) == {(1, 2)}
+    assert dedup.sync() == 0
+
+    db.execute_query("INSERT INTO cyber_incidents (date, incident_type, severity, status, description) "
+                     "VALUES ('2024-01-13', 'Phishing', 'High', 'Open', "
+                     "'Suspicious link in the payroll email sent from 10.0.0.9')")
+    db.execute_query("UPDATE cyber_incidents SET status = 'Closed' WHERE id = 3")  # no re-signing needed
+    assert dedup.sync() == 1
+    assert clustered(dedup) == {(1, 2, 6)}
+
+    db.execute_query("UPDATE cyber_incidents SET description = 'Printer jam on floor 3' WHERE id = 2")
+    db.execute_query("DELETE FROM cyber_incidents WHERE id = 6")
+    assert dedup.sync() == 1
+    assert clustered(dedup) == set()
+    assert db.fetch_one("SELECT COUNT(*) FROM incident_signatures")[0] == 5
+
+
+def test_near_duplicates_and_collapse(db):
+    dedup = IncidentDeduplicator(db)
+    dedup.sync()
+    assert dedup.near_duplicates(1)["incident_id"].tolist() == [2]
+    found = dedup.near_duplicates(text="Suspicious link in the payroll email sent from 172.16.0.1")
+    assert found["incident_id"].tolist() == [1, 2] and found["similarity"].tolist() == [1.0, 1.0]
+    assert dedup.near_duplicates(text="").empty
+
+    collapsed = dedup.collapse(db.fetch_dataframe("SELECT * FROM cyber_incidents"))
+    assert collapsed["incidents"].tolist() == [2, 1, 1, 1]
+    assert collapsed.loc[0, "incident_ids"] == "1, 2"
+
+
+def test_changed_settings_rebuild_the_index(db):
+    IncidentDeduplicator(db).sync()
+    dedup = IncidentDeduplicator(db, hasher=MinHasher(num_perm=64, bands=8, shingle=4))
+    assert dedup.sync() == 5
+    assert len(np.frombuffer(db.fetch_one("SELECT signature FROM incident_signatures")[0], dtype=np.uint32)) == 64
@@ -0,0 +1,72 @@
+import calendar
+import time
+from datetime import datetime
+
+import pytest
+
+from services.maintenance import TASK_INTERVAL_HOURS, MaintenanceManager, in_window
+
+ENDLESS = "WITH RECURSIVE c(x) AS (SELECT 1 UNION ALL SELECT x + 1 FROM c) SELECT COUNT(*) FROM c"
+
+
+def completed_at(manager, task):
+    return calendar.timegm(time.strptime(manager.last_runs()[task], "%Y-%m-%d %H:%M:%S"))
+
+
+def test_in_window():
+    assert in_window("", datetime(2024, 1, 1, 12, 0))
+    assert in_window("01:00-05:00", datetime(2024, 1, 1, 1, 0))
+    assert not in_window("01:00-05:00", datetime(2024, 1, 1, 5, 0))
+    assert in_window("22:00-02:00", datetime(2024, 1, 1, 23, 30))
+    assert in_window("22:00-02:00", datetime(2024, 1, 1, 1, 59))
+    assert not in_window("22:00-02:00", datetime(2024, 1, 1, 12, 0))
+
+
+def test_everything_is_due_on_a_new_database(db_path):
+    assert MaintenanceManager(db_path).due_tasks() == list(TASK_INTERVAL_HOURS)
+
+
+def test_full_run(db_path):
+    manager = MaintenanceManager(db_path, budget_seconds=60)
+    results = manager.run()
+    assert [(r.task, r.status) for r in results] == [(task, "done") for task in TASK_INTERVAL_HOURS]
+    details = {r.task: r.details for r in results}
+    assert details["incremental_vacuum"]["converted"]
+    assert details["optimize"]["mode"] == "analyze"
+    assert details["wal_checkpoint"] == {"not_needed": "journal_mode is delete"}
+    assert manager.due_tasks() == []
+    assert manager.run() == []  # nothing due
+    assert manager.run(["optimize"])[0].details["mode"] == "optimize"
+    assert [entry[1] for entry in manager.history()][:1] == ["optimize"]
+
+
+def test_tasks_fall_due_after_their_interval(db_path):
+    manager = MaintenanceManager(db_path)
+    manager.run(["optimize", "wal_checkpoint"])
+    done = completed_at(manager, "optimize")
+    assert manager.due_tasks(now=done + 1) == ["incremental_vacuum", "quick_check"]
+    assert manager.due_tasks(now=done + 2 * 3600) == ["incremental_vacuum", "quick_check", "wal_checkpoint"]
+    assert manager.due_tasks(now=done + 20 * 3600) == list(TASK_INTERVAL_HOURS)
+
+
+def test_skipped_tasks_stay_due(db_path):
+    manager = MaintenanceManager(db_path)
+    results = manager.run(budget_seconds=-1)
+    assert {r.status for r in results} == {"skipped"}
+    assert manager.due_tasks() == list(TASK_INTERVAL_HOURS)
+    assert {entry[2] for entry in manager.history()} == {"skipped"}
+
+
+def test_a_task_out_of_budget_is_interrupted_and_the_rest_skipped(db_path):
+    manager = MaintenanceManager(db_path)
+    manager._tasks["optimize"] = lambda conn, deadline: {"rows": conn.execute(ENDLESS).fetchone()[0]}
+    started = time.monotonic()
+    results = manager.run(["optimize", "quick_check"], budget_seconds=0.2)
+    assert time.monotonic() - started < 5
+    assert [(r.task, r.status) for r in results] == [("optimize", "interrupted"), ("quick_check", "skipped")]
+    assert set(manager.due_tasks()) >= {"optimize", "quick_check"}
+
+
+def test_unknown_tasks_are_rejected(db_path):
+    with pytest.raises(ValueError):
+        MaintenanceManager(db_path).run(["defragment"])
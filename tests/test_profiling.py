@@ -0,0 +1,74 @@
+import pytest
+
+from platform_core.profiling import profile_files, resolve, stored_path
+from services.dataset_profiler import DatasetProfiler
+
+CSV = "id,name\n" + "".join(f"{i},row {i}\n" for i in range(1, 10_001))
+
+
+@pytest.fixture
+def files(tmp_path):
+    (tmp_path / "events.csv").write_text(CSV)
+    (tmp_path / "unterminated.csv").write_text("a,b\n1,2\n3,4")
+    (tmp_path / "header_only.csv").write_text("a,b\n")
+    (tmp_path / "empty.jsonl").write_text("")
+    (tmp_path / "logs.jsonl").write_text('{"a": 1}\n{"a": 2}\n{"a": 3}\n')
+    (tmp_path / "notes.txt").write_text("not a dataset\n")
+    (tmp_path / "parts").mkdir()
+    (tmp_path / "parts" / "a.jsonl").write_text('{"a": 1}\n')
+    (tmp_path / "parts" / "b.jsonl").write_text('{"a": 2}\n{"a": 3}\n')
+    return tmp_path
+
+
+def counts(profiles):
+    return {path.name: profile.record_count for path, profile in profiles.items()}
+
+
+@pytest.mark.parametrize("workers, chunk_bytes", [(1, 64 * 1024 * 1024), (1, 7), (1, 5000), (2, 4096)])
+def test_line_counts_do_not_depend_on_chunking(files, workers, chunk_bytes):
+    names = ["events.csv", "unterminated.csv", "header_only.csv", "empty.jsonl", "logs.jsonl", "parts"]
+    profiles = profile_files([files / name for name in names], workers=workers, chunk_bytes=chunk_bytes)
+    assert counts(profiles) == {"events.csv": 10_000, "unterminated.csv": 2, "header_only.csv": 0,
+                                "empty.jsonl": 0, "logs.jsonl": 3, "parts": 3}
+    assert all(profile.ok for profile in profiles.values())
+    assert profiles[files / "events.csv"].size_bytes == len(CSV)
+    assert profiles[files / "parts"].file_format == "jsonl"
+
+
+def test_parquet_rows_come_from_the_footer(tmp_path):
+    pa = pytest.importorskip("pyarrow")
+    import pyarrow.parquet as pq
+
+    pq.write_table(pa.table({"x": list(range(1234))}), tmp_path / "table.parquet")
+    profile = profile_files([tmp_path / "table.parquet"])[tmp_path / "table.parquet"]
+    assert (profile.file_format, profile.record_count, profile.error) == ("parquet", 1234, "")
+
+
+def test_errors(files):
+    (files / "nothing").mkdir()
+    profiles = profile_files([files / "notes.txt", files / "missing.csv", files / "nothing"])
+    assert profiles[files / "notes.txt"].error == "unsupported file type '.txt'"
+    assert profiles[files / "missing.csv"].record_count is None and not profiles[files / "missing.csv"].ok
+    assert profiles[files / "nothing"].error == "no CSV, JSONL or Parquet files in the folder"
+
+
+def test_resolve_and_stored_path(files, tmp_path_factory):
+    assert resolve(files, "events") == files / "events.csv"
+    assert resolve(files, "parts") == files / "parts"
+    assert resolve(files, "anything", "logs.jsonl") == files / "logs.jsonl"
+    assert resolve(files, "events", "gone.csv") is None
+    assert resolve(files, "unknown") is None
+    assert stored_path(files, files / "parts" / "a.jsonl") == "parts/a.jsonl"
+    elsewhere = tmp_path_factory.mktemp("elsewhere") / "x.csv"
+    assert stored_path(files, elsewhere) == str(elsewhere)
+
+
+def test_dataset_profiler_fills_the_metadata(db, files):
+    profiler = DatasetProfiler(db, files, workers=1)
+    profiler.ensure_schema()
+    db.execute_query("INSERT INTO datasets_metadata (dataset_name, category) VALUES ('events', 'Security')")
+    db.execute_query("INSERT INTO datasets_metadata (dataset_name, category) VALUES ('lost', 'Security')")
+    updated, errors = profiler.save(profiler.profile())
+    assert updated == 1  # events is profiled; phishing_emails and lost have no file
+    assert [message.split(":")[0] for _, message in errors] == ["#1", "#3"]
+    assert db.fetch_one("SELECT record_count, file_path FROM datasets_metadata WHERE id = 2") == (10_000, "events.csv")
@@ -0,0 +1,53 @@
+import datetime
+import random
+
+import pandas as pd
+import pytest
+
+from models.security_incident import SecurityIncidentManager
+from services.risk_scoring import ensure_risk_column, has_risk_column, rank_incidents, risk_queue
+
+AS_OF = pd.Timestamp("2024-03-01")
+COLUMNS = ["risk_score", "id", "date", "incident_type", "severity", "status", "reported_by"]
+
+
+@pytest.fixture
+def incidents(db):
+    """The five seed incidents plus 300 more, one per day before AS_OF, so no two scores tie."""
+    rng = random.Random(27)
+    rows = [((AS_OF - datetime.timedelta(days=n)).strftime("%Y-%m-%d"),
+             rng.choice(["Phishing", "Malware", "Ransomware", "DDoS", "Misconfiguration"]),
+             rng.choice(["Low", "Medium", "High", "Critical"]),
+             rng.choice(["Open", "In Progress", "Resolved", "Closed"]),
+             f"generated incident {n}", "tests") for n in range(300)]
+    db.execute_many("INSERT INTO cyber_incidents (date, incident_type, severity, status, description, reported_by) "
+                    "VALUES (?, ?, ?, ?, ?, ?)", rows)
+    return SecurityIncidentManager(db)
+
+
+def ranked(incidents_df, top_n):
+    return rank_incidents(incidents_df, top_n=top_n, as_of=AS_OF)[COLUMNS]
+
+
+@pytest.mark.parametrize("top_n", [1, 5, 20, 400])
+def test_risk_queue_matches_rank_incidents(db, incidents, top_n):
+    expected = ranked(incidents.get_all_incidents_df(), top_n)
+    queue = risk_queue(db, top_n, AS_OF)
+    assert queue["id"].tolist() == expected["id"].tolist()
+    pd.testing.assert_frame_equal(queue[COLUMNS], expected, check_dtype=False)
+
+
+def test_has_risk_column_tracks_ensure(db):
+    assert not has_risk_column(db)
+    ensure_risk_column(db)
+    assert has_risk_column(db)
+    ensure_risk_column(db)  # already current: nothing to do
+    assert has_risk_column(db)
+
+
+def test_risk_queue_follows_edits(db, incidents):
+    top = risk_queue(db, 1, AS_OF)["id"].iloc[0]
+    assert incidents.update_incident_status(int(top), "Closed")
+    queue = risk_queue(db, 20, AS_OF)
+    assert top not in queue["id"].tolist()
+    assert queue["id"].tolist() == ranked(incidents.get_all_incidents_df(), 20)["id"].tolist()
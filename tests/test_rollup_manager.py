@@ -0,0 +1,79 @@
+import pytest
+
+from models.security_incident import SecurityIncidentManager
+from services.rollup_manager import RollupManager
+
+
+def rollup_rows(db, rollup):
+    return {tuple(row[:-1]): row[-1] for row in db.fetch_all(f"SELECT * FROM {rollup}")}
+
+
+def raw_counts(db, table, date_column, keys):
+    """What the rollup should hold: rows per (day, *keys), counted from the table itself."""
+    columns = [f"COALESCE(date({date_column}), '')"] + [f"COALESCE({key}, '')" for key in keys]
+    group_by = ", ".join(str(i) for i in range(1, len(columns) + 1))
+    return {tuple(row[:-1]): row[-1] for row in db.fetch_all(
+        f"SELECT {', '.join(columns)}, COUNT(*) FROM {table} GROUP BY {group_by}")}
+
+
+def assert_current(db):
+    assert rollup_rows(db, "incident_daily_rollup") == raw_counts(
+        db, "cyber_incidents", "date", ["incident_type", "severity", "status"])
+    assert rollup_rows(db, "ticket_daily_rollup") == raw_counts(
+        db, "it_tickets", "created_date", ["priority", "status", "category"])
+
+
+def test_ensure_schema_fills_new_rollups(db):
+    RollupManager(db).ensure_schema()
+    assert_current(db)
+    assert db.fetch_one("SELECT SUM(count) FROM incident_daily_rollup")[0] == 5
+
+
+def test_triggers_follow_inserts_updates_and_deletes(db):
+    RollupManager(db).ensure_schema()
+    incidents = SecurityIncidentManager(db)
+    new_id = incidents.insert_incident("2024-01-12", "Malware", "Low", "Open", "Another adware toolbar", "dave")
+    assert_current(db)
+
+    assert incidents.update_incident_status(new_id, "Closed")
+    db.execute_query("UPDATE it_tickets SET priority = 'Critical', created_date = '2024-02-01' WHERE id = 2")
+    assert_current(db)
+
+    incidents.delete_incident(new_id)
+    db.execute_query("DELETE FROM it_tickets WHERE ticket_id = 'TICKET-003'")
+    assert_current(db)
+    # a group whose last row went away is dropped rather than left at zero
+    assert db.fetch_one("SELECT COUNT(*) FROM incident_daily_rollup WHERE count <= 0")[0] == 0
+
+
+def test_updates_of_other_columns_leave_the_rollups_alone(db):
+    RollupManager(db).ensure_schema()
+    before = rollup_rows(db, "incident_daily_rollup")
+    db.execute_query("UPDATE cyber_incidents SET description = 'edited' WHERE id = 1")
+    assert rollup_rows(db, "incident_daily_rollup") == before
+
+
+def test_rebuild_matches_the_triggers(db):
+    manager = RollupManager(db)
+    manager.ensure_schema()
+    db.execute_query("UPDATE cyber_incidents SET severity = 'Critical' WHERE id = 2")
+    maintained = rollup_rows(db, "incident_daily_rollup")
+    assert manager.rebuild()["incident_daily_rollup"] == len(maintained)
+    assert rollup_rows(db, "incident_daily_rollup") == maintained
+
+
+def test_trends(db):
+    manager = RollupManager(db)
+    manager.ensure_schema()
+    daily = manager.get_incident_trend(by="incident_type")
+    assert daily.groupby("period")["count"].sum().to_dict() == {"2024-01-10": 2, "2024-01-11": 1, "2024-01-12": 2}
+    weekly = manager.get_incident_trend(by="severity", freq="weekly")
+    assert set(weekly["period"]) == {"2024-01-08"}  # weeks start on Monday
+    assert weekly["count"].sum() == 5
+    ranged = manager.get_ticket_trend(by="status", start="2024-01-05", end="2024-01-06")
+    assert ranged["count"].sum() == 2
+
+    with pytest.raises(ValueError):
+        manager.get_incident_trend(by="reported_by")
+    with pytest.raises(ValueError):
+        manager.get_ticket_trend(freq="monthly")
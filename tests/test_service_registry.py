@@ -0,0 +1,33 @@
+import pytest
+
+from benchmarks.bench_fd_leak import open_fds, run_simulated
+
+
+@pytest.fixture
+def registry(db_path, monkeypatch):
+    """service_registry on the test database, without the background maintenance and dataset threads."""
+    from services import service_registry
+
+    service_registry.shutdown()
+    monkeypatch.setattr(service_registry, "DB_PATH", db_path)
+    monkeypatch.setattr(service_registry, "MAINTENANCE_ENABLED", False)
+    monkeypatch.setattr(service_registry, "DATASET_WATCH_ENABLED", False)
+    yield service_registry
+    service_registry.shutdown()
+
+
+def test_reruns_share_services(registry):
+    run_simulated(1)
+    database, snapshots = registry.get_database(), registry.get_snapshot_manager()
+    run_simulated(5)
+    assert registry.get_database() is database and registry.get_snapshot_manager() is snapshots
+
+
+def test_reruns_keep_the_file_descriptor_count_flat(registry):
+    # each rerun runs in a new thread, as Streamlit does; the warm-up opens the shared connections
+    run_simulated(3)
+    before = open_fds()
+    run_simulated(200)
+    assert open_fds() <= before
+    registry.shutdown()
+    assert open_fds() < before
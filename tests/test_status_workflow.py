@@ -0,0 +1,103 @@
+import pytest
+
+from models.it_ticket import TicketManager
+from models.security_incident import SecurityIncidentManager
+from models.status_workflow import build_filter, can_transition, sources_for, transition
+
+
+def statuses(db, table="cyber_incidents"):
+    return dict(db.fetch_all(f"SELECT id, status FROM {table}"))
+
+
+def test_state_machine():
+    assert can_transition("Open", "Closed") and can_transition("Closed", "Open")
+    assert not can_transition("Closed", "Resolved")
+    assert sources_for("Resolved") == ["Open", "In Progress"]
+    with pytest.raises(ValueError):
+        sources_for("Done")
+
+
+def test_build_filter():
+    assert build_filter() == ("1", [])
+    assert build_filter(keys=[]) == ("0", [])
+    where, params = build_filter(keys=[1, 2], equals={"severity": ["High"], "status": []},
+                                 date_column="date", older_than_days=30)
+    assert where == "id IN (?, ?) AND severity IN (?) AND date(trim(date)) < date('now', ?)"
+    assert params == [1, 2, "High", "-30 days"]
+
+
+def test_transition_moves_allowed_rows_and_counts_the_rest(db):
+    # incidents: 1 Closed, 2 Open, 3 Open, 4 Resolved, 5 In Progress
+    result = transition(db, "cyber_incidents", "id", "Resolved", "1", [])
+    assert (result.changed, result.unchanged, result.blocked) == (3, 1, {"Closed": 1})
+    assert sorted(result.changed_keys) == [2, 3, 5]
+    assert result.matched == 5
+    assert statuses(db) == {1: "Closed", 2: "Resolved", 3: "Resolved", 4: "Resolved", 5: "Resolved"}
+    assert result.summary() == "5 matched: 3 moved to Resolved, 1 already Resolved, blocked: 1 Closed"
+
+
+def test_dry_run_writes_nothing(db):
+    before = statuses(db)
+    result = SecurityIncidentManager(db).transition_incidents("Closed", incident_types=["Phishing"], dry_run=True)
+    assert (result.changed, result.unchanged, result.changed_keys) == (1, 1, [])
+    assert "would move" in result.summary()
+    assert statuses(db) == before
+
+
+def test_filtered_incident_transition(db):
+    result = SecurityIncidentManager(db).transition_incidents("In Progress", severities=["High", "Critical"],
+                                                               statuses=["Open"])
+    assert sorted(result.changed_keys) == [2, 3]
+    assert statuses(db)[1] == "Closed"
+
+
+def test_single_incident_updates_follow_the_workflow(db):
+    incidents = SecurityIncidentManager(db)
+    assert incidents.update_incident_status(2, "Closed")
+    assert incidents.update_incident_status(2, "Closed")  # already there
+    assert not incidents.update_incident_status(2, "Resolved")  # closed work can only be reopened
+    assert not incidents.update_incident_status(99, "Open")
+    assert statuses(db)[2] == "Closed"
+
+
+def test_ticket_resolved_date_follows_the_status(db):
+    tickets = TicketManager(db)
+    today = db.fetch_one("SELECT date('now')")[0]  # SQLite's (UTC) date, as the UPDATE stamps it
+
+    def resolved(ticket_id):
+        return db.fetch_one("SELECT resolved_date FROM it_tickets WHERE ticket_id = ?", (ticket_id,))[0]
+
+    assert tickets.update_ticket_status("TICKET-002", "Resolved") == 1
+    assert resolved("TICKET-002") == today
+    assert tickets.update_ticket_status("TICKET-001", "Resolved") == 0  # Closed -> Resolved is blocked
+    assert resolved("TICKET-001") == "2024-01-04"
+    assert tickets.update_ticket_status("TICKET-001", "Open") == 1
+    assert resolved("TICKET-001") is None
+    assert tickets.update_ticket_status("TICKET-003", "Closed", resolved_date="2024-01-09") == 1
+    assert resolved("TICKET-003") == "2024-01-09"
+    assert tickets.update_ticket_status("TICKET-404", "Closed") == 0
+
+    result = tickets.transition_tickets("Closed", categories=["Software"])
+    assert sorted(result.changed_keys) == ["TICKET-002", "TICKET-005"]
+    assert resolved("TICKET-002") == today and resolved("TICKET-005") == today
+
+
+def test_bulk_status_updates_follow_the_workflow(db):
+    incidents = SecurityIncidentManager(db)
+    # 1 is Closed: only reopening is allowed, so the batch reports it and leaves it alone
+    assert incidents.update_incident_statuses([2, 1, 99, 4], "Resolved") == (
+        2, [(1, "#1 is Closed and cannot move to Resolved"), (2, "#99 not found")])
+    assert statuses(db) == {1: "Closed", 2: "Resolved", 3: "Open", 4: "Resolved", 5: "In Progress"}
+
+    tickets = TicketManager(db)
+    today = db.fetch_one("SELECT date('now')")[0]
+    assert tickets.update_ticket_statuses(["TICKET-001", "TICKET-002", "TICKET-005"], "Resolved") == (
+        2, [(0, "TICKET-001 is Closed and cannot move to Resolved")])
+    assert db.fetch_all("SELECT ticket_id, status, resolved_date FROM it_tickets "
+                        "WHERE ticket_id IN ('TICKET-001', 'TICKET-002', 'TICKET-005') ORDER BY ticket_id") == [
+        ("TICKET-001", "Closed", "2024-01-04"),
+        ("TICKET-002", "Resolved", today),
+        ("TICKET-005", "Resolved", today),
+    ]
+    assert tickets.update_ticket_statuses(["TICKET-002"], "Open") == (1, [])
+    assert db.fetch_one("SELECT resolved_date FROM it_tickets WHERE ticket_id = 'TICKET-002'")[0] is None
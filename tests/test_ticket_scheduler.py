@@ -0,0 +1,108 @@
+import random
+
+from services.ticket_scheduler import IndexedHeap, TicketScheduler, queue_key
+
+
+def drain(heap):
+    items = []
+    while heap:
+        items.append(heap.pop())
+    return items
+
+
+def test_indexed_heap_matches_a_sorted_reference():
+    rng = random.Random(7)
+    heap, reference = IndexedHeap(), {}
+    for _ in range(2000):
+        item = rng.randrange(300)
+        if rng.random() < 0.25:
+            assert heap.remove(item) == (reference.pop(item, None) is not None)
+        else:
+            key = rng.choice([rng.random(), 0.5])  # repeated keys: ties go to the lower item
+            heap.push(item, key)  # inserts, or moves an item already queued
+            reference[item] = key
+    expected = sorted(((item, key) for item, key in reference.items()), key=lambda entry: (entry[1], entry[0]))
+    assert len(heap) == len(reference)
+    assert all(item in heap and heap.key(item) == key for item, key in reference.items())
+    assert heap.peek() == expected[0]
+    assert heap.smallest(10) == expected[:10]
+    assert heap.smallest(10_000) == expected
+    assert drain(heap) == expected
+    assert heap.pop() is None and heap.peek() is None and heap.smallest(3) == []
+
+
+def test_indexed_heap_build_heapifies():
+    rng = random.Random(11)
+    entries = [(item, float(rng.randrange(50))) for item in range(500)]
+    heap = IndexedHeap.build(entries)
+    heap.push(499, -1.0)
+    assert heap.remove(0)
+    expected = sorted([(item, key) for item, key in entries[1:499]] + [(499, -1.0)],
+                      key=lambda entry: (entry[1], entry[0]))
+    assert drain(heap) == expected
+
+
+def test_queue_key_orders_by_sla_then_priority():
+    critical, weight = queue_key("Critical", "2024-01-07")
+    assert weight == 4
+    assert critical < queue_key("Medium", "2024-01-05")[0] < queue_key("Low", "2024-01-06")[0]
+    assert queue_key("HIGH", "2024-01-07 09:30") == queue_key("High", "2024-01-07")
+    assert queue_key(None, "2024-01-07")[1] == 2  # unknown priorities count as medium
+
+
+def test_scheduler_queues_open_tickets_per_group(db):
+    scheduler = TicketScheduler(db).load()
+    assert scheduler.groups() == ["Helpdesk", "Network_Ops"]
+    assert scheduler.next_ticket().ticket_id == "TICKET-004"  # critical, unassigned
+    assert scheduler.next_ticket("Helpdesk").ticket_id == "TICKET-002"
+    assert scheduler.next_ticket("IT_Support") is None
+    assert scheduler.queue()["ticket_id"].tolist() == ["TICKET-004", "TICKET-002", "TICKET-003"]
+    loads = scheduler.loads().set_index("assigned_to")
+    assert loads.loc["Helpdesk"].tolist() == [1, 1, 5]  # queued, in progress, medium + high
+    assert loads.loc["Unassigned", "queued"] == 1
+    # loading only reads it_tickets
+    assert db.fetch_one("SELECT assigned_to FROM it_tickets WHERE ticket_id = 'TICKET-004'")[0] is None
+
+
+def test_scheduler_follows_ticket_changes(db):
+    scheduler = TicketScheduler(db).load()
+    db.execute_query("INSERT INTO it_tickets (ticket_id, priority, status, category, subject, created_date, "
+                     "assigned_to) VALUES ('TICKET-006', 'Critical', 'Open', 'Software', 'Payroll down', "
+                     "'2024-01-01', 'Helpdesk')")
+    db.execute_query("UPDATE it_tickets SET status = 'Closed' WHERE ticket_id = 'TICKET-002'")
+    assert scheduler.sync() == 2
+    assert scheduler.queue("Helpdesk")["ticket_id"].tolist() == ["TICKET-006"]
+    assert scheduler.loads().set_index("assigned_to").loc["Helpdesk", "load"] == 3 + 4
+
+    reloaded = TicketScheduler(db).load()  # restored from ticket_queue, not re-scored
+    assert reloaded.queue()["ticket_id"].tolist() == scheduler.queue()["ticket_id"].tolist()
+
+
+def test_claim_next_moves_the_ticket_in_progress(db):
+    scheduler = TicketScheduler(db).load()
+    assert scheduler.claim_next("Helpdesk").ticket_id == "TICKET-002"
+    assert db.fetch_one("SELECT status FROM it_tickets WHERE ticket_id = 'TICKET-002'")[0] == "In Progress"
+    assert scheduler.claim_next("Helpdesk") is None
+
+
+def test_assign_unassigned_prefers_the_least_loaded_group_for_the_category(db):
+    db.execute_many("INSERT INTO it_tickets (ticket_id, priority, status, category, subject, created_date) "
+                    "VALUES (?, ?, 'Open', ?, ?, '2024-01-08')",
+                    [("TICKET-006", "Low", "Software", "Teams audio"), ("TICKET-007", "Low", "Facilities", "Desk")])
+    scheduler = TicketScheduler(db).load()
+    assert scheduler.assign_unassigned() == 3
+    assigned = dict(db.fetch_all("SELECT ticket_id, assigned_to FROM it_tickets WHERE ticket_id IN "
+                                 "('TICKET-004', 'TICKET-006', 'TICKET-007')"))
+    # most urgent first: Network and Software go to the groups handling them (Network_Ops 1 + 4, Helpdesk
+    # 5 + 1), then Facilities, which nobody has handled, to the least-loaded group
+    assert assigned == {"TICKET-004": "Network_Ops", "TICKET-006": "Helpdesk", "TICKET-007": "Network_Ops"}
+    assert "Unassigned" not in scheduler.loads()["assigned_to"].tolist()
+    assert scheduler.assign_unassigned() == 0
+
+
+def test_assign_keeps_a_group_set_since_the_queue_was_loaded(db):
+    scheduler = TicketScheduler(db).load()
+    db.execute_query("UPDATE it_tickets SET assigned_to = 'IT_Support' WHERE ticket_id = 'TICKET-004'")
+    assert scheduler.assign_unassigned() == 0
+    assert db.fetch_one("SELECT assigned_to FROM it_tickets WHERE id = 4")[0] == "IT_Support"
+    assert scheduler.next_ticket("IT_Support").ticket_id == "TICKET-004"